@@ -6,6 +6,7 @@ from datetime import datetime
 from pathlib import Path
 import json
 
+from ..cache import get_cache
 from .base_agent import AgentContext
 
 logger = logging.getLogger(__name__)
@@ -16,7 +17,7 @@ class ContextManager:
     
     def __init__(self):
         self.logger = logging.getLogger(__name__)
-        self._context_cache = {}
+        self._context_cache = get_cache("agent_context", max_entries=64, default_ttl=3600)
         self._shared_metrics = {}
         
     async def prepare_context(self,
@@ -63,7 +64,7 @@ class ContextManager:
         
         # Cache per riuso
         cache_key = f"{validated_company_info.get('company_name')}_{datetime.now().date()}"
-        self._context_cache[cache_key] = context
+        self._context_cache.set(cache_key, context)
         
         return context
     
@@ -1,11 +1,14 @@
 """AI Report Orchestrator - Coordina gli agent per generazione report enterprise"""
 
 import asyncio
+import hashlib
 import logging
 from typing import Dict, Any, List, Optional
 from datetime import datetime
 import json
 
+from ..cache import get_cache
+
 from .base_agent import AgentContext, AgentResult, AgentStatus, AgentPriority
 from .executive_agent import ExecutiveSummaryAgent
 from .technical_agent import TechnicalAnalysisAgent
@@ -36,6 +39,9 @@ class AIReportOrchestrator:
         # Inizializza agent specializzati
         self.specialist_agents = self._initialize_agents()
         
+        # Report già generati per gli stessi input (enable_caching)
+        self.report_cache = get_cache("ai_reports", max_entries=32, default_ttl=self.config.get('cache_ttl', 3600))
+        
         # Metriche di esecuzione
         self.execution_metrics = {
             'total_reports': 0,
@@ -93,6 +99,26 @@ class AIReportOrchestrator:
         Returns:
             Dizionario con report HTML e metadati
         """
+        if not self.config.get('enable_caching'):
+            return await self._generate_report(scan_data, company_info, requirements)
+        
+        # Stessi input, stesso report: richieste concorrenti attendono una
+        # sola generazione; i report di fallback non vengono memorizzati
+        cache_key = hashlib.sha256(json.dumps(
+            [scan_data, company_info, requirements], sort_keys=True, default=str
+        ).encode()).hexdigest()
+        return await self.report_cache.aget_or_load(
+            cache_key,
+            lambda: self._generate_report(scan_data, company_info, requirements),
+            ttl=self.config.get('cache_ttl'),
+            should_cache=lambda report: report.get('status') == 'success'
+        )
+    
+    async def _generate_report(self,
+                               scan_data: Dict[str, Any],
+                               company_info: Dict[str, Any],
+                               requirements: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Generazione effettiva del report (senza cache)"""
         start_time = datetime.now()
         self.logger.info(f"Starting report generation for {company_info.get('company_name')}")
         
@@ -421,6 +447,7 @@ class AIReportOrchestrator:
     def get_orchestrator_stats(self) -> Dict[str, Any]:
         """Ottiene statistiche dell'orchestratore"""
         stats = self.execution_metrics.copy()
+        stats['cache'] = self.report_cache.snapshot()
         
         # Aggiungi statistiche per agent
         stats['agent_stats'] = {}
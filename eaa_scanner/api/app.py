@@ -137,7 +137,8 @@ class AccessibilityAPIServer:
                 cleanup_count = self.session_manager.cleanup_old_sessions()
                 if cleanup_count > 0:
                     logger.info(f"Cleanup: {cleanup_count} sessioni rimosse")
-        
+                self.session_manager.close()
+
         except Exception as e:
             logger.error(f"Errore durante shutdown: {e}")
         
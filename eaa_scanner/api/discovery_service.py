@@ -218,26 +218,11 @@ class DiscoveryService:
         Returns:
             True se aggiornata con successo
         """
-        session = self.session_manager.get_discovery_session(session_id)
-        if not session:
+        # Reset e nuove selezioni applicati dal manager col lock di sessione
+        selected_count = self.session_manager.set_page_selection(session_id, selected_urls)
+        if selected_count is None:
             return False
         
-        # Reset selezioni precedenti
-        for page in session.discovered_pages:
-            page.selected_for_scan = False
-            page.selection_reason = ""
-        
-        # Applica nuove selezioni
-        selected_count = 0
-        for page in session.discovered_pages:
-            if page.url in selected_urls:
-                page.selected_for_scan = True
-                page.selection_reason = "user_selected"
-                selected_count += 1
-        
-        # Salva aggiornamento
-        self.session_manager.update_discovery_session(session_id)
-        
         logger.info(f"Selezione aggiornata per session {session_id}: {selected_count} pagine")
         return True
     
@@ -307,7 +292,8 @@ class DiscoveryService:
                     logger.info(f"SmartCrawler completato: {len(discovered_pages)} pagine")
                 except Exception as e:
                     logger.warning(f"SmartCrawler fallito: {e}, fallback a WebCrawler")
-                    session.add_warning(f"SmartCrawler non disponibile: {e}")
+                    self.session_manager.add_discovery_log(
+                        session_id, f"SmartCrawler non disponibile: {e}", level="warning")
             
             # Fallback a WebCrawler se SmartCrawler fallito o disabilitato
             if not discovered_pages:
@@ -389,12 +375,12 @@ class DiscoveryService:
             crawler.excluded_patterns = config.excluded_patterns
         
         logger.info(f"Avvio SmartCrawler per {session.base_url}")
-        session.add_log("Avvio SmartCrawler con Playwright...")
+        self.session_manager.add_discovery_log(session.session_id, "Avvio SmartCrawler con Playwright...")
         
         # Esegui crawling
         pages = crawler.crawl()
         
-        session.add_log(f"SmartCrawler completato: {len(pages)} pagine scoperte")
+        self.session_manager.add_discovery_log(session.session_id, f"SmartCrawler completato: {len(pages)} pagine scoperte")
         return pages
     
     def _run_web_crawler(self, session: DiscoverySession,
@@ -421,12 +407,12 @@ class DiscoveryService:
         )
         
         logger.info(f"Avvio WebCrawler per {session.base_url}")
-        session.add_log("Avvio WebCrawler con requests...")
+        self.session_manager.add_discovery_log(session.session_id, "Avvio WebCrawler con requests...")
         
         # Esegui crawling
         pages = crawler.crawl()
         
-        session.add_log(f"WebCrawler completato: {len(pages)} pagine scoperte")
+        self.session_manager.add_discovery_log(session.session_id, f"WebCrawler completato: {len(pages)} pagine scoperte")
         return pages
     
     def _process_discovery_results(self, session_id: str, 
@@ -442,7 +428,7 @@ class DiscoveryService:
         if not session:
             return
         
-        session.add_log("Processamento risultati discovery...")
+        self.session_manager.add_discovery_log(session_id, "Processamento risultati discovery...")
         
         # Converti in DiscoveredPage
         processed_pages = []
@@ -519,7 +505,10 @@ class DiscoveryService:
             pages_processed=len(processed_pages)
         )
         
-        session.add_log(f"Processamento completato: {len(processed_pages)} pagine, {len(templates_detected)} template")
+        self.session_manager.add_discovery_log(
+            session_id,
+            f"Processamento completato: {len(processed_pages)} pagine, {len(templates_detected)} template"
+        )
         
         # Salva report discovery
         self._save_discovery_report(session_id)
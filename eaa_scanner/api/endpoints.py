@@ -6,13 +6,17 @@ Implementa REST API completa con gestione errori e validazione
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Dict, Any, Optional, Tuple, List
+from typing import Dict, Any, Optional, Tuple, List, Iterable
 import json
 import time
 import logging
 import mimetypes
 from urllib.parse import parse_qs
 
+from ..delivery import (
+    COMPRESSIBLE_SUFFIXES, FILE_CHUNK_SIZE, RangeNotSatisfiable, iter_file, iter_json,
+    parse_range, select_precompressed
+)
 from .models import (
     DiscoveryStartRequest, ScanStartRequest, DiscoveryConfiguration, 
     ScanConfiguration, SessionStatus
@@ -168,12 +172,12 @@ class APIEndpoints:
         # GET /api/download/html/{scan_id} - Scarica HTML
         elif path.startswith("/api/download/html/") and method == "GET":
             scan_id = path.split("/")[-1]
-            return self._handle_download_html(start_response, scan_id)
+            return self._handle_download_html(environ, start_response, scan_id)
         
         # GET /api/download/pdf/{scan_id} - Scarica PDF
         elif path.startswith("/api/download/pdf/") and method == "GET":
             scan_id = path.split("/")[-1]
-            return self._handle_download_pdf(start_response, scan_id)
+            return self._handle_download_pdf(environ, start_response, scan_id)
         
         # ========== WEBSOCKET INFO ==========
         
@@ -399,16 +403,16 @@ class APIEndpoints:
         return self._json_response(start_response, status)
     
     def _handle_scan_results(self, start_response: callable, scan_id: str, 
-                           include_issues: bool) -> List[bytes]:
+                           include_issues: bool) -> Iterable[bytes]:
         """
         GET /api/scan/results/{scan_id}
-        Ottiene risultati scan
+        Ottiene risultati scan (serializzati in streaming)
         """
         results = self.scan_service.get_scan_results(scan_id, include_issues)
         if not results:
             return self._handle_404(start_response, "Scan session non trovata o non completata")
         
-        return self._json_response(start_response, results)
+        return self._stream_json_response(start_response, results)
     
     def _handle_scan_cancel(self, start_response: callable, scan_id: str) -> List[bytes]:
         """
@@ -478,7 +482,8 @@ class APIEndpoints:
     
     # ========== FILE DOWNLOAD HANDLERS ==========
     
-    def _handle_download_html(self, start_response: callable, scan_id: str) -> List[bytes]:
+    def _handle_download_html(self, environ: Dict[str, Any], start_response: callable,
+                              scan_id: str) -> Iterable[bytes]:
         """
         GET /api/download/html/{scan_id}
         Scarica report HTML
@@ -491,9 +496,10 @@ class APIEndpoints:
         if not html_path.exists():
             return self._handle_404(start_response, "File report HTML non trovato")
         
-        return self._file_response(start_response, html_path, "text/html")
+        return self._file_response(start_response, html_path, "text/html", environ)
     
-    def _handle_download_pdf(self, start_response: callable, scan_id: str) -> List[bytes]:
+    def _handle_download_pdf(self, environ: Dict[str, Any], start_response: callable,
+                             scan_id: str) -> Iterable[bytes]:
         """
         GET /api/download/pdf/{scan_id}
         Scarica report PDF
@@ -506,7 +512,7 @@ class APIEndpoints:
         if not pdf_path.exists():
             return self._handle_404(start_response, "File report PDF non trovato")
         
-        return self._file_response(start_response, pdf_path, "application/pdf")
+        return self._file_response(start_response, pdf_path, "application/pdf", environ)
     
     # ========== OTHER HANDLERS ==========
     
@@ -630,6 +636,27 @@ class APIEndpoints:
         except:
             return False
     
+    def _status_line(self, status_code: int) -> str:
+        """Riga di stato WSGI per il codice HTTP"""
+        return {
+            200: "200 OK",
+            201: "201 Created",
+            206: "206 Partial Content",
+            400: "400 Bad Request",
+            404: "404 Not Found",
+            416: "416 Range Not Satisfiable",
+            500: "500 Internal Server Error"
+        }.get(status_code, f"{status_code} Unknown")
+    
+    def _json_headers(self) -> List[Tuple[str, str]]:
+        """Header comuni delle risposte JSON"""
+        return [
+            ("Content-Type", "application/json; charset=utf-8"),
+            ("Access-Control-Allow-Origin", "*"),
+            ("Access-Control-Allow-Methods", "GET, POST, PUT, DELETE, OPTIONS"),
+            ("Access-Control-Allow-Headers", "Content-Type, Authorization")
+        ]
+    
     def _json_response(self, start_response: callable, data: Dict[str, Any], 
                       status_code: int = 200) -> List[bytes]:
         """
@@ -643,48 +670,84 @@ class APIEndpoints:
         Returns:
             Risposta JSON come bytes
         """
-        status_text = {
-            200: "200 OK",
-            201: "201 Created",
-            400: "400 Bad Request",
-            404: "404 Not Found",
-            500: "500 Internal Server Error"
-        }.get(status_code, f"{status_code} Unknown")
-        
-        headers = [
-            ("Content-Type", "application/json; charset=utf-8"),
-            ("Access-Control-Allow-Origin", "*"),
-            ("Access-Control-Allow-Methods", "GET, POST, PUT, DELETE, OPTIONS"),
-            ("Access-Control-Allow-Headers", "Content-Type, Authorization")
-        ]
-        
-        start_response(status_text, headers)
+        start_response(self._status_line(status_code), self._json_headers())
         
         json_data = json.dumps(data, ensure_ascii=False, indent=2)
         return [json_data.encode('utf-8')]
     
+    def _stream_json_response(self, start_response: callable, data: Dict[str, Any]) -> Iterable[bytes]:
+        """
+        Crea risposta JSON serializzata a blocchi
+        
+        Senza Content-Length il server usa il chunked encoding: il documento
+        non viene mai costruito per intero come stringa.
+        
+        Args:
+            start_response: Callback WSGI
+            data: Dati da serializzare
+            
+        Returns:
+            Iteratore sui blocchi JSON
+        """
+        start_response(self._status_line(200), self._json_headers())
+        return iter_json(data, indent=2)
+    
     def _file_response(self, start_response: callable, file_path: Path, 
-                      content_type: str) -> List[bytes]:
+                      content_type: str, environ: Optional[Dict[str, Any]] = None) -> Iterable[bytes]:
         """
         Crea risposta per download file
         
+        Serve la variante precompressa accettata dal client (HTML/JSON),
+        supporta Range a intervallo singolo e usa wsgi.file_wrapper, quando
+        il server lo offre, per l'invio zero-copy (sendfile).
+        
         Args:
             start_response: Callback WSGI
             file_path: Path del file
             content_type: Content type
+            environ: Environment WSGI (Range, Accept-Encoding, file_wrapper)
             
         Returns:
-            Contenuto file come bytes
+            Contenuto file a blocchi
         """
+        environ = environ or {}
+        range_header = environ.get("HTTP_RANGE")
         headers = [
             ("Content-Type", content_type),
             ("Content-Disposition", f"attachment; filename={file_path.name}"),
-            ("Content-Length", str(file_path.stat().st_size))
+            ("Accept-Ranges", "bytes")
         ]
         
-        start_response("200 OK", headers)
+        serve_path, encoding = file_path, None
+        if file_path.suffix.lower() in COMPRESSIBLE_SUFFIXES:
+            headers.append(("Vary", "Accept-Encoding"))
+            if not range_header:
+                # Le richieste Range si riferiscono sempre al file originale
+                serve_path, encoding = select_precompressed(file_path, environ.get("HTTP_ACCEPT_ENCODING"))
+        if encoding:
+            headers.append(("Content-Encoding", encoding))
         
-        return [file_path.read_bytes()]
+        size = serve_path.stat().st_size
+        try:
+            byte_range = parse_range(range_header, size)
+        except RangeNotSatisfiable:
+            start_response(self._status_line(416), [("Content-Range", f"bytes */{size}")])
+            return []
+        
+        if byte_range:
+            start, end = byte_range
+            headers.append(("Content-Range", f"bytes {start}-{end}/{size}"))
+            headers.append(("Content-Length", str(end - start + 1)))
+            start_response(self._status_line(206), headers)
+            return iter_file(serve_path, start, end)
+        
+        headers.append(("Content-Length", str(size)))
+        start_response(self._status_line(200), headers)
+        
+        file_wrapper = environ.get("wsgi.file_wrapper")
+        if file_wrapper:
+            return file_wrapper(open(serve_path, "rb"), FILE_CHUNK_SIZE)
+        return iter_file(serve_path)
     
     def _handle_400(self, start_response: callable, message: str) -> List[bytes]:
         """Gestisce errore 400"""
@@ -0,0 +1,178 @@
+"""
+Coda di uscita per client WebSocket con backpressure
+Ogni client ha una coda limitata svuotata da un writer task dedicato
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Optional, Callable, Any, Awaitable
+from collections import deque
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+# Eventi di progresso: in coda ne basta l'ultimo per tipo/scanner
+COALESCIBLE_EVENT_TYPES = {
+    "progress", "scan_progress", "discovery_progress",
+    "scanner_operation", "page_progress"
+}
+
+
+def coalesce_key_for(event_type: Optional[str], data: Optional[Dict[str, Any]] = None) -> Optional[str]:
+    """
+    Chiave di coalescing per un evento (None se l'evento va sempre consegnato)
+    
+    Args:
+        event_type: Tipo evento
+        data: Payload evento (usato per distinguere gli scanner)
+        
+    Returns:
+        Chiave o None
+    """
+    if event_type not in COALESCIBLE_EVENT_TYPES:
+        return None
+    scanner = ""
+    if isinstance(data, dict):
+        scanner = str(data.get("scanner") or data.get("scanner_name") or "")
+    return f"{event_type}:{scanner}"
+
+
+class ClientOutbox:
+    """
+    Coda di uscita limitata con writer task dedicato per un client
+    
+    Il broadcast accoda senza attendere la rete: un client lento riempie solo
+    la propria coda. Gli eventi di progresso con la stessa chiave vengono
+    sostituiti in coda (coalescing): il messaggio nuovo va in fondo, così non
+    supera mai eventi accodati dopo quello sostituito. A coda piena si scarta
+    l'evento più vecchio.
+    """
+    
+    def __init__(self, send: Callable[[str], Awaitable[Any]], client_id: str,
+                 max_queue: int = 100, send_timeout: float = 10.0,
+                 on_close: Optional[Callable[["ClientOutbox"], None]] = None):
+        """
+        Inizializza la outbox
+        
+        Args:
+            send: Coroutine function che invia un messaggio testuale
+            client_id: ID del client (per log e metriche)
+            max_queue: Numero massimo di messaggi in attesa
+            send_timeout: Timeout per singolo invio in secondi
+            on_close: Callback invocata quando il writer termina per errore
+        """
+        self.client_id = client_id
+        self.max_queue = max(1, max_queue)
+        self.send_timeout = send_timeout
+        self._send = send
+        self._on_close = on_close
+        self._queue: deque = deque()
+        self._pending_by_key: Dict[str, list] = {}
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.closed = False
+        
+        # Metriche
+        self.sent = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.max_depth = 0
+    
+    @property
+    def depth(self) -> int:
+        """Messaggi attualmente in coda"""
+        return len(self._queue)
+    
+    def start(self) -> None:
+        """Avvia il writer task (richiede un event loop attivo)"""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._writer())
+    
+    def enqueue(self, message: str, coalesce_key: Optional[str] = None) -> bool:
+        """
+        Accoda un messaggio senza bloccare
+        
+        Args:
+            message: Messaggio già serializzato
+            coalesce_key: Chiave per sostituire un messaggio equivalente in coda
+            
+        Returns:
+            False se la outbox è chiusa
+        """
+        if self.closed:
+            return False
+        
+        if coalesce_key is not None:
+            entry = self._pending_by_key.pop(coalesce_key, None)
+            if entry is not None:
+                # Rimuove il vecchio messaggio: il nuovo viene accodato in fondo
+                # per rispettare l'ordine rispetto agli eventi successivi
+                self._queue.remove(entry)
+                self.coalesced += 1
+        
+        if len(self._queue) >= self.max_queue:
+            oldest_key, _ = self._queue.popleft()
+            if oldest_key is not None:
+                self._pending_by_key.pop(oldest_key, None)
+            self.dropped += 1
+        
+        entry = [coalesce_key, message]
+        self._queue.append(entry)
+        if coalesce_key is not None:
+            self._pending_by_key[coalesce_key] = entry
+        self.max_depth = max(self.max_depth, len(self._queue))
+        self._wakeup.set()
+        return True
+    
+    async def _writer(self) -> None:
+        try:
+            while not self.closed:
+                if not self._queue:
+                    self._wakeup.clear()
+                    await self._wakeup.wait()
+                    continue
+                
+                key, message = self._queue.popleft()
+                if key is not None:
+                    self._pending_by_key.pop(key, None)
+                
+                await asyncio.wait_for(self._send(message), timeout=self.send_timeout)
+                self.sent += 1
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.warning(f"Writer WebSocket {self.client_id} terminato: {e}")
+            self.closed = True
+            if self._on_close:
+                try:
+                    self._on_close(self)
+                except Exception:
+                    pass
+    
+    def close(self) -> None:
+        """Ferma il writer e scarta i messaggi in coda (contati come dropped)"""
+        self.closed = True
+        self.dropped += len(self._queue)
+        self._queue.clear()
+        self._pending_by_key.clear()
+        if self._task and not self._task.done() and not self._in_writer():
+            self._task.cancel()
+    
+    def _in_writer(self) -> bool:
+        """True se chiamato dal writer stesso (es. on_close dopo un errore)"""
+        try:
+            return asyncio.current_task() is self._task
+        except RuntimeError:
+            return False
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "client_id": self.client_id,
+            "queue_depth": self.depth,
+            "max_queue_depth": self.max_depth,
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+        }
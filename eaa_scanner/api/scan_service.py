@@ -13,6 +13,7 @@ import logging
 import asyncio
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
+from ..cancellation import CancellationRegistry, ScanCancelled, reset_current_token, set_current_token
 from ..scanners import WaveScanner, Pa11yScanner, AxeScanner, LighthouseScanner
 from ..processors import process_wave, process_pa11y, normalize_all
 from ..report import generate_html_report, write_report
@@ -47,6 +48,9 @@ class ScanService:
         # Thread pool per esecuzione asincrona
         self._running_threads: Dict[str, threading.Thread] = {}
         
+        # Token di annullamento delle scan in corso (terminano gli scanner attivi)
+        self._cancellations = CancellationRegistry()
+        
         logger.info("ScanService inizializzato")
     
     def start_scan(self, discovery_session_id: str, selected_urls: List[str],
@@ -261,12 +265,13 @@ class ScanService:
         if not session:
             return False
         
-        # Segnala cancellazione
+        # Segnala cancellazione e termina subito lo scanner in esecuzione
         self.session_manager.set_scan_status(
             session_id,
             SessionStatus.CANCELLED,
             message="Scan cancellata dall'utente"
         )
+        self._cancellations.cancel(session_id, "Scan cancellata dall'utente")
         
         logger.info(f"Scan {session_id} cancellata")
         return True
@@ -330,6 +335,9 @@ class ScanService:
         except ImportError:
             logger.warning("SSE monitor not available, continuing without real-time events")
         
+        # Token corrente del thread: run_command lo usa per i sottoprocessi degli scanner
+        cancel_token = self._cancellations.open(session_id)
+        cancel_reset = set_current_token(cancel_token)
         try:
             # Avvia sessione
             self.session_manager.set_scan_status(
@@ -398,6 +406,9 @@ class ScanService:
             
             logger.info(f"Scan {session_id} completata con successo")
             
+        except ScanCancelled:
+            # Lo stato CANCELLED è già stato impostato da cancel_scan
+            logger.info(f"Scan {session_id} cancellata: scanner in corso terminati")
         except Exception as e:
             logger.error(f"Errore in scan worker {session_id}: {e}", exc_info=True)
             self.session_manager.set_scan_status(
@@ -410,6 +421,8 @@ class ScanService:
             if monitor:
                 monitor.emit_scan_failed(session_id, str(e))
         finally:
+            reset_current_token(cancel_reset)
+            self._cancellations.release(session_id, cancel_token)
             # Cleanup thread reference
             if session_id in self._running_threads:
                 del self._running_threads[session_id]
@@ -439,11 +452,13 @@ class ScanService:
         )
         
         # Esegui scan per ogni pagina
+        cancel_token = self._cancellations.open(session_id)
         for i, page in enumerate(session.selected_pages):
             # Controlla cancellazione
             current_session = self.session_manager.get_scan_session(session_id)
             if not current_session or current_session.status == SessionStatus.CANCELLED:
                 break
+            cancel_token.raise_if_cancelled()
             
             logger.info(f"Scansione pagina {i+1}/{len(session.selected_pages)}: {page.url}")
             
@@ -482,8 +497,8 @@ class ScanService:
                 current_scanner=""
             )
             
-            # Piccola pausa tra pagine
-            time.sleep(0.5)
+            # Piccola pausa tra pagine (interrotta dalla cancellazione)
+            cancel_token.sleep(0.5)
         
         return all_results
     
@@ -938,7 +953,7 @@ class ScanService:
         if not session:
             return
         
-        session.add_log("Generazione report finale...")
+        self.session_manager.add_scan_log(session_id, "Generazione report finale...")
         
         # Aggiorna progresso per report generation
         self.session_manager.update_scan_progress(
@@ -968,7 +983,7 @@ class ScanService:
                     report_html_path=str(report_path)
                 )
                 
-                session.add_log(f"Report HTML salvato: {report_path}")
+                self.session_manager.add_scan_log(session_id, f"Report HTML salvato: {report_path}")
                 
                 # Salva anche dati aggregati
                 import json
@@ -977,7 +992,8 @@ class ScanService:
             
         except Exception as e:
             logger.error(f"Errore generazione report per scan {session_id}: {e}")
-            session.add_error(f"Errore generazione report: {str(e)}")
+            self.session_manager.add_scan_log(
+                session_id, f"Errore generazione report: {str(e)}", level="error")
     
     def _create_aggregated_data(self, session: ScanSession, all_results: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
@@ -0,0 +1,275 @@
+"""
+Indice su disco delle sessioni e cache LRU dei contenuti completi
+All'avvio si carica solo l'indice; le sessioni vengono lette al primo accesso
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, List, Any, Callable, Iterable
+import json
+import os
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+INDEX_VERSION = 1
+
+
+class SessionIndex:
+    """
+    Indice persistente dei riepiloghi di sessione (id, status, timestamp, dimensioni)
+
+    Il file è piccolo rispetto alle sessioni complete e viene riscritto in modo
+    atomico. Può essere indietro rispetto al disco dopo un crash: il
+    SessionManager lo riconcilia all'avvio con gli snapshot presenti.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._entries: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+
+    def load(self) -> bool:
+        """
+        Carica l'indice dal disco
+
+        Returns:
+            True se un indice valido era presente
+        """
+        if not self.path.exists():
+            return False
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != INDEX_VERSION:
+                return False
+            with self._lock:
+                self._entries = {kind: dict(entries) for kind, entries in data.get("sessions", {}).items()}
+            return True
+        except Exception as e:
+            logger.warning(f"Indice sessioni non leggibile, verrà ricostruito: {e}")
+            return False
+
+    def get(self, kind: str, session_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._entries.get(kind, {}).get(session_id)
+
+    def put(self, kind: str, session_id: str, summary: Dict[str, Any]) -> None:
+        with self._lock:
+            self._entries.setdefault(kind, {})[session_id] = summary
+            self._dirty = True
+
+    def remove(self, kind: str, session_id: str) -> None:
+        with self._lock:
+            if self._entries.get(kind, {}).pop(session_id, None) is not None:
+                self._dirty = True
+
+    def ids(self, kind: str) -> List[str]:
+        with self._lock:
+            return list(self._entries.get(kind, {}))
+
+    def entries(self, kind: str) -> List[Dict[str, Any]]:
+        """Riepiloghi di un tipo di sessione (gli oggetti restituiti non vanno modificati)"""
+        with self._lock:
+            return list(self._entries.get(kind, {}).values())
+
+    def save(self, force: bool = False) -> None:
+        """Scrive l'indice su disco (tmp + rename) se modificato"""
+        with self._lock:
+            if not self._dirty and not force:
+                return
+            data = {"version": INDEX_VERSION, "sessions": self._entries}
+            tmp_path = self.path.with_name(self.path.name + ".tmp")
+            try:
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+                os.replace(tmp_path, self.path)
+                self._dirty = False
+            except Exception as e:
+                logger.error(f"Errore salvataggio indice sessioni: {e}")
+
+
+class LazySessionStore:
+    """
+    Sessioni di un tipo: riepiloghi sempre in memoria, contenuti caricati on demand
+
+    I contenuti completi restano in una LRU limitata. Vengono scaricate solo
+    sessioni in stato finale e non in uso da un writer (lock di sessione
+    libero): le sessioni attive restano sempre in memoria.
+    """
+
+    def __init__(self, kind: str, index: SessionIndex, summarize: Callable[[Any], Dict[str, Any]],
+                 loader: Optional[Callable[[str], Any]] = None, max_loaded: Optional[int] = None,
+                 is_final: Callable[[Any], bool] = lambda session: False,
+                 lock_for: Optional[Callable[[str], Any]] = None,
+                 on_evict: Optional[Callable[[str], None]] = None):
+        """
+        Inizializza lo store
+
+        Args:
+            kind: Tipo sessione ("discovery" o "scan")
+            index: Indice condiviso dei riepiloghi
+            summarize: Funzione sessione -> riepilogo
+            loader: Funzione session_id -> sessione (None: nessun caricamento lazy)
+            max_loaded: Sessioni complete mantenute in memoria (None: illimitate)
+            is_final: Se una sessione può essere scaricata dalla memoria
+            lock_for: Lock di sessione, acquisito in modo non bloccante prima di scaricarla
+            on_evict: Callback invocata dopo lo scaricamento
+        """
+        self.kind = kind
+        self._index = index
+        self._summarize = summarize
+        self._loader = loader
+        self.max_loaded = max_loaded if loader is not None else None
+        self._is_final = is_final
+        self._lock_for = lock_for
+        self._on_evict = on_evict
+        self._loaded: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.RLock()
+        self.loads = 0
+        self.evictions = 0
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._loaded or self._index.get(self.kind, session_id) is not None
+
+    def __len__(self) -> int:
+        return len(self._index.ids(self.kind))
+
+    @property
+    def loaded_count(self) -> int:
+        return len(self._loaded)
+
+    def get(self, session_id: str) -> Optional[Any]:
+        """
+        Sessione completa (caricata dal disco se necessario)
+
+        Args:
+            session_id: ID della sessione
+
+        Returns:
+            Sessione o None se non esiste
+        """
+        with self._lock:
+            session = self._loaded.get(session_id)
+            if session is not None:
+                self._loaded.move_to_end(session_id)
+                return session
+            if self._loader is None or self._index.get(self.kind, session_id) is None:
+                return None
+
+            try:
+                session = self._loader(session_id)
+            except Exception as e:
+                logger.error(f"Errore caricamento {self.kind} session {session_id}: {e}")
+                return None
+            self.loads += 1
+            self._loaded[session_id] = session
+            self._evict(keep=session_id)
+            return session
+
+    def add(self, session: Any) -> None:
+        """Registra una sessione (nuova o appena caricata) e il suo riepilogo"""
+        with self._lock:
+            self._loaded[session.session_id] = session
+            self._loaded.move_to_end(session.session_id)
+            self.refresh(session)
+            self._evict(keep=session.session_id)
+
+    def refresh(self, session: Any, **extra: Any) -> bool:
+        """
+        Aggiorna il riepilogo di una sessione modificata
+
+        Args:
+            session: Sessione
+            **extra: Campi aggiuntivi del riepilogo (es. size_bytes)
+
+        Returns:
+            True se lo status è cambiato rispetto all'indice
+        """
+        previous = self._index.get(self.kind, session.session_id) or {}
+        summary = self._summarize(session)
+        if "size_bytes" in previous:
+            summary["size_bytes"] = previous["size_bytes"]
+        summary.update(extra)
+        self._index.put(self.kind, session.session_id, summary)
+        return previous.get("status") != summary["status"]
+
+    def remove(self, session_id: str) -> None:
+        with self._lock:
+            self._loaded.pop(session_id, None)
+            self._index.remove(self.kind, session_id)
+
+    def summaries(self) -> List[Dict[str, Any]]:
+        """Riepiloghi di tutte le sessioni, senza caricarne i contenuti"""
+        return self._index.entries(self.kind)
+
+    def ids(self) -> List[str]:
+        return self._index.ids(self.kind)
+
+    def loaded_ids(self) -> Iterable[str]:
+        with self._lock:
+            return list(self._loaded)
+
+    def _evict(self, keep: str) -> None:
+        """Scarica le sessioni finali meno usate oltre il limite (col lock dello store)"""
+        if self.max_loaded is None or len(self._loaded) <= self.max_loaded:
+            return
+
+        for session_id in list(self._loaded):
+            if len(self._loaded) <= self.max_loaded:
+                break
+            session = self._loaded[session_id]
+            if session_id == keep or not self._is_final(session):
+                continue
+
+            lock = self._lock_for(session_id) if self._lock_for else None
+            if lock is not None and not lock.acquire(blocking=False):
+                # Un writer la sta usando: resta in memoria
+                continue
+            try:
+                del self._loaded[session_id]
+                self.evictions += 1
+                if self._on_evict:
+                    self._on_evict(session_id)
+            finally:
+                if lock is not None:
+                    lock.release()
+
+
+def summarize_discovery(session: Any) -> Dict[str, Any]:
+    """Riepilogo indicizzato di una sessione discovery"""
+    return {
+        "session_id": session.session_id,
+        "base_url": session.base_url,
+        "status": session.status.value,
+        "pages_discovered": session.pages_discovered,
+        "created_at": session.created_at,
+        "started_at": session.started_at,
+        "completed_at": session.completed_at,
+        "templates_detected": session.templates_detected,
+        "progress_percent": session.progress_percent
+    }
+
+
+def summarize_scan(session: Any) -> Dict[str, Any]:
+    """Riepilogo indicizzato di una sessione scan"""
+    return {
+        "session_id": session.session_id,
+        "discovery_session_id": session.discovery_session_id,
+        "company_name": session.company_name,
+        "status": session.status.value,
+        "pages_scanned": session.pages_scanned,
+        "total_pages": session.total_pages,
+        "overall_score": session.overall_score,
+        "compliance_level": session.compliance_level,
+        "total_issues": session.total_issues,
+        "created_at": session.created_at,
+        "started_at": session.started_at,
+        "completed_at": session.completed_at,
+        "progress_percent": session.progress_percent
+    }
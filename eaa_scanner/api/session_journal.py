@@ -0,0 +1,352 @@
+"""
+Journal append-only per la persistenza delle sessioni
+Ogni sessione ha uno snapshot JSON e un journal JSON lines con le sole modifiche
+"""
+
+from __future__ import annotations
+
+from dataclasses import fields as dataclass_fields
+from enum import Enum
+from pathlib import Path
+from typing import Dict, Optional, Any, Tuple, Type
+import json
+import os
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+# Chiave interna dello snapshot: ultimo record di journal già incluso
+SNAPSHOT_SEQ_KEY = "_journal_seq"
+
+_MISSING = object()
+
+
+def _encode(value: Any) -> Any:
+    """Converte un valore di sessione in forma serializzabile JSON"""
+    if isinstance(value, Enum):
+        return value.value
+    if hasattr(value, "to_dict"):
+        return value.to_dict()
+    if isinstance(value, list):
+        return [_encode(item) for item in value]
+    return value
+
+
+class _JournalState:
+    """Stato persistito di una singola sessione"""
+
+    __slots__ = ("lock", "fields", "lengths", "list_ids", "seq",
+                 "records", "journal_bytes", "handle", "unsynced_bytes", "last_sync")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.fields: Dict[str, Any] = {}
+        self.lengths: Dict[str, int] = {}
+        self.list_ids: Dict[str, int] = {}
+        self.seq = 0
+        self.records = 0
+        self.journal_bytes = 0
+        self.handle = None
+        self.unsynced_bytes = 0
+        self.last_sync = time.monotonic()
+
+
+class SessionJournal:
+    """
+    Persistenza incrementale delle sessioni
+
+    Ogni modifica scrive una riga di journal con i soli campi cambiati e gli
+    elementi aggiunti alle liste (pagine, issue, log): il costo di scrittura è
+    proporzionale alla modifica e non alla dimensione della sessione.
+    Periodicamente il journal viene compattato in un nuovo snapshot.
+
+    Le liste sono tracciate per identità e lunghezza: modifiche in-place a
+    elementi già salvati (es. selected_for_scan di una pagina) non vengono
+    rilevate e richiedono record(..., compact=True).
+    """
+
+    def __init__(self, storage_dir: Path, compact_every: int = 500,
+                 fsync_interval: float = 1.0, fsync_bytes: int = 256 * 1024):
+        """
+        Inizializza il journal
+
+        Args:
+            storage_dir: Directory di persistenza
+            compact_every: Record di journal oltre i quali si riscrive lo snapshot
+            fsync_interval: Secondi massimi tra due fsync del journal
+            fsync_bytes: Byte non sincronizzati oltre i quali si forza fsync
+        """
+        self.storage_dir = Path(storage_dir)
+        self.compact_every = compact_every
+        self.fsync_interval = fsync_interval
+        self.fsync_bytes = fsync_bytes
+        self._states: Dict[str, _JournalState] = {}
+        self._states_lock = threading.Lock()
+
+    # =================================
+    # PATHS
+    # =================================
+
+    def snapshot_path(self, kind: str, session_id: str) -> Path:
+        return self.storage_dir / f"{kind}_{session_id}.json"
+
+    def journal_path(self, kind: str, session_id: str) -> Path:
+        return self.storage_dir / f"{kind}_{session_id}.journal"
+
+    def _state(self, kind: str, session_id: str) -> _JournalState:
+        key = f"{kind}_{session_id}"
+        with self._states_lock:
+            state = self._states.get(key)
+            if state is None:
+                state = _JournalState()
+                self._states[key] = state
+            return state
+
+    # =================================
+    # WRITE
+    # =================================
+
+    def record(self, kind: str, session: Any, compact: bool = False) -> None:
+        """
+        Persiste le modifiche di una sessione rispetto all'ultimo salvataggio
+
+        Args:
+            kind: Tipo sessione ("discovery" o "scan")
+            session: Sessione dataclass con session_id
+            compact: Se riscrivere subito lo snapshot (es. sessione terminata)
+        """
+        state = self._state(kind, session.session_id)
+        with state.lock:
+            if compact or not state.fields:
+                self._write_snapshot(kind, session, state)
+                return
+
+            changes, appends = self._diff(session, state)
+            if not changes and not appends:
+                return
+
+            entry: Dict[str, Any] = {"seq": state.seq + 1}
+            if changes:
+                entry["set"] = changes
+            if appends:
+                entry["append"] = appends
+            self._append(kind, session.session_id, state, entry)
+
+            if state.records >= self.compact_every:
+                self._write_snapshot(kind, session, state)
+
+    def _diff(self, session: Any, state: _JournalState) -> Tuple[Dict[str, Any], Dict[str, list]]:
+        """Calcola campi modificati ed elementi aggiunti alle liste"""
+        changes: Dict[str, Any] = {}
+        appends: Dict[str, list] = {}
+        for f in dataclass_fields(session):
+            value = getattr(session, f.name)
+            if isinstance(value, list):
+                known = state.lengths.get(f.name, 0)
+                if id(value) != state.list_ids.get(f.name) or len(value) < known:
+                    # Lista sostituita o accorciata: si riscrive intera
+                    changes[f.name] = _encode(value)
+                elif len(value) > known:
+                    appends[f.name] = _encode(value[known:])
+                state.lengths[f.name] = len(value)
+                state.list_ids[f.name] = id(value)
+                continue
+
+            encoded = _encode(value)
+            if state.fields.get(f.name, _MISSING) != encoded:
+                changes[f.name] = encoded
+                state.fields[f.name] = encoded
+        return changes, appends
+
+    def _remember(self, session: Any, state: _JournalState) -> None:
+        """Allinea lo stato noto alla sessione corrente"""
+        state.fields.clear()
+        for f in dataclass_fields(session):
+            value = getattr(session, f.name)
+            if isinstance(value, list):
+                state.lengths[f.name] = len(value)
+                state.list_ids[f.name] = id(value)
+            else:
+                state.fields[f.name] = _encode(value)
+
+    def _append(self, kind: str, session_id: str, state: _JournalState, entry: Dict[str, Any]) -> None:
+        line = json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n"
+        try:
+            if state.handle is None:
+                state.handle = open(self.journal_path(kind, session_id), "a", encoding="utf-8")
+            state.handle.write(line)
+            state.handle.flush()
+        except Exception as e:
+            logger.error(f"Errore scrittura journal {kind}_{session_id}: {e}")
+            # Stato noto non più affidabile: il prossimo salvataggio riscrive lo snapshot
+            state.fields.clear()
+            return
+
+        size = len(line.encode("utf-8"))
+        state.seq = entry["seq"]
+        state.records += 1
+        state.journal_bytes += size
+        state.unsynced_bytes += size
+
+        # fsync a lotti: per tempo trascorso o byte accumulati
+        now = time.monotonic()
+        if state.unsynced_bytes >= self.fsync_bytes or now - state.last_sync >= self.fsync_interval:
+            self._sync(state, now)
+
+    def _sync(self, state: _JournalState, now: Optional[float] = None) -> None:
+        if state.handle is not None and state.unsynced_bytes:
+            try:
+                os.fsync(state.handle.fileno())
+            except Exception as e:
+                logger.debug(f"fsync journal fallito: {e}")
+        state.unsynced_bytes = 0
+        state.last_sync = now if now is not None else time.monotonic()
+
+    def _write_snapshot(self, kind: str, session: Any, state: _JournalState) -> None:
+        """Compatta: scrive lo snapshot in modo atomico e azzera il journal"""
+        data = session.to_dict()
+        data[SNAPSHOT_SEQ_KEY] = state.seq
+        path = self.snapshot_path(kind, session.session_id)
+        tmp_path = path.with_name(path.name + ".tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.error(f"Errore salvataggio snapshot {kind}_{session.session_id}: {e}")
+            return
+
+        # Lo snapshot registra l'ultimo seq incluso: un journal non ancora
+        # azzerato dopo un crash viene comunque ignorato al replay
+        if state.handle is not None:
+            state.handle.close()
+            state.handle = None
+        try:
+            open(self.journal_path(kind, session.session_id), "w").close()
+        except Exception as e:
+            logger.error(f"Errore reset journal {kind}_{session.session_id}: {e}")
+
+        state.records = 0
+        state.journal_bytes = 0
+        state.unsynced_bytes = 0
+        self._remember(session, state)
+
+    def flush(self) -> None:
+        """Forza fsync di tutti i journal aperti"""
+        with self._states_lock:
+            states = list(self._states.values())
+        for state in states:
+            with state.lock:
+                self._sync(state)
+
+    def close(self) -> None:
+        """Sincronizza e chiude tutti i journal aperti"""
+        with self._states_lock:
+            states = list(self._states.values())
+        for state in states:
+            with state.lock:
+                self._sync(state)
+                if state.handle is not None:
+                    state.handle.close()
+                    state.handle = None
+
+    def release(self, kind: str, session_id: str) -> None:
+        """Chiude il journal di una sessione scaricata dalla memoria (i file restano)"""
+        with self._states_lock:
+            state = self._states.pop(f"{kind}_{session_id}", None)
+        if state is not None:
+            with state.lock:
+                self._sync(state)
+                if state.handle is not None:
+                    state.handle.close()
+                    state.handle = None
+
+    def disk_size(self, kind: str, session_id: str) -> int:
+        """Byte occupati su disco da snapshot e journal di una sessione"""
+        size = 0
+        for path in (self.snapshot_path(kind, session_id), self.journal_path(kind, session_id)):
+            try:
+                size += path.stat().st_size
+            except OSError:
+                pass
+        return size
+
+    def remove(self, kind: str, session_id: str) -> None:
+        """Rimuove snapshot e journal di una sessione"""
+        with self._states_lock:
+            state = self._states.pop(f"{kind}_{session_id}", None)
+        if state is not None:
+            with state.lock:
+                if state.handle is not None:
+                    state.handle.close()
+                    state.handle = None
+        for path in (self.snapshot_path(kind, session_id), self.journal_path(kind, session_id)):
+            if path.exists():
+                path.unlink()
+
+    # =================================
+    # REPLAY
+    # =================================
+
+    def load(self, kind: str, session_cls: Type, snapshot_path: Path) -> Any:
+        """
+        Carica una sessione: snapshot più replay del journal
+
+        Args:
+            kind: Tipo sessione
+            session_cls: Classe con from_dict
+            snapshot_path: Path dello snapshot
+
+        Returns:
+            Sessione ricostruita
+        """
+        with open(snapshot_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        snapshot_seq = int(data.pop(SNAPSHOT_SEQ_KEY, 0) or 0)
+        session_id = data.get("session_id") or snapshot_path.stem.split("_", 1)[1]
+
+        seq, records, size, truncated = self._replay(self.journal_path(kind, session_id), data, snapshot_seq)
+
+        session = session_cls.from_dict(data)
+        state = self._state(kind, session.session_id)
+        with state.lock:
+            state.seq = seq
+            state.records = records
+            state.journal_bytes = size
+            self._remember(session, state)
+            if truncated:
+                # Nuovi record non vanno accodati a una riga spezzata
+                self._write_snapshot(kind, session, state)
+        return session
+
+    @staticmethod
+    def _replay(journal_path: Path, data: Dict[str, Any],
+                snapshot_seq: int) -> Tuple[int, int, int, bool]:
+        """Applica i record del journal successivi allo snapshot"""
+        seq, records, size, truncated = snapshot_seq, 0, 0, False
+        if not journal_path.exists():
+            return seq, records, size, truncated
+
+        with open(journal_path, "r", encoding="utf-8") as f:
+            for line in f:
+                size += len(line.encode("utf-8"))
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # Riga troncata da un crash durante la scrittura
+                    logger.warning(f"Record journal incompleto ignorato in {journal_path.name}")
+                    truncated = True
+                    break
+                if entry.get("seq", 0) <= seq:
+                    continue
+                data.update(entry.get("set", {}))
+                for name, items in entry.get("append", {}).items():
+                    data.setdefault(name, []).extend(items)
+                seq = entry["seq"]
+                records += 1
+        return seq, records, size, truncated
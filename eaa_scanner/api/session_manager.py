@@ -5,9 +5,10 @@ Supporta recovery, stato persistente e WebSocket events
 
 from __future__ import annotations
 
+from dataclasses import fields as dataclass_fields, replace
 from pathlib import Path
-from typing import Dict, Optional, List, Any
-import json
+from typing import Dict, Optional, List, Any, Tuple, Callable
+import copy
 import threading
 import time
 import logging
@@ -16,6 +17,8 @@ from .models import (
     DiscoverySession, ScanSession, SessionStatus, 
     WebSocketEvent, DiscoveredPage, AccessibilityIssue
 )
+from .session_index import LazySessionStore, SessionIndex, summarize_discovery, summarize_scan
+from .session_journal import SessionJournal
 
 logger = logging.getLogger(__name__)
 
@@ -23,27 +26,49 @@ logger = logging.getLogger(__name__)
 class SessionManager:
     """
     Manager centralizato per gestione sessioni discovery e scan
-    Thread-safe con persistenza su filesystem
+    Thread-safe con persistenza su filesystem (snapshot + journal append-only)
+    
+    Ogni sessione ha un proprio lock: le scritture di una scansione non
+    bloccano le altre. I lettori ricevono copie pubblicate (copy-on-write)
+    e non attendono mai una scrittura su disco in corso.
+    
+    All'avvio si carica solo l'indice delle sessioni: i contenuti delle
+    sessioni concluse vengono letti al primo accesso e tenuti in una LRU.
     """
     
-    def __init__(self, storage_dir: Path = None, enable_persistence: bool = True):
+    # Stati finali: la sessione non cambierà più, si compatta subito lo snapshot
+    TERMINAL_STATUSES = (SessionStatus.COMPLETED, SessionStatus.FAILED, SessionStatus.CANCELLED)
+    _terminal_values = tuple(status.value for status in TERMINAL_STATUSES)
+    
+    def __init__(self, storage_dir: Path = None, enable_persistence: bool = True,
+                 max_loaded_sessions: int = 100):
         """
         Inizializza SessionManager
         
         Args:
             storage_dir: Directory per persistenza sessioni
             enable_persistence: Se abilitare salvataggio su disco
+            max_loaded_sessions: Sessioni concluse tenute in memoria per tipo
         """
         self.storage_dir = storage_dir or Path("output/sessions")
         self.storage_dir.mkdir(parents=True, exist_ok=True)
         self.enable_persistence = enable_persistence
+        self._journal = SessionJournal(self.storage_dir)
         
-        # Thread safety
+        # Thread safety: lock di registro (solo dizionari) + lock per sessione
         self._lock = threading.RLock()
+        self._session_locks: Dict[str, threading.RLock] = {}
         
-        # In-memory storage
-        self._discovery_sessions: Dict[str, DiscoverySession] = {}
-        self._scan_sessions: Dict[str, ScanSession] = {}
+        # Copie pubblicate per i lettori: session_id -> (versione, copia)
+        self._versions: Dict[str, int] = {}
+        self._snapshots: Dict[str, Tuple[int, Any]] = {}
+        
+        # Indice riepiloghi (sempre in memoria) + contenuti caricati on demand
+        self._index = SessionIndex(self.storage_dir / "sessions_index.json")
+        self._discovery_sessions = self._create_store("discovery", DiscoverySession,
+                                                      summarize_discovery, max_loaded_sessions)
+        self._scan_sessions = self._create_store("scan", ScanSession,
+                                                 summarize_scan, max_loaded_sessions)
         
         # WebSocket callbacks
         self._websocket_callbacks: List[callable] = []
@@ -67,20 +92,22 @@ class SessionManager:
         Returns:
             DiscoverySession creata
         """
-        with self._lock:
-            session = DiscoverySession(base_url=base_url)
-            
-            if config:
-                from .models import DiscoveryConfiguration
-                session.config = DiscoveryConfiguration.from_dict(config)
-            
-            self._discovery_sessions[session.session_id] = session
+        session = DiscoverySession(base_url=base_url)
+        
+        if config:
+            from .models import DiscoveryConfiguration
+            session.config = DiscoveryConfiguration.from_dict(config)
+        
+        with self._session_lock(session.session_id):
+            self._discovery_sessions.add(session)
             
             if self.enable_persistence:
                 self._save_discovery_session(session)
             
-            logger.info(f"Discovery session creata: {session.session_id} per {base_url}")
-            return session
+            snapshot = self._publish(session)
+        
+        logger.info(f"Discovery session creata: {session.session_id} per {base_url}")
+        return snapshot
     
     def get_discovery_session(self, session_id: str) -> Optional[DiscoverySession]:
         """
@@ -90,10 +117,9 @@ class SessionManager:
             session_id: ID della sessione
             
         Returns:
-            DiscoverySession o None se non trovata
+            DiscoverySession (copia in sola lettura) o None se non trovata
         """
-        with self._lock:
-            return self._discovery_sessions.get(session_id)
+        return self._read_session(self._discovery_sessions, session_id)
     
     def update_discovery_session(self, session_id: str, **updates) -> bool:
         """
@@ -106,19 +132,21 @@ class SessionManager:
         Returns:
             True se aggiornata con successo
         """
-        with self._lock:
+        with self._session_lock(session_id):
             session = self._discovery_sessions.get(session_id)
             if not session:
                 return False
             
             # Applica aggiornamenti
-            for key, value in updates.items():
-                if hasattr(session, key):
-                    setattr(session, key, value)
+            status_changed = self._apply_updates(session, updates)
+            self._touch(session)
             
-            # Salva se persistenza abilitata
+            # Salva se persistenza abilitata: chiamata ad ogni tick di progresso
+            # del crawler, quindi solo il diff nel journal (le liste passate qui
+            # sono oggetti nuovi e vengono riscritte intere; la selezione pagine
+            # passa da set_page_selection). Snapshot solo al cambio di stato
             if self.enable_persistence:
-                self._save_discovery_session(session)
+                self._save_discovery_session(session, compact=status_changed)
             
             return True
     
@@ -133,19 +161,19 @@ class SessionManager:
         Returns:
             True se aggiunta con successo
         """
-        with self._lock:
+        with self._session_lock(session_id):
             session = self._discovery_sessions.get(session_id)
             if not session:
                 return False
             
             session.discovered_pages.append(page)
             session.pages_discovered = len(session.discovered_pages)
+            self._touch(session)
             
             if self.enable_persistence:
                 self._save_discovery_session(session)
             
-            # Invia evento WebSocket
-            self._emit_websocket_event(WebSocketEvent(
+            event = WebSocketEvent(
                 event_type="discovery_progress",
                 session_id=session_id,
                 data={
@@ -154,9 +182,59 @@ class SessionManager:
                     "current_page": page.url,
                     "page_type": page.page_type.value
                 }
-            ))
+            )
+        
+        # Invia evento WebSocket fuori dalla sezione critica
+        self._emit_websocket_event(event)
+        return True
+    
+    def set_page_selection(self, session_id: str, selected_urls: List[str],
+                           reason: str = "user_selected") -> Optional[int]:
+        """
+        Imposta le pagine selezionate per scan in una sessione discovery
+        
+        Args:
+            session_id: ID della sessione
+            selected_urls: URL da selezionare (le altre vengono deselezionate)
+            reason: Motivo della selezione
             
-            return True
+        Returns:
+            Numero di pagine selezionate o None se sessione non trovata
+        """
+        wanted = set(selected_urls)
+        with self._session_lock(session_id):
+            session = self._discovery_sessions.get(session_id)
+            if not session:
+                return None
+            
+            selected_count = 0
+            pages = session.discovered_pages
+            for index, page in enumerate(pages):
+                selected = page.url in wanted
+                pages[index] = replace(page, selected_for_scan=selected,
+                                       selection_reason=reason if selected else "")
+                selected_count += int(selected)
+            self._touch(session)
+            
+            if self.enable_persistence:
+                self._save_discovery_session(session, compact=True)
+            
+            return selected_count
+    
+    def add_discovery_log(self, session_id: str, message: str, level: str = "info") -> bool:
+        """
+        Aggiunge messaggio al log di una sessione discovery
+        
+        Args:
+            session_id: ID della sessione
+            message: Messaggio
+            level: info, warning o error
+            
+        Returns:
+            True se aggiunto
+        """
+        return self._add_log(self._discovery_sessions, session_id, message, level,
+                             self._save_discovery_session)
     
     def set_discovery_status(self, session_id: str, status: SessionStatus, 
                            message: str = "", error: str = "") -> bool:
@@ -172,7 +250,8 @@ class SessionManager:
         Returns:
             True se aggiornata
         """
-        with self._lock:
+        event = None
+        with self._session_lock(session_id):
             session = self._discovery_sessions.get(session_id)
             if not session:
                 return False
@@ -189,14 +268,15 @@ class SessionManager:
                 session.add_log(message)
             if error:
                 session.add_error(error)
+            self._touch(session)
             
             if self.enable_persistence:
-                self._save_discovery_session(session)
+                self._save_discovery_session(session, compact=status in self.TERMINAL_STATUSES)
             
             # Eventi WebSocket per cambio stato
             if status != old_status:
                 event_type = "discovery_complete" if status == SessionStatus.COMPLETED else "discovery_status_change"
-                self._emit_websocket_event(WebSocketEvent(
+                event = WebSocketEvent(
                     event_type=event_type,
                     session_id=session_id,
                     data={
@@ -205,9 +285,11 @@ class SessionManager:
                         "error": error,
                         "pages_discovered": session.pages_discovered
                     }
-                ))
-            
-            return True
+                )
+        
+        if event:
+            self._emit_websocket_event(event)
+        return True
     
     def get_discovery_sessions_list(self, status_filter: Optional[SessionStatus] = None) -> List[Dict[str, Any]]:
         """
@@ -219,27 +301,8 @@ class SessionManager:
         Returns:
             Lista di summary delle sessioni
         """
-        with self._lock:
-            sessions = []
-            for session in self._discovery_sessions.values():
-                if status_filter and session.status != status_filter:
-                    continue
-                
-                sessions.append({
-                    "session_id": session.session_id,
-                    "base_url": session.base_url,
-                    "status": session.status.value,
-                    "pages_discovered": session.pages_discovered,
-                    "created_at": session.created_at,
-                    "started_at": session.started_at,
-                    "completed_at": session.completed_at,
-                    "templates_detected": session.templates_detected,
-                    "progress_percent": session.progress_percent
-                })
-            
-            # Ordina per data creazione (più recenti prima)
-            sessions.sort(key=lambda x: x['created_at'], reverse=True)
-            return sessions
+        # Servita dall'indice: nessuna sessione viene caricata dal disco
+        return self._list_summaries(self._discovery_sessions, status_filter)
     
     # =================================
     # SCAN SESSION MANAGEMENT  
@@ -260,8 +323,8 @@ class SessionManager:
         Returns:
             ScanSession creata o None se errore
         """
-        with self._lock:
-            # Verifica che discovery session esista
+        # Verifica che discovery session esista
+        with self._session_lock(discovery_session_id):
             discovery_session = self._discovery_sessions.get(discovery_session_id)
             if not discovery_session:
                 logger.error(f"Discovery session non trovata: {discovery_session_id}")
@@ -269,35 +332,46 @@ class SessionManager:
             
             # Filtra pagine selezionate
             selected_pages = []
-            for page in discovery_session.discovered_pages:
+            pages = discovery_session.discovered_pages
+            for index, page in enumerate(pages):
                 if page.url in selected_urls:
-                    page.selected_for_scan = True
-                    selected_pages.append(page)
-            
-            if not selected_pages:
-                logger.error(f"Nessuna pagina valida selezionata per scan da {selected_urls}")
-                return None
-            
-            # Crea sessione scan
-            session = ScanSession(
-                discovery_session_id=discovery_session_id,
-                selected_pages=selected_pages,
-                company_name=company_name,
-                email=email,
-                total_pages=len(selected_pages)
-            )
-            
-            if config:
-                from .models import ScanConfiguration
-                session.config = ScanConfiguration.from_dict(config)
-            
-            self._scan_sessions[session.session_id] = session
+                    # Gli elementi si sostituiscono, mai modificati: le copie
+                    # già consegnate ai lettori restano coerenti
+                    pages[index] = replace(page, selected_for_scan=True)
+                    selected_pages.append(replace(pages[index]))
+            if selected_pages:
+                self._touch(discovery_session)
+                # Elementi sostituiti nella lista: il journal richiede uno snapshot
+                if self.enable_persistence:
+                    self._save_discovery_session(discovery_session, compact=True)
+        
+        if not selected_pages:
+            logger.error(f"Nessuna pagina valida selezionata per scan da {selected_urls}")
+            return None
+        
+        # Crea sessione scan
+        session = ScanSession(
+            discovery_session_id=discovery_session_id,
+            selected_pages=selected_pages,
+            company_name=company_name,
+            email=email,
+            total_pages=len(selected_pages)
+        )
+        
+        if config:
+            from .models import ScanConfiguration
+            session.config = ScanConfiguration.from_dict(config)
+        
+        with self._session_lock(session.session_id):
+            self._scan_sessions.add(session)
             
             if self.enable_persistence:
                 self._save_scan_session(session)
             
-            logger.info(f"Scan session creata: {session.session_id} per {len(selected_pages)} pagine")
-            return session
+            snapshot = self._publish(session)
+        
+        logger.info(f"Scan session creata: {session.session_id} per {len(selected_pages)} pagine")
+        return snapshot
     
     def get_scan_session(self, session_id: str) -> Optional[ScanSession]:
         """
@@ -307,10 +381,9 @@ class SessionManager:
             session_id: ID della sessione
             
         Returns:
-            ScanSession o None se non trovata
+            ScanSession (copia in sola lettura) o None se non trovata
         """
-        with self._lock:
-            return self._scan_sessions.get(session_id)
+        return self._read_session(self._scan_sessions, session_id)
     
     def update_scan_session(self, session_id: str, **updates) -> bool:
         """
@@ -323,18 +396,19 @@ class SessionManager:
         Returns:
             True se aggiornata con successo
         """
-        with self._lock:
+        with self._session_lock(session_id):
             session = self._scan_sessions.get(session_id)
             if not session:
                 return False
             
             # Applica aggiornamenti
-            for key, value in updates.items():
-                if hasattr(session, key):
-                    setattr(session, key, value)
+            status_changed = self._apply_updates(session, updates)
+            self._touch(session)
             
+            # Diff nel journal, snapshot solo al cambio di stato (come per
+            # update_discovery_session)
             if self.enable_persistence:
-                self._save_scan_session(session)
+                self._save_scan_session(session, compact=status_changed)
             
             return True
     
@@ -349,18 +423,34 @@ class SessionManager:
         Returns:
             True se aggiunto con successo
         """
-        with self._lock:
+        with self._session_lock(session_id):
             session = self._scan_sessions.get(session_id)
             if not session:
                 return False
             
             session.add_issue(issue)
+            self._touch(session)
             
             if self.enable_persistence:
                 self._save_scan_session(session)
             
             return True
     
+    def add_scan_log(self, session_id: str, message: str, level: str = "info") -> bool:
+        """
+        Aggiunge messaggio al log di una sessione scan
+        
+        Args:
+            session_id: ID della sessione
+            message: Messaggio
+            level: info, warning o error
+            
+        Returns:
+            True se aggiunto
+        """
+        return self._add_log(self._scan_sessions, session_id, message, level,
+                             self._save_scan_session)
+    
     def set_scan_status(self, session_id: str, status: SessionStatus,
                        message: str = "", error: str = "") -> bool:
         """
@@ -375,7 +465,8 @@ class SessionManager:
         Returns:
             True se aggiornata
         """
-        with self._lock:
+        event = None
+        with self._session_lock(session_id):
             session = self._scan_sessions.get(session_id)
             if not session:
                 return False
@@ -395,14 +486,15 @@ class SessionManager:
                 session.add_log(message)
             if error:
                 session.add_error(error)
+            self._touch(session)
             
             if self.enable_persistence:
-                self._save_scan_session(session)
+                self._save_scan_session(session, compact=status in self.TERMINAL_STATUSES)
             
             # Eventi WebSocket
             if status != old_status:
                 event_type = "scan_complete" if status == SessionStatus.COMPLETED else "scan_status_change"
-                self._emit_websocket_event(WebSocketEvent(
+                event = WebSocketEvent(
                     event_type=event_type,
                     session_id=session_id,
                     data={
@@ -413,9 +505,11 @@ class SessionManager:
                         "compliance_level": session.compliance_level,
                         "total_issues": session.total_issues
                     }
-                ))
-            
-            return True
+                )
+        
+        if event:
+            self._emit_websocket_event(event)
+        return True
     
     def update_scan_progress(self, session_id: str, pages_scanned: int, 
                            current_page: str = "", current_scanner: str = "",
@@ -433,7 +527,7 @@ class SessionManager:
         Returns:
             True se aggiornata
         """
-        with self._lock:
+        with self._session_lock(session_id):
             session = self._scan_sessions.get(session_id)
             if not session:
                 return False
@@ -444,12 +538,12 @@ class SessionManager:
             if session.total_pages > 0:
                 progress_percent = int((pages_scanned / session.total_pages) * 100)
                 session.update_progress(progress_percent, message, current_page, current_scanner)
+            self._touch(session)
             
             if self.enable_persistence:
                 self._save_scan_session(session)
             
-            # Evento WebSocket per progresso
-            self._emit_websocket_event(WebSocketEvent(
+            event = WebSocketEvent(
                 event_type="scan_progress",
                 session_id=session_id,
                 data={
@@ -460,9 +554,11 @@ class SessionManager:
                     "current_scanner": current_scanner,
                     "message": message
                 }
-            ))
-            
-            return True
+            )
+        
+        # Evento WebSocket per progresso, fuori dalla sezione critica
+        self._emit_websocket_event(event)
+        return True
     
     def get_scan_sessions_list(self, status_filter: Optional[SessionStatus] = None) -> List[Dict[str, Any]]:
         """
@@ -474,31 +570,156 @@ class SessionManager:
         Returns:
             Lista di summary delle sessioni
         """
-        with self._lock:
-            sessions = []
-            for session in self._scan_sessions.values():
-                if status_filter and session.status != status_filter:
-                    continue
-                
-                sessions.append({
-                    "session_id": session.session_id,
-                    "discovery_session_id": session.discovery_session_id,
-                    "company_name": session.company_name,
-                    "status": session.status.value,
-                    "pages_scanned": session.pages_scanned,
-                    "total_pages": session.total_pages,
-                    "overall_score": session.overall_score,
-                    "compliance_level": session.compliance_level,
-                    "total_issues": session.total_issues,
-                    "created_at": session.created_at,
-                    "started_at": session.started_at,
-                    "completed_at": session.completed_at,
-                    "progress_percent": session.progress_percent
-                })
-            
-            # Ordina per data creazione
-            sessions.sort(key=lambda x: x['created_at'], reverse=True)
-            return sessions
+        # Servita dall'indice: nessuna sessione viene caricata dal disco
+        return self._list_summaries(self._scan_sessions, status_filter)
+    
+    def _list_summaries(self, store: LazySessionStore,
+                        status_filter: Optional[SessionStatus]) -> List[Dict[str, Any]]:
+        """Riepiloghi dall'indice, filtrati e ordinati (più recenti prima)"""
+        sessions = [
+            dict(summary) for summary in store.summaries()
+            if not status_filter or summary["status"] == status_filter.value
+        ]
+        sessions.sort(key=lambda x: x['created_at'], reverse=True)
+        return sessions
+    
+    # =================================
+    # LOCKING & SNAPSHOT MANAGEMENT
+    # =================================
+    
+    @staticmethod
+    def _apply_updates(session: Any, updates: Dict[str, Any]) -> bool:
+        """Applica i campi esistenti; ritorna True se lo stato è cambiato"""
+        previous_status = session.status
+        for key, value in updates.items():
+            if hasattr(session, key):
+                setattr(session, key, value)
+        return session.status != previous_status
+    
+    def _session_lock(self, session_id: str) -> threading.RLock:
+        """
+        Ottiene (o crea) il lock dedicato a una sessione
+        
+        Args:
+            session_id: ID della sessione
+            
+        Returns:
+            RLock della sessione
+        """
+        lock = self._session_locks.get(session_id)
+        if lock is None:
+            with self._lock:
+                lock = self._session_locks.setdefault(session_id, threading.RLock())
+        return lock
+    
+    def _touch(self, session: Any) -> None:
+        """
+        Invalida la copia pubblicata e aggiorna il riepilogo nell'indice
+        (da chiamare col lock di sessione)
+        """
+        session_id = session.session_id
+        self._versions[session_id] = self._versions.get(session_id, 0) + 1
+        if self._store_for(session).refresh(session) and self.enable_persistence:
+            # Cambio di status: l'indice su disco non deve restare indietro
+            self._index.save()
+    
+    def _store_for(self, session: Any) -> LazySessionStore:
+        if isinstance(session, ScanSession):
+            return self._scan_sessions
+        return self._discovery_sessions
+    
+    def _publish(self, session: Any) -> Any:
+        """
+        Pubblica una copia della sessione per i lettori (col lock di sessione)
+        
+        La copia è superficiale ma con liste proprie: i lettori possono
+        iterare pagine e issue mentre lo scan worker continua ad aggiungerne.
+        Gli elementi sono condivisi ma mai modificati dal manager (vengono
+        sostituiti); le modifiche passano dai metodi del manager, non dalla copia.
+        """
+        snapshot = copy.copy(session)
+        for f in dataclass_fields(session):
+            value = getattr(session, f.name)
+            if isinstance(value, list):
+                setattr(snapshot, f.name, list(value))
+        self._snapshots[session.session_id] = (self._versions.get(session.session_id, 0), snapshot)
+        return snapshot
+    
+    def _read_session(self, sessions: LazySessionStore, session_id: str) -> Optional[Any]:
+        """
+        Lettura copy-on-write di una sessione
+        
+        Se la copia pubblicata è aggiornata viene restituita senza lock; se un
+        writer sta lavorando sulla sessione si restituisce l'ultima copia
+        pubblicata invece di attendere la sua scrittura su disco.
+        """
+        if session_id not in sessions:
+            return None
+        
+        cached = self._snapshots.get(session_id)
+        if cached and cached[0] == self._versions.get(session_id, 0):
+            return cached[1]
+        
+        lock = self._session_lock(session_id)
+        if not lock.acquire(blocking=cached is None):
+            return cached[1]
+        try:
+            session = sessions.get(session_id)
+            if session is None:
+                return None
+            return self._publish(session)
+        finally:
+            lock.release()
+    
+    def _add_log(self, sessions: LazySessionStore, session_id: str, message: str,
+                 level: str, save: Callable[[Any], None]) -> bool:
+        """Aggiunge log/warning/errore a una sessione col suo lock"""
+        with self._session_lock(session_id):
+            session = sessions.get(session_id)
+            if not session:
+                return False
+            
+            if level == "error":
+                session.add_error(message)
+            elif level == "warning":
+                session.add_warning(message)
+            else:
+                session.add_log(message)
+            self._touch(session)
+            
+            if self.enable_persistence:
+                save(session)
+            return True
+    
+    def _forget_session(self, session_id: str) -> None:
+        """Rimuove lock e copie di una sessione eliminata (col lock di registro)"""
+        self._session_locks.pop(session_id, None)
+        self._versions.pop(session_id, None)
+        self._snapshots.pop(session_id, None)
+    
+    # =================================
+    # LAZY LOADING
+    # =================================
+    
+    def _create_store(self, kind: str, session_cls: type, summarize: Callable[[Any], Dict[str, Any]],
+                      max_loaded: int) -> LazySessionStore:
+        """Crea lo store di un tipo di sessione (caricamento lazy solo con persistenza)"""
+        def load(session_id: str) -> Any:
+            return self._journal.load(kind, session_cls, self._journal.snapshot_path(kind, session_id))
+        
+        def evicted(session_id: str) -> None:
+            # Copia pubblicata e stato del journal si ricostruiscono al prossimo accesso
+            self._snapshots.pop(session_id, None)
+            self._journal.release(kind, session_id)
+        
+        return LazySessionStore(
+            kind, self._index, summarize,
+            loader=load if self.enable_persistence else None,
+            max_loaded=max_loaded,
+            is_final=lambda session: session.status in self.TERMINAL_STATUSES,
+            lock_for=self._session_lock,
+            on_evict=evicted
+        )
     
     # =================================
     # WEBSOCKET EVENT MANAGEMENT
@@ -511,7 +732,8 @@ class SessionManager:
         Args:
             callback: Funzione da chiamare per ogni evento
         """
-        self._websocket_callbacks.append(callback)
+        with self._lock:
+            self._websocket_callbacks = self._websocket_callbacks + [callback]
     
     def unregister_websocket_callback(self, callback: callable) -> None:
         """
@@ -520,13 +742,17 @@ class SessionManager:
         Args:
             callback: Funzione da rimuovere
         """
-        if callback in self._websocket_callbacks:
-            self._websocket_callbacks.remove(callback)
+        with self._lock:
+            if callback in self._websocket_callbacks:
+                self._websocket_callbacks = [cb for cb in self._websocket_callbacks if cb is not callback]
     
     def _emit_websocket_event(self, event: WebSocketEvent) -> None:
         """
         Emette evento WebSocket a tutti i callback registrati
         
+        Va chiamato senza lock: la lista callback è sostituita (mai modificata)
+        a ogni registrazione, quindi l'iterazione è sicura.
+        
         Args:
             event: Evento da emettere
         """
@@ -540,61 +766,79 @@ class SessionManager:
     # PERSISTENCE MANAGEMENT
     # =================================
     
-    def _save_discovery_session(self, session: DiscoverySession) -> None:
+    def _save_discovery_session(self, session: DiscoverySession, compact: bool = False) -> None:
         """
-        Salva sessione discovery su disco
+        Salva sessione discovery su disco (solo le modifiche nel journal)
         
         Args:
             session: Sessione da salvare
+            compact: Se riscrivere lo snapshot completo
         """
         try:
-            file_path = self.storage_dir / f"discovery_{session.session_id}.json"
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(session.to_dict(), f, indent=2, ensure_ascii=False)
+            self._journal.record("discovery", session, compact=compact)
+            if compact:
+                self._discovery_sessions.refresh(session, size_bytes=self._journal.disk_size("discovery", session.session_id))
+                self._index.save()
         except Exception as e:
             logger.error(f"Errore salvataggio discovery session {session.session_id}: {e}")
     
-    def _save_scan_session(self, session: ScanSession) -> None:
+    def _save_scan_session(self, session: ScanSession, compact: bool = False) -> None:
         """
-        Salva sessione scan su disco
+        Salva sessione scan su disco (solo le modifiche nel journal)
         
         Args:
             session: Sessione da salvare
+            compact: Se riscrivere lo snapshot completo
         """
         try:
-            file_path = self.storage_dir / f"scan_{session.session_id}.json"
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(session.to_dict(), f, indent=2, ensure_ascii=False)
+            self._journal.record("scan", session, compact=compact)
+            if compact:
+                self._scan_sessions.refresh(session, size_bytes=self._journal.disk_size("scan", session.session_id))
+                self._index.save()
         except Exception as e:
             logger.error(f"Errore salvataggio scan session {session.session_id}: {e}")
     
+    def close(self) -> None:
+        """
+        Sincronizza e chiude i journal di sessione (es. allo shutdown)
+        """
+        if self.enable_persistence:
+            self._journal.close()
+            self._index.save()
+    
     def _load_sessions_from_disk(self) -> None:
         """
-        Carica sessioni salvate dal disco per recovery
+        Recovery all'avvio: carica l'indice e lo riconcilia con gli snapshot su disco
+        
+        Solo le sessioni non concluse (o assenti dall'indice) vengono lette e
+        ricostruite subito; le altre restano su disco fino al primo accesso.
         """
         try:
-            # Carica discovery sessions
-            for file_path in self.storage_dir.glob("discovery_*.json"):
-                try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                    session = DiscoverySession.from_dict(data)
-                    self._discovery_sessions[session.session_id] = session
-                    logger.debug(f"Discovery session caricata: {session.session_id}")
-                except Exception as e:
-                    logger.error(f"Errore caricamento {file_path}: {e}")
-            
-            # Carica scan sessions
-            for file_path in self.storage_dir.glob("scan_*.json"):
-                try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                    session = ScanSession.from_dict(data)
-                    self._scan_sessions[session.session_id] = session
-                    logger.debug(f"Scan session caricata: {session.session_id}")
-                except Exception as e:
-                    logger.error(f"Errore caricamento {file_path}: {e}")
+            self._index.load()
+            for kind, store in (("discovery", self._discovery_sessions), ("scan", self._scan_sessions)):
+                on_disk = {path.stem.split("_", 1)[1] for path in self.storage_dir.glob(f"{kind}_*.json")}
+                
+                # Voci orfane: snapshot rimosso fuori dal manager
+                for session_id in set(store.ids()) - on_disk:
+                    store.remove(session_id)
+                
+                loaded = 0
+                for session_id in on_disk:
+                    summary = self._index.get(kind, session_id)
+                    if summary and summary["status"] in self._terminal_values:
+                        continue
+                    # Nuova per l'indice o ancora attiva: il riepilogo può essere indietro
+                    try:
+                        session = self._journal.load(kind, (DiscoverySession if kind == "discovery" else ScanSession), self._journal.snapshot_path(kind, session_id))
+                        store.add(session)
+                        store.refresh(session, size_bytes=self._journal.disk_size(kind, session_id))
+                        loaded += 1
+                    except Exception as e:
+                        logger.error(f"Errore caricamento {kind}_{session_id}: {e}")
+                
+                logger.debug(f"Sessioni {kind}: {len(on_disk)} su disco, {loaded} caricate all'avvio")
             
+            self._index.save()
             logger.info(f"Recovery completato: {len(self._discovery_sessions)} discovery, {len(self._scan_sessions)} scan sessions")
             
         except Exception as e:
@@ -606,7 +850,9 @@ class SessionManager:
     
     def cleanup_old_sessions(self, max_age_hours: int = 24) -> int:
         """
-        Rimuove sessioni vecchie per liberare memoria
+        Rimuove sessioni vecchie per liberare memoria e disco
+        
+        Usa solo l'indice: le sessioni da rimuovere non vengono caricate.
         
         Args:
             max_age_hours: Età massima sessioni in ore
@@ -615,74 +861,57 @@ class SessionManager:
             Numero di sessioni rimosse
         """
         cutoff_time = time.time() - (max_age_hours * 3600)
+        expired_statuses = (SessionStatus.COMPLETED.value, SessionStatus.FAILED.value)
         removed = 0
         
-        with self._lock:
-            # Discovery sessions
-            to_remove = []
-            for session_id, session in self._discovery_sessions.items():
-                if session.created_at < cutoff_time and session.status in [SessionStatus.COMPLETED, SessionStatus.FAILED]:
-                    to_remove.append(session_id)
+        for kind, store in (("discovery", self._discovery_sessions), ("scan", self._scan_sessions)):
+            to_remove = [
+                summary["session_id"] for summary in store.summaries()
+                if summary["created_at"] < cutoff_time and summary["status"] in expired_statuses
+            ]
             
             for session_id in to_remove:
-                del self._discovery_sessions[session_id]
-                # Rimuovi file se esiste
-                file_path = self.storage_dir / f"discovery_{session_id}.json"
-                if file_path.exists():
-                    file_path.unlink()
-                removed += 1
-            
-            # Scan sessions
-            to_remove = []
-            for session_id, session in self._scan_sessions.items():
-                if session.created_at < cutoff_time and session.status in [SessionStatus.COMPLETED, SessionStatus.FAILED]:
-                    to_remove.append(session_id)
-            
-            for session_id in to_remove:
-                del self._scan_sessions[session_id]
-                # Rimuovi file se esiste
-                file_path = self.storage_dir / f"scan_{session_id}.json"
-                if file_path.exists():
-                    file_path.unlink()
+                with self._session_lock(session_id):
+                    store.remove(session_id)
+                    # Rimuovi snapshot e journal se esistono
+                    if self.enable_persistence:
+                        self._journal.remove(kind, session_id)
+                with self._lock:
+                    self._forget_session(session_id)
                 removed += 1
         
         if removed > 0:
+            if self.enable_persistence:
+                self._index.save()
             logger.info(f"Cleanup completato: {removed} sessioni vecchie rimosse")
         
         return removed
     
     def get_stats(self) -> Dict[str, Any]:
         """
-        Ottiene statistiche sessioni
+        Ottiene statistiche sessioni (dall'indice, senza caricare contenuti)
         
         Returns:
             Dizionario con statistiche
         """
-        with self._lock:
-            # Conta discovery sessions per status
-            discovery_stats = {}
-            for session in self._discovery_sessions.values():
-                status = session.status.value
-                discovery_stats[status] = discovery_stats.get(status, 0) + 1
-            
-            # Conta scan sessions per status  
-            scan_stats = {}
-            for session in self._scan_sessions.values():
-                status = session.status.value
-                scan_stats[status] = scan_stats.get(status, 0) + 1
-            
-            return {
-                "discovery_sessions": {
-                    "total": len(self._discovery_sessions),
-                    "by_status": discovery_stats
-                },
-                "scan_sessions": {
-                    "total": len(self._scan_sessions),
-                    "by_status": scan_stats
-                },
-                "storage_enabled": self.enable_persistence,
-                "websocket_callbacks": len(self._websocket_callbacks)
+        stats: Dict[str, Any] = {}
+        for kind, store in (("discovery", self._discovery_sessions), ("scan", self._scan_sessions)):
+            by_status: Dict[str, int] = {}
+            summaries = store.summaries()
+            for summary in summaries:
+                by_status[summary["status"]] = by_status.get(summary["status"], 0) + 1
+            stats[f"{kind}_sessions"] = {
+                "total": len(summaries),
+                "by_status": by_status,
+                "loaded": store.loaded_count,
+                "loads": store.loads,
+                "evictions": store.evictions,
+                "size_bytes": sum(summary.get("size_bytes", 0) for summary in summaries)
             }
+        
+        stats["storage_enabled"] = self.enable_persistence
+        stats["websocket_callbacks"] = len(self._websocket_callbacks)
+        return stats
 
 
 # Singleton instance per uso globale
@@ -22,6 +22,7 @@ except ImportError:
     print("Attenzione: websockets non installato. Installa con: pip install websockets")
 
 from .models import WebSocketEvent, SessionStatus
+from .outbox import ClientOutbox, coalesce_key_for
 from .session_manager import SessionManager, get_session_manager
 
 logger = logging.getLogger(__name__)
@@ -38,6 +39,28 @@ class WebSocketConnection:
         self.connected_at = time.time()
         self.subscribed_sessions: Set[str] = set()
         self.is_active = True
+        self.outbox: Optional[ClientOutbox] = None
+    
+    def start_outbox(self, max_queue: int = 100, send_timeout: float = 10.0,
+                     on_close: Optional[Callable[["WebSocketConnection"], None]] = None) -> ClientOutbox:
+        """Crea e avvia la coda di uscita usata per i broadcast"""
+        def on_outbox_close(_outbox: ClientOutbox) -> None:
+            self.is_active = False
+            if on_close:
+                on_close(self)
+        
+        self.outbox = ClientOutbox(
+            self.websocket.send, self.client_id,
+            max_queue=max_queue, send_timeout=send_timeout, on_close=on_outbox_close
+        )
+        self.outbox.start()
+        return self.outbox
+    
+    def enqueue(self, message: str, coalesce_key: Optional[str] = None) -> bool:
+        """Accoda un messaggio serializzato (broadcast non bloccante)"""
+        if not self.is_active or self.outbox is None:
+            return False
+        return self.outbox.enqueue(message, coalesce_key)
     
     async def send_event(self, event: WebSocketEvent) -> bool:
         """
@@ -80,18 +103,28 @@ class WebSocketManager:
     Thread-safe con supporto per subscriptions selettive
     """
     
-    def __init__(self, session_manager: Optional[SessionManager] = None):
+    def __init__(self, session_manager: Optional[SessionManager] = None,
+                 max_queue_per_client: int = 100, send_timeout: float = 10.0):
         """
         Inizializza WebSocketManager
         
         Args:
             session_manager: Manager sessioni per integrazione
+            max_queue_per_client: Messaggi massimi in coda per client
+            send_timeout: Timeout invio per singolo messaggio (secondi)
         """
         self.session_manager = session_manager or get_session_manager()
         
         # Connessioni attive
         self._connections: Dict[str, WebSocketConnection] = {}
         
+        # Indice sessione -> client iscritti
+        self._subscribers: Dict[str, Set[str]] = {}
+        
+        # Backpressure per client
+        self.max_queue_per_client = max_queue_per_client
+        self.send_timeout = send_timeout
+        
         # Server WebSocket
         self._server: Optional[Any] = None
         self._server_task: Optional[asyncio.Task] = None
@@ -102,6 +135,8 @@ class WebSocketManager:
         # Statistiche
         self._total_connections = 0
         self._events_sent = 0
+        # Totali delle outbox già chiuse (statistiche cumulative)
+        self._closed_totals = {"sent": 0, "dropped": 0, "coalesced": 0}
         
         # Registra callback nel session manager
         self.session_manager.register_websocket_callback(self._handle_session_event)
@@ -173,6 +208,9 @@ class WebSocketManager:
         self._total_connections += 1
         
         connection = WebSocketConnection(websocket, client_id)
+        # Writer fallito (timeout/errore di invio): la connessione esce dal registro
+        connection.start_outbox(self.max_queue_per_client, self.send_timeout,
+                                on_close=lambda _conn: self._remove_connection(client_id))
         self._connections[client_id] = connection
         
         logger.info(f"Client WebSocket connesso: {client_id} da {websocket.remote_address}")
@@ -202,8 +240,7 @@ class WebSocketManager:
             logger.error(f"Errore gestione client {client_id}: {e}")
         finally:
             # Cleanup connessione
-            if client_id in self._connections:
-                del self._connections[client_id]
+            self._remove_connection(client_id)
             logger.debug(f"Connessione {client_id} rimossa")
     
     async def _handle_client_message(self, client_id: str, message: str) -> None:
@@ -227,7 +264,7 @@ class WebSocketManager:
             if command == "subscribe_discovery":
                 session_id = payload.get("session_id")
                 if session_id:
-                    connection.subscribe_to_session(session_id)
+                    self._subscribe(connection, session_id)
                     await self._send_response(connection, "subscribed", {
                         "session_id": session_id,
                         "type": "discovery"
@@ -236,7 +273,7 @@ class WebSocketManager:
             elif command == "subscribe_scan":
                 session_id = payload.get("session_id")
                 if session_id:
-                    connection.subscribe_to_session(session_id)
+                    self._subscribe(connection, session_id)
                     await self._send_response(connection, "subscribed", {
                         "session_id": session_id,
                         "type": "scan"
@@ -245,7 +282,7 @@ class WebSocketManager:
             elif command == "unsubscribe":
                 session_id = payload.get("session_id")
                 if session_id:
-                    connection.unsubscribe_from_session(session_id)
+                    self._unsubscribe(connection, session_id)
                     await self._send_response(connection, "unsubscribed", {
                         "session_id": session_id
                     })
@@ -276,6 +313,39 @@ class WebSocketManager:
                 "message": f"Errore server: {str(e)}"
             })
     
+    def _subscribe(self, connection: WebSocketConnection, session_id: str) -> None:
+        """Iscrive il client aggiornando l'indice sessione -> client"""
+        connection.subscribe_to_session(session_id)
+        self._subscribers.setdefault(session_id, set()).add(connection.client_id)
+    
+    def _unsubscribe(self, connection: WebSocketConnection, session_id: str) -> None:
+        """Disiscrive il client aggiornando l'indice sessione -> client"""
+        connection.unsubscribe_from_session(session_id)
+        subscribers = self._subscribers.get(session_id)
+        if subscribers is not None:
+            subscribers.discard(connection.client_id)
+            if not subscribers:
+                del self._subscribers[session_id]
+    
+    def _remove_connection(self, client_id: str) -> None:
+        """Rimuove una connessione da registro e indice, fermando il writer"""
+        connection = self._connections.pop(client_id, None)
+        if connection is None:
+            return
+        for session_id in list(connection.subscribed_sessions):
+            self._unsubscribe(connection, session_id)
+        self._close_outbox(connection)
+    
+    def _close_outbox(self, connection: WebSocketConnection) -> None:
+        """Ferma la outbox accumulandone i contatori nei totali del manager"""
+        outbox = connection.outbox
+        if outbox is None:
+            return
+        outbox.close()
+        connection.outbox = None
+        for name in self._closed_totals:
+            self._closed_totals[name] += getattr(outbox, name)
+    
     async def _send_response(self, connection: WebSocketConnection, 
                            response_type: str, data: Dict[str, Any]) -> None:
         """
@@ -357,35 +427,35 @@ class WebSocketManager:
     
     async def _broadcast_event(self, event: WebSocketEvent) -> None:
         """
-        Invia evento a tutti i client interessati
+        Accoda evento per tutti i client iscritti alla sessione
+        
+        L'evento viene serializzato una sola volta e accodato nelle outbox:
+        nessun invio viene atteso qui, quindi un client lento non ritarda gli altri.
         
         Args:
             event: Evento da broadcastare
         """
         session_id = event.session_id
         
-        # Trova client iscritti alla sessione
-        interested_clients = [
-            conn for conn in self._connections.values()
-            if conn.is_subscribed_to(session_id) and conn.is_active
-        ]
-        
-        if not interested_clients:
+        subscriber_ids = self._subscribers.get(session_id)
+        if not subscriber_ids:
             return
         
-        # Invia evento a tutti i client interessati
-        successful_sends = 0
-        for connection in interested_clients:
-            success = await connection.send_event(event)
-            if success:
-                successful_sends += 1
+        message = json.dumps(event.to_dict(), ensure_ascii=False)
+        coalesce_key = coalesce_key_for(event.event_type, event.data)
+        
+        queued = 0
+        for client_id in list(subscriber_ids):
+            connection = self._connections.get(client_id)
+            if connection and connection.enqueue(message, coalesce_key):
+                queued += 1
         
-        self._events_sent += successful_sends
+        self._events_sent += queued
         
-        if successful_sends > 0:
+        if queued > 0:
             logger.debug(
                 f"Evento {event.event_type} per sessione {session_id} "
-                f"inviato a {successful_sends} client"
+                f"accodato per {queued} client"
             )
     
     async def broadcast_to_all(self, event: WebSocketEvent) -> int:
@@ -396,24 +466,21 @@ class WebSocketManager:
             event: Evento da inviare
             
         Returns:
-            Numero di client che hanno ricevuto l'evento
+            Numero di client a cui l'evento è stato accodato
         """
-        active_connections = [
-            conn for conn in self._connections.values() if conn.is_active
-        ]
+        message = json.dumps(event.to_dict(), ensure_ascii=False)
         
-        successful_sends = 0
-        for connection in active_connections:
-            success = await connection.send_event(event)
-            if success:
-                successful_sends += 1
+        queued = 0
+        for connection in list(self._connections.values()):
+            if connection.enqueue(message):
+                queued += 1
         
-        self._events_sent += successful_sends
+        self._events_sent += queued
         
-        if successful_sends > 0:
-            logger.info(f"Evento broadcast {event.event_type} inviato a {successful_sends} client")
+        if queued > 0:
+            logger.info(f"Evento broadcast {event.event_type} accodato per {queued} client")
         
-        return successful_sends
+        return queued
     
     async def send_to_client(self, client_id: str, event: WebSocketEvent) -> bool:
         """
@@ -452,12 +519,14 @@ class WebSocketManager:
         
         # Chiudi connessioni
         for connection in list(self._connections.values()):
+            self._close_outbox(connection)
             try:
                 await connection.websocket.close()
             except:
                 pass
         
         self._connections.clear()
+        self._subscribers.clear()
     
     def get_connection_count(self) -> int:
         """Ottiene numero connessioni attive"""
@@ -483,6 +552,9 @@ class WebSocketManager:
                 elif self.session_manager.get_scan_session(session_id):
                     scan_subs.add(session_id)
         
+        outboxes = [c.outbox for c in self._connections.values() if c.outbox]
+        totals = self._closed_totals
+        
         return {
             "server_running": self._server is not None,
             "active_connections": len(active_connections),
@@ -490,7 +562,15 @@ class WebSocketManager:
             "events_sent": self._events_sent,
             "discovery_subscriptions": len(discovery_subs),
             "scan_subscriptions": len(scan_subs),
-            "websockets_available": WEBSOCKETS_AVAILABLE
+            "websockets_available": WEBSOCKETS_AVAILABLE,
+            "queues": {
+                "total_depth": sum(o.depth for o in outboxes),
+                "max_depth": max((o.depth for o in outboxes), default=0),
+                "sent": totals["sent"] + sum(o.sent for o in outboxes),
+                "dropped": totals["dropped"] + sum(o.dropped for o in outboxes),
+                "coalesced": totals["coalesced"] + sum(o.coalesced for o in outboxes),
+                "per_client": [o.get_stats() for o in outboxes]
+            }
         }
     
     def cleanup_inactive_connections(self) -> int:
@@ -506,7 +586,7 @@ class WebSocketManager:
         ]
         
         for client_id in to_remove:
-            del self._connections[client_id]
+            self._remove_connection(client_id)
         
         return len(to_remove)
 
@@ -0,0 +1,379 @@
+"""
+Cache LRU con scadenza, condivisa dai componenti web e dagli agent
+
+Ogni namespace (validazioni API key, stime costi, contesti agent, report AI)
+ha la sua LRUCache con limiti propri su numero di elementi e memoria stimata,
+TTL per elemento e contatori hit/miss/eviction. get_or_load/aget_or_load
+fanno single-flight: richieste concorrenti della stessa chiave attendono un
+unico caricamento. I namespace creati con shared=True usano anche un livello
+Redis (CACHE_REDIS_URL) per condividere i valori, serializzati in JSON, tra
+processi.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from .metrics import REGISTRY
+from .state.backend import decode_value, encode_value
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+
+# Pausa dopo un errore del livello Redis prima di riprovarlo
+REMOTE_RETRY_SECONDS = 30.0
+
+_MISSING = object()
+
+
+def estimate_size(value: Any, _seen: Optional[set] = None) -> int:
+    """Stima in byte della memoria occupata da un valore e dal suo contenuto"""
+    seen = _seen if _seen is not None else set()
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(estimate_size(k, seen) + estimate_size(v, seen) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(estimate_size(item, seen) for item in value)
+    elif hasattr(value, "__dict__"):
+        size += estimate_size(vars(value), seen)
+    return size
+
+
+@dataclass
+class CacheStats:
+    """Contatori di un namespace"""
+
+    hits: int = 0
+    misses: int = 0
+    loads: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    remote_hits: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class RedisCacheTier:
+    """Livello Redis condiviso: valori JSON con scadenza nativa"""
+
+    def __init__(self, client: Any, prefix: str = "eaa:cache:"):
+        self.client = client
+        self.prefix = prefix
+        self._retry_at = 0.0
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs: Any) -> "RedisCacheTier":
+        import redis
+        return cls(redis.Redis.from_url(url, decode_responses=True), **kwargs)
+
+    def _call(self, operation: Callable[[], Any]) -> Any:
+        if time.monotonic() < self._retry_at:
+            return None
+        try:
+            return operation()
+        except Exception as e:
+            logger.warning(f"Livello Redis della cache non disponibile: {e}")
+            self._retry_at = time.monotonic() + REMOTE_RETRY_SECONDS
+            return None
+
+    def get(self, namespace: str, key: str) -> Any:
+        raw = self._call(lambda: self.client.get(f"{self.prefix}{namespace}:{key}"))
+        return _MISSING if raw is None else decode_value(raw)
+
+    def set(self, namespace: str, key: str, value: Any, ttl: Optional[float]) -> None:
+        try:
+            raw = encode_value(value)
+        except (TypeError, ValueError):
+            return
+        px = int(ttl * 1000) if ttl else None
+        self._call(lambda: self.client.set(f"{self.prefix}{namespace}:{key}", raw, px=px))
+
+    def delete(self, namespace: str, key: str) -> None:
+        self._call(lambda: self.client.delete(f"{self.prefix}{namespace}:{key}"))
+
+
+class _Flight:
+    """Caricamento in corso di una chiave (thread che attendono il risultato)"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class LRUCache:
+    """
+    Cache LRU thread-safe con TTL e limiti di elementi e memoria
+
+    Args:
+        namespace: Nome del namespace (prefisso nel livello Redis)
+        max_entries: Numero massimo di elementi
+        max_bytes: Memoria massima stimata (estimate_size)
+        default_ttl: Scadenza in secondi (None: nessuna)
+        remote: Livello condiviso opzionale
+    """
+
+    def __init__(self, namespace: str, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 max_bytes: Optional[int] = DEFAULT_MAX_BYTES, default_ttl: Optional[float] = None,
+                 remote: Optional[RedisCacheTier] = None):
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.remote = remote
+        self.stats = CacheStats()
+        self.total_bytes = 0
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._flights: Dict[str, _Flight] = {}
+        self._async_flights: Dict[tuple, asyncio.Future] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return self._lookup(key, count=False) is not _MISSING
+
+    def _ttl(self, ttl: Optional[float]) -> Optional[float]:
+        return self.default_ttl if ttl is None else ttl
+
+    def _lookup(self, key: str, count: bool = True) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires, _ = entry
+                if expires is None or expires > time.monotonic():
+                    self._entries.move_to_end(key)
+                    if count:
+                        self.stats.hits += 1
+                    return value
+                self._remove(key)
+                self.stats.expirations += 1
+        if self.remote is not None:
+            value = self.remote.get(self.namespace, key)
+            if value is not _MISSING:
+                self._store(key, value, self.default_ttl)
+                if count:
+                    with self._lock:
+                        self.stats.hits += 1
+                        self.stats.remote_hits += 1
+                return value
+        if count:
+            with self._lock:
+                self.stats.misses += 1
+        return _MISSING
+
+    def _remove(self, key: str) -> None:
+        _, _, size = self._entries.pop(key)
+        self.total_bytes -= size
+
+    def _store(self, key: str, value: Any, ttl: Optional[float]) -> None:
+        size = estimate_size(value) if self.max_bytes is not None else 0
+        expires = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if self.max_bytes is not None and size > self.max_bytes:
+                # Un valore più grande dell'intero namespace non si mette in cache
+                return
+            self._entries[key] = (value, expires, size)
+            self.total_bytes += size
+            while len(self._entries) > self.max_entries or (
+                self.max_bytes is not None and self.total_bytes > self.max_bytes
+            ):
+                self._remove(next(iter(self._entries)))
+                self.stats.evictions += 1
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = self._lookup(key)
+        return default if value is _MISSING else value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self._ttl(ttl)
+        self._store(key, value, ttl)
+        if self.remote is not None:
+            self.remote.set(self.namespace, key, value, ttl)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+        if self.remote is not None:
+            self.remote.delete(self.namespace, key)
+
+    def clear(self) -> None:
+        """Svuota il livello locale (il livello Redis scade da solo)"""
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+    def cleanup(self) -> int:
+        """Rimuove gli elementi scaduti; restituisce quanti"""
+        now = time.monotonic()
+        with self._lock:
+            expired = [key for key, (_, expires, _) in self._entries.items() if expires is not None and expires <= now]
+            for key in expired:
+                self._remove(key)
+            self.stats.expirations += len(expired)
+        return len(expired)
+
+    def get_or_load(self, key: str, loader: Callable[[], Any], ttl: Optional[float] = None,
+                    should_cache: Callable[[Any], bool] = lambda value: True) -> Any:
+        """
+        Valore in cache o caricato con loader, una sola volta per chiave
+
+        I thread che chiedono la stessa chiave durante il caricamento ne
+        attendono l'esito (eccezioni comprese, che non vengono messe in cache).
+        """
+        value = self._lookup(key)
+        if value is not _MISSING:
+            return value
+
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = loader()
+            with self._lock:
+                self.stats.loads += 1
+            if should_cache(flight.value):
+                self.set(key, flight.value, ttl)
+            return flight.value
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+    async def aget_or_load(self, key: str, loader: Callable[[], Awaitable[Any]], ttl: Optional[float] = None,
+                           should_cache: Callable[[Any], bool] = lambda value: True) -> Any:
+        """Come get_or_load per loader asincroni (single-flight per event loop)"""
+        value = self._lookup(key)
+        if value is not _MISSING:
+            return value
+
+        flight_key = (asyncio.get_running_loop(), key)
+        flight = self._async_flights.get(flight_key)
+        if flight is not None:
+            return await asyncio.shield(flight)
+
+        flight = flight_key[0].create_future()
+        self._async_flights[flight_key] = flight
+        try:
+            value = await loader()
+            with self._lock:
+                self.stats.loads += 1
+            if should_cache(value):
+                self.set(key, value, ttl)
+            flight.set_result(value)
+            return value
+        except BaseException as e:
+            flight.set_exception(e)
+            # L'eccezione è consegnata agli altri in attesa; se non ce ne sono
+            # non va segnalata come mai letta
+            flight.exception()
+            raise
+        finally:
+            self._async_flights.pop(flight_key, None)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Contatori e occupazione del namespace"""
+        with self._lock:
+            return {
+                "namespace": self.namespace,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "bytes": self.total_bytes,
+                "max_bytes": self.max_bytes,
+                "hit_rate": round(self.stats.hit_rate, 4),
+                "shared": self.remote is not None,
+                **asdict(self.stats),
+            }
+
+
+_caches: Dict[str, LRUCache] = {}
+_registry_lock = threading.Lock()
+_remote_tier: Optional[RedisCacheTier] = None
+
+
+def _shared_tier() -> Optional[RedisCacheTier]:
+    global _remote_tier
+    url = os.getenv("CACHE_REDIS_URL")
+    if url and _remote_tier is None:
+        try:
+            _remote_tier = RedisCacheTier.from_url(url)
+        except Exception as e:
+            logger.warning(f"Livello Redis della cache non configurabile: {e}")
+    return _remote_tier
+
+
+def get_cache(namespace: str, max_entries: int = DEFAULT_MAX_ENTRIES,
+              max_bytes: Optional[int] = DEFAULT_MAX_BYTES, default_ttl: Optional[float] = None,
+              shared: bool = False) -> LRUCache:
+    """
+    Cache del namespace, creata con i limiti indicati alla prima richiesta
+
+    Args:
+        shared: Usa anche il livello Redis (CACHE_REDIS_URL) se configurato;
+            solo per valori serializzabili in JSON
+    """
+    with _registry_lock:
+        cache = _caches.get(namespace)
+        if cache is None:
+            cache = _caches[namespace] = LRUCache(
+                namespace, max_entries=max_entries, max_bytes=max_bytes,
+                default_ttl=default_ttl, remote=_shared_tier() if shared else None
+            )
+        return cache
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Contatori di tutti i namespace, per health check e metriche"""
+    with _registry_lock:
+        caches = list(_caches.values())
+    return {cache.namespace: cache.snapshot() for cache in caches}
+
+
+CACHE_ENTRIES = REGISTRY.gauge("eaa_cache_entries", "Elementi nel livello locale della cache", ("namespace",))
+CACHE_BYTES = REGISTRY.gauge("eaa_cache_bytes", "Memoria stimata del livello locale della cache", ("namespace",))
+CACHE_EVENTS = REGISTRY.gauge(
+    "eaa_cache_events", "Contatori cumulativi della cache (hit, miss, eviction, ...)", ("namespace", "event")
+)
+
+
+def _collect_metrics() -> None:
+    for namespace, snapshot in cache_stats().items():
+        CACHE_ENTRIES.labels(namespace=namespace).set(snapshot["entries"])
+        CACHE_BYTES.labels(namespace=namespace).set(snapshot["bytes"])
+        for event in ("hits", "misses", "loads", "evictions", "expirations", "remote_hits"):
+            CACHE_EVENTS.labels(namespace=namespace, event=event).set(snapshot[event])
+
+
+REGISTRY.on_collect(_collect_metrics)
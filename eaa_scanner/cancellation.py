@@ -0,0 +1,202 @@
+"""
+Cancellazione cooperativa delle scansioni
+
+Un CancellationToken accompagna una scansione dall'endpoint di cancellazione
+fino ai sottoprocessi degli scanner: run_scan e l'orchestratore enterprise lo
+rendono corrente (come gli hook degli eventi, tramite contextvar propagata
+anche ai thread degli scanner) e run_command registra sul token la
+terminazione del gruppo di processi del comando in esecuzione. L'annullamento
+interrompe quindi subito Pa11y/axe/Lighthouse e i browser che hanno avviato,
+invece di attendere il loro timeout.
+
+I punti di controllo sollevano ScanCancelled, che deriva da BaseException
+come asyncio.CancelledError: attraversa i blocchi `except Exception` con cui
+scanner e orchestratori convertono gli errori in fallback o retry.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import logging
+import os
+import signal
+import subprocess
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+# Attesa tra SIGTERM e SIGKILL al gruppo di processi di un comando
+KILL_GRACE_SECONDS = 2.0
+
+
+class ScanCancelled(BaseException):
+    """Sollevata nei punti di controllo di una scansione annullata"""
+
+
+class CancellationToken:
+    """
+    Segnale di annullamento condiviso tra thread
+
+    Le callback registrate con add_callback vengono eseguite una sola volta,
+    nel thread che chiama cancel(): devono essere brevi e non bloccanti.
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks: Dict[int, Callable[[], None]] = {}
+        self._next_id = 0
+        self.reason: Optional[str] = None
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self, reason: str = "Scansione annullata") -> bool:
+        """
+        Annulla la scansione ed esegue le callback registrate
+
+        Returns:
+            False se il token era già stato annullato
+        """
+        with self._lock:
+            if self._event.is_set():
+                return False
+            self.reason = reason
+            self._event.set()
+            callbacks, self._callbacks = list(self._callbacks.values()), {}
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logger.warning(f"Callback di annullamento non riuscita: {e}")
+        return True
+
+    def add_callback(self, callback: Callable[[], None]) -> Callable[[], None]:
+        """
+        Registra una callback di annullamento (eseguita subito se già annullato)
+
+        Returns:
+            Funzione che rimuove la callback
+        """
+        with self._lock:
+            if not self._event.is_set():
+                callback_id = self._next_id
+                self._next_id += 1
+                self._callbacks[callback_id] = callback
+                return lambda: self._remove_callback(callback_id)
+        callback()
+        return lambda: None
+
+    def _remove_callback(self, callback_id: int) -> None:
+        with self._lock:
+            self._callbacks.pop(callback_id, None)
+
+    def raise_if_cancelled(self) -> None:
+        if self._event.is_set():
+            raise ScanCancelled(self.reason)
+
+    def sleep(self, seconds: float) -> None:
+        """Attesa interrotta dall'annullamento (per backoff e pause tra pagine)"""
+        if self._event.wait(seconds):
+            raise ScanCancelled(self.reason)
+
+
+_current_token: contextvars.ContextVar[Optional[CancellationToken]] = contextvars.ContextVar(
+    "eaa_cancellation_token", default=None
+)
+
+
+def get_current_token() -> Optional[CancellationToken]:
+    return _current_token.get()
+
+
+def set_current_token(token: CancellationToken) -> contextvars.Token:
+    """Imposta il token corrente; restituisce il token per reset_current_token"""
+    return _current_token.set(token)
+
+
+def reset_current_token(reset: contextvars.Token) -> None:
+    _current_token.reset(reset)
+
+
+@contextmanager
+def cancellation_scope(token: Optional[CancellationToken]) -> Iterator[Optional[CancellationToken]]:
+    """Rende corrente il token nel contesto (None lascia quello esistente)"""
+    if token is None:
+        yield get_current_token()
+        return
+    reset = set_current_token(token)
+    try:
+        yield token
+    finally:
+        reset_current_token(reset)
+
+
+def raise_if_cancelled(token: Optional[CancellationToken] = None) -> None:
+    """Punto di controllo sul token indicato o su quello corrente"""
+    token = token or get_current_token()
+    if token is not None:
+        token.raise_if_cancelled()
+
+
+def terminate_process_group(process: subprocess.Popen, grace: float = KILL_GRACE_SECONDS) -> None:
+    """
+    SIGTERM al gruppo di processi del comando, SIGKILL dopo `grace` secondi
+
+    Il comando deve essere avviato con start_new_session=True, così il gruppo
+    comprende anche i browser avviati dal comando. Non bloccante.
+    """
+    if not hasattr(os, "killpg"):
+        process.kill()
+        return
+
+    def signal_group(signum: int) -> None:
+        try:
+            os.killpg(process.pid, signum)
+        except (ProcessLookupError, PermissionError):
+            pass
+
+    signal_group(signal.SIGTERM)
+    timer = threading.Timer(grace, signal_group, (signal.SIGKILL,))
+    timer.daemon = True
+    timer.start()
+
+
+class CancellationRegistry:
+    """Token delle scansioni in corso nel processo, per ID scansione"""
+
+    def __init__(self):
+        self._tokens: Dict[str, CancellationToken] = {}
+        self._lock = threading.Lock()
+
+    def open(self, scan_id: str) -> CancellationToken:
+        """Token della scansione (nuovo se assente o già annullato)"""
+        with self._lock:
+            token = self._tokens.get(scan_id)
+            if token is None or token.cancelled:
+                token = self._tokens[scan_id] = CancellationToken()
+            return token
+
+    def cancel(self, scan_id: str, reason: str = "Scansione annullata") -> bool:
+        """Annulla la scansione se è in corso in questo processo"""
+        with self._lock:
+            token = self._tokens.get(scan_id)
+        return token is not None and token.cancel(reason)
+
+    def release(self, scan_id: str, token: CancellationToken) -> None:
+        with self._lock:
+            if self._tokens.get(scan_id) is token:
+                del self._tokens[scan_id]
+
+    @contextmanager
+    def scope(self, scan_id: str) -> Iterator[CancellationToken]:
+        """Token registrato e corrente per la durata della scansione"""
+        token = self.open(scan_id)
+        try:
+            with cancellation_scope(token):
+                yield token
+        finally:
+            self.release(scan_id, token)
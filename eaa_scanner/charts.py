@@ -1,5 +1,12 @@
 """
 Generazione grafici e visualizzazioni per report accessibilità
+
+generate_all_charts disegna i grafici in un pool di processi (pyplot non è
+thread-safe), li rende in PNG una sola volta e riusa i byte per il file e
+per il data URI. I risultati sono in cache per hash dei dati analytics:
+rigenerazioni e scansioni identiche non ridisegnano nulla.
+
+    EAA_CHART_WORKERS   processi del pool (0: disegno seriale nel processo)
 """
 import matplotlib
 matplotlib.use('Agg')  # Backend non-interattivo per server
@@ -9,10 +16,20 @@ from matplotlib.patches import Rectangle, FancyBboxPatch
 import numpy as np
 from typing import Dict, List, Any, Optional, Tuple
 import base64
-from io import BytesIO
+import hashlib
+import json
 import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
 from pathlib import Path
 
+from .cache import get_cache
+from .svg_charts import CHART_SPECS, COLORS as CHART_COLORS
+
 # Configurazione stile italiano professionale
 plt.rcParams['font.family'] = 'sans-serif'
 plt.rcParams['font.sans-serif'] = ['Arial', 'Helvetica', 'DejaVu Sans']
@@ -25,45 +42,77 @@ plt.rcParams['legend.fontsize'] = 9
 
 logger = logging.getLogger(__name__)
 
+DATA_URI_PREFIX = "data:image/png;base64,"
+
+# Set di grafici in cache (data URI) per hash dei dati analytics
+CHART_CACHE_TTL = 3600
+_chart_cache = get_cache("charts", max_entries=32, max_bytes=64 * 1024 * 1024, default_ttl=CHART_CACHE_TTL)
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def chart_workers() -> int:
+    """Processi del pool di disegno (EAA_CHART_WORKERS, default: CPU fino a 4)"""
+    value = os.getenv("EAA_CHART_WORKERS")
+    if value is not None and value.strip().isdigit():
+        return int(value)
+    # Con una sola CPU il pool aggiunge solo il costo dei processi
+    cpus = os.cpu_count() or 1
+    return min(4, cpus) if cpus > 1 else 0
+
+
+def _chart_pool() -> Optional[ProcessPoolExecutor]:
+    """Pool condiviso, creato al primo uso; None se il disegno è seriale"""
+    global _pool
+    workers = chart_workers()
+    if workers <= 0:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            # spawn: i processi di API e scansione hanno thread attivi, fork non è sicuro
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def _discard_pool(pool: ProcessPoolExecutor) -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def chart_cache_key(analytics_data: Dict[str, Any]) -> str:
+    """Hash dei dati analytics che determinano i grafici"""
+    payload = json.dumps(analytics_data, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _render_chart(method: str, data: Dict[str, Any]) -> str:
+    """Disegna un grafico e ne restituisce il data URI (eseguito nei processi del pool)"""
+    return getattr(ChartGenerator(write_files=False), method)(data)
+
 
 class ChartGenerator:
     """
     Generatore di grafici professionali per report EAA
     """
     
-    # Palette colori accessibili e professionali
-    COLORS = {
-        'primary': '#2E5266',      # Blu scuro professionale
-        'secondary': '#6E8898',    # Grigio blu
-        'success': '#52B788',      # Verde successo
-        'warning': '#F77F00',      # Arancione warning
-        'danger': '#D62828',       # Rosso errore
-        'info': '#4CC9F0',         # Azzurro info
-        'light': '#F8F9FA',        # Grigio chiaro
-        'dark': '#212529',         # Grigio scuro
-        
-        # Colori per severità
-        'critical': '#D62828',
-        'high': '#F77F00',
-        'medium': '#FFC107',
-        'low': '#52B788',
-        
-        # Colori per principi WCAG
-        'perceivable': '#2E5266',
-        'operable': '#6E8898',
-        'understandable': '#52B788',
-        'robust': '#4CC9F0'
-    }
+    # Palette colori accessibili e professionali (condivisa con il backend SVG)
+    COLORS = CHART_COLORS
     
-    def __init__(self, output_dir: Optional[Path] = None):
+    def __init__(self, output_dir: Optional[Path] = None, write_files: bool = True):
         """
         Inizializza generatore grafici
         
         Args:
             output_dir: Directory output per salvare grafici
+            write_files: False per produrre solo i data URI (processi del pool)
         """
+        self.write_files = write_files
         self.output_dir = output_dir or Path.cwd() / "charts"
-        if not self.output_dir.exists():
+        if write_files and not self.output_dir.exists():
             self.output_dir.mkdir(parents=True, exist_ok=True)
     
     def generate_all_charts(self, analytics_data: Dict[str, Any]) -> Dict[str, str]:
@@ -74,45 +123,76 @@ class ChartGenerator:
             analytics_data: Dati analytics completi
             
         Returns:
-            Dizionario con path/base64 dei grafici generati
+            Dizionario con base64 dei grafici generati (salvati anche come PNG)
         """
-        charts = {}
-        
         try:
-            # Dashboard principale
-            charts['dashboard'] = self.create_dashboard(analytics_data)
-            
-            # Grafici individuali
-            charts['compliance_gauge'] = self.create_compliance_gauge(
-                analytics_data.get('executive_summary', {})
+            charts = _chart_cache.get_or_load(
+                chart_cache_key(analytics_data),
+                lambda: self._render_all(analytics_data),
+                # Un set incompleto (grafico fallito) viene ridisegnato la volta successiva
+                should_cache=lambda rendered: len(rendered) == len(CHART_SPECS)
             )
-            charts['severity_donut'] = self.create_severity_donut(
-                analytics_data.get('quantitative_analysis', {})
-            )
-            charts['wcag_principles'] = self.create_wcag_principles_radar(
-                analytics_data.get('wcag_analysis', {})
-            )
-            charts['issues_by_category'] = self.create_category_bar_chart(
-                analytics_data.get('category_analysis', {})
-            )
-            charts['scanner_comparison'] = self.create_scanner_comparison(
-                analytics_data.get('scanner_comparison', {})
-            )
-            charts['remediation_timeline'] = self.create_remediation_timeline(
-                analytics_data.get('effort_estimation', {})
-            )
-            charts['risk_matrix'] = self.create_risk_matrix(
-                analytics_data.get('risk_assessment', {})
-            )
-            charts['benchmark_comparison'] = self.create_benchmark_chart(
-                analytics_data.get('benchmarks', {})
-            )
-            
         except Exception as e:
             logger.error(f"Errore generazione grafici: {e}")
+            return {}
+        
+        if self.write_files:
+            self._write_chart_files(charts)
+        return dict(charts)
+    
+    def _render_all(self, analytics_data: Dict[str, Any]) -> Dict[str, str]:
+        """Disegna i grafici di CHART_SPECS nel pool (o in serie se non disponibile)"""
+        tasks = [
+            (key, method, analytics_data if section is None else analytics_data.get(section, {}))
+            for key, method, section, _ in CHART_SPECS
+        ]
         
+        pool = _chart_pool()
+        if pool is not None:
+            try:
+                futures = [(key, pool.submit(_render_chart, method, data)) for key, method, data in tasks]
+                return self._collect(futures)
+            except BrokenProcessPool as e:
+                logger.warning(f"Pool dei grafici non disponibile, disegno seriale: {e}")
+                _discard_pool(pool)
+        
+        renderer = ChartGenerator(write_files=False)
+        charts = {}
+        for key, method, data in tasks:
+            try:
+                charts[key] = getattr(renderer, method)(data)
+            except Exception as e:
+                logger.error(f"Errore generazione grafico {key}: {e}")
+        return {key: uri for key, uri in charts.items() if uri}
+    
+    @staticmethod
+    def _collect(futures) -> Dict[str, str]:
+        charts = {}
+        for key, future in futures:
+            try:
+                uri = future.result()
+            except BrokenProcessPool:
+                raise
+            except Exception as e:
+                logger.error(f"Errore generazione grafico {key}: {e}")
+                continue
+            if uri:
+                charts[key] = uri
         return charts
     
+    def _write_chart_files(self, charts: Dict[str, str]) -> None:
+        """Salva i PNG dei grafici dai byte già codificati nei data URI"""
+        file_names = {key: file_name for key, _, _, file_name in CHART_SPECS}
+        for key, uri in charts.items():
+            if not uri.startswith(DATA_URI_PREFIX):
+                continue
+            try:
+                (self.output_dir / f"{file_names[key]}.png").write_bytes(
+                    base64.b64decode(uri[len(DATA_URI_PREFIX):])
+                )
+            except OSError as e:
+                logger.error(f"Errore salvataggio grafico {key}: {e}")
+    
     def create_dashboard(self, analytics_data: Dict[str, Any]) -> str:
         """
         Crea dashboard riepilogativa con metriche chiave
@@ -701,33 +781,30 @@ class ChartGenerator:
     
     def _save_figure(self, fig: plt.Figure, name: str) -> str:
         """
-        Salva figura come file o base64
+        Rende la figura in PNG una sola volta, salva il file e restituisce il base64
         
         Args:
             fig: Figura matplotlib
             name: Nome del file
             
         Returns:
-            Path del file o stringa base64
+            Data URI PNG per embedding HTML
         """
         try:
-            # Salva come file
-            filepath = self.output_dir / f"{name}.png"
-            fig.savefig(filepath, dpi=100, bbox_inches='tight', facecolor='white')
-            plt.close(fig)
-            
-            # Converti anche in base64 per embedding HTML
             buffer = BytesIO()
             fig.savefig(buffer, format='png', dpi=100, bbox_inches='tight', facecolor='white')
-            buffer.seek(0)
-            image_base64 = base64.b64encode(buffer.getvalue()).decode()
+            png = buffer.getvalue()
+            
+            if self.write_files:
+                (self.output_dir / f"{name}.png").write_bytes(png)
             
-            return f"data:image/png;base64,{image_base64}"
+            return DATA_URI_PREFIX + base64.b64encode(png).decode()
             
         except Exception as e:
             logger.error(f"Errore salvataggio grafico {name}: {e}")
-            plt.close(fig)
             return ""
+        finally:
+            plt.close(fig)
     
     def _get_level_color(self, level: str) -> str:
         """Ottiene colore per livello conformità"""
@@ -26,6 +26,7 @@ def parse_args() -> argparse.Namespace:
     p.add_argument("--pdf_engine", help="PDF engine (auto, weasyprint, chrome, wkhtmltopdf)", default="auto")
     p.add_argument("--pdf_format", help="PDF page format (A4, Letter, etc)", default="A4")
     p.add_argument("--pdf_margins", help="PDF margins in inches (top,right,bottom,left)", default=None)
+    p.add_argument("--chart_format", help="Chart format (auto, svg, png)", default="auto")
     
     mode = p.add_mutually_exclusive_group()
     mode.add_argument("--simulate", action="store_true", help="Run in simulate (offline) mode")
@@ -61,6 +61,7 @@ class Config(BaseModel):
     pdf_engine: str = Field(default="auto", description="Engine PDF (auto, weasyprint, chrome, wkhtmltopdf)")
     pdf_page_format: str = Field(default="A4", description="Formato pagina PDF")
     pdf_margins: Optional[str] = Field(default=None, description="Margini PDF (formato: top,right,bottom,left in pollici)")
+    chart_format: str = Field(default="auto", description="Formato grafici (auto, svg, png)")
     
     wcag_version: str = Field(default="2.1", description="Versione WCAG")
     wcag_level: str = Field(default="AA", description="Livello WCAG")
@@ -151,6 +152,7 @@ class Config(BaseModel):
             eaa_compliance=_parse_bool(pick("eaa_compliance", default="true")),
             out_dir=pick("out_dir", default="output"),
             log_level=pick("log_level", default="INFO"),
+            chart_format=pick("chart_format", default="auto"),
             simulate=_parse_bool(pick("simulate", default=str(args.get("simulate", True)).lower())),
         )
         return cfg
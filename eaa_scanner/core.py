@@ -1,27 +1,26 @@
 from __future__ import annotations
 
 import json
+from contextlib import nullcontext
 from pathlib import Path
 from typing import Dict, Any, List, Optional
 
 from .config import Config, new_scan_id
+from .delivery import precompress_artifact
 from .scanners import WaveScanner, Pa11yScanner, AxeScanner, LighthouseScanner
 from .processors import process_wave, process_pa11y, normalize_all
-from .report import generate_html_report, write_report
-from .pdf import create_pdf_with_options, get_pdf_engines_status
 from .crawler import WebCrawler
-from .page_sampler import (
-    SmartPageSamplerCoordinator, 
-    SamplerConfig, 
-    SelectionStrategy,
-    AnalysisDepth
-)
 from .methodology import TestMethodology, MetadataManager
 from .analytics import AccessibilityAnalytics
-from .charts import ChartGenerator
 from .remediation import RemediationPlanManager
 from .accessibility_statement import generate_statement_from_scan
-from .scan_events import ScanEventHooks, set_current_hooks, MonitoredScanner
+from .scan_events import ScanEventHooks, hooks_context, MonitoredScanner
+from .metrics import STAGE_SECONDS
+from .cancellation import CancellationToken, cancellation_scope, raise_if_cancelled
+
+# Report (client LLM), motori PDF, grafici (matplotlib) e page sampler
+# (Playwright, scikit-learn) si importano al primo uso: chi importa il modulo
+# senza eseguire una scansione non ne paga il costo di avvio
 
 
 def run_scan(cfg: Config, output_root: Path | None = None, 
@@ -30,7 +29,15 @@ def run_scan(cfg: Config, output_root: Path | None = None,
             methodology_config: Optional[Dict[str, Any]] = None,
             report_type: str = "standard",
             event_monitor=None,
-            scan_id: Optional[str] = None) -> Dict[str, Any]:
+            scan_id: Optional[str] = None,
+            cancel_token: Optional[CancellationToken] = None) -> Dict[str, Any]:
+    """
+    Scansione completa di un sito (una o più pagine) con report HTML e PDF
+
+    cancel_token, se indicato, diventa il token corrente della scansione:
+    annullandolo vengono terminati i comandi degli scanner in corso e la
+    scansione solleva ScanCancelled al primo punto di controllo.
+    """
     
     # DEBUG: Log parametri ricevuti
     print(f"🔍 DEBUG run_scan - cfg.url: {repr(cfg.url)}")
@@ -50,8 +57,26 @@ def run_scan(cfg: Config, output_root: Path | None = None,
     if event_monitor:
         hooks = ScanEventHooks(scan_id)
         hooks.set_monitor(event_monitor)
-        set_current_hooks(hooks)
     
+    # Gli hook valgono solo per questa scansione: il contesto del chiamante
+    # viene ripristinato all'uscita (anche in caso di eccezione)
+    with hooks_context(hooks) if hooks else nullcontext(), cancellation_scope(cancel_token):
+        return _run_scan_pipeline(
+            cfg, base_out, scan_id, hooks,
+            enable_crawling=enable_crawling,
+            crawler_config=crawler_config,
+            methodology_config=methodology_config,
+            report_type=report_type,
+        )
+
+
+def _run_scan_pipeline(cfg: Config, base_out: Path, scan_id: str,
+                       hooks: Optional[ScanEventHooks],
+                       enable_crawling: bool = False,
+                       crawler_config: Optional[Dict[str, Any]] = None,
+                       methodology_config: Optional[Dict[str, Any]] = None,
+                       report_type: str = "standard") -> Dict[str, Any]:
+    """Corpo di run_scan, eseguito con gli hook già impostati nel contesto"""
     # Configurazione crawler per scansione multi-pagina
     urls_to_scan = [cfg.url]
     if enable_crawling and crawler_config:
@@ -107,6 +132,7 @@ def run_scan(cfg: Config, output_root: Path | None = None,
     all_results = []
     
     for i, url in enumerate(urls_to_scan):
+        raise_if_cancelled()
         # Emetti evento progresso pagine
         if hooks:
             hooks.emit_page_progress(i + 1, len(urls_to_scan), url)
@@ -193,14 +219,15 @@ def run_scan(cfg: Config, output_root: Path | None = None,
                 print(f"⚠️ Lighthouse scan failed for {url}: {e}")
         
         # Normalizza risultati per questa URL
-        url_results = normalize_all(
-            url=url,
-            company_name=cfg.company_name,
-            wave=wave_res,
-            pa11y=pa11y_res,
-            axe=axe_res,
-            lighthouse=lighthouse_res,
-        )
+        with STAGE_SECONDS.labels(stage="normalization").time():
+            url_results = normalize_all(
+                url=url,
+                company_name=cfg.company_name,
+                wave=wave_res,
+                pa11y=pa11y_res,
+                axe=axe_res,
+                lighthouse=lighthouse_res,
+            )
         url_results["page_index"] = i + 1
         all_results.append(url_results)
         
@@ -230,12 +257,14 @@ def run_scan(cfg: Config, output_root: Path | None = None,
     )
 
     (base_out / "summary.json").write_text(json.dumps(aggregated, indent=2, ensure_ascii=False), encoding="utf-8")
+    precompress_artifact(base_out / "summary.json")
     
     # Genera analytics avanzate
     if hooks:
         hooks.emit_processing_step("Generazione analytics", 70)
-    analytics = AccessibilityAnalytics(aggregated)
-    analytics_data = analytics.generate_complete_analytics()
+    with STAGE_SECONDS.labels(stage="analytics").time():
+        analytics = AccessibilityAnalytics(aggregated)
+        analytics_data = analytics.generate_complete_analytics()
     (base_out / "analytics.json").write_text(
         json.dumps(analytics_data, indent=2, ensure_ascii=False),
         encoding="utf-8"
@@ -244,12 +273,16 @@ def run_scan(cfg: Config, output_root: Path | None = None,
     # Genera grafici e visualizzazioni
     if hooks:
         hooks.emit_processing_step("Generazione grafici", 80)
-    chart_generator = ChartGenerator(output_dir=base_out)
-    charts_data = chart_generator.generate_all_charts(analytics_data)
+    from .svg_charts import create_chart_generator, resolve_chart_format
+    chart_format = resolve_chart_format(cfg.chart_format, cfg.pdf_engine, report_type)
+    with STAGE_SECONDS.labels(stage="charts").time():
+        chart_generator = create_chart_generator(base_out, chart_format)
+        charts_data = chart_generator.generate_all_charts(analytics_data)
     (base_out / "charts.json").write_text(
         json.dumps(charts_data, indent=2, ensure_ascii=False),
         encoding="utf-8"
     )
+    precompress_artifact(base_out / "charts.json")
     
     # Genera piano di remediation
     remediation = RemediationPlanManager(aggregated, cfg.company_name)
@@ -283,10 +316,12 @@ def run_scan(cfg: Config, output_root: Path | None = None,
     # Generate HTML report (standard o professionale)
     if hooks:
         hooks.emit_report_generation("Generazione report HTML", 90)
-    if report_type == "professional":
-        html_report = _generate_professional_report(aggregated, cfg)
-    else:
-        html_report = generate_html_report(aggregated, cfg)
+    from .report import generate_html_report, write_report
+    with STAGE_SECONDS.labels(stage="html").time():
+        if report_type == "professional":
+            html_report = _generate_professional_report(aggregated, cfg)
+        else:
+            html_report = generate_html_report(aggregated, cfg)
     
     report_path = write_report(base_out / f"report_{cfg.company_name.replace(' ', '_')}.html", html_report)
     
@@ -300,14 +335,16 @@ def run_scan(cfg: Config, output_root: Path | None = None,
         # Configura opzioni PDF dalla configurazione
         margins = cfg.get_pdf_margins_dict()
         
-        pdf_success = create_pdf_with_options(
-            html_path=report_path,
-            pdf_path=pdf_path,
-            engine=cfg.pdf_engine,
-            page_format=cfg.pdf_page_format,
-            margins=margins,
-            timeout=120
-        )
+        from .pdf import create_pdf_with_options
+        with STAGE_SECONDS.labels(stage="pdf").time():
+            pdf_success = create_pdf_with_options(
+                html_path=report_path,
+                pdf_path=pdf_path,
+                engine=cfg.pdf_engine,
+                page_format=cfg.pdf_page_format,
+                margins=margins,
+                timeout=120
+            )
         
         if pdf_success:
             pdf_status = "success"
@@ -345,7 +382,8 @@ def run_scan(cfg: Config, output_root: Path | None = None,
         "remediation_path": str(base_out / "remediation_plan.json"),
         "statement_path": str(base_out / "accessibility_statement.json"),
         "pages_scanned": len(urls_to_scan),
-        "report_type": report_type
+        "report_type": report_type,
+        "event_stats": hooks.get_stats() if hooks else None
     }
 
 
@@ -463,15 +501,11 @@ def _generate_professional_report(data: Dict[str, Any], config: Config = None) -
     if config:
         from .report import enhance_data_with_llm
         data = enhance_data_with_llm(data, config)
-    from jinja2 import Environment, FileSystemLoader
-    import os
+    from .templating import get_template
     
-    # Configura Jinja2
-    template_dir = os.path.join(os.path.dirname(__file__), "..", "templates")
-    env = Environment(loader=FileSystemLoader(template_dir))
-    
-    # Carica template professionale
-    template = env.get_template("report_professionale.html")
+    # Template professionale dall'ambiente condiviso (markup costruito dai dati: niente autoescape)
+    template_dir = Path(__file__).parent.parent / "templates"
+    template = get_template(template_dir, "report_professionale.html", autoescape=False)
     
     # Prepara dati per template
     context = {
@@ -494,6 +528,80 @@ def _generate_professional_report(data: Dict[str, Any], config: Config = None) -
     return template.render(**context)
 
 
+def _scan_sampled_page(cfg: Config, url: str, page_depth, depth_manager) -> tuple:
+    """
+    Esegue gli scanner abilitati su una pagina selezionata dal sampler
+    
+    Args:
+        cfg: Configurazione base scanner
+        url: URL della pagina
+        page_depth: DepthConfig della pagina (opzionale)
+        depth_manager: DepthManager che traduce la profondità in parametri scanner
+        
+    Returns:
+        Tupla (risultati normalizzati, output grezzi per scanner)
+    """
+    wave_res = None
+    pa11y_res = None
+    axe_res = None
+    lighthouse_res = None
+    raw_outputs: Dict[str, Any] = {}
+    
+    # Esegui scanner in base a configurazione profondità
+    if page_depth:
+        # Usa scanner configurati per questa profondità
+        scan_params = depth_manager.get_scan_configuration(page_depth)
+        scanners_enabled = scan_params['scanners_enabled']
+        
+        # Override timeout se necessario
+        scanner_timeout = scan_params.get('timeout_per_scanner', cfg.scanner_timeout_ms)
+    else:
+        scanners_enabled = {
+            'wave': cfg.scanners_enabled.wave,
+            'axe': cfg.scanners_enabled.axe_core,
+            'pa11y': cfg.scanners_enabled.pa11y,
+            'lighthouse': cfg.scanners_enabled.lighthouse
+        }
+        scanner_timeout = cfg.scanner_timeout_ms
+    
+    # Esegui scanner abilitati
+    if scanners_enabled.get('wave') and cfg.scanners_enabled.wave:
+        wave = WaveScanner(api_key=cfg.wave_api_key, timeout_ms=scanner_timeout, simulate=cfg.simulate)
+        r = wave.scan(url)
+        wave_res = process_wave(r.json)
+        raw_outputs["wave"] = r.json
+    
+    if scanners_enabled.get('pa11y') and cfg.scanners_enabled.pa11y:
+        pz = Pa11yScanner(timeout_ms=scanner_timeout, simulate=cfg.simulate)
+        r = pz.scan(url)
+        pa11y_res = process_pa11y(r.json)
+        raw_outputs["pa11y"] = r.json
+    
+    if scanners_enabled.get('axe') and cfg.scanners_enabled.axe_core:
+        axe = AxeScanner(timeout_ms=scanner_timeout, simulate=cfg.simulate)
+        r = axe.scan(url)
+        axe_res = r.json
+        raw_outputs["axe"] = r.json
+    
+    if scanners_enabled.get('lighthouse') and cfg.scanners_enabled.lighthouse:
+        lh = LighthouseScanner(timeout_ms=scanner_timeout, simulate=cfg.simulate)
+        r = lh.scan(url)
+        lighthouse_res = r.json
+        raw_outputs["lighthouse"] = r.json
+    
+    # Normalizza risultati
+    with STAGE_SECONDS.labels(stage="normalization").time():
+        url_results = normalize_all(
+            url=url,
+            company_name=cfg.company_name,
+            wave=wave_res,
+            pa11y=pa11y_res,
+            axe=axe_res,
+            lighthouse=lighthouse_res,
+        )
+    return url_results, raw_outputs
+
+
 def run_smart_scan(cfg: Config, output_root: Path | None = None,
                   sampler_config: Optional[Dict[str, Any]] = None,
                   report_type: str = "standard",
@@ -522,6 +630,7 @@ def run_smart_scan(cfg: Config, output_root: Path | None = None,
     print("\n🚀 Avvio Smart Page Sampling...")
     
     # Configura sampler
+    from .page_sampler import SamplerConfig, SmartPageSamplerCoordinator
     sampler_cfg = SamplerConfig()
     if sampler_config:
         # Aggiorna configurazione con parametri forniti
@@ -532,8 +641,15 @@ def run_smart_scan(cfg: Config, output_root: Path | None = None,
     # Override output directory per sampler
     sampler_cfg.output_dir = str(base_out / "page_sampler")
     
-    # Inizializza e esegui sampler
-    sampler = SmartPageSamplerCoordinator(sampler_cfg)
+    # Inizializza e esegui sampler: le pagine prioritarie vengono
+    # scansionate mentre la discovery è ancora in corso
+    def scan_priority_page(page: Dict[str, Any], depth_config):
+        url_results, raw_outputs = _scan_sampled_page(
+            cfg, page['url'], depth_config, sampler.depth_manager
+        )
+        return url_results, raw_outputs, depth_config
+    
+    sampler = SmartPageSamplerCoordinator(sampler_cfg, page_scanner=scan_priority_page)
     sampler_result = sampler.execute(cfg.url)
     
     # Salva risultati sampler
@@ -601,69 +717,25 @@ def run_smart_scan(cfg: Config, output_root: Path | None = None,
         if page_depth:
             print(f"   Profondità: {page_depth.level.value} ({page_depth.estimated_time_minutes} min)")
         
-        wave_res = None
-        pa11y_res = None
-        axe_res = None
-        lighthouse_res = None
-        
         url_dir = base_out / f"page_{i+1}"
         url_dir.mkdir(exist_ok=True)
         
-        # Esegui scanner in base a configurazione profondità
-        scanners_to_use = cfg.scanners_enabled
-        if page_depth:
-            # Usa scanner configurati per questa profondità
-            scan_params = sampler.depth_manager.get_scan_configuration(page_depth)
-            scanners_enabled = scan_params['scanners_enabled']
-            
-            # Override timeout se necessario
-            scanner_timeout = scan_params.get('timeout_per_scanner', cfg.scanner_timeout_ms)
+        if url in sampler_result.early_scans:
+            # Pagina prioritaria già scansionata durante la discovery
+            print("   Già scansionata durante la discovery")
+            url_results, raw_outputs, used_depth = sampler_result.early_scans[url]
         else:
-            scanners_enabled = {
-                'wave': cfg.scanners_enabled.wave,
-                'axe': cfg.scanners_enabled.axe_core,
-                'pa11y': cfg.scanners_enabled.pa11y,
-                'lighthouse': cfg.scanners_enabled.lighthouse
-            }
-            scanner_timeout = cfg.scanner_timeout_ms
-        
-        # Esegui scanner abilitati
-        if scanners_enabled.get('wave') and cfg.scanners_enabled.wave:
-            wave = WaveScanner(api_key=cfg.wave_api_key, timeout_ms=scanner_timeout, simulate=cfg.simulate)
-            r = wave.scan(url)
-            wave_res = process_wave(r.json)
-            (url_dir / "wave.json").write_text(json.dumps(r.json, indent=2), encoding="utf-8")
-        
-        if scanners_enabled.get('pa11y') and cfg.scanners_enabled.pa11y:
-            pz = Pa11yScanner(timeout_ms=scanner_timeout, simulate=cfg.simulate)
-            r = pz.scan(url)
-            pa11y_res = process_pa11y(r.json)
-            (url_dir / "pa11y.json").write_text(json.dumps(r.json, indent=2), encoding="utf-8")
-        
-        if scanners_enabled.get('axe') and cfg.scanners_enabled.axe_core:
-            axe = AxeScanner(timeout_ms=scanner_timeout, simulate=cfg.simulate)
-            r = axe.scan(url)
-            axe_res = r.json
-            (url_dir / "axe.json").write_text(json.dumps(r.json, indent=2), encoding="utf-8")
+            url_results, raw_outputs = _scan_sampled_page(
+                cfg, url, page_depth, sampler.depth_manager
+            )
+            used_depth = page_depth
         
-        if scanners_enabled.get('lighthouse') and cfg.scanners_enabled.lighthouse:
-            lh = LighthouseScanner(timeout_ms=scanner_timeout, simulate=cfg.simulate)
-            r = lh.scan(url)
-            lighthouse_res = r.json
-            (url_dir / "lighthouse.json").write_text(json.dumps(r.json, indent=2), encoding="utf-8")
+        for scanner_name, raw in raw_outputs.items():
+            (url_dir / f"{scanner_name}.json").write_text(json.dumps(raw, indent=2), encoding="utf-8")
         
-        # Normalizza risultati
-        url_results = normalize_all(
-            url=url,
-            company_name=cfg.company_name,
-            wave=wave_res,
-            pa11y=pa11y_res,
-            axe=axe_res,
-            lighthouse=lighthouse_res,
-        )
         url_results["page_index"] = i + 1
         url_results["page_category"] = sampler_result.selection_reasons.get(url, "general")
-        url_results["depth_config"] = page_depth.level.value if page_depth else "standard"
+        url_results["depth_config"] = used_depth.level.value if used_depth else "standard"
         
         all_results.append(url_results)
         
@@ -695,25 +767,31 @@ def run_smart_scan(cfg: Config, output_root: Path | None = None,
         json.dumps(aggregated, indent=2, ensure_ascii=False),
         encoding="utf-8"
     )
+    precompress_artifact(base_out / "summary.json")
     
     # FASE 4: Analytics e report (come in run_scan)
     print("\n📊 Generazione analytics e report...")
     
     # Genera analytics
-    analytics = AccessibilityAnalytics(aggregated)
-    analytics_data = analytics.generate_complete_analytics()
+    with STAGE_SECONDS.labels(stage="analytics").time():
+        analytics = AccessibilityAnalytics(aggregated)
+        analytics_data = analytics.generate_complete_analytics()
     (base_out / "analytics.json").write_text(
         json.dumps(analytics_data, indent=2, ensure_ascii=False),
         encoding="utf-8"
     )
     
     # Genera grafici
-    chart_generator = ChartGenerator(output_dir=base_out)
-    charts_data = chart_generator.generate_all_charts(analytics_data)
+    from .svg_charts import create_chart_generator, resolve_chart_format
+    chart_format = resolve_chart_format(cfg.chart_format, cfg.pdf_engine, report_type)
+    with STAGE_SECONDS.labels(stage="charts").time():
+        chart_generator = create_chart_generator(base_out, chart_format)
+        charts_data = chart_generator.generate_all_charts(analytics_data)
     (base_out / "charts.json").write_text(
         json.dumps(charts_data, indent=2, ensure_ascii=False),
         encoding="utf-8"
     )
+    precompress_artifact(base_out / "charts.json")
     
     # Genera piano di remediation
     remediation = RemediationPlanManager(aggregated, cfg.company_name)
@@ -745,10 +823,12 @@ def run_smart_scan(cfg: Config, output_root: Path | None = None,
     })
     
     # Genera report HTML
-    if report_type == "professional":
-        html_report = _generate_professional_report(aggregated, cfg)
-    else:
-        html_report = generate_html_report(aggregated, cfg)
+    from .report import generate_html_report, write_report
+    with STAGE_SECONDS.labels(stage="html").time():
+        if report_type == "professional":
+            html_report = _generate_professional_report(aggregated, cfg)
+        else:
+            html_report = generate_html_report(aggregated, cfg)
     
     report_path = write_report(
         base_out / f"report_{cfg.company_name.replace(' ', '_')}.html",
@@ -12,6 +12,8 @@ import time
 from collections import deque
 import json
 
+from .metrics import CRAWL_FETCH_SECONDS
+
 logger = logging.getLogger(__name__)
 
 
@@ -115,7 +117,7 @@ class WebCrawler:
         self.visited_urls.add(normalized_url)
         
         try:
-            response = self.session.get(normalized_url, timeout=3)
+            response = self._fetch(normalized_url, timeout=3)
             response.raise_for_status()
             
             # Verifica che sia HTML
@@ -144,6 +146,19 @@ class WebCrawler:
         except Exception as e:
             logger.error(f"Errore inaspettato crawling {normalized_url}: {e}")
     
+    def _fetch(self, url: str, timeout: float) -> requests.Response:
+        """GET con misura della latenza (eaa_crawl_fetch_seconds)"""
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            response = self.session.get(url, timeout=timeout)
+            outcome = "success" if response.ok else "http_error"
+            return response
+        finally:
+            CRAWL_FETCH_SECONDS.labels(crawler="requests", outcome=outcome).observe(
+                time.perf_counter() - started
+            )
+    
     def _discover_from_sitemap(self) -> None:
         """
         Scopre URL dalla sitemap se disponibile
@@ -156,7 +171,7 @@ class WebCrawler:
         
         for sitemap_url in sitemap_urls:
             try:
-                response = self.session.get(sitemap_url, timeout=2)
+                response = self._fetch(sitemap_url, timeout=2)
                 if response.status_code == 200:
                     if sitemap_url.endswith('.xml'):
                         self._parse_xml_sitemap(response.text)
@@ -192,7 +207,7 @@ class WebCrawler:
                 loc = sitemap.find('loc')
                 if loc:
                     try:
-                        sub_response = self.session.get(loc.text.strip(), timeout=5)
+                        sub_response = self._fetch(loc.text.strip(), timeout=5)
                         if sub_response.status_code == 200:
                             self._parse_xml_sitemap(sub_response.text)
                     except:
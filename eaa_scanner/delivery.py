@@ -0,0 +1,225 @@
+"""
+Consegna di risultati e report senza bufferizzare interi file per richiesta
+
+- JSON serializzato a blocchi (iterencode) per le risposte in streaming
+- varianti .gz/.br degli artefatti HTML/JSON scritte alla generazione,
+  scelte in base ad Accept-Encoding
+- parsing di Range (singolo intervallo) e lettura a blocchi dei file
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import logging
+import os
+import shutil
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:  # dipendenza opzionale: si usano solo le varianti gzip
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+JSON_CHUNK_SIZE = 64 * 1024
+FILE_CHUNK_SIZE = 256 * 1024
+
+# Estensioni per cui ha senso scrivere varianti precompresse
+COMPRESSIBLE_SUFFIXES = {".html", ".htm", ".json"}
+
+# Codifiche in ordine di preferenza e suffisso della variante su disco
+PRECOMPRESSED_ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+# Livelli usati durante la scansione: gzip 9 e brotli 11 costano molte volte
+# il tempo di compressione per pochi punti percentuali di dimensione
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 9
+
+
+class RangeNotSatisfiable(ValueError):
+    """Range richiesto fuori dalla dimensione del file (HTTP 416)"""
+
+    def __init__(self, size: int):
+        super().__init__(f"Range non soddisfacibile per {size} byte")
+        self.size = size
+
+
+def iter_json(data: Any, chunk_size: int = JSON_CHUNK_SIZE, indent: Optional[int] = None,
+              default: Optional[Callable[[Any], Any]] = None) -> Iterator[bytes]:
+    """
+    Serializza JSON a blocchi di circa chunk_size byte
+
+    Args:
+        data: Documento da serializzare
+        chunk_size: Dimensione indicativa dei blocchi restituiti
+        indent: Indentazione come json.dumps
+        default: Serializzatore per tipi non JSON (es. str per datetime)
+
+    Yields:
+        Blocchi UTF-8 del documento
+    """
+    encoder = json.JSONEncoder(ensure_ascii=False, indent=indent, default=default)
+    buffer: List[str] = []
+    buffered = 0
+    for fragment in encoder.iterencode(data):
+        buffer.append(fragment)
+        buffered += len(fragment)
+        if buffered >= chunk_size:
+            yield "".join(buffer).encode("utf-8")
+            buffer, buffered = [], 0
+    if buffer:
+        yield "".join(buffer).encode("utf-8")
+
+
+def precompress_artifact(path: Path) -> List[Path]:
+    """
+    Scrive accanto all'artefatto le varianti .gz (e .br se brotli è installato)
+
+    Da chiamare subito dopo la generazione: le richieste servono poi il file
+    già compresso invece di comprimere a ogni download. Gli errori vengono
+    solo registrati, la generazione del report non fallisce per questo.
+
+    Args:
+        path: File HTML o JSON appena scritto
+
+    Returns:
+        Varianti scritte
+    """
+    path = Path(path)
+    if path.suffix.lower() not in COMPRESSIBLE_SUFFIXES or not path.exists():
+        return []
+
+    written = []
+    try:
+        gz_path = path.with_name(path.name + ".gz")
+        tmp_path = gz_path.with_name(gz_path.name + ".tmp")
+        with open(path, "rb") as src, gzip.open(tmp_path, "wb", compresslevel=GZIP_LEVEL) as dst:
+            shutil.copyfileobj(src, dst, FILE_CHUNK_SIZE)
+        os.replace(tmp_path, gz_path)
+        written.append(gz_path)
+
+        if brotli is not None:
+            br_path = path.with_name(path.name + ".br")
+            tmp_path = br_path.with_name(br_path.name + ".tmp")
+            tmp_path.write_bytes(brotli.compress(path.read_bytes(), quality=BROTLI_QUALITY))
+            os.replace(tmp_path, br_path)
+            written.append(br_path)
+    except Exception as e:
+        logger.warning(f"Precompressione di {path} non riuscita: {e}")
+    return written
+
+
+def parse_accept_encoding(header: Optional[str]) -> Dict[str, float]:
+    """Codifiche accettate con il relativo q-value (RFC 9110)"""
+    accepted: Dict[str, float] = {}
+    for item in (header or "").split(","):
+        name, _, params = item.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name] = quality
+    return accepted
+
+
+def select_precompressed(path: Path, accept_encoding: Optional[str]) -> Tuple[Path, Optional[str]]:
+    """
+    Sceglie la variante precompressa migliore accettata dal client
+
+    Una variante più vecchia dell'originale (report rigenerato) viene ignorata.
+
+    Returns:
+        (file da servire, Content-Encoding o None per l'originale)
+    """
+    path = Path(path)
+    accepted = parse_accept_encoding(accept_encoding)
+    if not accepted:
+        return path, None
+
+    try:
+        source_mtime = path.stat().st_mtime
+    except OSError:
+        return path, None
+
+    wildcard = accepted.get("*", 0.0)
+    for encoding, suffix in PRECOMPRESSED_ENCODINGS:
+        if accepted.get(encoding, wildcard) <= 0:
+            continue
+        candidate = path.with_name(path.name + suffix)
+        try:
+            if candidate.stat().st_mtime >= source_mtime:
+                return candidate, encoding
+        except OSError:
+            continue
+    return path, None
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Interpreta un header Range a intervallo singolo
+
+    Range multipli o malformati vengono ignorati (si risponde con il file
+    intero, come consentito da RFC 9110).
+
+    Args:
+        header: Valore di Range (es. "bytes=0-1023", "bytes=-500")
+        size: Dimensione del file
+
+    Returns:
+        (start, end) inclusivi, o None per servire il file intero
+
+    Raises:
+        RangeNotSatisfiable: Se l'intervallo è fuori dal file
+    """
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    first, sep, last = header[6:].strip().partition("-")
+    if not sep:
+        return None
+    try:
+        if first:
+            start = int(first)
+            end = int(last) if last else size - 1
+        else:
+            # Suffisso: ultimi N byte
+            suffix = int(last)
+            if suffix <= 0:
+                raise RangeNotSatisfiable(size)
+            start, end = max(0, size - suffix), size - 1
+    except ValueError:
+        return None
+
+    if start > end and first and last:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable(size)
+    return start, min(end, size - 1)
+
+
+def iter_file(path: Path, start: int = 0, end: Optional[int] = None,
+              chunk_size: int = FILE_CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Legge un file (o un suo intervallo inclusivo) a blocchi
+
+    Yields:
+        Blocchi di al più chunk_size byte
+    """
+    with open(path, "rb") as f:
+        f.seek(start)
+        remaining = None if end is None else end - start + 1
+        while remaining is None or remaining > 0:
+            chunk = f.read(chunk_size if remaining is None else min(chunk_size, remaining))
+            if not chunk:
+                break
+            if remaining is not None:
+                remaining -= len(chunk)
+            yield chunk
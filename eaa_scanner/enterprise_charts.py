@@ -1,22 +1,38 @@
 """
 Enterprise Chart Generator con defensive programming e null safety
 Gestisce robustamente dati mancanti e operazioni matematiche sicure
+
+Con chart_format="svg" i grafici sono SVG vettoriali (svg_charts) e
+matplotlib non viene importato; "png" resta per i motori PDF che lo richiedono.
 """
 
-import matplotlib
-matplotlib.use('Agg')  # Backend non-interattivo
-import matplotlib.pyplot as plt
-import numpy as np
 from typing import Dict, List, Any, Optional, Tuple, Union
 import base64
 from io import BytesIO
 import logging
+import math
 from pathlib import Path
 from decimal import Decimal, InvalidOperation
 import traceback
 
+from . import svg_charts
+
 logger = logging.getLogger(__name__)
 
+# matplotlib e numpy, importati dal primo generatore PNG
+plt = None
+np = None
+
+
+def _load_matplotlib() -> None:
+    global plt, np
+    if plt is None:
+        import matplotlib
+        matplotlib.use('Agg')  # Backend non-interattivo
+        import matplotlib.pyplot
+        import numpy
+        plt, np = matplotlib.pyplot, numpy
+
 
 class EnterpriseChartGenerator:
     """
@@ -48,12 +64,15 @@ class EnterpriseChartGenerator:
         'low': '#2d5016'
     }
     
-    def __init__(self, output_dir: str):
+    def __init__(self, output_dir: str, chart_format: str = "png"):
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(exist_ok=True, parents=True)
+        self.chart_format = chart_format
         
-        # Setup matplotlib sicuro
-        self._setup_matplotlib_safe()
+        # Setup matplotlib sicuro (solo per i grafici PNG)
+        if chart_format == "png":
+            _load_matplotlib()
+            self._setup_matplotlib_safe()
         
         # Statistics per monitoring
         self.generation_stats = {
@@ -95,6 +114,7 @@ class EnterpriseChartGenerator:
         
         charts_data = {
             "generation_mode": "enterprise",
+            "chart_format": self.chart_format,
             "validation_passed": validated_data is not None,
             "charts": {},
             "fallbacks": {},
@@ -106,13 +126,22 @@ class EnterpriseChartGenerator:
             return self._generate_fallback_charts(data, charts_data)
         
         # Lista chart da generare con priority
-        chart_generators = [
-            ("overview_score", self._generate_overview_chart_safe, 1),
-            ("severity_breakdown", self._generate_severity_chart_safe, 2),
-            ("scanner_comparison", self._generate_scanner_chart_safe, 3),
-            ("wcag_categories", self._generate_wcag_chart_safe, 4),
-            ("compliance_gauge", self._generate_compliance_gauge_safe, 5)
-        ]
+        if self.chart_format == "svg":
+            chart_generators = [
+                ("overview_score", self._generate_overview_svg, 1),
+                ("severity_breakdown", self._generate_severity_svg, 2),
+                ("scanner_comparison", self._generate_scanner_svg, 3),
+                ("wcag_categories", self._generate_wcag_svg, 4),
+                ("compliance_gauge", self._generate_compliance_gauge_svg, 5)
+            ]
+        else:
+            chart_generators = [
+                ("overview_score", self._generate_overview_chart_safe, 1),
+                ("severity_breakdown", self._generate_severity_chart_safe, 2),
+                ("scanner_comparison", self._generate_scanner_chart_safe, 3),
+                ("wcag_categories", self._generate_wcag_chart_safe, 4),
+                ("compliance_gauge", self._generate_compliance_gauge_safe, 5)
+            ]
         
         # Genera charts con error handling individuale
         for chart_name, generator_func, priority in chart_generators:
@@ -232,7 +261,7 @@ class EnterpriseChartGenerator:
         
         # Se è già un numero
         if isinstance(value, (int, float)):
-            if np.isnan(value) or np.isinf(value):
+            if math.isnan(value) or math.isinf(value):
                 return default
             return value
             
@@ -391,6 +420,7 @@ class EnterpriseChartGenerator:
             
             return {
                 "success": True,
+                "format": "png",
                 "image_base64": image_data,
                 "metrics": {
                     "score": score,
@@ -446,6 +476,7 @@ class EnterpriseChartGenerator:
             
             return {
                 "success": True,
+                "format": "png",
                 "image_base64": image_data,
                 "metrics": severity_counts
             }
@@ -505,6 +536,7 @@ class EnterpriseChartGenerator:
             
             return {
                 "success": True,
+                "format": "png",
                 "image_base64": image_data,
                 "metrics": scanner_scores
             }
@@ -552,6 +584,7 @@ class EnterpriseChartGenerator:
             
             return {
                 "success": True,
+                "format": "png",
                 "image_base64": image_data,
                 "metrics": wcag_categories
             }
@@ -615,6 +648,7 @@ class EnterpriseChartGenerator:
             
             return {
                 "success": True,
+                "format": "png",
                 "image_base64": image_data,
                 "metrics": {
                     "score": score,
@@ -626,6 +660,83 @@ class EnterpriseChartGenerator:
             logger.error(f"Compliance gauge error: {e}")
             return {"success": False, "error": str(e)}
     
+    # Grafici SVG: stessi dati e stessi risultati dei grafici PNG, con
+    # "svg" al posto di "image_base64"
+    
+    def _level_color(self, compliance_level: str) -> str:
+        return {
+            "conforme": self.COLORS["success"],
+            "parzialmente_conforme": self.COLORS["warning"],
+            "non_conforme": self.COLORS["danger"]
+        }.get(compliance_level, self.COLORS["warning"])
+    
+    def _svg_result(self, svg: str, filename: str, metrics: Any) -> Dict[str, Any]:
+        """Risultato di un chart SVG, salvato anche su file"""
+        try:
+            (self.output_dir / f"{filename}.svg").write_text(svg, encoding="utf-8")
+        except OSError as e:
+            logger.error(f"Chart save error for {filename}: {e}")
+        return {"success": True, "format": "svg", "svg": svg, "metrics": metrics}
+    
+    def _generate_overview_svg(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Overview score come gauge SVG"""
+        score = data["compliance"]["overall_score"]
+        compliance_level = data["compliance"]["compliance_level"]
+        svg = svg_charts.gauge(
+            score, f"Score Accessibilità - {compliance_level.replace('_', ' ').title()}",
+            "Punteggio Accessibilità", self._level_color(compliance_level)
+        )
+        return self._svg_result(svg, "overview_score", {"score": score, "compliance_level": compliance_level})
+    
+    def _generate_severity_svg(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Violazioni per severità come barre SVG"""
+        severity_counts = data["severity_counts"]
+        rows = [
+            (label, [(count, self.COLORS.get(label, self.COLORS["info"]))])
+            for label, count in severity_counts.items() if count > 0
+        ]
+        svg = svg_charts.bar_chart(rows, 'Distribuzione Violazioni per Severità',
+                                   empty_message='Nessuna violazione rilevata')
+        return self._svg_result(svg, "severity_breakdown", severity_counts)
+    
+    def _generate_scanner_svg(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Score per scanner come barre SVG (soglie 60 e 80)"""
+        scanner_scores = data["detailed_results"]["scanner_scores"]
+        if not scanner_scores:
+            return self._generate_no_scanners_chart()
+        
+        rows = []
+        for scanner, raw_score in scanner_scores.items():
+            score = self._safe_numeric_conversion(raw_score, 0)
+            color = (self.COLORS["success"] if score >= 80 else
+                     self.COLORS["warning"] if score >= 60 else self.COLORS["danger"])
+            rows.append((scanner, [(score, color)]))
+        svg = svg_charts.bar_chart(rows, 'Confronto Score per Scanner', max_value=100,
+                                   reference=(80, 'Soglia Buona (80)'))
+        return self._svg_result(svg, "scanner_comparison", scanner_scores)
+    
+    def _generate_wcag_svg(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Violazioni per principio WCAG come donut SVG"""
+        wcag_categories = data["wcag_categories"]
+        colors = [self.COLORS["primary"], self.COLORS["secondary"],
+                  self.COLORS["warning"], self.COLORS["info"]]
+        segments = [
+            (label, value, colors[n % len(colors)])
+            for n, (label, value) in enumerate((k, v) for k, v in wcag_categories.items() if v > 0)
+        ]
+        svg = svg_charts.donut(segments, 'Violazioni per Principio WCAG', center_label='Violazioni',
+                               empty_message='Nessuna violazione WCAG rilevata')
+        return self._svg_result(svg, "wcag_categories", wcag_categories)
+    
+    def _generate_compliance_gauge_svg(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Gauge conformità SVG con fasce 0-60, 60-80, 80-100"""
+        score = data["compliance"]["overall_score"]
+        compliance_level = data["compliance"]["compliance_level"]
+        zones = [(60, self.COLORS["danger"]), (80, self.COLORS["warning"]), (100, self.COLORS["success"])]
+        svg = svg_charts.gauge(score, 'Gauge Conformità EAA', compliance_level.replace('_', ' ').title(),
+                               self._level_color(compliance_level), zones=zones)
+        return self._svg_result(svg, "compliance_gauge", {"score": score, "compliance_level": compliance_level})
+    
     def _save_chart_safe(self, fig, filename: str) -> Optional[str]:
         """Salva chart come base64 con error handling"""
         
@@ -725,6 +836,7 @@ class EnterpriseChartGenerator:
             
             return {
                 "success": True,
+                "format": "png",
                 "image_base64": image_data,
                 "metrics": {"message": "no_violations_detected"}
             }
@@ -768,6 +880,6 @@ class EnterpriseChartGenerator:
 
 
 # Factory function
-def create_enterprise_chart_generator(output_dir: str) -> EnterpriseChartGenerator:
+def create_enterprise_chart_generator(output_dir: str, chart_format: str = "png") -> EnterpriseChartGenerator:
     """Factory per creare chart generator enterprise"""
-    return EnterpriseChartGenerator(output_dir)
\ No newline at end of file
+    return EnterpriseChartGenerator(output_dir, chart_format=chart_format)
\ No newline at end of file
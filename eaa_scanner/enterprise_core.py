@@ -6,8 +6,10 @@ Sostituisce core.py legacy con type safety e gestione robusta errori
 from __future__ import annotations
 
 import json
+import os
 import asyncio
 import logging
+import threading
 from pathlib import Path
 from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
@@ -18,10 +20,17 @@ from .config import Config, new_scan_id
 from .scanners import WaveScanner, Pa11yScanner, AxeScanner, LighthouseScanner
 from .processors.enterprise_normalizer import EnterpriseNormalizer
 from .models.scanner_results import AggregatedResults, ScannerResult
+from .delivery import precompress_artifact
 from .report import generate_html_report, write_report
 from .pdf import create_pdf_with_options
-from .scan_events import ScanEventHooks, set_current_hooks, MonitoredScanner
+from .scan_events import (
+    ScanEventHooks, set_current_hooks, reset_current_hooks,
+    submit_with_context, MonitoredScanner
+)
 from .enterprise_charts import EnterpriseChartGenerator
+from .svg_charts import resolve_chart_format
+from .metrics import SCANNER_RETRIES, SCANNER_RUNS, STAGE_SECONDS
+from .cancellation import CancellationToken, get_current_token, reset_current_token, set_current_token
 
 logger = logging.getLogger(__name__)
 
@@ -42,6 +51,7 @@ class EnterpriseScanOrchestrator:
         self.normalizer = EnterpriseNormalizer(enable_metrics=True)
         self.chart_generator = None
         self.enable_parallel = enable_parallel
+        self._stats_lock = threading.Lock()
         
         # Scanner execution statistics
         self.execution_stats = {
@@ -58,7 +68,8 @@ class EnterpriseScanOrchestrator:
         event_monitor=None,
         scan_id: Optional[str] = None,
         enable_pdf: bool = True,
-        max_retries: int = 3
+        max_retries: int = 3,
+        cancel_token: Optional[CancellationToken] = None
     ) -> Dict[str, Any]:
         """
         Entry point principale per scansioni enterprise
@@ -70,6 +81,7 @@ class EnterpriseScanOrchestrator:
             scan_id: ID scansione (auto-generato se None)
             enable_pdf: Abilita generazione PDF
             max_retries: Numero massimo retry per scanner
+            cancel_token: Token di annullamento (default: quello corrente)
             
         Returns:
             Risultati scansione enterprise con paths e metadata
@@ -77,6 +89,7 @@ class EnterpriseScanOrchestrator:
         Raises:
             ValueError: Se nessuno scanner produce risultati
             RuntimeError: Se errori critici durante processing
+            ScanCancelled: Se la scansione viene annullata
         """
         
         # Setup base
@@ -90,11 +103,13 @@ class EnterpriseScanOrchestrator:
         
         # Setup event hooks
         hooks = None
+        hooks_token = None
         if event_monitor:
             hooks = ScanEventHooks(scan_id)
             hooks.set_monitor(event_monitor) 
-            set_current_hooks(hooks)
+            hooks_token = set_current_hooks(hooks)
         
+        cancel_reset = set_current_token(cancel_token) if cancel_token is not None else None
         try:
             # Fase 1: Esecuzione scanner
             if hooks:
@@ -111,9 +126,10 @@ class EnterpriseScanOrchestrator:
             if hooks:
                 hooks.emit_processing_step("Normalizzazione dati", 40)
                 
-            aggregated_results = self._normalize_with_validation(
-                cfg, scan_id, scanner_results
-            )
+            with STAGE_SECONDS.labels(stage="normalization").time():
+                aggregated_results = self._normalize_with_validation(
+                    cfg, scan_id, scanner_results
+                )
             
             # Fase 3: Salvataggio risultati
             self._save_enterprise_results(base_out, aggregated_results)
@@ -122,13 +138,18 @@ class EnterpriseScanOrchestrator:
             if hooks:
                 hooks.emit_processing_step("Generazione visualizzazioni", 60)
                 
-            charts_data = self._generate_charts_safe(aggregated_results, base_out)
+            with STAGE_SECONDS.labels(stage="charts").time():
+                charts_data = self._generate_charts_safe(
+                    aggregated_results, base_out,
+                    resolve_chart_format(cfg.chart_format, cfg.pdf_engine, "enterprise")
+                )
             
             # Fase 5: Report HTML
             if hooks:
                 hooks.emit_processing_step("Generazione report HTML", 80)
                 
-            html_path = self._generate_html_report(cfg, aggregated_results, base_out)
+            with STAGE_SECONDS.labels(stage="html").time():
+                html_path = self._generate_html_report(cfg, aggregated_results, base_out)
             
             # Fase 6: PDF opzionale
             pdf_path = None
@@ -136,7 +157,8 @@ class EnterpriseScanOrchestrator:
                 if hooks:
                     hooks.emit_processing_step("Generazione PDF", 90)
                     
-                pdf_path = self._generate_pdf_safe(html_path, base_out, cfg)
+                with STAGE_SECONDS.labels(stage="pdf").time():
+                    pdf_path = self._generate_pdf_safe(html_path, base_out, cfg)
             
             # Fase 7: Response finale
             if hooks:
@@ -157,6 +179,11 @@ class EnterpriseScanOrchestrator:
             self._save_error_report(base_out, str(e), cfg, scan_id)
             
             raise RuntimeError(f"Scansione enterprise fallita: {e}") from e
+        finally:
+            if cancel_reset is not None:
+                reset_current_token(cancel_reset)
+            if hooks_token is not None:
+                reset_current_hooks(hooks_token)
     
     def _execute_scanners_robust(
         self,
@@ -182,29 +209,62 @@ class EnterpriseScanOrchestrator:
         
         logger.info(f"Scanner abilitati: {[name for _, name in enabled_scanners]}")
         
-        # Esecuzione sequenziale (più stabile per ora)
-        for scanner_key, scanner_name in enabled_scanners:
-            if hooks:
-                hooks.emit_scanner_operation(scanner_name, "Inizializzazione", 0)
+        if self.enable_parallel and len(enabled_scanners) > 1:
+            # Esecuzione parallela: il contesto (hook inclusi) viene propagato
+            # ai thread worker, quindi gli eventi di progresso non si perdono
+            with ThreadPoolExecutor(max_workers=len(enabled_scanners),
+                                    thread_name_prefix="eaa-scanner") as executor:
+                futures = {}
+                for scanner_key, scanner_name in enabled_scanners:
+                    if hooks:
+                        hooks.emit_scanner_operation(scanner_name, "Inizializzazione", 0)
+                    futures[scanner_key] = submit_with_context(
+                        executor, self._execute_single_scanner_with_retry,
+                        scanner_key, cfg, base_out, hooks, max_retries
+                    )
                 
-            result = self._execute_single_scanner_with_retry(
-                scanner_key, cfg, base_out, hooks, max_retries
-            )
-            
-            scanner_results.append((scanner_key, result))
-            
-            if result is not None:
-                self.execution_stats["completed"] += 1
-                if hooks:
-                    hooks.emit_scanner_operation(scanner_name, "Completato", 100)
-            else:
-                self.execution_stats["failed"] += 1
+                # Mantiene l'ordine degli scanner nei risultati
+                for scanner_key, scanner_name in enabled_scanners:
+                    try:
+                        result = futures[scanner_key].result()
+                    except Exception as e:
+                        logger.error(f"❌ {scanner_key} terminato con eccezione: {e}")
+                        result = None
+                    self._record_scanner_outcome(scanner_key, scanner_name, result, hooks)
+                    scanner_results.append((scanner_key, result))
+        else:
+            # Esecuzione sequenziale
+            for scanner_key, scanner_name in enabled_scanners:
                 if hooks:
-                    hooks.emit_scanner_operation(scanner_name, "Fallito", 100)
+                    hooks.emit_scanner_operation(scanner_name, "Inizializzazione", 0)
+                    
+                result = self._execute_single_scanner_with_retry(
+                    scanner_key, cfg, base_out, hooks, max_retries
+                )
+                
+                scanner_results.append((scanner_key, result))
+                self._record_scanner_outcome(scanner_key, scanner_name, result, hooks)
                     
         logger.info(f"Statistiche esecuzione: {self.execution_stats}")
         return scanner_results
     
+    def _record_scanner_outcome(self, scanner_key: str, scanner_name: str,
+                                result: Optional[Dict[str, Any]],
+                                hooks: Optional[ScanEventHooks]) -> None:
+        """Aggiorna statistiche ed emette l'evento di esito dello scanner"""
+        with self._stats_lock:
+            if result is not None:
+                self.execution_stats["completed"] += 1
+            else:
+                self.execution_stats["failed"] += 1
+        SCANNER_RUNS.labels(
+            scanner=scanner_key, outcome="completed" if result is not None else "failed"
+        ).inc()
+        if hooks:
+            hooks.emit_scanner_operation(
+                scanner_name, "Completato" if result is not None else "Fallito", 100
+            )
+    
     def _execute_single_scanner_with_retry(
         self,
         scanner_key: str,
@@ -215,12 +275,14 @@ class EnterpriseScanOrchestrator:
     ) -> Optional[Dict[str, Any]]:
         """Esegue singolo scanner con retry logic"""
         
-        self.execution_stats["started"] += 1
+        with self._stats_lock:
+            self.execution_stats["started"] += 1
         
         for attempt in range(max_retries + 1):
             try:
                 if attempt > 0:
                     logger.info(f"🔄 Retry {attempt}/{max_retries} per {scanner_key}")
+                    SCANNER_RETRIES.labels(scanner=scanner_key).inc()
                     
                 # Esegui scanner specifico
                 result = None
@@ -287,12 +349,16 @@ class EnterpriseScanOrchestrator:
                 
                 if attempt == max_retries:
                     logger.error(f"💥 {scanner_key} fallito definitivamente dopo {max_retries + 1} tentativi")
-                    self.execution_stats["failed"] += 1
                     return None
                 
-                # Wait progressivo per retry
-                import time
-                time.sleep(min(2 ** attempt, 10))  # Exponential backoff con cap
+                # Wait progressivo per retry, interrotto dall'annullamento
+                token = get_current_token()
+                delay = min(2 ** attempt, 10)  # Exponential backoff con cap
+                if token is not None:
+                    token.sleep(delay)
+                else:
+                    import time
+                    time.sleep(delay)
                 
         return None
     
@@ -353,6 +419,7 @@ class EnterpriseScanOrchestrator:
             json.dumps(summary_data, indent=2, ensure_ascii=False, default=str),
             encoding="utf-8"
         )
+        precompress_artifact(base_out / "enterprise_summary.json")
         
         # Salva statistiche processing
         stats = self.normalizer.get_processing_stats()
@@ -374,14 +441,15 @@ class EnterpriseScanOrchestrator:
     def _generate_charts_safe(
         self,
         results: AggregatedResults,
-        base_out: Path
+        base_out: Path,
+        chart_format: str = "svg"
     ) -> Optional[Dict[str, Any]]:
-        """Genera charts con gestione robusta errori e fallback"""
+        """Genera charts (SVG o PNG) con gestione robusta errori e fallback"""
         
         try:
             # Inizializza chart generator enterprise
-            if not self.chart_generator:
-                self.chart_generator = EnterpriseChartGenerator(str(base_out))
+            if not self.chart_generator or self.chart_generator.chart_format != chart_format:
+                self.chart_generator = EnterpriseChartGenerator(str(base_out), chart_format=chart_format)
             
             # Converti risultati enterprise in formato legacy per compatibility
             legacy_data = self._convert_to_legacy_format(results)
@@ -394,6 +462,7 @@ class EnterpriseScanOrchestrator:
                 json.dumps(charts_data, indent=2, ensure_ascii=False),
                 encoding="utf-8"
             )
+            precompress_artifact(base_out / "charts_enterprise.json")
             
             logger.info("✅ Charts enterprise generati")
             return charts_data
@@ -641,10 +710,15 @@ class EnterpriseScanOrchestrator:
         )
 
 
+def parallel_scanners_enabled() -> bool:
+    """Esecuzione parallela degli scanner (EAA_PARALLEL_SCANNERS, default attiva)"""
+    return os.getenv("EAA_PARALLEL_SCANNERS", "true").lower() in ("1", "true", "yes")
+
+
 # Factory function per backward compatibility
 def create_enterprise_orchestrator() -> EnterpriseScanOrchestrator:
     """Factory per creare orchestratore enterprise"""
-    return EnterpriseScanOrchestrator(enable_parallel=False)
+    return EnterpriseScanOrchestrator(enable_parallel=parallel_scanners_enabled())
 
 
 def run_enterprise_scan(cfg: Config, **kwargs) -> Dict[str, Any]:
@@ -8,8 +8,9 @@ from pathlib import Path
 import logging
 from datetime import datetime
 
+from .cancellation import CancellationToken
 from .config import Config
-from .enterprise_core import EnterpriseScanOrchestrator
+from .enterprise_core import EnterpriseScanOrchestrator, parallel_scanners_enabled
 from .models.scanner_results import AggregatedResults
 
 logger = logging.getLogger(__name__)
@@ -22,7 +23,7 @@ class FastAPIEnterpriseAdapter:
     """
     
     def __init__(self):
-        self.orchestrator = EnterpriseScanOrchestrator(enable_parallel=False)
+        self.orchestrator = EnterpriseScanOrchestrator(enable_parallel=parallel_scanners_enabled())
         self.active_scans = {}  # Track scan status per WebSocket support
     
     def run_enterprise_scan_for_api(
@@ -33,13 +34,24 @@ class FastAPIEnterpriseAdapter:
         wave_api_key: Optional[str] = None,
         simulate: bool = False,
         event_monitor=None,
-        scan_id: Optional[str] = None
+        scan_id: Optional[str] = None,
+        output_root: Optional[Path] = None,
+        cancel_token: Optional[CancellationToken] = None
     ) -> Dict[str, Any]:
         """
         Entry point per API FastAPI con enterprise system
         
+        Args:
+            output_root: Directory base degli output (default "output"); le
+                pagine di una sessione multi-pagina usano una sottodirectory
+                per non sovrascriversi quando eseguite in parallelo
+            cancel_token: Token di annullamento della scansione
+        
         Returns:
             API-compatible response con paths e metadata
+        
+        Raises:
+            ScanCancelled: Se la scansione viene annullata
         """
         
         try:
@@ -59,11 +71,12 @@ class FastAPIEnterpriseAdapter:
             # Esegui scansione enterprise
             enterprise_result = self.orchestrator.run_enterprise_scan(
                 cfg=cfg,
-                output_root=Path("output"),
+                output_root=output_root or Path("output"),
                 event_monitor=event_monitor,
                 scan_id=scan_id,
                 enable_pdf=True,
-                max_retries=2
+                max_retries=2,
+                cancel_token=cancel_token
             )
             
             # Converti risultato per API compatibility
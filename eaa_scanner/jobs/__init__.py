@@ -0,0 +1,11 @@
+"""
+Coda persistente dei job di scansione e worker in processi separati
+"""
+
+from .queue import Job, JobQueue, JobStatus, SQLiteJobQueue, create_job_queue
+from .worker import JobCancelled, JobContext, JobWorker
+
+__all__ = [
+    "Job", "JobQueue", "JobStatus", "SQLiteJobQueue", "create_job_queue",
+    "JobCancelled", "JobContext", "JobWorker"
+]
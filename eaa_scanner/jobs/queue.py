@@ -0,0 +1,419 @@
+"""
+Coda persistente dei job di scansione con lease, heartbeat, retry e priorità
+
+Il processo API si limita ad accodare e leggere lo stato; i worker (processi
+separati, vedi worker.py) prendono i job in lease e lo rinnovano con heartbeat
+periodici. Un job il cui lease scade (worker terminato o bloccato) torna in
+coda finché non esaurisce i tentativi.
+"""
+
+from __future__ import annotations
+
+import json
+import secrets
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from enum import Enum
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LEASE_SECONDS = 60.0
+DEFAULT_MAX_ATTEMPTS = 3
+FINISHED_RETENTION_SECONDS = 7 * 24 * 3600
+
+
+class JobStatus(str, Enum):
+    """Stati di un job in coda"""
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+FINAL_STATUSES = {JobStatus.SUCCEEDED, JobStatus.FAILED, JobStatus.CANCELLED}
+
+
+@dataclass
+class Job:
+    """Job con payload, stato di esecuzione e ultimo progresso riportato"""
+    id: str
+    kind: str
+    payload: Dict[str, Any]
+    status: JobStatus = JobStatus.QUEUED
+    priority: int = 0
+    attempts: int = 0
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS
+    run_after: float = 0.0
+    lease_owner: Optional[str] = None
+    lease_expires_at: Optional[float] = None
+    cancel_requested: bool = False
+    progress: Dict[str, Any] = field(default_factory=dict)
+    result: Any = None
+    error: Optional[str] = None
+    created_at: float = 0.0
+    updated_at: float = 0.0
+
+    @property
+    def is_final(self) -> bool:
+        return self.status in FINAL_STATUSES
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Rappresentazione per le API di stato (senza payload)"""
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "status": self.status.value,
+            "priority": self.priority,
+            "attempts": self.attempts,
+            "max_attempts": self.max_attempts,
+            "progress": self.progress,
+            "error": self.error,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at
+        }
+
+
+def new_job_id() -> str:
+    return f"job_{secrets.token_urlsafe(12)}"
+
+
+class JobQueue(ABC):
+    """
+    Interfaccia comune dei backend di coda
+
+    Tutte le operazioni del worker verificano il proprietario del lease: un
+    worker che ha perso il lease non può completare né aggiornare il job.
+    """
+
+    @abstractmethod
+    def enqueue(self, kind: str, payload: Dict[str, Any], priority: int = 0,
+                max_attempts: int = DEFAULT_MAX_ATTEMPTS, job_id: Optional[str] = None,
+                delay: float = 0.0) -> Job:
+        """
+        Accoda un job
+
+        Args:
+            kind: Tipo di job (chiave dell'handler nel worker)
+            payload: Parametri serializzabili in JSON
+            priority: Priorità (più alta = prima)
+            max_attempts: Tentativi massimi, incluso il primo
+            job_id: ID esplicito (es. l'ID della scansione)
+            delay: Secondi prima che il job diventi eseguibile
+        """
+        pass
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[Job]:
+        pass
+
+    @abstractmethod
+    def claim(self, worker_id: str, kinds: Optional[Sequence[str]] = None,
+              lease_seconds: float = DEFAULT_LEASE_SECONDS) -> Optional[Job]:
+        """
+        Prende in lease il prossimo job eseguibile (priorità, poi ordine di accodamento)
+
+        I job con lease scaduto vengono rimessi in coda, o falliti se hanno
+        esaurito i tentativi.
+        """
+        pass
+
+    @abstractmethod
+    def heartbeat(self, job_id: str, worker_id: str, lease_seconds: float = DEFAULT_LEASE_SECONDS,
+                  progress: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        Rinnova il lease e salva il progresso
+
+        Returns:
+            False se il lease è perso o è stata richiesta la cancellazione:
+            il worker deve interrompere il job
+        """
+        pass
+
+    @abstractmethod
+    def complete(self, job_id: str, worker_id: str, result: Any = None) -> bool:
+        pass
+
+    @abstractmethod
+    def fail(self, job_id: str, worker_id: str, error: str, retry_delay: float = 0.0) -> Optional[Job]:
+        """
+        Registra un tentativo fallito
+
+        Il job torna in coda dopo retry_delay se restano tentativi, altrimenti
+        diventa failed. Un job cancellato durante l'esecuzione diventa cancelled.
+        """
+        pass
+
+    @abstractmethod
+    def cancel(self, job_id: str) -> bool:
+        """Cancella un job in coda o chiede l'interruzione di uno in esecuzione"""
+        pass
+
+    @abstractmethod
+    def purge_finished(self, older_than: float = FINISHED_RETENTION_SECONDS) -> int:
+        """Rimuove i job terminati da più di older_than secondi"""
+        pass
+
+    @abstractmethod
+    def stats(self) -> Dict[str, int]:
+        """Numero di job per stato"""
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+JOBS_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS jobs (
+        id TEXT PRIMARY KEY,
+        kind TEXT NOT NULL,
+        payload TEXT NOT NULL,
+        status TEXT NOT NULL,
+        priority INTEGER NOT NULL DEFAULT 0,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        max_attempts INTEGER NOT NULL,
+        run_after REAL NOT NULL,
+        lease_owner TEXT,
+        lease_expires_at REAL,
+        cancel_requested INTEGER NOT NULL DEFAULT 0,
+        progress TEXT,
+        result TEXT,
+        error TEXT,
+        created_at REAL NOT NULL,
+        updated_at REAL NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_jobs_ready ON jobs (status, priority DESC, run_after, created_at)",
+    "CREATE INDEX IF NOT EXISTS idx_jobs_lease ON jobs (status, lease_expires_at)",
+)
+
+
+class SQLiteJobQueue(JobQueue):
+    """
+    Coda su file SQLite (WAL) condivisibile tra processi sullo stesso host
+
+    Il claim avviene in una transazione BEGIN IMMEDIATE: un solo processo alla
+    volta può assegnarsi un job, senza doppie esecuzioni.
+    """
+
+    def __init__(self, path: str, busy_timeout: float = 10.0):
+        self.path = str(path)
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        with self._transaction() as conn:
+            for statement in JOBS_SCHEMA:
+                conn.execute(statement)
+
+    def _connection(self) -> sqlite3.Connection:
+        # Una connessione per thread: il worker fa heartbeat da un thread separato
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        else:
+            conn.execute("COMMIT")
+
+    @staticmethod
+    def _row_to_job(row: sqlite3.Row) -> Job:
+        return Job(
+            id=row["id"],
+            kind=row["kind"],
+            payload=json.loads(row["payload"]),
+            status=JobStatus(row["status"]),
+            priority=row["priority"],
+            attempts=row["attempts"],
+            max_attempts=row["max_attempts"],
+            run_after=row["run_after"],
+            lease_owner=row["lease_owner"],
+            lease_expires_at=row["lease_expires_at"],
+            cancel_requested=bool(row["cancel_requested"]),
+            progress=json.loads(row["progress"]) if row["progress"] else {},
+            result=json.loads(row["result"]) if row["result"] else None,
+            error=row["error"],
+            created_at=row["created_at"],
+            updated_at=row["updated_at"]
+        )
+
+    def enqueue(self, kind: str, payload: Dict[str, Any], priority: int = 0,
+                max_attempts: int = DEFAULT_MAX_ATTEMPTS, job_id: Optional[str] = None,
+                delay: float = 0.0) -> Job:
+        now = time.time()
+        job = Job(id=job_id or new_job_id(), kind=kind, payload=payload, priority=priority,
+                  max_attempts=max(1, max_attempts), run_after=now + delay,
+                  created_at=now, updated_at=now)
+        with self._transaction() as conn:
+            conn.execute("""
+                INSERT INTO jobs (id, kind, payload, status, priority, max_attempts,
+                                  run_after, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (job.id, kind, json.dumps(payload, default=str), job.status.value, priority,
+                  job.max_attempts, job.run_after, now, now))
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        row = self._connection().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def claim(self, worker_id: str, kinds: Optional[Sequence[str]] = None,
+              lease_seconds: float = DEFAULT_LEASE_SECONDS) -> Optional[Job]:
+        now = time.time()
+        kind_filter, kind_params = "", []
+        if kinds:
+            kind_filter = f" AND kind IN ({', '.join('?' for _ in kinds)})"
+            kind_params = list(kinds)
+
+        with self._transaction() as conn:
+            # Lease scaduti senza tentativi rimasti: falliti invece di rieseguiti
+            conn.execute("""
+                UPDATE jobs SET status = ?, error = 'Lease scaduto: tentativi esauriti',
+                                lease_owner = NULL, lease_expires_at = NULL, updated_at = ?
+                WHERE status = ? AND lease_expires_at < ? AND attempts >= max_attempts
+            """, (JobStatus.FAILED.value, now, JobStatus.RUNNING.value, now))
+            conn.execute("""
+                UPDATE jobs SET status = ?, lease_owner = NULL, lease_expires_at = NULL, updated_at = ?
+                WHERE status = ? AND lease_expires_at < ? AND cancel_requested = 1
+            """, (JobStatus.CANCELLED.value, now, JobStatus.RUNNING.value, now))
+
+            row = conn.execute(f"""
+                SELECT id FROM jobs
+                WHERE ((status = ? AND run_after <= ?) OR (status = ? AND lease_expires_at < ?)){kind_filter}
+                ORDER BY priority DESC, run_after, created_at
+                LIMIT 1
+            """, [JobStatus.QUEUED.value, now, JobStatus.RUNNING.value, now] + kind_params).fetchone()
+            if row is None:
+                return None
+
+            conn.execute("""
+                UPDATE jobs SET status = ?, lease_owner = ?, lease_expires_at = ?,
+                                attempts = attempts + 1, updated_at = ?
+                WHERE id = ?
+            """, (JobStatus.RUNNING.value, worker_id, now + lease_seconds, now, row["id"]))
+            claimed = conn.execute("SELECT * FROM jobs WHERE id = ?", (row["id"],)).fetchone()
+        return self._row_to_job(claimed)
+
+    def heartbeat(self, job_id: str, worker_id: str, lease_seconds: float = DEFAULT_LEASE_SECONDS,
+                  progress: Optional[Dict[str, Any]] = None) -> bool:
+        now = time.time()
+        assignments, params = ["lease_expires_at = ?", "updated_at = ?"], [now + lease_seconds, now]
+        if progress is not None:
+            assignments.append("progress = ?")
+            params.append(json.dumps(progress, default=str))
+
+        with self._transaction() as conn:
+            cursor = conn.execute(f"""
+                UPDATE jobs SET {', '.join(assignments)}
+                WHERE id = ? AND status = ? AND lease_owner = ?
+            """, params + [job_id, JobStatus.RUNNING.value, worker_id])
+            if cursor.rowcount == 0:
+                return False
+            row = conn.execute("SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return not row["cancel_requested"]
+
+    def complete(self, job_id: str, worker_id: str, result: Any = None) -> bool:
+        now = time.time()
+        with self._transaction() as conn:
+            cursor = conn.execute("""
+                UPDATE jobs SET status = ?, result = ?, error = NULL, lease_owner = NULL,
+                                lease_expires_at = NULL, updated_at = ?
+                WHERE id = ? AND status = ? AND lease_owner = ?
+            """, (JobStatus.SUCCEEDED.value, json.dumps(result, default=str), now,
+                  job_id, JobStatus.RUNNING.value, worker_id))
+        return cursor.rowcount == 1
+
+    def fail(self, job_id: str, worker_id: str, error: str, retry_delay: float = 0.0) -> Optional[Job]:
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute("""
+                SELECT attempts, max_attempts, cancel_requested FROM jobs
+                WHERE id = ? AND status = ? AND lease_owner = ?
+            """, (job_id, JobStatus.RUNNING.value, worker_id)).fetchone()
+            if row is None:
+                return None
+
+            if row["cancel_requested"]:
+                status, run_after = JobStatus.CANCELLED, now
+            elif row["attempts"] < row["max_attempts"]:
+                status, run_after = JobStatus.QUEUED, now + retry_delay
+            else:
+                status, run_after = JobStatus.FAILED, now
+
+            conn.execute("""
+                UPDATE jobs SET status = ?, error = ?, run_after = ?, lease_owner = NULL,
+                                lease_expires_at = NULL, updated_at = ?
+                WHERE id = ?
+            """, (status.value, error, run_after, now, job_id))
+            updated = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._row_to_job(updated)
+
+    def cancel(self, job_id: str) -> bool:
+        now = time.time()
+        with self._transaction() as conn:
+            cursor = conn.execute("UPDATE jobs SET status = ?, updated_at = ? WHERE id = ? AND status = ?",
+                                  (JobStatus.CANCELLED.value, now, job_id, JobStatus.QUEUED.value))
+            if cursor.rowcount:
+                return True
+            cursor = conn.execute("UPDATE jobs SET cancel_requested = 1, updated_at = ? WHERE id = ? AND status = ?",
+                                  (now, job_id, JobStatus.RUNNING.value))
+        return cursor.rowcount == 1
+
+    def purge_finished(self, older_than: float = FINISHED_RETENTION_SECONDS) -> int:
+        final = [status.value for status in FINAL_STATUSES]
+        with self._transaction() as conn:
+            cursor = conn.execute(f"""
+                DELETE FROM jobs WHERE status IN ({', '.join('?' for _ in final)}) AND updated_at < ?
+            """, final + [time.time() - older_than])
+        return cursor.rowcount
+
+    def stats(self) -> Dict[str, int]:
+        counts = {status.value: 0 for status in JobStatus}
+        for row in self._connection().execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status"):
+            counts[row["status"]] = row["n"]
+        return counts
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+def create_job_queue(url: str) -> JobQueue:
+    """
+    Crea il backend di coda da un URL
+
+    Args:
+        url: "sqlite:///percorso/jobs.db" (o un percorso di file) oppure "redis://host:porta/db"
+
+    Returns:
+        Coda pronta all'uso
+    """
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        from .redis_queue import RedisJobQueue
+        return RedisJobQueue.from_url(url)
+    if url.startswith("sqlite:///"):
+        url = url[len("sqlite:///"):]
+    return SQLiteJobQueue(url)
@@ -0,0 +1,281 @@
+"""
+Backend Redis della coda job, per worker distribuiti su più host
+
+Ogni job è un hash con campi scalari; payload, progresso e risultato sono
+stringhe JSON che gli script Lua non interpretano. Le transizioni di stato
+(claim, heartbeat, completamento, fallimento) sono script Lua atomici.
+
+Chiavi (con prefisso):
+- job:{id}       hash del job
+- ready:{kind}   sorted set dei job eseguibili (score: priorità, poi accodamento)
+- delayed        sorted set dei job in attesa di retry (score: run_after)
+- leases         sorted set dei job in esecuzione (score: scadenza del lease)
+"""
+
+from __future__ import annotations
+
+import json
+import time
+from typing import Any, Dict, Optional, Sequence
+
+from .queue import (
+    DEFAULT_LEASE_SECONDS, DEFAULT_MAX_ATTEMPTS, FINISHED_RETENTION_SECONDS,
+    Job, JobQueue, JobStatus, new_job_id
+)
+
+# Score in ready:{kind}: priorità più alta prima, a parità in ordine di accodamento
+PRIORITY_WEIGHT = 1e12
+
+_CLAIM_SCRIPT = """
+local prefix, now, owner, lease_until = ARGV[1], tonumber(ARGV[2]), ARGV[3], tonumber(ARGV[4])
+local delayed, leases = prefix .. 'delayed', prefix .. 'leases'
+
+local function ready_score(key)
+    return -tonumber(redis.call('HGET', key, 'priority')) * 1e12 + tonumber(redis.call('HGET', key, 'created_at'))
+end
+
+for _, id in ipairs(redis.call('ZRANGEBYSCORE', delayed, '-inf', now)) do
+    redis.call('ZREM', delayed, id)
+    local key = prefix .. 'job:' .. id
+    if redis.call('HGET', key, 'status') == 'queued' then
+        redis.call('ZADD', prefix .. 'ready:' .. redis.call('HGET', key, 'kind'), ready_score(key), id)
+    end
+end
+
+for _, id in ipairs(redis.call('ZRANGEBYSCORE', leases, '-inf', now)) do
+    redis.call('ZREM', leases, id)
+    local key = prefix .. 'job:' .. id
+    if redis.call('HGET', key, 'status') == 'running' then
+        redis.call('HDEL', key, 'lease_owner', 'lease_expires_at')
+        redis.call('HSET', key, 'updated_at', now)
+        if redis.call('HGET', key, 'cancel_requested') == '1' then
+            redis.call('HSET', key, 'status', 'cancelled')
+        elseif tonumber(redis.call('HGET', key, 'attempts')) >= tonumber(redis.call('HGET', key, 'max_attempts')) then
+            redis.call('HSET', key, 'status', 'failed', 'error', 'Lease scaduto: tentativi esauriti')
+        else
+            redis.call('HSET', key, 'status', 'queued')
+            redis.call('ZADD', prefix .. 'ready:' .. redis.call('HGET', key, 'kind'), ready_score(key), id)
+        end
+    end
+end
+
+local best_id, best_key, best_score = nil, nil, nil
+for _, ready in ipairs(KEYS) do
+    local head = redis.call('ZRANGE', ready, 0, 0, 'WITHSCORES')
+    if head[1] and (best_score == nil or tonumber(head[2]) < best_score) then
+        best_id, best_key, best_score = head[1], ready, tonumber(head[2])
+    end
+end
+if best_id == nil then
+    return nil
+end
+
+redis.call('ZREM', best_key, best_id)
+local key = prefix .. 'job:' .. best_id
+redis.call('HSET', key, 'status', 'running', 'lease_owner', owner, 'lease_expires_at', lease_until, 'updated_at', now)
+redis.call('HINCRBY', key, 'attempts', 1)
+redis.call('ZADD', leases, lease_until, best_id)
+return best_id
+"""
+
+_HEARTBEAT_SCRIPT = """
+local key, leases = KEYS[1], KEYS[2]
+local id, owner, now, lease_until, progress = ARGV[1], ARGV[2], ARGV[3], ARGV[4], ARGV[5]
+if redis.call('HGET', key, 'status') ~= 'running' or redis.call('HGET', key, 'lease_owner') ~= owner then
+    return 0
+end
+redis.call('HSET', key, 'lease_expires_at', lease_until, 'updated_at', now)
+if progress ~= '' then
+    redis.call('HSET', key, 'progress', progress)
+end
+redis.call('ZADD', leases, lease_until, id)
+if redis.call('HGET', key, 'cancel_requested') == '1' then
+    return 0
+end
+return 1
+"""
+
+_COMPLETE_SCRIPT = """
+local key, leases = KEYS[1], KEYS[2]
+local id, owner, now, result, retention = ARGV[1], ARGV[2], ARGV[3], ARGV[4], tonumber(ARGV[5])
+if redis.call('HGET', key, 'status') ~= 'running' or redis.call('HGET', key, 'lease_owner') ~= owner then
+    return 0
+end
+redis.call('HSET', key, 'status', 'succeeded', 'result', result, 'updated_at', now)
+redis.call('HDEL', key, 'lease_owner', 'lease_expires_at', 'error')
+redis.call('ZREM', leases, id)
+redis.call('EXPIRE', key, retention)
+return 1
+"""
+
+_FAIL_SCRIPT = """
+local key, leases, delayed = KEYS[1], KEYS[2], KEYS[3]
+local id, owner, now, err, retry_at, retention = ARGV[1], ARGV[2], ARGV[3], ARGV[4], tonumber(ARGV[5]), tonumber(ARGV[6])
+if redis.call('HGET', key, 'status') ~= 'running' or redis.call('HGET', key, 'lease_owner') ~= owner then
+    return nil
+end
+redis.call('ZREM', leases, id)
+redis.call('HDEL', key, 'lease_owner', 'lease_expires_at')
+redis.call('HSET', key, 'error', err, 'updated_at', now)
+local status
+if redis.call('HGET', key, 'cancel_requested') == '1' then
+    status = 'cancelled'
+elseif tonumber(redis.call('HGET', key, 'attempts')) < tonumber(redis.call('HGET', key, 'max_attempts')) then
+    status = 'queued'
+    redis.call('HSET', key, 'run_after', retry_at)
+    redis.call('ZADD', delayed, retry_at, id)
+else
+    status = 'failed'
+end
+redis.call('HSET', key, 'status', status)
+if status ~= 'queued' then
+    redis.call('EXPIRE', key, retention)
+end
+return status
+"""
+
+_CANCEL_SCRIPT = """
+local key, delayed = KEYS[1], KEYS[2]
+local id, prefix, now, retention = ARGV[1], ARGV[2], ARGV[3], tonumber(ARGV[4])
+local status = redis.call('HGET', key, 'status')
+if status == 'queued' then
+    redis.call('ZREM', prefix .. 'ready:' .. redis.call('HGET', key, 'kind'), id)
+    redis.call('ZREM', delayed, id)
+    redis.call('HSET', key, 'status', 'cancelled', 'updated_at', now)
+    redis.call('EXPIRE', key, retention)
+    return 1
+elseif status == 'running' then
+    redis.call('HSET', key, 'cancel_requested', '1', 'updated_at', now)
+    return 1
+end
+return 0
+"""
+
+
+class RedisJobQueue(JobQueue):
+    """Coda job su Redis; i job terminati scadono dopo FINISHED_RETENTION_SECONDS"""
+
+    def __init__(self, client: Any, prefix: str = "eaa:jobs:",
+                 retention: float = FINISHED_RETENTION_SECONDS):
+        self.client = client
+        self.prefix = prefix
+        self.retention = int(retention)
+        self._claim = client.register_script(_CLAIM_SCRIPT)
+        self._heartbeat = client.register_script(_HEARTBEAT_SCRIPT)
+        self._complete = client.register_script(_COMPLETE_SCRIPT)
+        self._fail = client.register_script(_FAIL_SCRIPT)
+        self._cancel = client.register_script(_CANCEL_SCRIPT)
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs: Any) -> "RedisJobQueue":
+        import redis
+        return cls(redis.Redis.from_url(url, decode_responses=True), **kwargs)
+
+    def _key(self, job_id: str) -> str:
+        return f"{self.prefix}job:{job_id}"
+
+    def _job_from_hash(self, job_id: str, data: Dict[str, str]) -> Job:
+        return Job(
+            id=job_id,
+            kind=data["kind"],
+            payload=json.loads(data.get("payload") or "{}"),
+            status=JobStatus(data["status"]),
+            priority=int(data.get("priority", 0)),
+            attempts=int(data.get("attempts", 0)),
+            max_attempts=int(data.get("max_attempts", DEFAULT_MAX_ATTEMPTS)),
+            run_after=float(data.get("run_after", 0)),
+            lease_owner=data.get("lease_owner"),
+            lease_expires_at=float(data["lease_expires_at"]) if data.get("lease_expires_at") else None,
+            cancel_requested=data.get("cancel_requested") == "1",
+            progress=json.loads(data["progress"]) if data.get("progress") else {},
+            result=json.loads(data["result"]) if data.get("result") else None,
+            error=data.get("error"),
+            created_at=float(data.get("created_at", 0)),
+            updated_at=float(data.get("updated_at", 0))
+        )
+
+    def enqueue(self, kind: str, payload: Dict[str, Any], priority: int = 0,
+                max_attempts: int = DEFAULT_MAX_ATTEMPTS, job_id: Optional[str] = None,
+                delay: float = 0.0) -> Job:
+        now = time.time()
+        job = Job(id=job_id or new_job_id(), kind=kind, payload=payload, priority=priority,
+                  max_attempts=max(1, max_attempts), run_after=now + delay,
+                  created_at=now, updated_at=now)
+        pipe = self.client.pipeline(transaction=True)
+        pipe.hset(self._key(job.id), mapping={
+            "kind": kind,
+            "payload": json.dumps(payload, default=str),
+            "status": job.status.value,
+            "priority": priority,
+            "attempts": 0,
+            "max_attempts": job.max_attempts,
+            "run_after": job.run_after,
+            "cancel_requested": "0",
+            "created_at": now,
+            "updated_at": now
+        })
+        pipe.sadd(f"{self.prefix}kinds", kind)
+        if delay > 0:
+            pipe.zadd(f"{self.prefix}delayed", {job.id: job.run_after})
+        else:
+            pipe.zadd(f"{self.prefix}ready:{kind}", {job.id: -priority * PRIORITY_WEIGHT + now})
+        pipe.execute()
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        data = self.client.hgetall(self._key(job_id))
+        return self._job_from_hash(job_id, data) if data else None
+
+    def claim(self, worker_id: str, kinds: Optional[Sequence[str]] = None,
+              lease_seconds: float = DEFAULT_LEASE_SECONDS) -> Optional[Job]:
+        kinds = list(kinds) if kinds else sorted(self.client.smembers(f"{self.prefix}kinds"))
+        now = time.time()
+        job_id = self._claim(
+            keys=[f"{self.prefix}ready:{kind}" for kind in kinds],
+            args=[self.prefix, now, worker_id, now + lease_seconds]
+        )
+        return self.get(job_id) if job_id else None
+
+    def heartbeat(self, job_id: str, worker_id: str, lease_seconds: float = DEFAULT_LEASE_SECONDS,
+                  progress: Optional[Dict[str, Any]] = None) -> bool:
+        now = time.time()
+        encoded = json.dumps(progress, default=str) if progress is not None else ""
+        return bool(self._heartbeat(
+            keys=[self._key(job_id), f"{self.prefix}leases"],
+            args=[job_id, worker_id, now, now + lease_seconds, encoded]
+        ))
+
+    def complete(self, job_id: str, worker_id: str, result: Any = None) -> bool:
+        return bool(self._complete(
+            keys=[self._key(job_id), f"{self.prefix}leases"],
+            args=[job_id, worker_id, time.time(), json.dumps(result, default=str), self.retention]
+        ))
+
+    def fail(self, job_id: str, worker_id: str, error: str, retry_delay: float = 0.0) -> Optional[Job]:
+        now = time.time()
+        status = self._fail(
+            keys=[self._key(job_id), f"{self.prefix}leases", f"{self.prefix}delayed"],
+            args=[job_id, worker_id, now, error, now + retry_delay, self.retention]
+        )
+        return self.get(job_id) if status else None
+
+    def cancel(self, job_id: str) -> bool:
+        return bool(self._cancel(
+            keys=[self._key(job_id), f"{self.prefix}delayed"],
+            args=[job_id, self.prefix, time.time(), self.retention]
+        ))
+
+    def purge_finished(self, older_than: float = FINISHED_RETENTION_SECONDS) -> int:
+        # I job terminati hanno già un TTL impostato al completamento
+        return 0
+
+    def stats(self) -> Dict[str, int]:
+        counts = {status.value: 0 for status in JobStatus}
+        kinds = self.client.smembers(f"{self.prefix}kinds")
+        counts[JobStatus.QUEUED.value] = sum(self.client.zcard(f"{self.prefix}ready:{kind}") for kind in kinds)
+        counts[JobStatus.QUEUED.value] += self.client.zcard(f"{self.prefix}delayed")
+        counts[JobStatus.RUNNING.value] = self.client.zcard(f"{self.prefix}leases")
+        return counts
+
+    def close(self) -> None:
+        self.client.close()
@@ -0,0 +1,257 @@
+"""
+Worker della coda job, eseguiti come processi separati dall'API
+
+Ogni processo prende un job alla volta in lease; un thread di heartbeat
+rinnova il lease e pubblica l'ultimo progresso riportato dall'handler. Se il
+lease viene perso o il job è cancellato, l'handler lo vede tramite
+JobContext.cancelled e deve interrompersi.
+
+Uso:
+    python -m eaa_scanner.jobs --queue sqlite:///data/jobs.db \\
+        --handlers webapp.scan_jobs --processes 2
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from ..metrics import JOBS_FINISHED, QUEUE_WAIT_SECONDS, start_metrics_server
+from .queue import DEFAULT_LEASE_SECONDS, Job, JobQueue, create_job_queue
+
+logger = logging.getLogger(__name__)
+
+RETRY_BASE_DELAY = 5.0
+RETRY_MAX_DELAY = 300.0
+PURGE_INTERVAL = 3600.0
+
+
+class JobCancelled(Exception):
+    """Sollevata dagli handler che si interrompono per cancellazione o lease perso"""
+
+
+class JobContext:
+    """Contesto passato all'handler: progresso e segnale di interruzione"""
+
+    def __init__(self, job: Job):
+        self.job = job
+        self.cancelled = threading.Event()
+        self._progress: Optional[Dict[str, Any]] = None
+        self._lock = threading.Lock()
+
+    def report_progress(self, **fields: Any) -> None:
+        """Registra il progresso (pubblicato dal prossimo heartbeat)"""
+        with self._lock:
+            self._progress = dict(self._progress or {}, **fields)
+
+    def take_progress(self) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            progress, self._progress = self._progress, None
+            return progress
+
+    def raise_if_cancelled(self) -> None:
+        if self.cancelled.is_set():
+            raise JobCancelled(f"Job {self.job.id} interrotto")
+
+
+Handler = Callable[[Job, JobContext], Any]
+
+
+class JobWorker:
+    """
+    Esegue i job di una coda con gli handler registrati per tipo
+
+    Args:
+        queue: Backend della coda
+        handlers: Tipo di job -> funzione (job, context) -> risultato JSON
+        worker_id: Identificativo del proprietario del lease
+        lease_seconds: Durata del lease (heartbeat ogni terzo di lease)
+        poll_interval: Attesa quando la coda è vuota
+    """
+
+    def __init__(self, queue: JobQueue, handlers: Dict[str, Handler], worker_id: Optional[str] = None,
+                 lease_seconds: float = DEFAULT_LEASE_SECONDS, poll_interval: float = 1.0):
+        self.queue = queue
+        self.handlers = handlers
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.stop_event = threading.Event()
+        self.processed = 0
+        self.failed = 0
+        self._last_purge = 0.0
+
+    def run(self) -> None:
+        """Ciclo principale fino a stop()"""
+        logger.info(f"Worker {self.worker_id} avviato per {sorted(self.handlers)}")
+        while not self.stop_event.is_set():
+            try:
+                if not self.run_once():
+                    self.stop_event.wait(self.poll_interval)
+                self._maybe_purge()
+            except Exception as e:
+                logger.error(f"Errore nel ciclo del worker {self.worker_id}: {e}", exc_info=True)
+                self.stop_event.wait(self.poll_interval)
+        logger.info(f"Worker {self.worker_id} terminato")
+
+    def stop(self) -> None:
+        self.stop_event.set()
+
+    def run_once(self) -> bool:
+        """
+        Prende ed esegue un job, se disponibile
+
+        Returns:
+            True se un job è stato eseguito
+        """
+        job = self.queue.claim(self.worker_id, list(self.handlers), self.lease_seconds)
+        if job is None:
+            return False
+        # Attesa dall'istante in cui il job era eseguibile (run_after per i retry)
+        QUEUE_WAIT_SECONDS.labels(kind=job.kind).observe(
+            max(0.0, time.time() - max(job.created_at, job.run_after))
+        )
+        self._process(job)
+        return True
+
+    def _process(self, job: Job) -> None:
+        context = JobContext(job)
+        heartbeat_stop = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat_loop, args=(job, context, heartbeat_stop),
+                                     name=f"heartbeat-{job.id}", daemon=True)
+        heartbeat.start()
+        logger.info(f"Job {job.id} ({job.kind}) avviato, tentativo {job.attempts}/{job.max_attempts}")
+        try:
+            result = self.handlers[job.kind](job, context)
+        except Exception as e:
+            heartbeat_stop.set()
+            heartbeat.join()
+            self.failed += 1
+            delay = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** max(0, job.attempts - 1))
+            updated = self.queue.fail(job.id, self.worker_id, f"{type(e).__name__}: {e}", retry_delay=delay)
+            state = updated.status.value if updated else "lease perso"
+            JOBS_FINISHED.labels(kind=job.kind, outcome="failed").inc()
+            logger.warning(f"Job {job.id} fallito ({state}): {e}")
+            return
+
+        heartbeat_stop.set()
+        heartbeat.join()
+        progress = context.take_progress()
+        if progress is not None:
+            self.queue.heartbeat(job.id, self.worker_id, self.lease_seconds, progress)
+        if self.queue.complete(job.id, self.worker_id, result):
+            self.processed += 1
+            JOBS_FINISHED.labels(kind=job.kind, outcome="completed").inc()
+            logger.info(f"Job {job.id} completato")
+        else:
+            JOBS_FINISHED.labels(kind=job.kind, outcome="lease_lost").inc()
+            logger.warning(f"Job {job.id} terminato ma il lease era già perso: risultato scartato")
+
+    def _heartbeat_loop(self, job: Job, context: JobContext, stop: threading.Event) -> None:
+        interval = max(0.1, self.lease_seconds / 3)
+        while not stop.wait(interval):
+            try:
+                if not self.queue.heartbeat(job.id, self.worker_id, self.lease_seconds, context.take_progress()):
+                    context.cancelled.set()
+            except Exception as e:
+                # Errore transitorio: il lease resta valido fino alla scadenza
+                logger.warning(f"Heartbeat del job {job.id} non riuscito: {e}")
+
+    def _maybe_purge(self) -> None:
+        now = time.time()
+        if now - self._last_purge < PURGE_INTERVAL:
+            return
+        self._last_purge = now
+        try:
+            removed = self.queue.purge_finished()
+            if removed:
+                logger.info(f"Rimossi {removed} job terminati")
+        except Exception as e:
+            logger.warning(f"Pulizia dei job terminati non riuscita: {e}")
+
+
+def load_handlers(module_name: str) -> Dict[str, Handler]:
+    """Handler esposti da un modulo come dizionario JOB_HANDLERS"""
+    module = importlib.import_module(module_name)
+    return dict(module.JOB_HANDLERS)
+
+
+def _worker_process(queue_url: str, handlers_module: str, lease_seconds: float, poll_interval: float,
+                    metrics_port: Optional[int] = None) -> None:
+    if metrics_port:
+        start_metrics_server(metrics_port)
+    # Template dei report compilati prima del primo job
+    from ..templating import precompile_templates
+    precompile_templates()
+    # Browser per i PDF avviato prima del primo report, se verrà usato
+    from ..pdf_service import warm_pdf_service
+    warm_pdf_service()
+    queue = create_job_queue(queue_url)
+    worker = JobWorker(queue, load_handlers(handlers_module), lease_seconds=lease_seconds,
+                       poll_interval=poll_interval)
+    signal.signal(signal.SIGTERM, lambda *_: worker.stop())
+    signal.signal(signal.SIGINT, lambda *_: worker.stop())
+    try:
+        worker.run()
+    finally:
+        queue.close()
+
+
+def run_worker_processes(queue_url: str, handlers_module: str, processes: int = 1,
+                         lease_seconds: float = DEFAULT_LEASE_SECONDS, poll_interval: float = 1.0,
+                         metrics_port: Optional[int] = None) -> None:
+    """
+    Avvia i processi worker e attende la loro terminazione
+
+    SIGTERM/SIGINT vengono inoltrati ai figli, che terminano il job corrente
+    prima di uscire (il lease garantisce comunque la ripresa altrove).
+    Con metrics_port il processo n espone /metrics su metrics_port + n.
+    """
+    ctx = multiprocessing.get_context("spawn")
+    children: List[multiprocessing.Process] = []
+    for n in range(max(1, processes)):
+        child = ctx.Process(target=_worker_process, name=f"eaa-worker-{n}",
+                            args=(queue_url, handlers_module, lease_seconds, poll_interval,
+                                  metrics_port + n if metrics_port else None))
+        child.start()
+        children.append(child)
+
+    def forward(signum, _frame):
+        for child in children:
+            if child.is_alive() and child.pid:
+                os.kill(child.pid, signum)
+
+    signal.signal(signal.SIGTERM, forward)
+    signal.signal(signal.SIGINT, forward)
+    for child in children:
+        child.join()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Worker della coda job di EAA Scanner")
+    parser.add_argument("--queue", default=os.getenv("SCAN_QUEUE_URL", "sqlite:///data/jobs.db"),
+                        help="URL della coda (sqlite:///... o redis://...)")
+    parser.add_argument("--handlers", default="webapp.scan_jobs",
+                        help="Modulo che espone JOB_HANDLERS")
+    parser.add_argument("--processes", type=int, default=int(os.getenv("SCAN_WORKER_PROCESSES", "1")))
+    parser.add_argument("--lease", type=float, default=DEFAULT_LEASE_SECONDS)
+    parser.add_argument("--poll-interval", type=float, default=1.0)
+    parser.add_argument("--metrics-port", type=int, default=int(os.getenv("SCAN_WORKER_METRICS_PORT", "0")) or None,
+                        help="Porta /metrics del primo processo (i successivi usano le porte seguenti)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(processName)s - %(levelname)s - %(message)s")
+    run_worker_processes(args.queue, args.handlers, args.processes, args.lease, args.poll_interval,
+                         args.metrics_port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,371 @@
+"""
+Metriche di processo in formato Prometheus (senza dipendenze esterne)
+
+Contatori, gauge e istogrammi con etichette, registrati in un registro di
+processo e resi nel formato di esposizione testuale di Prometheus (0.0.4).
+L'API ricalca prometheus_client (labels/inc/set/observe/time) così da poterlo
+sostituire senza toccare i punti di misura.
+
+Le metriche sono per processo: l'API le espone su /metrics, i worker della
+coda su una porta propria (start_metrics_server, opzione --metrics-port).
+Le callback registrate con on_collect aggiornano i valori derivati (stato
+WebSocket, cache) subito prima di ogni esposizione.
+
+    with STAGE_SECONDS.labels(stage="pdf").time():
+        create_pdf(...)
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Bucket (secondi) adatti a operazioni da millisecondi a minuti
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if math.isnan(value):
+        return "NaN"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(pairs: Sequence[Tuple[str, str]]) -> str:
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+class _Metric:
+    """Base delle famiglie di metriche: valori per combinazione di etichette"""
+
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._children: Dict[Tuple[str, ...], object] = {}
+        if not self.labelnames:
+            self._children[()] = self._new_child()
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, **labels: str):
+        """Serie della combinazione di etichette indicata (creata al primo uso)"""
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name}: etichette attese {self.labelnames}, ricevute {tuple(labels)}")
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            child = self._children.get(key)
+            if child is None:
+                child = self._children[key] = self._new_child()
+            return child
+
+    def _unlabelled(self):
+        if self.labelnames:
+            raise ValueError(f"{self.name} richiede le etichette {self.labelnames}")
+        return self._children[()]
+
+    def _series(self) -> List[Tuple[Tuple[Tuple[str, str], ...], object]]:
+        with self._lock:
+            items = list(self._children.items())
+        return [(tuple(zip(self.labelnames, key)), child) for key, child in items]
+
+    def _samples(self) -> Iterator[Tuple[str, Sequence[Tuple[str, str]], float]]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        for name, labels, value in self._samples():
+            lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines)
+
+
+class _Value:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.inc(-amount)
+
+    def set(self, value: float) -> None:
+        with self._lock:
+            self.value = float(value)
+
+    @contextmanager
+    def track_inprogress(self) -> Iterator[None]:
+        """Incrementa per la durata del blocco (operazioni in corso)"""
+        self.inc()
+        try:
+            yield
+        finally:
+            self.dec()
+
+
+class _CounterValue:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        if amount < 0:
+            raise ValueError("Un contatore non può diminuire")
+        with self._lock:
+            self.value += amount
+
+
+class Counter(_Metric):
+    """Contatore monotono (nome con suffisso _total)"""
+
+    type_name = "counter"
+
+    def _new_child(self):
+        return _CounterValue()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._unlabelled().inc(amount)
+
+    def _samples(self):
+        for labels, child in self._series():
+            yield self.name, labels, child.value
+
+
+class Gauge(_Metric):
+    """Valore istantaneo che può salire e scendere"""
+
+    type_name = "gauge"
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._unlabelled().inc(amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._unlabelled().dec(amount)
+
+    def set(self, value: float) -> None:
+        self._unlabelled().set(value)
+
+    def track_inprogress(self):
+        return self._unlabelled().track_inprogress()
+
+    def _samples(self):
+        for labels, child in self._series():
+            yield self.name, labels, child.value
+
+
+class _HistogramValue:
+    def __init__(self, buckets: Tuple[float, ...]):
+        self._lock = threading.Lock()
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        with self._lock:
+            self.sum += value
+            self.count += 1
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    self.counts[index] += 1
+                    break
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        """Osserva la durata del blocco, anche se termina con un'eccezione"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def snapshot(self) -> Tuple[List[int], float, int]:
+        with self._lock:
+            return list(self.counts), self.sum, self.count
+
+
+class Histogram(_Metric):
+    """Distribuzione di durate in bucket cumulativi (con _sum e _count)"""
+
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(float(b) for b in buckets if not math.isinf(b)))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self._unlabelled().observe(value)
+
+    def time(self):
+        return self._unlabelled().time()
+
+    def _samples(self):
+        for labels, child in self._series():
+            counts, total, count = child.snapshot()
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                yield f"{self.name}_bucket", labels + (("le", _format_value(bound)),), cumulative
+            yield f"{self.name}_bucket", labels + (("le", "+Inf"),), count
+            yield f"{self.name}_sum", labels, total
+            yield f"{self.name}_count", labels, count
+
+
+class Registry:
+    """Registro delle metriche di un processo"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, documentation: str, labelnames: Sequence[str], **kwargs) -> _Metric:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, documentation, labelnames, **kwargs)
+            elif not isinstance(metric, cls) or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"Metrica {name} già registrata con tipo o etichette diversi")
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def on_collect(self, callback: Callable[[], None]) -> None:
+        """Callback eseguita prima di ogni esposizione (valori derivati)"""
+        with self._lock:
+            self._collectors.append(callback)
+
+    def render(self) -> str:
+        """Tutte le metriche nel formato testuale di Prometheus"""
+        with self._lock:
+            collectors = list(self._collectors)
+        for callback in collectors:
+            try:
+                callback()
+            except Exception as e:
+                logger.warning(f"Raccolta metriche non riuscita: {e}")
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def render() -> str:
+    return REGISTRY.render()
+
+
+def start_metrics_server(port: int, host: str = "0.0.0.0", registry: Registry = REGISTRY):
+    """
+    Espone GET /metrics su un server HTTP in un thread daemon
+
+    Per i processi senza API (worker della coda). Restituisce il server,
+    da chiudere con shutdown().
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] not in ("/", "/metrics"):
+                self.send_error(404)
+                return
+            body = registry.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name=f"metrics-{port}", daemon=True).start()
+    logger.info(f"Metriche esposte su http://{host}:{server.server_port}/metrics")
+    return server
+
+
+# Metriche della pipeline di scansione
+
+SCANNER_SECONDS = REGISTRY.histogram(
+    "eaa_scanner_duration_seconds", "Durata di una esecuzione di scanner per esito",
+    ("scanner", "outcome")
+)
+SCANNER_RUNS = REGISTRY.counter(
+    "eaa_scanner_runs_total", "Esito finale (dopo i retry) degli scanner dell'orchestratore enterprise",
+    ("scanner", "outcome")
+)
+SCANNER_RETRIES = REGISTRY.counter(
+    "eaa_scanner_retries_total", "Tentativi ripetuti dopo un errore dello scanner", ("scanner",)
+)
+CRAWL_FETCH_SECONDS = REGISTRY.histogram(
+    "eaa_crawl_fetch_seconds", "Latenza di scaricamento di una pagina durante il crawling",
+    ("crawler", "outcome")
+)
+STAGE_SECONDS = REGISTRY.histogram(
+    "eaa_stage_duration_seconds",
+    "Durata delle fasi di elaborazione (normalization, analytics, charts, html, pdf)", ("stage",)
+)
+NORMALIZER_INPUTS = REGISTRY.counter(
+    "eaa_normalizer_inputs_total", "Input degli scanner elaborati dal normalizer enterprise per esito",
+    ("result",)
+)
+QUEUE_WAIT_SECONDS = REGISTRY.histogram(
+    "eaa_queue_wait_seconds", "Attesa in coda di un job tra disponibilità e presa in carico", ("kind",)
+)
+JOBS_FINISHED = REGISTRY.counter(
+    "eaa_jobs_finished_total", "Job eseguiti dai worker per esito", ("kind", "outcome")
+)
+FANOUT_LAG_SECONDS = REGISTRY.histogram(
+    "eaa_event_fanout_lag_seconds", "Ritardo tra pubblicazione di un evento e consegna ai client locali",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+)
+ACTIVE_BROWSERS = REGISTRY.gauge(
+    "eaa_active_browsers", "Browser headless in uso", ("source",)
+)
+ACTIVE_SUBPROCESSES = REGISTRY.gauge(
+    "eaa_active_subprocesses", "Sottoprocessi esterni in esecuzione", ("command",)
+)
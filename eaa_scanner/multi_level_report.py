@@ -10,9 +10,10 @@ from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime
 from dataclasses import dataclass, field, asdict
 from collections import defaultdict
-from jinja2 import Environment, FileSystemLoader, select_autoescape
 import hashlib
 
+from .templating import get_environment, get_template
+
 logger = logging.getLogger(__name__)
 
 
@@ -84,10 +85,8 @@ class MultiLevelReportGenerator:
             template_dir.mkdir(parents=True, exist_ok=True)
             self._create_default_templates(template_dir)
         
-        self.jinja_env = Environment(
-            loader=FileSystemLoader(str(template_dir)),
-            autoescape=select_autoescape(['html', 'xml'])
-        )
+        self.template_dir = template_dir
+        self.jinja_env = get_environment(template_dir)
     
     def generate_report(self, scan_results: Dict, sampler_results: Dict, 
                        remediation_plan: Dict) -> MultiLevelReport:
@@ -403,13 +402,11 @@ class MultiLevelReportGenerator:
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
             output_path = self.output_dir / f"multi_level_report_{timestamp}.html"
         
-        # Carica template HTML
-        try:
-            template = self.jinja_env.get_template('multi_level_report.html')
-        except:
-            # Usa template di fallback se non esiste
-            template_content = self._get_fallback_template()
-            template = self.jinja_env.from_string(template_content)
+        # Carica template HTML (fallback incorporato se il file non esiste)
+        template = get_template(
+            self.template_dir, 'multi_level_report.html',
+            fallback_source=self._get_fallback_template()
+        )
         
         # Renderizza HTML
         html_content = template.render(report=report)
@@ -0,0 +1,196 @@
+"""
+Esecuzione concorrente delle pagine di una scansione multi-pagina
+
+- slot browser globali per processo: ogni pagina in esecuzione ne occupa uno,
+  così più sessioni concorrenti non moltiplicano i browser headless
+- progresso reale calcolato dalle unità completate (pagina x scanner),
+  alimentato dagli eventi dell'orchestratore enterprise
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import weakref
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from .metrics import ACTIVE_BROWSERS
+
+DEFAULT_BROWSER_SLOTS = 4
+
+# Operazioni con cui l'orchestratore chiude uno scanner (vedi _record_scanner_outcome)
+TERMINAL_OPERATIONS = {"Completato", "Fallito"}
+
+_slots: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+_slots_lock = threading.Lock()
+
+
+def browser_slot_limit() -> int:
+    """Numero di slot browser (SCAN_BROWSER_SLOTS, default 4)"""
+    try:
+        return max(1, int(os.getenv("SCAN_BROWSER_SLOTS", DEFAULT_BROWSER_SLOTS)))
+    except ValueError:
+        return DEFAULT_BROWSER_SLOTS
+
+
+class _BrowserSlots(asyncio.Semaphore):
+    """Semaforo che riporta gli slot occupati in eaa_active_browsers"""
+
+    async def acquire(self) -> bool:
+        acquired = await super().acquire()
+        ACTIVE_BROWSERS.labels(source="scan_slot").inc()
+        return acquired
+
+    def release(self) -> None:
+        ACTIVE_BROWSERS.labels(source="scan_slot").dec()
+        super().release()
+
+
+def get_browser_slots() -> asyncio.Semaphore:
+    """
+    Semaforo degli slot browser condiviso da tutte le sessioni del loop corrente
+
+    Un semaforo asyncio è legato al suo loop: i worker della coda eseguono
+    ogni job con asyncio.run, quindi ne serve uno per loop.
+    """
+    loop = asyncio.get_running_loop()
+    with _slots_lock:
+        semaphore = _slots.get(loop)
+        if semaphore is None:
+            semaphore = _BrowserSlots(browser_slot_limit())
+            _slots[loop] = semaphore
+        return semaphore
+
+
+class ScanUnitProgress:
+    """
+    Progresso di una sessione multi-pagina in unità pagina x scanner
+
+    Gli eventi arrivano dai thread degli scanner; ogni variazione viene
+    notificata a on_change (da rendere thread-safe lato chiamante).
+
+    Args:
+        pages: URL delle pagine nell'ordine della sessione
+        units_per_page: Scanner attesi per pagina (stima iniziale)
+        on_change: Callback senza argomenti invocata a ogni unità completata
+    """
+
+    def __init__(self, pages: List[str], units_per_page: int,
+                 on_change: Optional[Callable[[], None]] = None):
+        self.pages = list(pages)
+        self.units_per_page = max(1, units_per_page)
+        self.on_change = on_change
+        self._lock = threading.Lock()
+        self._started: List[Set[str]] = [set() for _ in self.pages]
+        self._finished: List[Set[str]] = [set() for _ in self.pages]
+        self._pages_done: Set[int] = set()
+
+    def _page_units(self, index: int) -> int:
+        return max(self.units_per_page, len(self._started[index]))
+
+    def _counts(self) -> Tuple[int, int]:
+        """(unità completate, unità totali) con il lock acquisito dal chiamante"""
+        total = completed = 0
+        for index, done in enumerate(self._finished):
+            units = self._page_units(index)
+            total += units
+            completed += units if index in self._pages_done else min(len(done), units)
+        return completed, total
+
+    @property
+    def total_units(self) -> int:
+        with self._lock:
+            return self._counts()[1]
+
+    @property
+    def completed_units(self) -> int:
+        with self._lock:
+            return self._counts()[0]
+
+    @property
+    def percent(self) -> int:
+        """Percentuale 0-99: il 100 lo imposta il chiamante a sessione chiusa"""
+        with self._lock:
+            completed, total = self._counts()
+        return min(99, int(completed * 100 / max(1, total)))
+
+    @property
+    def pages_done(self) -> int:
+        with self._lock:
+            return len(self._pages_done)
+
+    def scanner_started(self, index: int, scanner_name: str) -> None:
+        with self._lock:
+            self._started[index].add(scanner_name)
+
+    def scanner_finished(self, index: int, scanner_name: str) -> None:
+        with self._lock:
+            if scanner_name in self._finished[index] or index in self._pages_done:
+                return
+            self._started[index].add(scanner_name)
+            self._finished[index].add(scanner_name)
+        self._notify()
+
+    def page_finished(self, index: int) -> None:
+        """Chiude tutte le unità della pagina, anche se alcuni scanner non hanno riportato"""
+        with self._lock:
+            if index in self._pages_done:
+                return
+            self._pages_done.add(index)
+        self._notify()
+
+    def monitor_for(self, index: int) -> "PageProgressMonitor":
+        """Monitor eventi da passare all'orchestratore per la pagina index"""
+        return PageProgressMonitor(self, index)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            completed, total = self._counts()
+            pages_done = len(self._pages_done)
+        return {
+            "progress": min(99, int(completed * 100 / max(1, total))),
+            "pages_scanned": pages_done,
+            "total_pages": len(self.pages),
+            "completed_units": completed,
+            "total_units": total
+        }
+
+    def _notify(self) -> None:
+        if self.on_change is not None:
+            self.on_change()
+
+
+class PageProgressMonitor:
+    """Monitor compatibile con ScanEventHooks che conta gli scanner di una pagina"""
+
+    def __init__(self, progress: ScanUnitProgress, index: int):
+        self.progress = progress
+        self.index = index
+
+    def emit_scanner_operation(self, scan_id: str, scanner_name: str, operation: str,
+                               progress: Optional[int] = None, details: Optional[Dict] = None):
+        if operation in TERMINAL_OPERATIONS:
+            self.progress.scanner_finished(self.index, scanner_name)
+        else:
+            self.progress.scanner_started(self.index, scanner_name)
+
+    def emit_scanner_start(self, scan_id: str, scanner_name: str, url: str,
+                           estimated_duration: Optional[int] = None):
+        pass
+
+    def emit_scanner_complete(self, scan_id: str, scanner_name: str, results_summary: Dict[str, Any]):
+        pass
+
+    def emit_scanner_error(self, scan_id: str, scanner_name: str, error_message: str,
+                           is_critical: bool = False):
+        pass
+
+    def emit_page_progress(self, scan_id: str, current_page: int, total_pages: int, current_url: str):
+        pass
+
+    def emit_processing_step(self, scan_id: str, step_name: str, progress: Optional[int] = None):
+        pass
+
+    def emit_report_generation(self, scan_id: str, stage: str, progress: Optional[int] = None):
+        pass
@@ -5,11 +5,15 @@ Orchestrazione discovery, template detection, selezione e configurazione profond
 
 import logging
 import json
+import queue
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, Future
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Dict, List, Optional, Tuple, Any, Callable
 from dataclasses import dataclass, field, asdict
 
+from ..cancellation import CancellationToken, cancellation_scope, get_current_token
 from .smart_crawler import SmartCrawler
 from .template_detector import TemplateDetector
 from .page_categorizer import PageCategorizer, PageCategory
@@ -45,6 +49,14 @@ class SamplerConfig:
     time_budget_minutes: Optional[int] = None
     optimize_for_budget: bool = True
     
+    # Pipeline: le pagine scoperte vengono categorizzate subito e quelle
+    # prioritarie vengono scansionate mentre la discovery è ancora in corso
+    pipeline_enabled: bool = True
+    early_scan_categories: List[str] = field(
+        default_factory=lambda: ['homepage', 'authentication', 'checkout']
+    )
+    max_parallel_scans: int = 2
+    
     # Real-time Feedback
     enable_websocket: bool = True
     websocket_port: int = 8765
@@ -80,6 +92,11 @@ class SamplerResult:
     category_distribution: Dict[str, int] = field(default_factory=dict)
     priority_pages: List[Dict] = field(default_factory=list)
     
+    # Pipeline
+    provisional_templates: Dict[str, str] = field(default_factory=dict)
+    early_scans: Dict[str, Any] = field(default_factory=dict)
+    time_to_first_page_seconds: Optional[float] = None
+    
     # Errors/Warnings
     errors: List[str] = field(default_factory=list)
     warnings: List[str] = field(default_factory=list)
@@ -118,6 +135,10 @@ class SamplerResult:
                 'distribution': self.category_distribution,
                 'priority_pages': self.priority_pages
             },
+            'pipeline': {
+                'early_scanned_pages': list(self.early_scans.keys()),
+                'time_to_first_page_seconds': self.time_to_first_page_seconds
+            },
             'status': {
                 'errors': self.errors,
                 'warnings': self.warnings,
@@ -133,14 +154,18 @@ class SmartPageSamplerCoordinator:
     Orchestrazione completa del processo di discovery e selezione
     """
     
-    def __init__(self, config: Optional[SamplerConfig] = None):
+    def __init__(self, config: Optional[SamplerConfig] = None,
+                 page_scanner: Optional[Callable[[Dict, DepthConfig], Any]] = None):
         """
         Inizializza il coordinatore
         
         Args:
             config: Configurazione del sampler
+            page_scanner: Callable opzionale (pagina, DepthConfig) -> risultato,
+                usata per scansionare le pagine prioritarie durante la discovery
         """
         self.config = config or SamplerConfig()
+        self.page_scanner = page_scanner
         
         # Inizializza componenti (SmartCrawler verrà inizializzato in execute con URL)
         self.crawler = None
@@ -162,6 +187,12 @@ class SmartPageSamplerCoordinator:
         
         self.depth_manager = DepthManager()
         
+        # Stato della pipeline (azzerato a ogni execute)
+        self._stream_categories: Dict[str, Tuple[PageCategory, Any]] = {}
+        self._early_futures: Dict[str, Future] = {}
+        self._early_tokens: Dict[str, CancellationToken] = {}
+        self._early_keys: set = set()
+        
         # Inizializza progress tracker se abilitato
         self.progress = None
         if self.config.enable_websocket:
@@ -173,6 +204,11 @@ class SmartPageSamplerCoordinator:
         """
         Esegue il processo completo di sampling
         
+        La discovery gira in un thread dedicato e ogni pagina scoperta viene
+        subito categorizzata e assegnata a un template provvisorio; le pagine
+        prioritarie (homepage, autenticazione, checkout) vengono inviate a
+        ``page_scanner`` senza attendere la fine del crawling.
+        
         Args:
             url: URL base del sito da analizzare
             
@@ -180,6 +216,12 @@ class SmartPageSamplerCoordinator:
             SamplerResult con tutti i dati
         """
         result = SamplerResult()
+        self._stream_categories = {}
+        self._early_futures = {}
+        self._early_tokens = {}
+        self._early_keys = set()
+        
+        page_queue: "queue.Queue" = queue.Queue()
         
         # Inizializza crawler con URL
         self.crawler = SmartCrawler(
@@ -188,28 +230,47 @@ class SmartPageSamplerCoordinator:
             max_depth=self.config.max_depth,
             timeout_per_page=self.config.timeout_ms,
             screenshot_enabled=self.config.save_screenshots,
-            headless=True
+            headless=True,
+            page_callback=page_queue.put if self.config.pipeline_enabled else None
         )
         
         # Avvia progress tracker
         if self.progress:
             self.progress.start()
-            time.sleep(1)  # Aspetta che WebSocket sia pronto
+        
+        executor = None
+        remove_cancel_callback = None
+        if self.page_scanner and self.config.pipeline_enabled:
+            executor = ThreadPoolExecutor(
+                max_workers=max(1, self.config.max_parallel_scans),
+                thread_name_prefix="sampler-scan"
+            )
+            # L'annullamento della scansione interrompe anche quelle anticipate
+            scan_token = get_current_token()
+            if scan_token:
+                remove_cancel_callback = scan_token.add_callback(self._cancel_early_scans)
         
         try:
-            # FASE 1: Discovery
+            # FASE 1: Discovery (in streaming)
             logger.info(f"Inizio discovery di {url}")
             if self.progress:
                 self.progress.start_discovery(url, self.config.max_pages)
             
             start_time = time.time()
-            discovered_pages = self._execute_discovery(result)
+            discovered_pages = self._run_streaming_discovery(
+                page_queue, result, executor, start_time
+            )
             result.discovery_time_seconds = time.time() - start_time
             
+            # Pagine non passate dallo stream (es. fallback su URL base)
+            for page in discovered_pages:
+                if page['url'] not in self._stream_categories:
+                    self._ingest_page(page, result, executor, start_time)
+            
             if self.progress:
                 self.progress.complete_discovery(
                     len(discovered_pages),
-                    0  # Templates verranno calcolati dopo
+                    len(set(result.provisional_templates.values()))
                 )
             
             # FASE 2: Template Detection
@@ -238,6 +299,9 @@ class SmartPageSamplerCoordinator:
                 result
             )
             
+            # Raccoglie le scansioni anticipate (già sovrapposte alle fasi precedenti)
+            self._collect_early_scans(result, selected_pages)
+            
             # FASE 6: Salvataggio risultati
             self._save_results(result)
             
@@ -248,7 +312,8 @@ class SmartPageSamplerCoordinator:
                     {
                         'total_discovered': len(discovered_pages),
                         'templates_found': len(templates),
-                        'pages_selected': len(selected_pages)
+                        'pages_selected': len(selected_pages),
+                        'early_scanned': len(result.early_scans)
                     }
                 )
             
@@ -259,9 +324,148 @@ class SmartPageSamplerCoordinator:
             
             if self.progress:
                 self.progress.send_error(error_msg)
+        finally:
+            if executor:
+                # Nessun browser delle scansioni anticipate sopravvive a execute():
+                # quelle ancora in corso (pagine scartate o errore) vengono annullate
+                # e attese fino alla terminazione dei loro processi
+                self._cancel_early_scans()
+                executor.shutdown(wait=True, cancel_futures=True)
+            if remove_cancel_callback:
+                remove_cancel_callback()
         
         return result
     
+    def _run_streaming_discovery(self, page_queue: "queue.Queue",
+                                 result: SamplerResult,
+                                 executor: Optional[ThreadPoolExecutor],
+                                 start_time: float) -> List[Dict]:
+        """
+        Esegue la discovery in un thread e processa le pagine man mano che arrivano
+        
+        Args:
+            page_queue: Coda alimentata dal page_callback del crawler
+            result: Oggetto risultato da aggiornare
+            executor: Executor per le scansioni anticipate (opzionale)
+            start_time: Timestamp di inizio discovery
+            
+        Returns:
+            Lista pagine scoperte
+        """
+        done = object()
+        discovered: List[Dict] = []
+        
+        def run_discovery():
+            try:
+                discovered.extend(self._execute_discovery(result))
+            finally:
+                page_queue.put(done)
+        
+        discovery_thread = threading.Thread(
+            target=run_discovery, name="sampler-discovery", daemon=True
+        )
+        discovery_thread.start()
+        
+        while True:
+            item = page_queue.get()
+            if item is done:
+                break
+            self._ingest_page(item.to_dict(), result, executor, start_time)
+        
+        discovery_thread.join()
+        return discovered
+    
+    def _ingest_page(self, page: Dict, result: SamplerResult,
+                     executor: Optional[ThreadPoolExecutor],
+                     start_time: float) -> None:
+        """
+        Categorizza una pagina appena scoperta, le assegna un template
+        provvisorio e, se prioritaria, ne avvia subito la scansione
+        
+        Args:
+            page: Pagina scoperta come dizionario
+            result: Oggetto risultato da aggiornare
+            executor: Executor per le scansioni anticipate (opzionale)
+            start_time: Timestamp di inizio discovery
+        """
+        page_url = page['url']
+        if page_url in self._stream_categories:
+            return
+        
+        if result.time_to_first_page_seconds is None:
+            result.time_to_first_page_seconds = time.time() - start_time
+        
+        try:
+            category, info = self.categorizer.categorize_page(page)
+        except Exception as e:
+            logger.warning(f"Errore categorizzazione {page_url}: {e}")
+            category, info = PageCategory.GENERAL, self.categorizer.categories[PageCategory.GENERAL]
+        self._stream_categories[page_url] = (category, info)
+        
+        # Template provvisorio: stessa impronta DOM => stesso template
+        template_key = page.get('template_hash') or page.get('dom_structure') or \
+            self.template_detector._generate_simple_fingerprint(page)
+        result.provisional_templates[page_url] = template_key
+        
+        if self.progress:
+            self.progress.update_discovery(
+                pages_found=len(self._stream_categories),
+                pages_visited=len(self.crawler.visited_urls),
+                current_url=page_url,
+                message=f"Scoperta: {page_url} ({category.value})"
+            )
+        
+        # Una sola scansione anticipata per coppia categoria/template provvisorio
+        # (le varianti di login o checkout condividono il template) ed entro il
+        # budget di selezione: le altre pagine attendono la selezione WCAG-EM
+        early_key = (category.value, template_key)
+        if (executor and category.value in self.config.early_scan_categories
+                and early_key not in self._early_keys
+                and len(self._early_futures) < self.config.max_selected_pages):
+            self._early_keys.add(early_key)
+            depth_config = self.depth_manager.get_depth_for_page(page, category)
+            logger.info(f"Scansione anticipata di {page_url} ({category.value})")
+            token = self._early_tokens[page_url] = CancellationToken()
+            self._early_futures[page_url] = executor.submit(
+                self._run_early_scan, token, page, depth_config
+            )
+    
+    def _run_early_scan(self, token: CancellationToken, page: Dict, depth_config: DepthConfig) -> Any:
+        """Esegue page_scanner con un token proprio, annullabile per singola pagina"""
+        with cancellation_scope(token):
+            token.raise_if_cancelled()
+            return self.page_scanner(page, depth_config)
+    
+    def _cancel_early_scans(self) -> None:
+        """Annulla le scansioni anticipate non concluse (callback non bloccante)"""
+        for page_url, future in list(self._early_futures.items()):
+            if not future.done():
+                future.cancel()
+                self._early_tokens[page_url].cancel("Scansione anticipata non più necessaria")
+    
+    def _collect_early_scans(self, result: SamplerResult, selected_pages: List[Dict]) -> None:
+        """
+        Raccoglie i risultati delle scansioni avviate durante la discovery
+        
+        Si attendono solo le pagine selezionate; quelle scartate dalla
+        selezione vengono annullate, anche se già avviate (il token della
+        pagina termina i processi dello scanner).
+        
+        Args:
+            result: Oggetto risultato da aggiornare
+            selected_pages: Pagine selezionate per la scansione
+        """
+        selected_urls = {page['url'] for page in selected_pages}
+        for page_url, future in self._early_futures.items():
+            if page_url not in selected_urls:
+                future.cancel()
+                self._early_tokens[page_url].cancel("Pagina non selezionata")
+                continue
+            try:
+                result.early_scans[page_url] = future.result()
+            except Exception as e:
+                result.warnings.append(f"Scansione anticipata fallita per {page_url}: {e}")
+    
     def _execute_discovery(self, result: SamplerResult) -> List[Dict]:
         """
         Esegue fase di discovery
@@ -273,17 +477,7 @@ class SmartPageSamplerCoordinator:
             Lista pagine scoperte
         """
         try:
-            # Callback per progress updates
-            def on_page_discovered(page_info):
-                if self.progress:
-                    self.progress.update_discovery(
-                        pages_found=len(self.crawler.discovered_pages),
-                        pages_visited=len(self.crawler.visited),
-                        current_url=page_info.url,
-                        message=f"Scoperta: {page_info.url}"
-                    )
-            
-            # Esegui crawling
+            # Esegui crawling (il progresso per pagina arriva via page_callback)
             discovered = self.crawler.crawl()
             
             # Converti PageInfo in dizionari
@@ -331,18 +525,15 @@ class SmartPageSamplerCoordinator:
             Template identificati
         """
         try:
-            if self.progress:
-                # Simula progresso per template detection
-                for i, page in enumerate(pages):
-                    self.progress.update_template_detection(
-                        templates_found=0,
-                        pages_analyzed=i + 1
-                    )
-                    time.sleep(0.01)  # Piccolo delay per simulazione
-            
             # Identifica template
             templates = self.template_detector.detect_templates(pages)
             
+            if self.progress:
+                self.progress.update_template_detection(
+                    templates_found=len(templates),
+                    pages_analyzed=len(pages)
+                )
+            
             # Genera sommario
             summary = self.template_detector.get_template_summary(templates)
             
@@ -376,7 +567,9 @@ class SmartPageSamplerCoordinator:
             category_counts = {}
             
             for page in pages:
-                category, info = self.categorizer.categorize_page(page)
+                # Riusa la categorizzazione già fatta durante lo stream
+                cached = self._stream_categories.get(page['url'])
+                category, info = cached if cached else self.categorizer.categorize_page(page)
                 categories[page['url']] = category
                 
                 # Conta categorie
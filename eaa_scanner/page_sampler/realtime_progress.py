@@ -83,6 +83,7 @@ class RealtimeProgress:
         self.message_queue: Queue = Queue()
         self.server = None
         self.server_thread = None
+        self._server_ready = threading.Event()
         
         # Stato corrente
         self.current_phase = "idle"
@@ -117,6 +118,7 @@ class RealtimeProgress:
         """Avvia server WebSocket asincrono"""
         if not WEBSOCKET_AVAILABLE:
             logger.warning("WebSocket non disponibile")
+            self._server_ready.set()
             return
         
         try:
@@ -127,12 +129,21 @@ class RealtimeProgress:
             ) as server:
                 self.server = server
                 logger.info(f"WebSocket server avviato su ws://{self.host}:{self.port}")
+                self._server_ready.set()
                 await asyncio.Future()  # Run forever
         except Exception as e:
             logger.error(f"Errore avvio WebSocket server: {e}")
+        finally:
+            # Sblocca start() anche se il bind fallisce
+            self._server_ready.set()
     
-    def start(self):
-        """Avvia server in thread separato"""
+    def start(self, ready_timeout: float = 5.0):
+        """
+        Avvia server in thread separato
+        
+        Args:
+            ready_timeout: Attesa massima (secondi) per il bind del server
+        """
         if not WEBSOCKET_AVAILABLE:
             return
         
@@ -146,7 +157,9 @@ class RealtimeProgress:
         
         self.server_thread = threading.Thread(target=run_server, daemon=True)
         self.server_thread.start()
-        time.sleep(1)  # Aspetta che server sia pronto
+        # Attende solo il tempo necessario al bind invece di un delay fisso
+        if not self._server_ready.wait(ready_timeout):
+            logger.warning("WebSocket server non pronto entro il timeout, proseguo")
     
     async def handle_client(self, websocket: WebSocketServerProtocol, path: str):
         """
@@ -3,29 +3,29 @@ Smart Crawler con Playwright per discovery pagine avanzata
 Gestisce siti JavaScript-heavy e SPA con template detection
 """
 
+from __future__ import annotations
+
 import asyncio
+import importlib.util
 import logging
 import time
-from typing import List, Dict, Set, Optional, Any
+from typing import TYPE_CHECKING, List, Dict, Set, Optional, Any
 from urllib.parse import urljoin, urlparse, urlunparse
 from pathlib import Path
 import json
 import re
 from dataclasses import dataclass, field, asdict
 
-try:
-    from playwright.async_api import async_playwright, Page, Browser, BrowserContext
-    from playwright.sync_api import sync_playwright
-    PLAYWRIGHT_AVAILABLE = True
-except ImportError:
-    PLAYWRIGHT_AVAILABLE = False
-    Page = Any  # Usa Any come fallback per type hints
-    Browser = Any
-    BrowserContext = Any
-    print("Attenzione: Playwright non installato. Installa con: pip install playwright && playwright install")
+# Playwright si importa al primo crawling, non all'import del pacchetto
+PLAYWRIGHT_AVAILABLE = importlib.util.find_spec("playwright") is not None
+
+if TYPE_CHECKING:
+    from playwright.async_api import Page, Browser, BrowserContext
 
 from bs4 import BeautifulSoup
 
+from ..metrics import ACTIVE_BROWSERS, CRAWL_FETCH_SECONDS
+
 logger = logging.getLogger(__name__)
 
 
@@ -78,7 +78,8 @@ class SmartCrawler:
                  timeout_per_page: int = 10000,
                  screenshot_enabled: bool = True,
                  headless: bool = True,
-                 progress_callback: Optional[callable] = None):
+                 progress_callback: Optional[callable] = None,
+                 page_callback: Optional[callable] = None):
         """
         Inizializza il crawler
         
@@ -90,6 +91,8 @@ class SmartCrawler:
             screenshot_enabled: Se salvare screenshot
             headless: Se eseguire browser in headless
             progress_callback: Callback per aggiornamenti real-time
+            page_callback: Callback invocata con ogni PageInfo appena scoperta
+                (permette di processare le pagine mentre il crawling prosegue)
         """
         self.base_url = self._normalize_url(base_url)
         self.base_domain = urlparse(self.base_url).netloc
@@ -99,6 +102,7 @@ class SmartCrawler:
         self.screenshot_enabled = screenshot_enabled
         self.headless = headless
         self.progress_callback = progress_callback
+        self.page_callback = page_callback
         
         # Stato del crawling
         self.visited_urls: Set[str] = set()
@@ -128,43 +132,51 @@ class SmartCrawler:
             Lista di PageInfo per le pagine scoperte
         """
         if not PLAYWRIGHT_AVAILABLE:
-            logger.error("Playwright non disponibile. Installa con: pip install playwright")
+            logger.error("Playwright non disponibile. Installa con: pip install playwright && playwright install")
             return []
+        from playwright.async_api import async_playwright
         
         logger.info(f"Inizio Smart Crawling di {self.base_url}")
         
-        async with async_playwright() as p:
-            # Lancia browser
-            self.browser = await p.chromium.launch(headless=self.headless)
-            self.context = await self.browser.new_context(
-                viewport={'width': 1920, 'height': 1080},
-                user_agent='Mozilla/5.0 (compatible; EAA-Scanner/2.0; +https://eaa-scanner.it)'
-            )
+        # Il browser resta aperto (e conteggiato) fino all'uscita dal contesto Playwright
+        with ACTIVE_BROWSERS.labels(source="smart_crawler").track_inprogress():
+            async with async_playwright() as p:
+                # Lancia browser
+                self.browser = await p.chromium.launch(headless=self.headless)
+                self.context = await self.browser.new_context(
+                    viewport={'width': 1920, 'height': 1080},
+                    user_agent='Mozilla/5.0 (compatible; EAA-Scanner/2.0; +https://eaa-scanner.it)'
+                )
             
-            # Prima cerca sitemap
-            await self._discover_sitemap_async()
+                # Prima cerca sitemap
+                await self._discover_sitemap_async()
             
-            # Inizia dal base URL
-            self.page_queue.append((self.base_url, 0))
+                # Inizia dal base URL
+                self.page_queue.append((self.base_url, 0))
             
-            # Crawl iterativo con gestione coda
-            while self.page_queue and len(self.discovered_pages) < self.max_pages:
-                url, depth = self.page_queue.pop(0)
+                # Crawl iterativo con gestione coda
+                while self.page_queue and len(self.discovered_pages) < self.max_pages:
+                    url, depth = self.page_queue.pop(0)
                 
-                if depth > self.max_depth:
-                    continue
+                    if depth > self.max_depth:
+                        continue
                 
-                if url in self.visited_urls:
-                    continue
+                    if url in self.visited_urls:
+                        continue
                 
-                # Crawl della pagina
-                page_info = await self._crawl_page_async(url, depth)
-                if page_info:
-                    self.discovered_pages.append(page_info)
-                    self._report_progress(f"Scoperta pagina {len(self.discovered_pages)}/{self.max_pages}: {page_info.title}")
+                    # Crawl della pagina
+                    page_info = await self._crawl_page_async(url, depth)
+                    if page_info:
+                        self.discovered_pages.append(page_info)
+                        self._report_progress(f"Scoperta pagina {len(self.discovered_pages)}/{self.max_pages}: {page_info.title}")
+                        if self.page_callback:
+                            try:
+                                self.page_callback(page_info)
+                            except Exception as e:
+                                logger.warning(f"Errore in page_callback per {page_info.url}: {e}")
             
-            # Chiudi browser
-            await self.browser.close()
+                # Chiudi browser
+                await self.browser.close()
         
         # Ordina per priorità
         self.discovered_pages.sort(key=lambda x: (-x.priority, x.depth))
@@ -210,11 +222,19 @@ class SmartCrawler:
             page = await self.context.new_page()
             
             # Naviga con timeout
-            response = await page.goto(
-                normalized_url,
-                wait_until='networkidle',
-                timeout=self.timeout_per_page
-            )
+            fetch_started = time.perf_counter()
+            outcome = "error"
+            try:
+                response = await page.goto(
+                    normalized_url,
+                    wait_until='networkidle',
+                    timeout=self.timeout_per_page
+                )
+                outcome = "success" if response and response.status < 400 else "http_error"
+            finally:
+                CRAWL_FETCH_SECONDS.labels(crawler="playwright", outcome=outcome).observe(
+                    time.perf_counter() - fetch_started
+                )
             
             if not response or response.status >= 400:
                 await page.close()
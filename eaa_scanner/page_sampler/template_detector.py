@@ -4,24 +4,21 @@ Usa analisi DOM e clustering per identificare template comuni
 """
 
 import hashlib
+import importlib.util
 import logging
 from typing import List, Dict, Set, Optional, Tuple, Any
 from collections import defaultdict
 import re
 
-try:
-    import numpy as np
-    from sklearn.feature_extraction.text import TfidfVectorizer
-    from sklearn.metrics.pairwise import cosine_similarity
-    from sklearn.cluster import DBSCAN
-    SKLEARN_AVAILABLE = True
-except ImportError:
-    SKLEARN_AVAILABLE = False
-    np = None
-    print("Attenzione: scikit-learn non installato. Installa con: pip install scikit-learn numpy")
+# scikit-learn (e scipy) costano più di un secondo di import: si caricano
+# solo quando serve il clustering
+SKLEARN_AVAILABLE = all(importlib.util.find_spec(name) is not None for name in ("sklearn", "numpy"))
 
 logger = logging.getLogger(__name__)
 
+if not SKLEARN_AVAILABLE:
+    logger.info("scikit-learn non installato, clustering semplificato (pip install scikit-learn numpy)")
+
 
 class TemplateDetector:
     """
@@ -127,6 +124,10 @@ class TemplateDetector:
             
             return matrix
         
+        import numpy as np
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from sklearn.metrics.pairwise import cosine_similarity
+        
         try:
             # Usa TF-IDF per vettorizzare fingerprints
             vectorizer = TfidfVectorizer(
@@ -147,12 +148,7 @@ class TemplateDetector:
             logger.warning(f"Errore calcolo similarità: {e}")
             # Fallback: matrice identità
             n = len(fingerprints)
-            if SKLEARN_AVAILABLE and np:
-                return np.eye(n)
-            else:
-                # Matrice identità senza numpy
-                matrix = [[1.0 if i == j else 0.0 for j in range(n)] for i in range(n)]
-                return matrix
+            return np.eye(n)
     
     def _cluster_pages(self, similarity_matrix: Any) -> List[int]:
         """
@@ -179,6 +175,8 @@ class TemplateDetector:
             
             return clusters
         
+        from sklearn.cluster import DBSCAN
+        
         try:
             # Converti similarità in distanza
             distance_matrix = 1 - similarity_matrix
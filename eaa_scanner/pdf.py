@@ -2,13 +2,26 @@ from __future__ import annotations
 
 import os
 import shutil
-import subprocess
+import threading
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
 import logging
 
+from .metrics import ACTIVE_BROWSERS
+from .pdf_service import (
+    CHROME_CANDIDATES, PDFJobTimeout, PDFQueueFull, PDFServiceError, get_chrome_pool, print_options
+)
+from .utils import run_command
+
 logger = logging.getLogger(__name__)
 
+# Fogli di stile extra compilati tenuti per thread
+WEASYPRINT_STYLESHEET_CACHE = 32
+
+# FontConfiguration e CSS di WeasyPrint riusati tra i report dello stesso
+# thread (la configurazione dei font non è condivisibile tra thread)
+_weasyprint_local = threading.local()
+
 
 def html_to_pdf(html_path: Path, pdf_path: Path, engine: str = "auto", **kwargs) -> bool:
     """Converte HTML in PDF usando vari engine con fallback chain.
@@ -65,24 +78,10 @@ def _determine_engines(engine: str) -> list[str]:
 def _try_weasyprint(html_path: Path, pdf_path: Path, **kwargs) -> bool:
     """Prova conversione con WeasyPrint"""
     try:
-        from weasyprint import HTML, CSS
-        from weasyprint.text.fonts import FontConfiguration
+        from weasyprint import HTML
         
-        # Configurazione font per supporto caratteri internazionali
-        font_config = FontConfiguration()
-        
-        # CSS aggiuntivo per stampa se fornito
-        css_extra = kwargs.get('css_extra')
-        stylesheets = []
-        if css_extra:
-            if isinstance(css_extra, str):
-                stylesheets.append(CSS(string=css_extra, font_config=font_config))
-            elif isinstance(css_extra, Path) and css_extra.exists():
-                stylesheets.append(CSS(filename=str(css_extra), font_config=font_config))
-        
-        # Aggiunge CSS print-friendly di default
-        default_print_css = _get_default_print_css()
-        stylesheets.append(CSS(string=default_print_css, font_config=font_config))
+        # Font e CSS (extra e print-friendly di default) già compilati
+        font_config, stylesheets = _weasyprint_resources(kwargs.get('css_extra'))
         
         # Configurazione PDF
         html_doc = HTML(filename=str(html_path))
@@ -113,15 +112,58 @@ def _try_weasyprint(html_path: Path, pdf_path: Path, **kwargs) -> bool:
     return False
 
 
+def _weasyprint_resources(css_extra: Any = None) -> Tuple[Any, List[Any]]:
+    """FontConfiguration e fogli di stile del thread, compilati al primo uso"""
+    from weasyprint import CSS
+    from weasyprint.text.fonts import FontConfiguration
+    
+    cache = getattr(_weasyprint_local, "cache", None)
+    if cache is None:
+        cache = _weasyprint_local.cache = {"font_config": FontConfiguration(), "stylesheets": {}}
+    font_config, compiled = cache["font_config"], cache["stylesheets"]
+    
+    def stylesheet(key, **source):
+        css = compiled.get(key)
+        if css is None:
+            if len(compiled) > WEASYPRINT_STYLESHEET_CACHE:
+                compiled.clear()
+            css = compiled[key] = CSS(font_config=font_config, **source)
+        return css
+    
+    stylesheets = []
+    if css_extra:
+        if isinstance(css_extra, str):
+            stylesheets.append(stylesheet(("string", css_extra), string=css_extra))
+        elif isinstance(css_extra, Path) and css_extra.exists():
+            key = ("file", str(css_extra.resolve()), css_extra.stat().st_mtime_ns)
+            stylesheets.append(stylesheet(key, filename=str(css_extra)))
+    stylesheets.append(stylesheet(("default",), string=_get_default_print_css()))
+    return font_config, stylesheets
+
+
 def _try_chrome(html_path: Path, pdf_path: Path, **kwargs) -> bool:
-    """Prova conversione con Chrome/Chromium headless"""
+    """Prova conversione con Chrome/Chromium headless (pool persistente, poi riga di comando)"""
+    chrome_opts = kwargs.get('chrome_options', {})
+    timeout = kwargs.get('timeout', 120)
+    
+    pool = get_chrome_pool()
+    if pool is not None:
+        try:
+            options = print_options(chrome_opts.get('page_format', 'A4'), chrome_opts.get('margins'))
+            pool.render(html_path, pdf_path, options, timeout=timeout)
+            if pdf_path.exists() and pdf_path.stat().st_size > 0:
+                return True
+        except (PDFQueueFull, PDFJobTimeout) as e:
+            logger.warning(f"PDF Chrome non generato: {e}")
+            return False
+        except PDFServiceError as e:
+            logger.warning(f"Pool Chrome non disponibile, uso la riga di comando: {e}")
+    
     chrome_cmd = os.getenv("CHROME_CMD")
     chrome_candidates = []
     if chrome_cmd:
         chrome_candidates.append(chrome_cmd)
-    chrome_candidates += [
-        "google-chrome", "chrome", "chromium", "chromium-browser", "brave"
-    ]
+    chrome_candidates += CHROME_CANDIDATES
 
     for bin_name in chrome_candidates:
         bin_path = shutil.which(bin_name)
@@ -140,9 +182,6 @@ def _try_chrome(html_path: Path, pdf_path: Path, **kwargs) -> bool:
                 f"file://{str(html_path)}",
             ]
             
-            # Opzioni aggiuntive per Chrome
-            chrome_opts = kwargs.get('chrome_options', {})
-            
             # Formato pagina
             if 'page_format' in chrome_opts:
                 cmd.append(f"--print-to-pdf-no-header")
@@ -159,8 +198,8 @@ def _try_chrome(html_path: Path, pdf_path: Path, **kwargs) -> bool:
                         f"--print-to-pdf-margin-right={margins.get('right', 1)}",
                     ])
             
-            timeout = kwargs.get('timeout', 120)
-            cp = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+            with ACTIVE_BROWSERS.labels(source="pdf").track_inprogress():
+                cp = run_command(cmd, timeout_sec=timeout)
             
             if cp.returncode == 0 and pdf_path.exists() and pdf_path.stat().st_size > 0:
                 return True
@@ -209,7 +248,7 @@ def _try_wkhtmltopdf(html_path: Path, pdf_path: Path, **kwargs) -> bool:
         cmd.extend([str(html_path), str(pdf_path)])
         
         timeout = kwargs.get('timeout', 120)
-        cp = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+        cp = run_command(cmd, timeout_sec=timeout)
         
         if cp.returncode == 0 and pdf_path.exists() and pdf_path.stat().st_size > 0:
             return True
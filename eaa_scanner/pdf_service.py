@@ -0,0 +1,438 @@
+"""
+Servizio PDF con istanze di Chrome headless persistenti
+
+Invece di avviare `chrome --print-to-pdf` per ogni report, il pool tiene
+aperti alcuni Chrome headless e li pilota con il DevTools protocol
+(Page.navigate + Page.printToPDF): il report paga solo il rendering, non
+l'avvio del browser. Le richieste oltre il pool attendono in una coda
+limitata; quelle oltre la coda vengono rifiutate (PDFQueueFull).
+
+    EAA_PDF_CHROME_POOL     istanze di Chrome (default 2, 0 disabilita il pool)
+    EAA_PDF_QUEUE_SIZE      richieste in attesa oltre il pool (default 16)
+    EAA_PDF_MAX_JOBS        PDF per istanza prima del riavvio (default 100)
+    EAA_PDF_WARM            avvio di Chrome all'avvio del processo (1/0; default
+                            solo se Chrome sarà usato, vedi warm_enabled)
+"""
+
+from __future__ import annotations
+
+import atexit
+import base64
+import itertools
+import json
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from .cancellation import get_current_token, raise_if_cancelled, terminate_process_group
+from .metrics import ACTIVE_BROWSERS
+
+logger = logging.getLogger(__name__)
+
+CHROME_CANDIDATES = ("google-chrome", "chrome", "chromium", "chromium-browser", "brave")
+
+# Dimensioni carta in pollici per Page.printToPDF
+PAPER_SIZES = {
+    "A3": (11.69, 16.54),
+    "A4": (8.27, 11.69),
+    "A5": (5.83, 8.27),
+    "LETTER": (8.5, 11.0),
+    "LEGAL": (8.5, 14.0),
+}
+
+STARTUP_TIMEOUT = 20.0
+
+_pool: Optional["ChromePDFPool"] = None
+_pool_lock = threading.Lock()
+
+
+class PDFServiceError(Exception):
+    """Errore del servizio PDF"""
+
+
+class PDFQueueFull(PDFServiceError):
+    """Troppe richieste PDF in attesa"""
+
+
+class PDFJobTimeout(PDFServiceError):
+    """PDF non generato entro il timeout del job"""
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    if value is not None and value.strip().isdigit():
+        return int(value)
+    return default
+
+
+def find_chrome() -> Optional[str]:
+    """Primo Chrome/Chromium disponibile (CHROME_CMD ha la precedenza)"""
+    candidates = [os.getenv("CHROME_CMD")] + list(CHROME_CANDIDATES)
+    for name in filter(None, candidates):
+        path = shutil.which(name)
+        if path:
+            return path
+    return None
+
+
+def print_options(page_format: str = "A4", margins: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+    """
+    Parametri di Page.printToPDF
+
+    Args:
+        page_format: Formato carta (A4, Letter, ...)
+        margins: Margini in pollici (top, bottom, left, right)
+    """
+    width, height = PAPER_SIZES.get((page_format or "A4").upper(), PAPER_SIZES["A4"])
+    options = {
+        "paperWidth": width,
+        "paperHeight": height,
+        "printBackground": True,
+        "preferCSSPageSize": True,
+    }
+    if isinstance(margins, dict):
+        for side in ("top", "bottom", "left", "right"):
+            options[f"margin{side.title()}"] = float(margins.get(side, 1))
+    return options
+
+
+class ChromeInstance:
+    """
+    Chrome headless con una scheda dedicata alla stampa
+
+    Usata da un job alla volta (il pool la assegna in esclusiva).
+    """
+
+    def __init__(self, chrome_path: str, startup_timeout: float = STARTUP_TIMEOUT):
+        self.chrome_path = chrome_path
+        self.startup_timeout = startup_timeout
+        self.jobs = 0
+        self.process: Optional[subprocess.Popen] = None
+        self._profile_dir: Optional[str] = None
+        self._ws = None
+        self._session_id: Optional[str] = None
+        self._ids = itertools.count(1)
+        self._events: List[Dict[str, Any]] = []
+        self._closed = False
+
+    def start(self) -> "ChromeInstance":
+        """Avvia Chrome e apre la scheda di stampa"""
+        from websockets.sync.client import connect
+
+        self._profile_dir = tempfile.mkdtemp(prefix="eaa_chrome_")
+        cmd = [
+            self.chrome_path,
+            "--headless=new",
+            "--disable-gpu",
+            "--no-sandbox",
+            "--disable-dev-shm-usage",
+            "--disable-extensions",
+            "--no-first-run",
+            "--no-default-browser-check",
+            "--remote-debugging-port=0",
+            f"--user-data-dir={self._profile_dir}",
+            "about:blank",
+        ]
+        try:
+            self.process = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                                            start_new_session=True)
+            ACTIVE_BROWSERS.labels(source="pdf").inc()
+            deadline = time.monotonic() + self.startup_timeout
+            self._ws = connect(self._browser_url(deadline), max_size=None,
+                               open_timeout=max(deadline - time.monotonic(), 1))
+            target = self._call("Target.createTarget", {"url": "about:blank"}, deadline=deadline)
+            attached = self._call("Target.attachToTarget", {"targetId": target["targetId"], "flatten": True},
+                                  deadline=deadline)
+            self._session_id = attached["sessionId"]
+            self._call("Page.enable", session=True, deadline=deadline)
+        except BaseException:
+            self.close()
+            raise
+        return self
+
+    def _browser_url(self, deadline: float) -> str:
+        """URL DevTools del browser, letto da DevToolsActivePort nel profilo"""
+        port_file = Path(self._profile_dir) / "DevToolsActivePort"
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise PDFServiceError(f"Chrome terminato all'avvio (exit {self.process.returncode})")
+            try:
+                port, path = port_file.read_text().split()[:2]
+                return f"ws://127.0.0.1:{port}{path}"
+            except (OSError, ValueError):
+                time.sleep(0.05)
+        raise PDFJobTimeout("Chrome non pronto entro il timeout di avvio")
+
+    @property
+    def alive(self) -> bool:
+        return not self._closed and self.process is not None and self.process.poll() is None
+
+    def _call(self, method: str, params: Optional[Dict[str, Any]] = None, session: bool = False,
+              deadline: Optional[float] = None) -> Dict[str, Any]:
+        """Comando DevTools; gli eventi ricevuti nel frattempo restano in coda"""
+        message_id = next(self._ids)
+        message = {"id": message_id, "method": method, "params": params or {}}
+        if session:
+            message["sessionId"] = self._session_id
+        self._ws.send(json.dumps(message))
+        while True:
+            response = self._receive(deadline)
+            if response.get("id") != message_id:
+                if "method" in response:
+                    self._events.append(response)
+                continue
+            if "error" in response:
+                raise PDFServiceError(f"{method}: {response['error'].get('message', response['error'])}")
+            return response.get("result", {})
+
+    def _wait_event(self, method: str, deadline: float) -> Dict[str, Any]:
+        while True:
+            for n, event in enumerate(self._events):
+                if event.get("method") == method and event.get("sessionId") == self._session_id:
+                    return self._events.pop(n)
+            self._events.append(self._receive(deadline))
+
+    def _receive(self, deadline: Optional[float]) -> Dict[str, Any]:
+        timeout = None
+        if deadline is not None:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                raise PDFJobTimeout("Timeout del job PDF")
+        try:
+            return json.loads(self._ws.recv(timeout=timeout))
+        except TimeoutError:
+            raise PDFJobTimeout("Timeout del job PDF") from None
+
+    def print_to_pdf(self, html_path: Path, pdf_path: Path, options: Dict[str, Any], deadline: float) -> None:
+        """Carica il report nella scheda e ne salva la stampa in pdf_path"""
+        self._events.clear()
+        navigation = self._call("Page.navigate", {"url": Path(html_path).resolve().as_uri()},
+                                session=True, deadline=deadline)
+        if navigation.get("errorText"):
+            raise PDFServiceError(f"Caricamento di {html_path} fallito: {navigation['errorText']}")
+        self._wait_event("Page.loadEventFired", deadline)
+        result = self._call("Page.printToPDF", options, session=True, deadline=deadline)
+        Path(pdf_path).write_bytes(base64.b64decode(result["data"]))
+        self.jobs += 1
+
+    def close(self) -> None:
+        """Chiude connessione e browser (idempotente, usabile da altri thread)"""
+        if self._closed:
+            return
+        self._closed = True
+        if self._ws is not None:
+            try:
+                self._ws.close()
+            except Exception:
+                pass
+        if self.process is not None:
+            terminate_process_group(self.process)
+            ACTIVE_BROWSERS.labels(source="pdf").dec()
+            threading.Thread(target=self._cleanup, daemon=True).start()
+        elif self._profile_dir:
+            shutil.rmtree(self._profile_dir, ignore_errors=True)
+
+    def _cleanup(self) -> None:
+        try:
+            self.process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            pass
+        shutil.rmtree(self._profile_dir, ignore_errors=True)
+
+
+class ChromePDFPool:
+    """
+    Pool di istanze Chrome con coda limitata
+
+    Le istanze vengono avviate al primo uso (o da warm) e riusate; quelle che
+    falliscono un job o superano max_jobs vengono chiuse e sostituite.
+    """
+
+    def __init__(self, chrome_path: str, size: int = 2, max_queue: int = 16, max_jobs: int = 100,
+                 instance_factory: Optional[Callable[[str], ChromeInstance]] = None):
+        self.chrome_path = chrome_path
+        self.size = max(1, size)
+        self.max_jobs = max(1, max_jobs)
+        self._factory = instance_factory or (lambda path: ChromeInstance(path).start())
+        # Job ammessi contemporaneamente: in stampa più in attesa
+        self._slots = threading.BoundedSemaphore(self.size + max(0, max_queue))
+        self._condition = threading.Condition()
+        self._idle: List[ChromeInstance] = []
+        self._started = 0
+        self._closed = False
+
+    def render(self, html_path: Path, pdf_path: Path, options: Optional[Dict[str, Any]] = None,
+               timeout: float = 120) -> None:
+        """
+        Stampa un report HTML in PDF
+
+        Il timeout comprende l'attesa in coda. Se la scansione corrente viene
+        annullata, il browser in uso viene chiuso.
+
+        Raises:
+            PDFQueueFull: Coda piena
+            PDFJobTimeout: Timeout in coda o durante la stampa
+            PDFServiceError: Avvio del browser o stampa falliti
+            ScanCancelled: Scansione annullata
+        """
+        token = get_current_token()
+        raise_if_cancelled(token)
+        if not self._slots.acquire(blocking=False):
+            raise PDFQueueFull("Coda PDF piena")
+        try:
+            deadline = time.monotonic() + timeout
+            instance = self._checkout(deadline)
+            healthy = False
+            remove_callback = token.add_callback(instance.close) if token else None
+            try:
+                instance.print_to_pdf(html_path, pdf_path, options or print_options(), deadline)
+                healthy = True
+            except PDFServiceError:
+                raise
+            except Exception as e:
+                raise_if_cancelled(token)
+                raise PDFServiceError(f"Stampa PDF fallita: {e}") from e
+            finally:
+                if remove_callback:
+                    remove_callback()
+                self._checkin(instance, healthy)
+        finally:
+            self._slots.release()
+
+    def warm(self, count: int = 1) -> int:
+        """Avvia in anticipo fino a `count` istanze; ritorna quelle pronte"""
+        for _ in range(count):
+            with self._condition:
+                if self._closed or self._started >= self.size or len(self._idle) >= count:
+                    break
+                self._started += 1
+            try:
+                instance = self._factory(self.chrome_path)
+            except Exception as e:
+                with self._condition:
+                    self._started -= 1
+                logger.warning(f"Avvio di Chrome per i PDF non riuscito: {e}")
+                break
+            self._checkin(instance, True)
+        with self._condition:
+            return len(self._idle)
+
+    def _checkout(self, deadline: float) -> ChromeInstance:
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise PDFServiceError("Pool PDF chiuso")
+                while self._idle:
+                    instance = self._idle.pop()
+                    if instance.alive:
+                        return instance
+                    self._started -= 1
+                if self._started < self.size:
+                    self._started += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PDFJobTimeout("Nessun browser PDF libero entro il timeout")
+                self._condition.wait(remaining)
+        try:
+            return self._factory(self.chrome_path)
+        except BaseException:
+            with self._condition:
+                self._started -= 1
+                self._condition.notify()
+            raise
+
+    def _checkin(self, instance: ChromeInstance, healthy: bool) -> None:
+        with self._condition:
+            if healthy and not self._closed and instance.alive and instance.jobs < self.max_jobs:
+                self._idle.append(instance)
+            else:
+                self._started -= 1
+                instance.close()
+            self._condition.notify()
+
+    def close(self) -> None:
+        """Chiude le istanze libere; quelle in uso alla restituzione"""
+        with self._condition:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._started -= len(idle)
+            self._condition.notify_all()
+        for instance in idle:
+            instance.close()
+
+
+def get_chrome_pool() -> Optional[ChromePDFPool]:
+    """
+    Pool condiviso del processo, creato al primo uso
+
+    None se il pool è disabilitato, Chrome non è installato o manca il
+    client websockets (in questi casi si usa `chrome --print-to-pdf`).
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            return _pool
+        size = _env_int("EAA_PDF_CHROME_POOL", 2)
+        if size <= 0:
+            return None
+        chrome_path = find_chrome()
+        if not chrome_path:
+            return None
+        try:
+            import websockets.sync.client  # noqa: F401
+        except ImportError:
+            logger.debug("websockets non installato: pool Chrome per i PDF disabilitato")
+            return None
+        _pool = ChromePDFPool(chrome_path, size=size, max_queue=_env_int("EAA_PDF_QUEUE_SIZE", 16),
+                              max_jobs=_env_int("EAA_PDF_MAX_JOBS", 100))
+        return _pool
+
+
+def _weasyprint_available() -> bool:
+    try:
+        import weasyprint  # noqa: F401
+    except (ImportError, OSError):
+        return False
+    return True
+
+
+def warm_enabled(engine: str = "auto") -> bool:
+    """
+    True se conviene avviare Chrome prima del primo report
+
+    Con engine "auto" WeasyPrint viene provato per primo e Chrome serve solo
+    se WeasyPrint manca; EAA_PDF_WARM forza la scelta.
+    """
+    value = os.getenv("EAA_PDF_WARM", "").strip().lower()
+    if value:
+        return value in ("1", "true", "yes", "on")
+    if engine == "chrome":
+        return True
+    return engine == "auto" and not _weasyprint_available()
+
+
+def warm_pdf_service(engine: str = "auto") -> int:
+    """Avvia un browser PDF prima del primo report (API e worker); ritorna i browser pronti"""
+    if not warm_enabled(engine):
+        return 0
+    pool = get_chrome_pool()
+    return pool.warm() if pool else 0
+
+
+def shutdown_pdf_service() -> None:
+    """Chiude il pool condiviso (spegnimento dell'applicazione)"""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool:
+        pool.close()
+
+
+atexit.register(shutdown_pdf_service)
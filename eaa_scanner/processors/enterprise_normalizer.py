@@ -21,9 +21,17 @@ from ..models.scanner_results import (
     ScannerType,
     ScanStatus
 )
+from ..metrics import NORMALIZER_INPUTS
 
 logger = logging.getLogger(__name__)
 
+# Campi di ProcessingStats -> etichetta result di eaa_normalizer_inputs_total
+_INPUT_RESULTS = {
+    "successful_validations": "valid",
+    "failed_validations": "invalid",
+    "null_inputs": "null",
+}
+
 
 @dataclass
 class ProcessingStats:
@@ -123,15 +131,15 @@ class EnterpriseNormalizer:
                     wave_result = self._process_wave(url, wave)
                     if wave_result:
                         individual_results.append(wave_result)
-                        self.stats.successful_validations += 1
+                        self._count_input("successful_validations")
                 except Exception as e:
                     logger.error(f"WAVE processing failed: {e}")
-                    self.stats.failed_validations += 1
+                    self._count_input("failed_validations")
                     individual_results.append(self._create_failed_scanner_result(
                         ScannerType.WAVE, url, str(e)
                     ))
             else:
-                self.stats.null_inputs += 1
+                self._count_input("null_inputs")
             
             # Pa11y  
             if pa11y is not None:
@@ -139,15 +147,15 @@ class EnterpriseNormalizer:
                     pa11y_result = self._process_pa11y(url, pa11y)
                     if pa11y_result:
                         individual_results.append(pa11y_result)
-                        self.stats.successful_validations += 1
+                        self._count_input("successful_validations")
                 except Exception as e:
                     logger.error(f"Pa11y processing failed: {e}")
-                    self.stats.failed_validations += 1
+                    self._count_input("failed_validations")
                     individual_results.append(self._create_failed_scanner_result(
                         ScannerType.PA11Y, url, str(e)
                     ))
             else:
-                self.stats.null_inputs += 1
+                self._count_input("null_inputs")
                 
             # Axe-core
             if axe is not None:
@@ -155,15 +163,15 @@ class EnterpriseNormalizer:
                     axe_result = self._process_axe(url, axe)
                     if axe_result:
                         individual_results.append(axe_result)
-                        self.stats.successful_validations += 1
+                        self._count_input("successful_validations")
                 except Exception as e:
                     logger.error(f"Axe processing failed: {e}")
-                    self.stats.failed_validations += 1
+                    self._count_input("failed_validations")
                     individual_results.append(self._create_failed_scanner_result(
                         ScannerType.AXE, url, str(e)
                     ))
             else:
-                self.stats.null_inputs += 1
+                self._count_input("null_inputs")
                 
             # Lighthouse
             if lighthouse is not None:
@@ -171,15 +179,15 @@ class EnterpriseNormalizer:
                     lighthouse_result = self._process_lighthouse(url, lighthouse)
                     if lighthouse_result:
                         individual_results.append(lighthouse_result)
-                        self.stats.successful_validations += 1
+                        self._count_input("successful_validations")
                 except Exception as e:
                     logger.error(f"Lighthouse processing failed: {e}")
-                    self.stats.failed_validations += 1
+                    self._count_input("failed_validations")
                     individual_results.append(self._create_failed_scanner_result(
                         ScannerType.LIGHTHOUSE, url, str(e)
                     ))
             else:
-                self.stats.null_inputs += 1
+                self._count_input("null_inputs")
             
             # Valida che abbiamo almeno un risultato
             if not individual_results:
@@ -711,6 +719,12 @@ class EnterpriseNormalizer:
         
         return mapping.get(audit_id, "")
     
+    def _count_input(self, field: str) -> None:
+        """Aggiorna ProcessingStats e il contatore esportato come metrica"""
+        setattr(self.stats, field, getattr(self.stats, field) + 1)
+        if self.enable_metrics:
+            NORMALIZER_INPUTS.labels(result=_INPUT_RESULTS[field]).inc()
+    
     def get_processing_stats(self) -> ProcessingStats:
         """Restituisce statistiche processing per monitoring"""
         return self.stats
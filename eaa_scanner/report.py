@@ -4,14 +4,26 @@ import html
 import logging
 from pathlib import Path
 from typing import Any, Dict
-from jinja2 import Environment, FileSystemLoader, select_autoescape
+from jinja2 import TemplateNotFound
 import os
 
+from .delivery import precompress_artifact
 from .llm_integration import LLMIntegration
 from .config import Config
+from .templating import get_template
 
 logger = logging.getLogger(__name__)
 
+TEMPLATE_DIR = Path(__file__).parent / "templates"
+
+# Template del report in ordine di preferenza
+REPORT_TEMPLATES = (
+    "report_enterprise_professional.html",
+    "report_professional_v2.html",
+    "report_minimal.html",
+)
+FALLBACK_TEMPLATE = "report_minimal.html"
+
 
 def generate_html_report(data: Dict[str, Any], config: Config = None) -> str:
     """Genera un report HTML dai dati normalizzati usando Jinja2 con supporto LLM"""
@@ -23,32 +35,24 @@ def generate_html_report(data: Dict[str, Any], config: Config = None) -> str:
     # Prepara i dati per il template professionale
     data = prepare_professional_report_data(data)
     
-    # Trova il path dei template - priorità al template professionale v2
-    template_dir = Path(__file__).parent / "templates"
-    if template_dir.exists():
-        # Usa il nuovo template enterprise professionale
+    # Primo template disponibile, dall'ambiente condiviso già compilato
+    try:
+        template = get_template(TEMPLATE_DIR, REPORT_TEMPLATES)
+    except TemplateNotFound as e:
+        logger.warning(f"Template del report non trovati: {e}")
+        return generate_html_report_inline(data)
+    
+    try:
+        return template.render(**data)
+    except Exception as e:
+        logger.warning(f"Errore rendering template {template.name}: {e}")
+    
+    # Il template minimal richiede meno dati
+    if template.name != FALLBACK_TEMPLATE:
         try:
-            env = Environment(
-                loader=FileSystemLoader(template_dir),
-                autoescape=select_autoescape(['html', 'xml'])
-            )
-            # Prova prima il template enterprise professionale
-            try:
-                template = env.get_template("report_enterprise_professional.html")
-                logger.info("✅ Usando template enterprise professionale")
-                return template.render(**data)
-            except:
-                logger.warning("⚠️ Template enterprise non trovato, uso template v2")
-                template = env.get_template("report_professional_v2.html")
-                return template.render(**data)
+            return get_template(TEMPLATE_DIR, FALLBACK_TEMPLATE).render(**data)
         except Exception as e:
-            logger.warning(f"Errore caricamento template professionale v2: {e}")
-            # Prova con il template minimal come fallback
-            try:
-                template = env.get_template("report_minimal.html")
-                return template.render(**data)
-            except Exception as e2:
-                logger.warning(f"Errore caricamento template minimal: {e2}")
+            logger.warning(f"Errore caricamento template minimal: {e}")
     
     # Fallback: genera HTML inline
     return generate_html_report_inline(data)
@@ -784,5 +788,7 @@ def generate_html_report_inline(data: Dict[str, Any]) -> str:
 def write_report(path: Path, html_text: str) -> Path:
     path.parent.mkdir(parents=True, exist_ok=True)
     path.write_text(html_text, encoding="utf-8")
+    # Varianti .gz/.br servite direttamente ai client che le accettano
+    precompress_artifact(path)
     return path
 
@@ -3,20 +3,51 @@ Integrazione eventi di monitoraggio per il sistema di scansione
 Fornisce hook per emettere eventi durante l'esecuzione dei scanner
 """
 
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Callable
+from concurrent.futures import Executor, Future
+from contextlib import contextmanager
+import asyncio
+import contextvars
+import functools
 import threading
 import time
 
+from .cancellation import ScanCancelled, raise_if_cancelled
+from .metrics import SCANNER_SECONDS
+
 class ScanEventHooks:
     """
     Sistema di hook per eventi di scansione
     Permette di emettere eventi durante l'esecuzione dei scanner
+    
+    Gli aggiornamenti ``scanner_operation`` vengono coalescenti per scanner:
+    entro ``coalesce_window`` secondi dall'ultimo inoltro resta in attesa solo
+    l'aggiornamento più recente, consegnato da un timer alla chiusura della
+    finestra (o prima, da un evento fuori finestra o da ``flush``).
+    Start, complete ed errori vengono sempre consegnati.
+    
+    Le consegne di uno stesso scanner sono serializzate da un lock per
+    scanner (acquisito prima di ``_lock``): un aggiornamento consegnato dal
+    timer non può arrivare al monitor dopo il complete/error dello scanner.
     """
     
-    def __init__(self, scan_id: str):
+    def __init__(self, scan_id: str, coalesce_window: float = 0.25):
         self.scan_id = scan_id
         self.monitor = None
         self.start_time = time.time()
+        self.coalesce_window = coalesce_window
+        
+        # Stato coalescing per scanner: ultimo inoltro e aggiornamento in attesa
+        self._last_delivery: Dict[str, float] = {}
+        self._pending_operations: Dict[str, tuple] = {}
+        self._timers: Dict[str, threading.Timer] = {}
+        self._delivery_locks: Dict[str, threading.RLock] = {}
+        self._lock = threading.Lock()
+        self.stats = {
+            "delivered": 0,   # aggiornamenti operation inoltrati al monitor
+            "merged": 0,      # aggiornamenti sostituiti da uno più recente
+            "dropped": 0      # aggiornamenti superati da complete/error
+        }
         
     def set_monitor(self, monitor):
         """Imposta il monitor per emettere eventi"""
@@ -25,23 +56,102 @@ class ScanEventHooks:
     def emit_scanner_start(self, scanner_name: str, url: str, estimated_duration: Optional[int] = None):
         """Hook per inizio scanner"""
         if self.monitor:
-            self.monitor.emit_scanner_start(self.scan_id, scanner_name, url, estimated_duration)
+            with self._delivery_lock(scanner_name):
+                self._discard_pending(scanner_name)
+                self.monitor.emit_scanner_start(self.scan_id, scanner_name, url, estimated_duration)
     
     def emit_scanner_operation(self, scanner_name: str, operation: str, 
                              progress: Optional[int] = None, details: Optional[Dict] = None):
-        """Hook per operazione scanner"""
-        if self.monitor:
+        """Hook per operazione scanner (coalescente per scanner)"""
+        if not self.monitor:
+            return
+        
+        with self._delivery_lock(scanner_name):
+            now = time.time()
+            with self._lock:
+                last = self._last_delivery.get(scanner_name)
+                if last is not None and now - last < self.coalesce_window:
+                    if scanner_name in self._pending_operations:
+                        self.stats["merged"] += 1
+                    self._pending_operations[scanner_name] = (operation, progress, details)
+                    if scanner_name not in self._timers:
+                        timer = threading.Timer(last + self.coalesce_window - now,
+                                                self._deliver_pending, args=(scanner_name,))
+                        timer.daemon = True
+                        self._timers[scanner_name] = timer
+                        timer.start()
+                    return
+                self._cancel_timer(scanner_name)
+                if self._pending_operations.pop(scanner_name, None) is not None:
+                    self.stats["merged"] += 1
+                self._last_delivery[scanner_name] = now
+                self.stats["delivered"] += 1
+            
             self.monitor.emit_scanner_operation(self.scan_id, scanner_name, operation, progress, details)
     
     def emit_scanner_complete(self, scanner_name: str, results_summary: Dict[str, Any]):
         """Hook per completamento scanner"""
         if self.monitor:
-            self.monitor.emit_scanner_complete(self.scan_id, scanner_name, results_summary)
+            with self._delivery_lock(scanner_name):
+                self._discard_pending(scanner_name)
+                self.monitor.emit_scanner_complete(self.scan_id, scanner_name, results_summary)
     
     def emit_scanner_error(self, scanner_name: str, error_message: str, is_critical: bool = False):
         """Hook per errore scanner"""
         if self.monitor:
-            self.monitor.emit_scanner_error(self.scan_id, scanner_name, error_message, is_critical)
+            with self._delivery_lock(scanner_name):
+                self._discard_pending(scanner_name)
+                self.monitor.emit_scanner_error(self.scan_id, scanner_name, error_message, is_critical)
+    
+    def flush(self):
+        """Consegna gli aggiornamenti operation ancora in attesa"""
+        if not self.monitor:
+            return
+        with self._lock:
+            scanner_names = list(self._pending_operations)
+        for scanner_name in scanner_names:
+            self._deliver_pending(scanner_name)
+    
+    def get_stats(self) -> Dict[str, int]:
+        """Contatori del coalescing (delivered/merged/dropped)"""
+        with self._lock:
+            return dict(self.stats)
+    
+    def _deliver_pending(self, scanner_name: str):
+        """Consegna l'aggiornamento in attesa (timer a fine finestra o flush)"""
+        with self._delivery_lock(scanner_name):
+            with self._lock:
+                self._cancel_timer(scanner_name)
+                pending = self._pending_operations.pop(scanner_name, None)
+                if pending is None:
+                    return
+                self._last_delivery[scanner_name] = time.time()
+                self.stats["delivered"] += 1
+            
+            operation, progress, details = pending
+            self.monitor.emit_scanner_operation(self.scan_id, scanner_name, operation, progress, details)
+    
+    def _delivery_lock(self, scanner_name: str) -> threading.RLock:
+        """Lock che serializza le consegne al monitor di uno scanner"""
+        with self._lock:
+            lock = self._delivery_locks.get(scanner_name)
+            if lock is None:
+                lock = self._delivery_locks[scanner_name] = threading.RLock()
+            return lock
+    
+    def _cancel_timer(self, scanner_name: str):
+        """Annulla il timer di consegna di uno scanner (col lock acquisito)"""
+        timer = self._timers.pop(scanner_name, None)
+        if timer is not None:
+            timer.cancel()
+    
+    def _discard_pending(self, scanner_name: str):
+        """Scarta l'aggiornamento in attesa, superato da un evento di stato"""
+        with self._lock:
+            self._cancel_timer(scanner_name)
+            if self._pending_operations.pop(scanner_name, None) is not None:
+                self.stats["dropped"] += 1
+            self._last_delivery.pop(scanner_name, None)
     
     def emit_page_progress(self, current_page: int, total_pages: int, current_url: str):
         """Hook per progresso multi-pagina"""
@@ -51,24 +161,73 @@ class ScanEventHooks:
     def emit_processing_step(self, step_name: str, progress: Optional[int] = None):
         """Hook per step di processing"""
         if self.monitor:
+            # Cambio fase: consegna prima gli aggiornamenti scanner in attesa
+            self.flush()
             self.monitor.emit_processing_step(self.scan_id, step_name, progress)
     
     def emit_report_generation(self, stage: str, progress: Optional[int] = None):
         """Hook per generazione report"""
         if self.monitor:
+            self.flush()
             self.monitor.emit_report_generation(self.scan_id, stage, progress)
 
 
-# Thread-local storage per gli hook attuali
-_local = threading.local()
+# Hook correnti trasportati dal contesto di esecuzione (non dal thread):
+# seguono i task asyncio e, tramite gli helper sotto, i thread degli executor
+_current_hooks: contextvars.ContextVar[Optional[ScanEventHooks]] = contextvars.ContextVar(
+    "eaa_scan_hooks", default=None
+)
+
+def set_current_hooks(hooks: Optional[ScanEventHooks]) -> contextvars.Token:
+    """Imposta gli hook per il contesto corrente (restituisce il token per il reset)"""
+    return _current_hooks.set(hooks)
 
-def set_current_hooks(hooks: ScanEventHooks):
-    """Imposta gli hook per il thread corrente"""
-    _local.hooks = hooks
+def reset_current_hooks(token: contextvars.Token):
+    """Ripristina gli hook precedenti a ``set_current_hooks``"""
+    _current_hooks.reset(token)
 
 def get_current_hooks() -> Optional[ScanEventHooks]:
-    """Ottiene gli hook per il thread corrente"""
-    return getattr(_local, 'hooks', None)
+    """Ottiene gli hook per il contesto corrente"""
+    return _current_hooks.get()
+
+@contextmanager
+def hooks_context(hooks: Optional[ScanEventHooks]):
+    """Context manager che imposta gli hook e li ripristina all'uscita"""
+    token = _current_hooks.set(hooks)
+    try:
+        yield hooks
+    finally:
+        _current_hooks.reset(token)
+
+def submit_with_context(executor: Executor, fn: Callable, *args, **kwargs) -> Future:
+    """
+    ``executor.submit`` che propaga il contesto corrente (hook inclusi)
+    al thread worker, dove altrimenti ``get_current_hooks()`` sarebbe None
+    """
+    ctx = contextvars.copy_context()
+    return executor.submit(ctx.run, fn, *args, **kwargs)
+
+def run_in_executor_with_context(executor: Optional[Executor], fn: Callable, *args, **kwargs) -> asyncio.Future:
+    """``loop.run_in_executor`` che propaga il contesto corrente al worker"""
+    loop = asyncio.get_running_loop()
+    ctx = contextvars.copy_context()
+    return loop.run_in_executor(executor, functools.partial(ctx.run, fn, *args, **kwargs))
+
+def create_task_with_hooks(coro, hooks: Optional[ScanEventHooks] = None) -> asyncio.Task:
+    """
+    Crea un task asyncio con gli hook impostati nel suo contesto
+
+    I task copiano già il contesto alla creazione; ``hooks`` permette di
+    assegnare hook diversi al solo task senza toccare il contesto chiamante.
+    """
+    if hooks is None:
+        return asyncio.create_task(coro)
+
+    async def _run_with_hooks():
+        _current_hooks.set(hooks)
+        return await coro
+
+    return asyncio.create_task(_run_with_hooks())
 
 def emit_scanner_event(event_type: str, scanner_name: str, **kwargs):
     """Utility per emettere eventi dai scanner"""
@@ -102,6 +261,9 @@ class MonitoredScanner:
     def scan(self, url: str):
         """Esegue scan con monitoring"""
         hooks = get_current_hooks()
+        raise_if_cancelled()
+        started = time.perf_counter()
+        outcome = "error"
         
         try:
             # Emit start event
@@ -118,6 +280,7 @@ class MonitoredScanner:
                 
             # Execute scanner
             result = self.scanner.scan(url)
+            outcome = "success" if getattr(result, "json", None) else "empty"
             
             # Emit progress after scan
             if hooks:
@@ -130,11 +293,18 @@ class MonitoredScanner:
             
             return result
             
+        except ScanCancelled:
+            outcome = "cancelled"
+            raise
         except Exception as e:
             # Emit error event
             if hooks:
                 hooks.emit_scanner_error(self.scanner_name, str(e), is_critical=True)
             raise
+        finally:
+            SCANNER_SECONDS.labels(scanner=self.scanner_name.lower(), outcome=outcome).observe(
+                time.perf_counter() - started
+            )
     
     def _extract_summary(self, result_json: dict) -> Dict[str, Any]:
         """Estrae summary dai risultati del scanner"""
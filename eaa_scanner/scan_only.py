@@ -16,6 +16,7 @@ from .scanners.pa11y import Pa11yScanner
 from .scanners.axe import AxeScanner
 from .scanners.lighthouse import LighthouseScanner
 from .scanners.wave import WaveScanner
+from .scan_events import submit_with_context
 # Le funzioni di normalizzazione non esistono ancora, le creiamo inline
 
 logger = logging.getLogger(__name__)
@@ -215,7 +216,8 @@ class ScanOnlyRunner:
                     except Exception as e:
                         logger.error(f"Errore callback progresso {name}: {e}")
                 
-                future = executor.submit(self._run_single_scanner, name, scanner, url)
+                # Propaga il contesto così gli hook eventi restano visibili nel worker
+                future = submit_with_context(executor, self._run_single_scanner, name, scanner, url)
                 futures[future] = name
             
             # Raccogli risultati
@@ -0,0 +1,14 @@
+"""
+Stato condiviso tra processi: record per namespace, contatori, rate limiting e pub/sub
+"""
+
+from .backend import (
+    MemoryStateBackend, SQLiteStateBackend, StateBackend, Subscription, create_state_backend
+)
+from .rate_limit import RateLimitResult
+from .store import SharedRecord, SharedStore
+
+__all__ = [
+    "MemoryStateBackend", "SQLiteStateBackend", "StateBackend", "Subscription", "create_state_backend",
+    "RateLimitResult", "SharedRecord", "SharedStore"
+]
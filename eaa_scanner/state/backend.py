@@ -0,0 +1,575 @@
+"""
+Backend di stato condiviso tra i processi dell'API (uvicorn --workers N)
+
+Lo stato è organizzato in record per namespace: ogni record è un hash di
+campi serializzati singolarmente in JSON, così un aggiornamento di progresso
+non riscrive i risultati e una lettura di stato non li decodifica. Oltre ai
+record il backend offre contatori atomici con scadenza, il rate limiting
+GCRA (rate_limit.py) e un canale pub/sub per gli eventi di progresso.
+
+- MemoryStateBackend: singolo processo (default)
+- SQLiteStateBackend: più processi sullo stesso host (file WAL condiviso)
+- RedisStateBackend: più host (vedi redis_backend.py)
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from .rate_limit import RateLimitResult, gcra
+
+logger = logging.getLogger(__name__)
+
+EventCallback = Callable[[str, Dict[str, Any]], None]
+
+# Eventi pub/sub conservati su SQLite per i processi in ritardo sul polling
+EVENT_RETENTION_SECONDS = 60.0
+
+# Prima parte della chiave di scadenza dei contatori in MemoryStateBackend
+_COUNTER_REF = "$counter"
+
+# Intervallo minimo tra due pulizie dei TAT scaduti fatte durante throttle()
+THROTTLE_SWEEP_SECONDS = 60.0
+
+
+def _encode_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"$datetime": value.isoformat()}
+    return str(value)
+
+
+def _decode_hook(obj: Dict[str, Any]) -> Any:
+    if len(obj) == 1 and "$datetime" in obj:
+        return datetime.fromisoformat(obj["$datetime"])
+    return obj
+
+
+def encode_value(value: Any) -> str:
+    """JSON di un campo; i datetime sopravvivono al round trip"""
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=_encode_default)
+
+
+def decode_value(raw: Optional[str]) -> Any:
+    return None if raw is None else json.loads(raw, object_hook=_decode_hook)
+
+
+class Subscription:
+    """Iscrizione al canale eventi; close() ferma la consegna"""
+
+    def __init__(self, on_close: Optional[Callable[[], None]] = None):
+        self._on_close = on_close
+        self.closed = False
+
+    def close(self) -> None:
+        if not self.closed:
+            self.closed = True
+            if self._on_close:
+                self._on_close()
+
+
+class StateBackend(ABC):
+    """
+    Interfaccia comune dei backend di stato
+
+    Le scadenze (ttl in secondi) valgono per record e contatori; None = nessuna.
+    """
+
+    @abstractmethod
+    def get_fields(self, namespace: str, key: str,
+                   fields: Optional[Iterable[str]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Legge un record, o solo i campi indicati
+
+        Returns:
+            Campi del record (quelli assenti sono omessi), None se il record non esiste
+        """
+        pass
+
+    @abstractmethod
+    def set_fields(self, namespace: str, key: str, values: Dict[str, Any],
+                   ttl: Optional[float] = None, replace: bool = False) -> None:
+        """Scrive campi di un record (creandolo); replace sostituisce l'intero record"""
+        pass
+
+    @abstractmethod
+    def delete_fields(self, namespace: str, key: str, fields: Iterable[str]) -> None:
+        pass
+
+    @abstractmethod
+    def delete(self, namespace: str, key: str) -> bool:
+        pass
+
+    @abstractmethod
+    def exists(self, namespace: str, key: str) -> bool:
+        pass
+
+    @abstractmethod
+    def keys(self, namespace: str) -> List[str]:
+        pass
+
+    def count(self, namespace: str) -> int:
+        return len(self.keys(namespace))
+
+    @abstractmethod
+    def incr(self, name: str, amount: int = 1, ttl: Optional[float] = None) -> int:
+        """
+        Incrementa atomicamente un contatore
+
+        Args:
+            ttl: Scadenza impostata alla creazione del contatore (finestre fisse)
+
+        Returns:
+            Valore dopo l'incremento
+        """
+        pass
+
+    @abstractmethod
+    def get_counter(self, name: str) -> int:
+        pass
+
+    @abstractmethod
+    def throttle(self, key: str, limit: int, period: float, cost: int = 1) -> RateLimitResult:
+        """
+        Consuma `cost` unità dal limite GCRA di una chiave, atomicamente
+
+        Lo stato per chiave è un solo TAT che scade da solo quando il
+        limite torna pieno.
+
+        Args:
+            limit: Richieste ammesse per periodo (anche in raffica)
+            period: Periodo in secondi
+        """
+        pass
+
+    def purge_expired(self) -> int:
+        """Rimuove record e contatori scaduti (no-op dove la scadenza è nativa)"""
+        return 0
+
+    @abstractmethod
+    def publish(self, channel: str, message: Dict[str, Any]) -> None:
+        """Pubblica un evento a tutti i processi iscritti (incluso il chiamante)"""
+        pass
+
+    @abstractmethod
+    def subscribe(self, callback: EventCallback) -> Subscription:
+        """
+        Riceve tutti gli eventi pubblicati da ora in poi
+
+        La callback può essere invocata da un thread del backend.
+        """
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class MemoryStateBackend(StateBackend):
+    """
+    Stato nel processo corrente
+
+    I campi sono conservati serializzati come negli altri backend: un valore
+    letto è sempre una copia e le modifiche annidate non vengono scritte
+    finché non si richiama set_fields.
+    """
+
+    def __init__(self):
+        self._records: Dict[str, Dict[str, Dict[str, str]]] = {}
+        self._expires: Dict[tuple, float] = {}
+        self._counters: Dict[str, int] = {}
+        self._tats: Dict[str, float] = {}
+        self._last_sweep = 0.0
+        self._subscribers: List[EventCallback] = []
+        self._lock = threading.RLock()
+
+    def _alive(self, ref: tuple) -> bool:
+        expires = self._expires.get(ref)
+        if expires is not None and expires <= time.time():
+            self._expires.pop(ref, None)
+            if ref[0] == _COUNTER_REF:
+                self._counters.pop(ref[1], None)
+            else:
+                self._records.get(ref[0], {}).pop(ref[1], None)
+            return False
+        return True
+
+    def _record(self, namespace: str, key: str) -> Optional[Dict[str, str]]:
+        record = self._records.get(namespace, {}).get(key)
+        if record is None or not self._alive((namespace, key)):
+            return None
+        return record
+
+    def get_fields(self, namespace, key, fields=None):
+        with self._lock:
+            record = self._record(namespace, key)
+            if record is None:
+                return None
+            names = record if fields is None else [name for name in fields if name in record]
+            return {name: decode_value(record[name]) for name in names}
+
+    def set_fields(self, namespace, key, values, ttl=None, replace=False):
+        encoded = {name: encode_value(value) for name, value in values.items()}
+        with self._lock:
+            record = None if replace else self._record(namespace, key)
+            if record is None:
+                record = self._records.setdefault(namespace, {})[key] = {}
+                self._expires.pop((namespace, key), None)
+            record.update(encoded)
+            if ttl is not None:
+                self._expires[(namespace, key)] = time.time() + ttl
+
+    def delete_fields(self, namespace, key, fields):
+        with self._lock:
+            record = self._record(namespace, key)
+            for name in fields if record is not None else ():
+                record.pop(name, None)
+
+    def delete(self, namespace, key):
+        with self._lock:
+            existed = self._record(namespace, key) is not None
+            self._records.get(namespace, {}).pop(key, None)
+            self._expires.pop((namespace, key), None)
+            return existed
+
+    def exists(self, namespace, key):
+        with self._lock:
+            return self._record(namespace, key) is not None
+
+    def keys(self, namespace):
+        with self._lock:
+            return [key for key in list(self._records.get(namespace, {})) if self._alive((namespace, key))]
+
+    def incr(self, name, amount=1, ttl=None):
+        with self._lock:
+            ref = (_COUNTER_REF, name)
+            if name not in self._counters or not self._alive(ref):
+                self._counters[name] = 0
+                if ttl is not None:
+                    self._expires[ref] = time.time() + ttl
+            self._counters[name] += amount
+            return self._counters[name]
+
+    def get_counter(self, name):
+        with self._lock:
+            return self._counters.get(name, 0) if self._alive((_COUNTER_REF, name)) else 0
+
+    def throttle(self, key, limit, period, cost=1):
+        now = time.time()
+        with self._lock:
+            if now - self._last_sweep > THROTTLE_SWEEP_SECONDS:
+                self._sweep_tats(now)
+            result, tat = gcra(self._tats.get(key), now, limit, period, cost)
+            if tat is not None:
+                self._tats[key] = tat
+            return result
+
+    def _sweep_tats(self, now: float) -> None:
+        self._last_sweep = now
+        for key in [key for key, tat in self._tats.items() if tat <= now]:
+            del self._tats[key]
+
+    def purge_expired(self):
+        with self._lock:
+            now = time.time()
+            expired = [ref for ref, expires in self._expires.items() if expires <= now]
+            for ref in expired:
+                self._alive(ref)
+            self._sweep_tats(now)
+        return len(expired)
+
+    def publish(self, channel, message):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for callback in subscribers:
+            try:
+                callback(channel, message)
+            except Exception as e:
+                logger.error(f"Errore nel subscriber di {channel}: {e}")
+
+    def subscribe(self, callback):
+        with self._lock:
+            self._subscribers.append(callback)
+
+        def unsubscribe():
+            with self._lock:
+                if callback in self._subscribers:
+                    self._subscribers.remove(callback)
+
+        return Subscription(unsubscribe)
+
+
+STATE_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS state_records (
+        namespace TEXT NOT NULL,
+        key TEXT NOT NULL,
+        expires_at REAL,
+        PRIMARY KEY (namespace, key)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS state_fields (
+        namespace TEXT NOT NULL,
+        key TEXT NOT NULL,
+        field TEXT NOT NULL,
+        value TEXT NOT NULL,
+        PRIMARY KEY (namespace, key, field)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS state_counters (
+        name TEXT PRIMARY KEY,
+        value INTEGER NOT NULL,
+        expires_at REAL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS state_rate_limits (
+        name TEXT PRIMARY KEY,
+        tat REAL NOT NULL
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS state_events (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        channel TEXT NOT NULL,
+        message TEXT NOT NULL,
+        created_at REAL NOT NULL
+    )
+    """,
+)
+
+
+class SQLiteStateBackend(StateBackend):
+    """
+    Stato su file SQLite (WAL) condiviso dai worker uvicorn dello stesso host
+
+    Il pub/sub è una tabella di eventi letta in polling da un thread per
+    iscrizione; gli eventi più vecchi di EVENT_RETENTION_SECONDS vengono rimossi.
+    """
+
+    def __init__(self, path: str, busy_timeout: float = 10.0, poll_interval: float = 0.1):
+        self.path = str(path)
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self.busy_timeout = busy_timeout
+        self.poll_interval = poll_interval
+        self._local = threading.local()
+        self._last_prune = 0.0
+        self._last_sweep = 0.0
+        with self._transaction() as conn:
+            for statement in STATE_SCHEMA:
+                conn.execute(statement)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        else:
+            conn.execute("COMMIT")
+
+    @staticmethod
+    def _live(conn: sqlite3.Connection, namespace: str, key: str) -> bool:
+        row = conn.execute(
+            "SELECT expires_at FROM state_records WHERE namespace = ? AND key = ?", (namespace, key)
+        ).fetchone()
+        return row is not None and (row[0] is None or row[0] > time.time())
+
+    @staticmethod
+    def _drop(conn: sqlite3.Connection, namespace: str, key: str) -> None:
+        conn.execute("DELETE FROM state_fields WHERE namespace = ? AND key = ?", (namespace, key))
+        conn.execute("DELETE FROM state_records WHERE namespace = ? AND key = ?", (namespace, key))
+
+    def get_fields(self, namespace, key, fields=None):
+        conn = self._connection()
+        # Lettura consistente di record e campi (snapshot WAL)
+        conn.execute("BEGIN")
+        try:
+            if not self._live(conn, namespace, key):
+                return None
+            if fields is None:
+                rows = conn.execute(
+                    "SELECT field, value FROM state_fields WHERE namespace = ? AND key = ?", (namespace, key)
+                ).fetchall()
+            else:
+                names = list(fields)
+                rows = conn.execute(
+                    f"SELECT field, value FROM state_fields WHERE namespace = ? AND key = ? "
+                    f"AND field IN ({', '.join('?' for _ in names)})", (namespace, key, *names)
+                ).fetchall() if names else []
+        finally:
+            conn.execute("COMMIT")
+        return {name: decode_value(raw) for name, raw in rows}
+
+    def set_fields(self, namespace, key, values, ttl=None, replace=False):
+        encoded = [(namespace, key, name, encode_value(value)) for name, value in values.items()]
+        with self._transaction() as conn:
+            if replace or not self._live(conn, namespace, key):
+                self._drop(conn, namespace, key)
+                conn.execute("INSERT INTO state_records (namespace, key, expires_at) VALUES (?, ?, ?)",
+                             (namespace, key, time.time() + ttl if ttl is not None else None))
+            elif ttl is not None:
+                conn.execute("UPDATE state_records SET expires_at = ? WHERE namespace = ? AND key = ?",
+                             (time.time() + ttl, namespace, key))
+            conn.executemany("""
+                INSERT INTO state_fields (namespace, key, field, value) VALUES (?, ?, ?, ?)
+                ON CONFLICT(namespace, key, field) DO UPDATE SET value = excluded.value
+            """, encoded)
+
+    def delete_fields(self, namespace, key, fields):
+        names = list(fields)
+        if not names:
+            return
+        with self._transaction() as conn:
+            conn.execute(
+                f"DELETE FROM state_fields WHERE namespace = ? AND key = ? "
+                f"AND field IN ({', '.join('?' for _ in names)})", (namespace, key, *names)
+            )
+
+    def delete(self, namespace, key):
+        with self._transaction() as conn:
+            existed = self._live(conn, namespace, key)
+            self._drop(conn, namespace, key)
+        return existed
+
+    def exists(self, namespace, key):
+        return self._live(self._connection(), namespace, key)
+
+    def keys(self, namespace):
+        rows = self._connection().execute(
+            "SELECT key FROM state_records WHERE namespace = ? AND (expires_at IS NULL OR expires_at > ?)",
+            (namespace, time.time())
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def count(self, namespace):
+        return self._connection().execute(
+            "SELECT COUNT(*) FROM state_records WHERE namespace = ? AND (expires_at IS NULL OR expires_at > ?)",
+            (namespace, time.time())
+        ).fetchone()[0]
+
+    def purge_expired(self) -> int:
+        """Rimuove record e contatori scaduti"""
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute("""
+                DELETE FROM state_fields WHERE (namespace, key) IN (
+                    SELECT namespace, key FROM state_records WHERE expires_at <= ?
+                )
+            """, (now,))
+            removed = conn.execute("DELETE FROM state_records WHERE expires_at <= ?", (now,)).rowcount
+            conn.execute("DELETE FROM state_counters WHERE expires_at <= ?", (now,))
+            conn.execute("DELETE FROM state_rate_limits WHERE tat <= ?", (now,))
+        return removed
+
+    def incr(self, name, amount=1, ttl=None):
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM state_counters WHERE name = ? AND expires_at <= ?", (name, now))
+            return conn.execute("""
+                INSERT INTO state_counters (name, value, expires_at) VALUES (?, ?, ?)
+                ON CONFLICT(name) DO UPDATE SET value = value + excluded.value
+                RETURNING value
+            """, (name, amount, now + ttl if ttl is not None else None)).fetchone()[0]
+
+    def get_counter(self, name):
+        row = self._connection().execute(
+            "SELECT value FROM state_counters WHERE name = ? AND (expires_at IS NULL OR expires_at > ?)",
+            (name, time.time())
+        ).fetchone()
+        return row[0] if row else 0
+
+    def throttle(self, key, limit, period, cost=1):
+        now = time.time()
+        with self._transaction() as conn:
+            if now - self._last_sweep > THROTTLE_SWEEP_SECONDS:
+                self._last_sweep = now
+                conn.execute("DELETE FROM state_rate_limits WHERE tat <= ?", (now,))
+            row = conn.execute("SELECT tat FROM state_rate_limits WHERE name = ?", (key,)).fetchone()
+            result, tat = gcra(row[0] if row else None, now, limit, period, cost)
+            if tat is not None:
+                conn.execute("""
+                    INSERT INTO state_rate_limits (name, tat) VALUES (?, ?)
+                    ON CONFLICT(name) DO UPDATE SET tat = excluded.tat
+                """, (key, tat))
+        return result
+
+    def publish(self, channel, message):
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute("INSERT INTO state_events (channel, message, created_at) VALUES (?, ?, ?)",
+                         (channel, encode_value(message), now))
+            if now - self._last_prune > EVENT_RETENTION_SECONDS:
+                self._last_prune = now
+                conn.execute("DELETE FROM state_events WHERE created_at < ?", (now - EVENT_RETENTION_SECONDS,))
+
+    def subscribe(self, callback):
+        stop = threading.Event()
+        last_id = self._connection().execute("SELECT COALESCE(MAX(id), 0) FROM state_events").fetchone()[0]
+
+        def poll():
+            nonlocal last_id
+            while not stop.wait(self.poll_interval):
+                try:
+                    rows = self._connection().execute(
+                        "SELECT id, channel, message FROM state_events WHERE id > ? ORDER BY id", (last_id,)
+                    ).fetchall()
+                except sqlite3.Error as e:
+                    logger.warning(f"Lettura eventi di stato non riuscita: {e}")
+                    continue
+                for event_id, channel, raw in rows:
+                    last_id = event_id
+                    try:
+                        callback(channel, decode_value(raw))
+                    except Exception as e:
+                        logger.error(f"Errore nel subscriber di {channel}: {e}")
+
+        thread = threading.Thread(target=poll, name="state-events", daemon=True)
+        thread.start()
+        return Subscription(stop.set)
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+def create_state_backend(url: Optional[str] = None) -> StateBackend:
+    """
+    Crea il backend di stato da un URL
+
+    Args:
+        url: None/"memory://" (singolo processo), "sqlite:///percorso/state.db"
+            (o un percorso di file) oppure "redis://host:porta/db"
+    """
+    if not url or url.startswith("memory://"):
+        return MemoryStateBackend()
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        from .redis_backend import RedisStateBackend
+        return RedisStateBackend.from_url(url)
+    if url.startswith("sqlite:///"):
+        url = url[len("sqlite:///"):]
+    return SQLiteStateBackend(url)
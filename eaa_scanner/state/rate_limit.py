@@ -0,0 +1,71 @@
+"""
+Rate limiting GCRA (Generic Cell Rate Algorithm)
+
+Equivale a un token bucket di capacità `limit` che si ricarica in `period`
+secondi, ma per ogni chiave conserva un solo numero: il TAT (theoretical
+arrival time), l'istante in cui il bucket tornerà pieno. Quando il TAT è
+passato lo stato coincide con quello di una chiave nuova, quindi la chiave
+può scadere proprio al TAT: nessuna lista di timestamp, nessuna crescita
+con i client inattivi.
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class RateLimitResult:
+    """Esito di una richiesta al limiter (tempi in secondi)"""
+
+    allowed: bool
+    limit: int
+    remaining: int
+    reset_after: float
+    retry_after: float = 0.0
+
+    def headers(self) -> Dict[str, str]:
+        """Header RateLimit-* (draft IETF) e Retry-After per le risposte 429"""
+        headers = {
+            "RateLimit-Limit": str(self.limit),
+            "RateLimit-Remaining": str(self.remaining),
+            "RateLimit-Reset": str(math.ceil(self.reset_after)),
+        }
+        if not self.allowed:
+            headers["Retry-After"] = str(max(1, math.ceil(self.retry_after)))
+        return headers
+
+
+def gcra(tat: Optional[float], now: float, limit: int, period: float,
+         cost: int = 1) -> Tuple[RateLimitResult, Optional[float]]:
+    """
+    Applica una richiesta al TAT di una chiave
+
+    Args:
+        tat: TAT memorizzato (None per una chiave nuova o scaduta)
+        now: Istante corrente
+        limit: Richieste ammesse per periodo (anche in raffica)
+        period: Periodo in secondi
+        cost: Unità consumate dalla richiesta
+
+    Returns:
+        (esito, nuovo TAT da salvare con scadenza al TAT stesso; None se la
+        richiesta è respinta e lo stato non cambia)
+    """
+    emission = period / limit
+    base = now if tat is None or tat < now else tat
+    new_tat = base + emission * cost
+    allow_at = new_tat - period
+
+    if allow_at > now:
+        result = RateLimitResult(
+            allowed=False, limit=limit, remaining=0,
+            reset_after=base - now, retry_after=allow_at - now
+        )
+        return result, None
+
+    # Tolleranza per gli arrotondamenti sui timestamp epoch
+    remaining = int((now - allow_at) / emission + 1e-3)
+    return RateLimitResult(allowed=True, limit=limit, remaining=remaining, reset_after=new_tat - now), new_tat
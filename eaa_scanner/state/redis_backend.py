@@ -0,0 +1,186 @@
+"""
+Backend Redis dello stato condiviso, per API distribuite su più host
+
+Chiavi (con prefisso):
+- {namespace}:{key}      hash del record (campi JSON, più il marcatore "$")
+- {namespace}:__index__  set delle chiavi del namespace (ripulito in lettura)
+- counter:{name}         contatori
+- throttle:{key}         TAT GCRA in millisecondi (scade al TAT)
+- events                 canale pub/sub degli eventi (channel + message)
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+from typing import Any
+
+from .backend import StateBackend, Subscription, decode_value, encode_value
+from .rate_limit import RateLimitResult
+
+logger = logging.getLogger(__name__)
+
+# Campo sempre presente: distingue un record senza campi da uno inesistente
+MARKER_FIELD = "$"
+
+_INCR_SCRIPT = """
+local value = redis.call('INCRBY', KEYS[1], ARGV[1])
+if ARGV[2] ~= '' and redis.call('PTTL', KEYS[1]) < 0 then
+    redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return value
+"""
+
+# GCRA con l'orologio di Redis, uguale per tutti gli host; tempi in millisecondi
+_THROTTLE_SCRIPT = """
+local limit = tonumber(ARGV[1])
+local period = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) * 1000 + tonumber(clock[2]) / 1000
+local emission = period / limit
+local tat = tonumber(redis.call('GET', KEYS[1]))
+if not tat or tat < now then
+    tat = now
+end
+local new_tat = tat + emission * cost
+local allow_at = new_tat - period
+if allow_at > now then
+    return {0, 0, tostring(tat - now), tostring(allow_at - now)}
+end
+redis.call('SET', KEYS[1], tostring(new_tat), 'PX', math.max(1, math.ceil(new_tat - now)))
+return {1, math.floor((now - allow_at) / emission + 1e-3), tostring(new_tat - now), '0'}
+"""
+
+
+class RedisStateBackend(StateBackend):
+    """Stato su Redis: record come hash, contatori atomici, pub/sub nativo"""
+
+    def __init__(self, client: Any, prefix: str = "eaa:state:"):
+        self.client = client
+        self.prefix = prefix
+        self._incr = client.register_script(_INCR_SCRIPT)
+        self._throttle = client.register_script(_THROTTLE_SCRIPT)
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs: Any) -> "RedisStateBackend":
+        import redis
+        return cls(redis.Redis.from_url(url, decode_responses=True), **kwargs)
+
+    def _key(self, namespace: str, key: str) -> str:
+        return f"{self.prefix}{namespace}:{key}"
+
+    def _index(self, namespace: str) -> str:
+        return f"{self.prefix}{namespace}:__index__"
+
+    def get_fields(self, namespace, key, fields=None):
+        record_key = self._key(namespace, key)
+        if fields is None:
+            data = self.client.hgetall(record_key)
+            if not data:
+                return None
+            data.pop(MARKER_FIELD, None)
+            return {name: decode_value(raw) for name, raw in data.items()}
+
+        names = list(fields)
+        values = self.client.hmget(record_key, [MARKER_FIELD, *names])
+        if values[0] is None:
+            return None
+        return {name: decode_value(raw) for name, raw in zip(names, values[1:]) if raw is not None}
+
+    def set_fields(self, namespace, key, values, ttl=None, replace=False):
+        record_key = self._key(namespace, key)
+        mapping = {name: encode_value(value) for name, value in values.items()}
+        mapping[MARKER_FIELD] = "1"
+        pipe = self.client.pipeline(transaction=True)
+        if replace:
+            pipe.delete(record_key)
+        pipe.hset(record_key, mapping=mapping)
+        if ttl is not None:
+            pipe.pexpire(record_key, int(ttl * 1000))
+        pipe.sadd(self._index(namespace), key)
+        pipe.execute()
+
+    def delete_fields(self, namespace, key, fields):
+        names = [name for name in fields if name != MARKER_FIELD]
+        if names:
+            self.client.hdel(self._key(namespace, key), *names)
+
+    def delete(self, namespace, key):
+        pipe = self.client.pipeline(transaction=True)
+        pipe.delete(self._key(namespace, key))
+        pipe.srem(self._index(namespace), key)
+        return bool(pipe.execute()[0])
+
+    def exists(self, namespace, key):
+        return bool(self.client.exists(self._key(namespace, key)))
+
+    def keys(self, namespace):
+        members = sorted(self.client.smembers(self._index(namespace)))
+        if not members:
+            return []
+        pipe = self.client.pipeline(transaction=False)
+        for key in members:
+            pipe.exists(self._key(namespace, key))
+        alive = pipe.execute()
+        expired = [key for key, present in zip(members, alive) if not present]
+        if expired:
+            # Record scaduti per TTL: l'indice si ripulisce alla lettura
+            self.client.srem(self._index(namespace), *expired)
+        return [key for key, present in zip(members, alive) if present]
+
+    def incr(self, name, amount=1, ttl=None):
+        ttl_ms = str(int(ttl * 1000)) if ttl is not None else ""
+        return int(self._incr(keys=[f"{self.prefix}counter:{name}"], args=[amount, ttl_ms]))
+
+    def get_counter(self, name):
+        return int(self.client.get(f"{self.prefix}counter:{name}") or 0)
+
+    def throttle(self, key, limit, period, cost=1):
+        allowed, remaining, reset_ms, retry_ms = self._throttle(
+            keys=[f"{self.prefix}throttle:{key}"], args=[limit, int(period * 1000), cost]
+        )
+        return RateLimitResult(
+            allowed=bool(allowed), limit=limit, remaining=int(remaining),
+            reset_after=float(reset_ms) / 1000, retry_after=float(retry_ms) / 1000
+        )
+
+    def publish(self, channel, message):
+        self.client.publish(f"{self.prefix}events", json.dumps(
+            {"channel": channel, "message": encode_value(message)}, ensure_ascii=False
+        ))
+
+    def subscribe(self, callback):
+        stop = threading.Event()
+
+        def listen():
+            pubsub = None
+            while not stop.is_set():
+                try:
+                    if pubsub is None:
+                        pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+                        pubsub.subscribe(f"{self.prefix}events")
+                    item = pubsub.get_message(timeout=1.0)
+                except Exception as e:
+                    # Connessione persa: ci si riconnette, gli eventi nel frattempo sono persi
+                    logger.warning(f"Sottoscrizione eventi Redis interrotta: {e}")
+                    pubsub = None
+                    stop.wait(1.0)
+                    continue
+                if item is None or item.get("type") != "message":
+                    continue
+                try:
+                    event = json.loads(item["data"])
+                    callback(event["channel"], decode_value(event["message"]))
+                except Exception as e:
+                    logger.error(f"Errore nel subscriber eventi: {e}")
+            if pubsub is not None:
+                pubsub.close()
+
+        thread = threading.Thread(target=listen, name="state-events-redis", daemon=True)
+        thread.start()
+        return Subscription(stop.set)
+
+    def close(self):
+        self.client.close()
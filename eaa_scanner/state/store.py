@@ -0,0 +1,134 @@
+"""
+Mapping condivisi sopra un StateBackend
+
+SharedStore si usa come il dizionario in memoria che sostituisce
+(store[id] = {...}, id in store, store.get(id)); ogni lettura restituisce
+una fotografia del record come SharedRecord, un dict le cui assegnazioni di
+primo livello vengono scritte subito nel backend. Le modifiche annidate
+(record["results"][url] = ...) restano locali: riassegnare il campo o
+chiamare record.save(campo).
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, Iterator, Mapping, MutableMapping, Optional, Tuple
+
+from .backend import StateBackend
+
+_MISSING = object()
+
+
+class SharedRecord(dict):
+    """Fotografia di un record con scrittura immediata dei campi assegnati"""
+
+    def __init__(self, store: "SharedStore", key: str, data: Mapping[str, Any]):
+        super().__init__(data)
+        self._store = store
+        self.key = key
+
+    def __setitem__(self, name: str, value: Any) -> None:
+        super().__setitem__(name, value)
+        self._store.write(self.key, {name: value})
+
+    def __delitem__(self, name: str) -> None:
+        super().__delitem__(name)
+        self._store.backend.delete_fields(self._store.namespace, self.key, [name])
+
+    def update(self, *args: Any, **kwargs: Any) -> None:
+        values = dict(*args, **kwargs)
+        super().update(values)
+        if values:
+            self._store.write(self.key, values)
+
+    def setdefault(self, name: str, default: Any = None) -> Any:
+        if name not in self:
+            self[name] = default
+        return dict.__getitem__(self, name)
+
+    def pop(self, name: str, default: Any = _MISSING) -> Any:
+        if name in self:
+            value = dict.__getitem__(self, name)
+            del self[name]
+            return value
+        if default is _MISSING:
+            raise KeyError(name)
+        return default
+
+    def save(self, *names: str) -> None:
+        """Scrive i campi indicati dopo modifiche annidate"""
+        self._store.write(self.key, {name: dict.__getitem__(self, name) for name in names})
+
+    def refresh(self) -> "SharedRecord":
+        """Ricarica i campi dal backend (scritture di altri processi)"""
+        data = self._store.backend.get_fields(self._store.namespace, self.key) or {}
+        dict.clear(self)
+        dict.update(self, data)
+        return self
+
+    def __copy__(self) -> Dict[str, Any]:
+        return dict(self)
+
+    def __reduce__(self):
+        # Copie e pickle diventano dizionari semplici, slegati dal backend
+        return dict, (dict(self),)
+
+
+class SharedStore(MutableMapping):
+    """
+    Dizionario di record condiviso tra processi
+
+    Args:
+        backend: Backend di stato
+        namespace: Namespace dei record
+        ttl: Scadenza dei record in secondi, rinnovata a ogni scrittura
+    """
+
+    def __init__(self, backend: StateBackend, namespace: str, ttl: Optional[float] = None):
+        self.backend = backend
+        self.namespace = namespace
+        self.ttl = ttl
+
+    def __getitem__(self, key: str) -> SharedRecord:
+        data = self.backend.get_fields(self.namespace, key)
+        if data is None:
+            raise KeyError(key)
+        return SharedRecord(self, key, data)
+
+    def __setitem__(self, key: str, value: Mapping[str, Any]) -> None:
+        self.backend.set_fields(self.namespace, key, dict(value), ttl=self.ttl, replace=True)
+
+    def __delitem__(self, key: str) -> None:
+        if not self.backend.delete(self.namespace, key):
+            raise KeyError(key)
+
+    def __contains__(self, key: object) -> bool:
+        return isinstance(key, str) and self.backend.exists(self.namespace, key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.backend.keys(self.namespace))
+
+    def __len__(self) -> int:
+        return self.backend.count(self.namespace)
+
+    def items(self) -> Iterator[Tuple[str, SharedRecord]]:
+        """Coppie (chiave, record), saltando i record rimossi durante l'iterazione"""
+        for key in self.backend.keys(self.namespace):
+            data = self.backend.get_fields(self.namespace, key)
+            if data is not None:
+                yield key, SharedRecord(self, key, data)
+
+    def values(self) -> Iterator[SharedRecord]:
+        return (record for _, record in self.items())
+
+    def create(self, key: str, value: Mapping[str, Any]) -> SharedRecord:
+        """Sostituisce il record e ne restituisce la versione condivisa"""
+        self[key] = value
+        return SharedRecord(self, key, value)
+
+    def fields(self, key: str, names: Iterable[str]) -> Optional[Dict[str, Any]]:
+        """Lettura parziale (es. solo i campi di stato, senza i risultati)"""
+        return self.backend.get_fields(self.namespace, key, names)
+
+    def write(self, key: str, values: Dict[str, Any]) -> None:
+        """Aggiorna campi di un record (creandolo se necessario)"""
+        self.backend.set_fields(self.namespace, key, values, ttl=self.ttl)
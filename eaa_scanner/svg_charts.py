@@ -0,0 +1,648 @@
+"""
+Grafici SVG vettoriali per i report HTML
+
+Alternativa al backend matplotlib di ChartGenerator: gauge, donut, radar,
+barre, timeline e matrice di rischio sono scritti come testo SVG
+direttamente dai dati analytics, in pochi millisecondi e in pochi KB invece
+delle centinaia di KB di un PNG in base64. Ogni SVG ha role="img" con
+<title> e <desc> che riportano i valori rappresentati, così il grafico resta
+accessibile anche incorporato inline.
+
+Il PNG resta disponibile per i motori PDF che non rendono gli SVG: il
+formato di una scansione si sceglie con resolve_chart_format.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import math
+import re
+from html import escape
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence, Tuple
+from urllib.parse import quote
+
+logger = logging.getLogger(__name__)
+
+CHART_FORMATS = ("svg", "png")
+
+# Formato dei grafici per tipo di report ("auto": SVG, PNG se il motore PDF lo richiede)
+REPORT_CHART_FORMATS: Dict[str, str] = {
+    "standard": "auto",
+    "professional": "auto",
+    "enterprise": "auto",
+}
+
+# Motori PDF che non rendono in modo affidabile le immagini SVG
+RASTER_PDF_ENGINES = frozenset({"wkhtmltopdf"})
+
+# Grafici di generate_all_charts: (chiave, metodo, sezione analytics, nome file);
+# la sezione None passa tutti i dati analytics. Condivisi dai backend PNG e SVG.
+CHART_SPECS: Tuple[Tuple[str, str, Optional[str], str], ...] = (
+    ('dashboard', 'create_dashboard', None, 'dashboard'),
+    ('compliance_gauge', 'create_compliance_gauge', 'executive_summary', 'compliance_gauge'),
+    ('severity_donut', 'create_severity_donut', 'quantitative_analysis', 'severity_donut'),
+    ('wcag_principles', 'create_wcag_principles_radar', 'wcag_analysis', 'wcag_radar'),
+    ('issues_by_category', 'create_category_bar_chart', 'category_analysis', 'category_bars'),
+    ('scanner_comparison', 'create_scanner_comparison', 'scanner_comparison', 'scanner_comparison'),
+    ('remediation_timeline', 'create_remediation_timeline', 'effort_estimation', 'remediation_timeline'),
+    ('risk_matrix', 'create_risk_matrix', 'risk_assessment', 'risk_matrix'),
+    ('benchmark_comparison', 'create_benchmark_chart', 'benchmarks', 'benchmark'),
+)
+
+# Palette colori accessibili e professionali (condivisa con ChartGenerator)
+COLORS = {
+    'primary': '#2E5266',      # Blu scuro professionale
+    'secondary': '#6E8898',    # Grigio blu
+    'success': '#52B788',      # Verde successo
+    'warning': '#F77F00',      # Arancione warning
+    'danger': '#D62828',       # Rosso errore
+    'info': '#4CC9F0',         # Azzurro info
+    'light': '#F8F9FA',        # Grigio chiaro
+    'dark': '#212529',         # Grigio scuro
+
+    # Colori per severità
+    'critical': '#D62828',
+    'high': '#F77F00',
+    'medium': '#FFC107',
+    'low': '#52B788',
+
+    # Colori per principi WCAG
+    'perceivable': '#2E5266',
+    'operable': '#6E8898',
+    'understandable': '#52B788',
+    'robust': '#4CC9F0'
+}
+
+GRID_COLOR = '#DEE2E6'
+FONT_FAMILY = "Arial, Helvetica, 'DejaVu Sans', sans-serif"
+
+# Zone del gauge di conformità: (limite superiore, colore)
+GAUGE_ZONES: Tuple[Tuple[float, str], ...] = (
+    (40, '#D62828'), (60, '#F77F00'), (75, '#FFC107'), (85, '#52B788'), (100, '#2E5266')
+)
+
+_PRINCIPLES = (
+    ('perceivable', 'Percepibile'),
+    ('operable', 'Operabile'),
+    ('understandable', 'Comprensibile'),
+    ('robust', 'Robusto'),
+)
+
+_SEVERITIES = (('critical', 'Critici'), ('high', 'Alti'), ('medium', 'Medi'), ('low', 'Bassi'))
+
+_SEVERITY_LEGEND = (('Critici', COLORS['critical']), ('Alti', COLORS['high']), ('Altri', COLORS['medium']))
+
+SVG_DATA_URI_PREFIX = "data:image/svg+xml;charset=utf-8,"
+
+# Segmento di una barra: (valore, colore)
+Segment = Tuple[float, str]
+
+
+def resolve_chart_format(chart_format: str = "auto", pdf_engine: str = "auto",
+                         report_type: str = "standard") -> str:
+    """
+    Formato dei grafici di una scansione
+
+    Args:
+        chart_format: "svg", "png" o "auto" (default del tipo di report)
+        pdf_engine: Motore PDF configurato, che stampa lo stesso HTML
+        report_type: Tipo di report (chiave di REPORT_CHART_FORMATS)
+
+    Returns:
+        "svg" o "png"
+    """
+    chart_format = (chart_format or "auto").lower()
+    if chart_format == "auto":
+        chart_format = REPORT_CHART_FORMATS.get(report_type, "auto")
+    if chart_format in CHART_FORMATS:
+        return chart_format
+    return "png" if (pdf_engine or "").lower() in RASTER_PDF_ENGINES else "svg"
+
+
+def create_chart_generator(output_dir: Optional[Path] = None, chart_format: str = "svg"):
+    """ChartGenerator (PNG con matplotlib, importato solo qui) o SVGChartGenerator"""
+    if chart_format == "png":
+        from .charts import ChartGenerator
+        return ChartGenerator(output_dir=output_dir)
+    return SVGChartGenerator(output_dir=output_dir)
+
+
+def data_uri(svg: str) -> str:
+    """Data URI per <img src>: percent-encoding, più compatto del base64"""
+    return SVG_DATA_URI_PREFIX + quote(svg, safe="=:/;,.'()#-_")
+
+
+def _num(value: float) -> str:
+    """Numero compatto per coordinate e valori (al più un decimale)"""
+    text = f"{value:.1f}"
+    return text[:-2] if text.endswith(".0") else text
+
+
+def _text(x: float, y: float, content: Any, size: int = 12, anchor: str = "middle",
+          weight: Optional[str] = None, color: Optional[str] = None) -> str:
+    attrs = f'x="{_num(x)}" y="{_num(y)}" font-size="{size}" text-anchor="{anchor}"'
+    if weight:
+        attrs += f' font-weight="{weight}"'
+    if color:
+        attrs += f' fill="{color}"'
+    return f'<text {attrs}>{escape(str(content))}</text>'
+
+
+def svg_document(width: float, height: float, title: str, description: str, body: str) -> str:
+    """
+    Documento SVG accessibile
+
+    Il titolo è anche il nome accessibile; la descrizione riporta i valori
+    del grafico in forma testuale.
+    """
+    chart_id = "c" + hashlib.sha1(f"{title}\n{description}".encode("utf-8")).hexdigest()[:8]
+    width, height = _num(width), _num(height)
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {width} {height}" '
+        f'width="{width}" height="{height}" role="img" '
+        f'aria-labelledby="{chart_id}-t {chart_id}-d" font-family="{FONT_FAMILY}" fill="{COLORS["dark"]}">'
+        f'<title id="{chart_id}-t">{escape(title)}</title>'
+        f'<desc id="{chart_id}-d">{escape(description)}</desc>'
+        f'<rect width="100%" height="100%" fill="#fff"/>'
+        f'{_text(float(width) / 2, 24, title, 15, weight="bold")}{body}</svg>'
+    )
+
+
+def svg_size(svg: str) -> Tuple[float, float]:
+    """Larghezza e altezza dichiarate dal documento SVG"""
+    match = re.match(r'<svg [^>]*?width="([\d.]+)" height="([\d.]+)"', svg)
+    return (float(match.group(1)), float(match.group(2))) if match else (0.0, 0.0)
+
+
+def _embed(svg: str, x: float, y: float) -> str:
+    """Posiziona un grafico dentro un altro (pannelli della dashboard)"""
+    return svg.replace('<svg xmlns="http://www.w3.org/2000/svg" ', f'<svg x="{_num(x)}" y="{_num(y)}" ', 1)
+
+
+def _message(title: str, message: str, width: float = 360, height: float = 120) -> str:
+    return svg_document(width, height, title, message, _text(width / 2, height / 2 + 14, message, 14))
+
+
+def _gauge_point(cx: float, cy: float, r: float, fraction: float) -> Tuple[float, float]:
+    """Punto del semicerchio superiore (0 = sinistra, 1 = destra)"""
+    angle = math.pi * (1 - min(max(fraction, 0.0), 1.0))
+    return cx + r * math.cos(angle), cy - r * math.sin(angle)
+
+
+def _arc(cx: float, cy: float, r: float, start: float, end: float, color: str, width: float) -> str:
+    x0, y0 = _gauge_point(cx, cy, r, start)
+    x1, y1 = _gauge_point(cx, cy, r, end)
+    return (f'<path d="M{_num(x0)} {_num(y0)}A{_num(r)} {_num(r)} 0 0 1 {_num(x1)} {_num(y1)}" '
+            f'fill="none" stroke="{color}" stroke-width="{_num(width)}"/>')
+
+
+def gauge(score: float, title: str, label: str, color: str,
+          zones: Optional[Sequence[Tuple[float, str]]] = None) -> str:
+    """
+    Gauge semicircolare 0-100
+
+    Args:
+        score: Valore indicato
+        label: Testo sotto il valore (es. livello di conformità)
+        color: Colore del valore (e dell'arco senza zone)
+        zones: (limite superiore, colore) delle fasce; senza fasce l'arco
+            riempito arriva al valore
+    """
+    score = min(max(float(score or 0), 0.0), 100.0)
+    width, height, cx, cy, r = 320, 230, 160, 170, 110
+    parts = []
+    if zones:
+        start = 0.0
+        for upper, zone_color in zones:
+            parts.append(_arc(cx, cy, r, start / 100, upper / 100, zone_color, 26))
+            start = upper
+        nx, ny = _gauge_point(cx, cy, r - 24, score / 100)
+        parts.append(f'<line x1="{cx}" y1="{cy}" x2="{_num(nx)}" y2="{_num(ny)}" stroke="{COLORS["dark"]}" '
+                     f'stroke-width="4" stroke-linecap="round"/>')
+        parts.append(f'<circle cx="{cx}" cy="{cy}" r="8" fill="#fff" stroke="{COLORS["dark"]}" stroke-width="3"/>')
+        value_y, label_y = cy - 52, cy + 36
+    else:
+        parts.append(_arc(cx, cy, r, 0, 1, GRID_COLOR, 26))
+        if score > 0:
+            parts.append(_arc(cx, cy, r, 0, score / 100, color, 26))
+        value_y, label_y = cy - 10, cy + 22
+    parts.append(_text(cx, value_y, _num(score), 34, weight="bold", color=color))
+    parts.append(_text(cx, label_y, label, 13, weight="bold", color=color))
+    parts.append(_text(cx - r, cy + 20, "0", 10))
+    parts.append(_text(cx + r, cy + 20, "100", 10))
+    return svg_document(width, height, title, f"Punteggio {_num(score)} su 100: {label}", "".join(parts))
+
+
+def donut(segments: Sequence[Tuple[str, float, str]], title: str, center_label: str = "Totale",
+          empty_message: str = "Nessun problema rilevato") -> str:
+    """
+    Donut con legenda
+
+    Args:
+        segments: (etichetta, valore, colore); i valori nulli sono omessi
+    """
+    segments = [(label, float(value), color) for label, value, color in segments if value and value > 0]
+    total = sum(value for _, value, _ in segments)
+    if not total:
+        return _message(title, empty_message)
+
+    width, height, cx, cy, r, stroke = 380, 250, 120, 140, 68, 34
+    circumference = 2 * math.pi * r
+    parts, legend, offset = [], [], 0.0
+    for n, (label, value, color) in enumerate(segments):
+        length = circumference * value / total
+        parts.append(
+            f'<circle cx="{cx}" cy="{cy}" r="{r}" fill="none" stroke="{color}" stroke-width="{stroke}" '
+            f'stroke-dasharray="{_num(length)} {_num(circumference - length)}" '
+            f'stroke-dashoffset="{_num(-offset)}" transform="rotate(-90 {cx} {cy})"/>'
+        )
+        offset += length
+        share = f"{_num(value)} ({value / total:.0%})"
+        y = 70 + n * 24
+        parts.append(f'<rect x="236" y="{y - 11}" width="14" height="14" fill="{color}"/>')
+        parts.append(_text(258, y, f"{label}: {share}", 12, anchor="start"))
+        legend.append(f"{label} {share}")
+    parts.append(_text(cx, cy + 2, _num(total), 22, weight="bold"))
+    parts.append(_text(cx, cy + 20, center_label, 11))
+    description = f"{center_label} {_num(total)}: " + ", ".join(legend)
+    return svg_document(width, height, title, description, "".join(parts))
+
+
+def radar(axes: Sequence[Tuple[str, float]], title: str, color: str, max_value: float = 100) -> str:
+    """Radar con una serie di valori tra 0 e max_value, un asse per voce"""
+    width, height, cx, cy, r = 380, 330, 190, 180, 105
+    count = len(axes)
+    if count < 3:
+        return _message(title, "Dati insufficienti")
+
+    def point(n: int, fraction: float) -> Tuple[float, float]:
+        angle = -math.pi / 2 + 2 * math.pi * n / count
+        return cx + r * fraction * math.cos(angle), cy + r * fraction * math.sin(angle)
+
+    def polygon(fractions: Sequence[float]) -> str:
+        return " ".join(f"{_num(x)},{_num(y)}" for x, y in (point(n, f) for n, f in enumerate(fractions)))
+
+    parts = []
+    for ring in (0.25, 0.5, 0.75, 1.0):
+        parts.append(f'<polygon points="{polygon([ring] * count)}" fill="none" stroke="{GRID_COLOR}"/>')
+    for n, (label, _) in enumerate(axes):
+        x, y = point(n, 1.0)
+        parts.append(f'<line x1="{cx}" y1="{cy}" x2="{_num(x)}" y2="{_num(y)}" stroke="{GRID_COLOR}"/>')
+        lx, ly = point(n, 1.2)
+        anchor = "middle" if abs(lx - cx) < 1 else ("start" if lx > cx else "end")
+        parts.append(_text(lx, ly + 4, label, 12, anchor=anchor, weight="bold"))
+
+    fractions = [min(max(float(value or 0) / max_value, 0.0), 1.0) for _, value in axes]
+    parts.append(f'<polygon points="{polygon(fractions)}" fill="{color}" fill-opacity="0.25" '
+                 f'stroke="{color}" stroke-width="2"/>')
+    for n, (_, value) in enumerate(axes):
+        x, y = point(n, fractions[n])
+        parts.append(f'<circle cx="{_num(x)}" cy="{_num(y)}" r="3.5" fill="{color}"/>')
+        parts.append(_text(x, y - 8, _num(float(value or 0)), 11, weight="bold"))
+    description = ", ".join(f"{label}: {_num(float(value or 0))} su {_num(max_value)}" for label, value in axes)
+    return svg_document(width, height, title, description, "".join(parts))
+
+
+def bar_chart(rows: Sequence[Tuple[str, Sequence[Segment]]], title: str,
+              legend: Sequence[Tuple[str, str]] = (), max_value: Optional[float] = None,
+              reference: Optional[Tuple[float, str]] = None,
+              empty_message: str = "Nessun dato disponibile") -> str:
+    """
+    Barre orizzontali, impilate quando una riga ha più segmenti
+
+    Args:
+        rows: (etichetta, segmenti) per riga
+        legend: (nome, colore) dei segmenti, nello stesso ordine
+        max_value: Fondo scala (default: totale massimo)
+        reference: (valore, etichetta) di una linea verticale di riferimento
+    """
+    rows = [(label, [(float(value or 0), color) for value, color in segments]) for label, segments in rows]
+    totals = [sum(value for value, _ in segments) for _, segments in rows]
+    if not rows:
+        return _message(title, empty_message)
+
+    label_width, bar_width, row_height = 160, 300, 28
+    top = 44 + (22 if legend else 0) + (18 if reference else 0)
+    width = label_width + bar_width + 60
+    height = top + len(rows) * row_height + 12
+    scale_max = max_value or max(totals + [reference[0] if reference else 0]) or 1
+    scale = bar_width / scale_max
+
+    parts = []
+    x = label_width
+    for name, color in legend:
+        parts.append(f'<rect x="{x}" y="38" width="12" height="12" fill="{color}"/>')
+        parts.append(_text(x + 16, 48, name, 11, anchor="start"))
+        x += 24 + 7 * len(name)
+
+    descriptions = []
+    for n, ((label, segments), total) in enumerate(zip(rows, totals)):
+        y = top + n * row_height
+        parts.append(_text(label_width - 8, y + 16, label, 12, anchor="end"))
+        x = float(label_width)
+        for value, color in segments:
+            if value > 0:
+                parts.append(f'<rect x="{_num(x)}" y="{y + 4}" width="{_num(value * scale)}" '
+                             f'height="{row_height - 8}" fill="{color}"/>')
+                x += value * scale
+        parts.append(_text(x + 6, y + 16, _num(total), 11, anchor="start", weight="bold"))
+        detail = ""
+        if legend and len(segments) > 1:
+            detail = " (" + ", ".join(f"{name} {_num(value)}" for (name, _), (value, _) in zip(legend, segments)) + ")"
+        descriptions.append(f"{label}: {_num(total)}{detail}")
+
+    if reference:
+        value, label = reference
+        rx = label_width + float(value) * scale
+        parts.append(f'<line x1="{_num(rx)}" y1="{top - 4}" x2="{_num(rx)}" y2="{height - 8}" '
+                     f'stroke="{COLORS["primary"]}" stroke-width="2" stroke-dasharray="6 4"/>')
+        parts.append(_text(rx, top - 8, label, 11, weight="bold", color=COLORS["primary"]))
+        descriptions.append(label)
+    return svg_document(width, height, title, "; ".join(descriptions), "".join(parts))
+
+
+def timeline(rows: Sequence[Tuple[str, str, str]], title: str, footer: str = "",
+             empty_message: str = "Nessun piano disponibile") -> str:
+    """
+    Timeline a gradini (una fase per riga, in sequenza)
+
+    Args:
+        rows: (periodo, attività, colore)
+    """
+    if not rows:
+        return _message(title, empty_message)
+
+    label_width, step, row_height = 110, 60, 30
+    top = 44
+    width = label_width + step * len(rows) + 240
+    height = top + len(rows) * row_height + (34 if footer else 12)
+    parts = []
+    for n, (period, activity, color) in enumerate(rows):
+        y = top + n * row_height
+        x = label_width + n * step
+        parts.append(_text(label_width - 8, y + 18, period, 12, anchor="end"))
+        parts.append(f'<rect x="{x}" y="{y + 5}" width="{step}" height="{row_height - 10}" rx="3" fill="{color}"/>')
+        parts.append(_text(x + step + 6, y + 18, activity, 12, anchor="start"))
+    if footer:
+        parts.append(_text(width / 2, height - 12, footer, 11))
+    description = "; ".join(f"{period}: {activity}" for period, activity, _ in rows)
+    if footer:
+        description += f". {footer}"
+    return svg_document(width, height, title, description, "".join(parts))
+
+
+def risk_matrix(markers: Sequence[Tuple[str, str, int, int]], title: str,
+                cell_colors: Sequence[Sequence[str]], x_labels: Sequence[str],
+                y_labels: Sequence[str], x_title: str = "Probabilità", y_title: str = "Impatto") -> str:
+    """
+    Matrice di rischio con i rischi posizionati nelle celle
+
+    Args:
+        markers: (nome, livello, colonna, riga); riga 0 in basso
+        cell_colors: Colori per riga (dal basso) e colonna
+    """
+    size = len(cell_colors)
+    cell, left, top = 80, 90, 44
+    width = left + cell * size + 30
+    height = top + cell * size + 80
+    parts = []
+    for row in range(size):
+        for col in range(size):
+            y = top + (size - 1 - row) * cell
+            parts.append(f'<rect x="{left + col * cell}" y="{y}" width="{cell}" height="{cell}" '
+                         f'fill="{cell_colors[row][col]}" fill-opacity="0.7" stroke="#fff" stroke-width="2"/>')
+    for n, label in enumerate(x_labels):
+        parts.append(_text(left + n * cell + cell / 2, top + size * cell + 18, label, 11))
+    for n, label in enumerate(y_labels):
+        parts.append(_text(left - 8, top + (size - 1 - n) * cell + cell / 2 + 4, label, 11, anchor="end"))
+    parts.append(_text(left + size * cell / 2, top + size * cell + 38, x_title, 12, weight="bold"))
+    parts.append(_text(18, top + size * cell / 2, y_title, 12, weight="bold").replace(
+        "<text ", f'<text transform="rotate(-90 18 {_num(top + size * cell / 2)})" ', 1))
+
+    # Rischi nella stessa cella affiancati
+    occupied: Dict[Tuple[int, int], int] = {}
+    for name, level, col, row in markers:
+        shift = occupied.get((col, row), 0)
+        occupied[(col, row)] = shift + 1
+        x = left + col * cell + cell / 2 + (shift * 26 - 13 if shift else 0)
+        y = top + (size - 1 - row) * cell + cell / 2
+        parts.append(f'<circle cx="{_num(x)}" cy="{_num(y)}" r="13" fill="#fff" stroke="{COLORS["dark"]}" stroke-width="2.5"/>')
+        parts.append(_text(x, y + 5, name[:1], 13, weight="bold"))
+    legend = "   ".join(f"{name[:1]} = Rischio {name} ({level})" for name, level, _, _ in markers)
+    parts.append(_text(width / 2, height - 14, legend, 11))
+    description = "; ".join(f"Rischio {name}: {level}" for name, level, _, _ in markers)
+    return svg_document(width, height, title, description, "".join(parts))
+
+
+def metric_panel(metrics: Sequence[Tuple[str, str, str]], title: str) -> str:
+    """Pannello di indicatori numerici: (valore, etichetta, colore)"""
+    width, row_height = 300, 50
+    height = 44 + len(metrics) * row_height
+    parts = []
+    for n, (value, label, color) in enumerate(metrics):
+        y = 44 + n * row_height
+        parts.append(f'<rect x="20" y="{y}" width="{width - 40}" height="{row_height - 8}" rx="6" '
+                     f'fill="{color}" fill-opacity="0.15" stroke="{color}"/>')
+        parts.append(_text(110, y + 28, value, 20, anchor="end", weight="bold", color=color))
+        parts.append(_text(124, y + 27, label, 12, anchor="start"))
+    description = ", ".join(f"{label}: {value}" for value, label, _ in metrics)
+    return svg_document(width, height, title, description, "".join(parts))
+
+
+def _level_color(level: str) -> str:
+    if 'non' in level:
+        return COLORS['danger']
+    if 'parzial' in level:
+        return COLORS['warning']
+    return COLORS['success']
+
+
+class SVGChartGenerator:
+    """
+    Backend SVG di ChartGenerator
+
+    Stesse chiavi e stessi dati di ChartGenerator.generate_all_charts; i
+    valori sono data URI SVG e i file salvati hanno estensione .svg.
+    """
+
+    COLORS = COLORS
+
+    def __init__(self, output_dir: Optional[Path] = None, write_files: bool = True):
+        """
+        Args:
+            output_dir: Directory output per salvare grafici
+            write_files: False per produrre solo i data URI
+        """
+        self.write_files = write_files
+        self.output_dir = Path(output_dir) if output_dir else Path.cwd() / "charts"
+        if write_files:
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+
+    def generate_all_charts(self, analytics_data: Dict[str, Any]) -> Dict[str, str]:
+        """
+        Genera tutti i grafici per il report
+
+        Returns:
+            Dizionario con i data URI SVG dei grafici generati
+        """
+        charts = {}
+        for key, method, section, file_name in CHART_SPECS:
+            data = analytics_data if section is None else analytics_data.get(section, {})
+            try:
+                svg = getattr(self, method)(data or {})
+            except Exception as e:
+                logger.error(f"Errore generazione grafico SVG {key}: {e}")
+                continue
+            if self.write_files:
+                try:
+                    (self.output_dir / f"{file_name}.svg").write_text(svg, encoding="utf-8")
+                except OSError as e:
+                    logger.error(f"Errore salvataggio grafico {key}: {e}")
+            charts[key] = data_uri(svg)
+        return charts
+
+    def create_dashboard(self, analytics_data: Dict[str, Any]) -> str:
+        """Dashboard riepilogativa: score, severità, principi WCAG, criteri violati, effort"""
+        summary = analytics_data.get('executive_summary', {})
+        wcag_data = analytics_data.get('wcag_analysis', {})
+        effort = analytics_data.get('effort_estimation', {})
+        improvement = analytics_data.get('trend_indicators', {}).get('improvement_potential', {})
+
+        principles = wcag_data.get('principle_distribution', {})
+        principle_rows = [
+            (label, [(principles.get(key, {}).get('errors', 0), self.COLORS['danger']),
+                     (principles.get(key, {}).get('warnings', 0), self.COLORS['warning'])])
+            for key, label in _PRINCIPLES
+        ]
+        top_issues = [
+            (f"WCAG {item.get('criteria', '')}", [(item.get('violations', 0), self.COLORS['danger'])])
+            for item in wcag_data.get('most_violated_criteria', [])[:5]
+        ]
+        panels = [
+            [
+                self.create_compliance_gauge(summary),
+                self.create_severity_donut(analytics_data.get('quantitative_analysis', {})),
+                metric_panel([
+                    (f"{int(effort.get('total_hours', 0) or 0)}", "Ore totali", self.COLORS['primary']),
+                    (f"{float(effort.get('estimated_days', 0) or 0):.1f}", "Giorni", self.COLORS['secondary']),
+                    (f"€ {float(effort.get('estimated_cost_eur', 0) or 0):,.0f}", "Costo stimato", self.COLORS['warning']),
+                    (f"{len(improvement.get('quick_wins', []))}", "Quick wins", self.COLORS['success']),
+                ], 'Stima Effort Remediation'),
+            ],
+            [
+                bar_chart(principle_rows, 'Principi WCAG (POUR)',
+                          legend=[('Errori', self.COLORS['danger']), ('Avvisi', self.COLORS['warning'])]),
+                bar_chart(top_issues, 'Top 5 Criteri WCAG Violati', empty_message='Nessun problema'),
+            ],
+        ]
+
+        body, y, width = [], 44, 0.0
+        for row in panels:
+            x, row_height = 0.0, 0.0
+            for panel in row:
+                panel_width, panel_height = svg_size(panel)
+                body.append(_embed(panel, x, y))
+                x += panel_width + 20
+                row_height = max(row_height, panel_height)
+            width = max(width, x - 20)
+            y += row_height + 20
+        score = summary.get('compliance_score', 0)
+        level = str(summary.get('compliance_level', 'non_conforme')).replace('_', ' ')
+        return svg_document(width, y, 'Dashboard Accessibilità - Analisi Complessiva',
+                            f"Score {_num(float(score or 0))}, {level}", "".join(body))
+
+    def create_compliance_gauge(self, executive_summary: Dict[str, Any]) -> str:
+        """Gauge dello score di conformità con le fasce di valutazione"""
+        score = executive_summary.get('compliance_score', 0) or 0
+        level = str(executive_summary.get('compliance_level', 'non_conforme'))
+        return gauge(score, 'Score di Conformità WCAG', level.replace('_', ' ').upper(),
+                     _level_color(level), zones=GAUGE_ZONES)
+
+    def create_severity_donut(self, quantitative_data: Dict[str, Any]) -> str:
+        """Donut della distribuzione per severità"""
+        breakdown = quantitative_data.get('severity_breakdown', {})
+        segments = [
+            (label, breakdown.get(severity, {}).get('count', 0), self.COLORS[severity])
+            for severity, label in _SEVERITIES
+        ]
+        return donut(segments, 'Distribuzione per Severità', center_label='Problemi totali')
+
+    def create_wcag_principles_radar(self, wcag_data: Dict[str, Any]) -> str:
+        """Radar dei principi WCAG (POUR): 100 meno le penalità per errori e avvisi"""
+        principles = wcag_data.get('principle_distribution', {})
+        axes = []
+        for key, label in _PRINCIPLES:
+            data = principles.get(key, {})
+            axes.append((label, max(0, 100 - data.get('errors', 0) * 15 - data.get('warnings', 0) * 5)))
+        return radar(axes, 'Conformità Principi WCAG (POUR)', self.COLORS['primary'])
+
+    def create_category_bar_chart(self, category_data: Dict[str, Any]) -> str:
+        """Barre impilate dei problemi per categoria funzionale"""
+        rows = []
+        for name, stats in category_data.items():
+            critical, high = stats.get('critical_count', 0), stats.get('high_count', 0)
+            rows.append((name.capitalize(), [
+                (critical, self.COLORS['critical']), (high, self.COLORS['high']),
+                (stats.get('total_issues', 0) - critical - high, self.COLORS['medium']),
+            ]))
+        return bar_chart(rows, 'Problemi per Categoria Funzionale', legend=_SEVERITY_LEGEND)
+
+    def create_scanner_comparison(self, scanner_data: Dict[str, Any]) -> str:
+        """Problemi trovati da ciascuno scanner, con il suo score"""
+        rows = []
+        for scanner, data in scanner_data.get('scanner_performance', {}).items():
+            critical, high = data.get('critical_found', 0), data.get('high_found', 0)
+            rows.append((f"{scanner} (score {_num(float(data.get('score', 0) or 0))})", [
+                (critical, self.COLORS['critical']), (high, self.COLORS['high']),
+                (data.get('total_issues', 0) - critical - high, self.COLORS['medium']),
+            ]))
+        return bar_chart(rows, 'Confronto Performance Scanner', legend=_SEVERITY_LEGEND,
+                         empty_message='Nessun dato scanner')
+
+    def create_remediation_timeline(self, effort_data: Dict[str, Any]) -> str:
+        """Timeline del piano di remediation per settimana"""
+        color_map = {
+            'critici': self.COLORS['critical'],
+            'alta': self.COLORS['high'],
+            'media': self.COLORS['medium'],
+            'testing': self.COLORS['info']
+        }
+        rows = []
+        for item in effort_data.get('priority_schedule', []):
+            focus = str(item.get('focus', ''))
+            color = next((c for key, c in color_map.items() if key in focus.lower()), self.COLORS['primary'])
+            rows.append((f"Settimana {item.get('week', len(rows) + 1)}", focus, color))
+        footer = (f"Effort totale: {int(effort_data.get('total_hours', 0) or 0)} ore | "
+                  f"Durata: {effort_data.get('estimated_weeks', 0)} settimane")
+        return timeline(rows, 'Piano di Remediation - Timeline', footer=footer)
+
+    def create_risk_matrix(self, risk_data: Dict[str, Any]) -> str:
+        """Matrice probabilità/impatto con rischio legale e reputazionale"""
+        cell_colors = [
+            [self.COLORS['success'], self.COLORS['success'], self.COLORS['warning']],
+            [self.COLORS['success'], self.COLORS['warning'], self.COLORS['danger']],
+            [self.COLORS['warning'], self.COLORS['danger'], self.COLORS['danger']]
+        ]
+        positions = {'BASSO': (0, 0), 'MEDIO': (1, 1), 'MEDIO-ALTO': (2, 1), 'ALTO': (2, 2)}
+        markers = []
+        for name, key in (('Legale', 'legal_risk'), ('Reputazionale', 'reputation_risk')):
+            level = str(risk_data.get(key, {}).get('level', 'MEDIO'))
+            col, row = positions.get(level, (1, 1))
+            markers.append((name, level, col, row))
+        return risk_matrix(markers, 'Matrice di Rischio Accessibilità', cell_colors,
+                           ['Bassa', 'Media', 'Alta'], ['Basso', 'Medio', 'Alto'])
+
+    def create_benchmark_chart(self, benchmark_data: Dict[str, Any]) -> str:
+        """Media di settore rispetto allo score attuale"""
+        current = float(benchmark_data.get('current_score', 0) or 0)
+        rows = []
+        for sector, data in benchmark_data.get('comparison', {}).items():
+            diff = data.get('difference', 0)
+            color = self.COLORS['success'] if diff > 0 else self.COLORS['danger'] if diff < -10 else self.COLORS['secondary']
+            rows.append((f"{sector.capitalize()} ({'+' if diff > 0 else ''}{diff})", [(data.get('benchmark', 0), color)]))
+        return bar_chart(rows, 'Benchmark Industria', max_value=100,
+                         reference=(current, f"Il tuo score ({_num(current)})"),
+                         empty_message='Nessun dato benchmark')
+
@@ -0,0 +1,181 @@
+"""
+Ambienti Jinja2 condivisi dai generatori di report
+
+Ogni directory di template ha un solo Environment per processo: i template
+vengono compilati una volta e restano nella cache dell'ambiente, mentre il
+bytecode compilato è salvato su disco (FileSystemBytecodeCache) e riusato dai
+worker e dai processi successivi. Il controllo delle modifiche ai file
+(auto_reload) è attivo solo in sviluppo.
+
+    EAA_TEMPLATE_CACHE_DIR      directory del bytecode (default: directory
+                                privata dell'utente nel temp di sistema)
+    EAA_TEMPLATE_AUTO_RELOAD    ricarica i template modificati (default: DEBUG_MODE)
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from jinja2 import (
+    BytecodeCache, Environment, FileSystemBytecodeCache, FileSystemLoader,
+    Template, TemplateError, TemplateNotFound, select_autoescape
+)
+
+logger = logging.getLogger(__name__)
+
+PACKAGE_DIR = Path(__file__).resolve().parent
+
+# Template dei report precompilati all'avvio: (directory, autoescape) come
+# li usano generate_html_report e _generate_professional_report
+REPORT_TEMPLATE_DIRS: Tuple[Tuple[Path, bool], ...] = (
+    (PACKAGE_DIR / "templates", True),
+    (PACKAGE_DIR.parent / "templates", False),
+)
+
+# Numero massimo di template compilati tenuti in memoria per ambiente
+TEMPLATE_CACHE_SIZE = 200
+
+_environments: Dict[Tuple[str, bool], Environment] = {}
+_registry_lock = threading.Lock()
+_bytecode_caches: Dict[bool, Optional[BytecodeCache]] = {}
+_string_templates: Dict[Tuple[str, bool, str], Template] = {}
+
+
+def _env_flag(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def auto_reload_enabled() -> bool:
+    """True in sviluppo: i template modificati vengono ricaricati"""
+    return _env_flag("EAA_TEMPLATE_AUTO_RELOAD", _env_flag("DEBUG_MODE", False))
+
+
+def _bytecode_cache(autoescape: bool) -> Optional[BytecodeCache]:
+    """
+    Cache su disco del bytecode, una per impostazione di autoescape
+
+    La chiave del bytecode Jinja2 dipende solo da nome e sorgente del
+    template, mentre il codice compilato dipende dall'autoescape: lo stesso
+    file usato con impostazioni diverse deve finire in file distinti.
+
+    Il bytecode viene eseguito al caricamento: senza EAA_TEMPLATE_CACHE_DIR
+    Jinja2 usa una directory per utente con permessi 0700 e ne verifica il
+    proprietario, così altri utenti locali non possono inserirvi codice.
+    """
+    if autoescape not in _bytecode_caches:
+        directory = os.getenv("EAA_TEMPLATE_CACHE_DIR")
+        pattern = "__eaa_%s_" + ("escaped" if autoescape else "raw") + ".cache"
+        try:
+            if directory:
+                Path(directory).mkdir(mode=0o700, parents=True, exist_ok=True)
+            _bytecode_caches[autoescape] = FileSystemBytecodeCache(directory, pattern)
+        except (OSError, RuntimeError) as e:
+            logger.warning(f"Cache del bytecode dei template non disponibile: {e}")
+            _bytecode_caches[autoescape] = None
+    return _bytecode_caches[autoescape]
+
+
+def get_environment(template_dir: Union[str, Path], autoescape: bool = True) -> Environment:
+    """
+    Ambiente condiviso per la directory di template
+
+    Args:
+        template_dir: Directory dei template
+        autoescape: Escape HTML/XML automatico (False per i template legacy
+            che producono markup dalle variabili)
+    """
+    key = (str(Path(template_dir).resolve()), autoescape)
+    with _registry_lock:
+        env = _environments.get(key)
+        if env is None:
+            env = _environments[key] = Environment(
+                loader=FileSystemLoader(key[0]),
+                autoescape=select_autoescape(['html', 'xml']) if autoescape else False,
+                bytecode_cache=_bytecode_cache(autoescape),
+                auto_reload=auto_reload_enabled(),
+                cache_size=TEMPLATE_CACHE_SIZE,
+            )
+        return env
+
+
+def get_template(template_dir: Union[str, Path], names: Union[str, Sequence[str]],
+                 autoescape: bool = True, fallback_source: Optional[str] = None) -> Template:
+    """
+    Primo template disponibile tra quelli indicati (in ordine di preferenza)
+
+    Args:
+        fallback_source: Sorgente da usare se nessun file esiste; compilato
+            una sola volta e riusato nelle chiamate successive
+
+    Raises:
+        TemplateNotFound / TemplatesNotFound: nessun template trovato e
+            nessun fallback_source
+    """
+    env = get_environment(template_dir, autoescape)
+    try:
+        if isinstance(names, str):
+            return env.get_template(names)
+        return env.select_template(list(names))
+    except TemplateNotFound:
+        if fallback_source is None:
+            raise
+
+    key = (str(Path(template_dir).resolve()), autoescape, fallback_source)
+    with _registry_lock:
+        template = _string_templates.get(key)
+    if template is None:
+        template = env.from_string(fallback_source)
+        with _registry_lock:
+            template = _string_templates.setdefault(key, template)
+    return template
+
+
+def precompile_templates(template_dirs: Optional[Iterable[Tuple[Union[str, Path], bool]]] = None,
+                         extensions: Sequence[str] = ("html", "j2")) -> Dict[str, List[str]]:
+    """
+    Compila in anticipo i template (e ne salva il bytecode su disco)
+
+    Da chiamare all'avvio di API e worker, così il primo report non paga la
+    compilazione. Senza argomenti compila i template dei report del pacchetto
+    e quelli degli ambienti già creati.
+
+    Args:
+        template_dirs: Coppie (directory, autoescape) da compilare
+
+    Returns:
+        Template compilati per directory; gli errori sono solo registrati
+    """
+    with _registry_lock:
+        targets = {key: None for key in _environments}
+    for directory, autoescape in template_dirs if template_dirs is not None else REPORT_TEMPLATE_DIRS:
+        targets.setdefault((str(Path(directory).resolve()), autoescape), None)
+
+    compiled: Dict[str, List[str]] = {}
+    for directory, autoescape in targets:
+        if not Path(directory).is_dir():
+            continue
+        env = get_environment(directory, autoescape)
+        names = compiled.setdefault(directory, [])
+        for name in env.list_templates(extensions=list(extensions)):
+            try:
+                env.get_template(name)
+            except TemplateError as e:
+                logger.warning(f"Template {name} in {directory} non compilabile: {e}")
+                continue
+            if name not in names:
+                names.append(name)
+    return compiled
+
+
+def clear_environments() -> None:
+    """Svuota il registro (test e ricarica esplicita dei template)"""
+    with _registry_lock:
+        _environments.clear()
+        _string_templates.clear()
@@ -1,8 +1,14 @@
 from __future__ import annotations
 
+import os
 import shutil
 import subprocess
-from typing import Iterable, List, Tuple
+from typing import Iterable, List, Optional, Tuple
+
+from .cancellation import (
+    KILL_GRACE_SECONDS, CancellationToken, get_current_token, raise_if_cancelled, terminate_process_group
+)
+from .metrics import ACTIVE_SUBPROCESSES
 
 
 def first_available(cmds: Iterable[List[str]]) -> Tuple[List[str] | None, str | None]:
@@ -12,11 +18,45 @@ def first_available(cmds: Iterable[List[str]]) -> Tuple[List[str] | None, str |
     return None, "no command found"
 
 
-def run_command(cmd: List[str], timeout_sec: float = 30.0, env=None) -> subprocess.CompletedProcess:
-    """Esegue comando con timeout aggressivo per evitare blocchi"""
+def run_command(cmd: List[str], timeout_sec: float = 30.0, env=None,
+                cancel_token: Optional[CancellationToken] = None) -> subprocess.CompletedProcess:
+    """
+    Esegue comando con timeout aggressivo per evitare blocchi
+
+    Il comando gira in un proprio gruppo di processi: al timeout o
+    all'annullamento del token (quello indicato o quello corrente della
+    scansione) viene terminato l'intero gruppo, browser figli compresi.
+
+    Raises:
+        ScanCancelled: Se la scansione viene annullata
+    """
+    token = cancel_token or get_current_token()
+    raise_if_cancelled(token)
+    with ACTIVE_SUBPROCESSES.labels(command=os.path.basename(cmd[0])).track_inprogress():
+        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True,
+                                   env=env, start_new_session=True)
+        remove_callback = token.add_callback(lambda: terminate_process_group(process)) if token else None
+        try:
+            stdout, stderr = process.communicate(timeout=timeout_sec)
+        except subprocess.TimeoutExpired:
+            terminate_process_group(process)
+            _drain(process)
+            # Ritorna processo fallito invece di bloccarsi
+            return subprocess.CompletedProcess(cmd, 124, stdout="", stderr="Command timeout after {}s".format(timeout_sec))
+        except BaseException:
+            terminate_process_group(process)
+            raise
+        finally:
+            if remove_callback:
+                remove_callback()
+    raise_if_cancelled(token)
+    return subprocess.CompletedProcess(cmd, process.returncode, stdout=stdout, stderr=stderr)
+
+
+def _drain(process: subprocess.Popen) -> None:
+    """Attende la fine del processo terminato (i nipoti potrebbero tenere aperte le pipe)"""
     try:
-        return subprocess.run(cmd, capture_output=True, text=True, timeout=timeout_sec, check=False, env=env)
+        process.communicate(timeout=KILL_GRACE_SECONDS + 1)
     except subprocess.TimeoutExpired:
-        # Ritorna processo fallito invece di bloccarsi
-        return subprocess.CompletedProcess(cmd, 124, stdout="", stderr="Command timeout after {}s".format(timeout_sec))
-
+        process.kill()
+        process.wait()
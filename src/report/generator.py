@@ -6,7 +6,6 @@ from typing import Dict, List, Optional, Any
 from pathlib import Path
 from datetime import datetime
 import json
-from jinja2 import Environment, FileSystemLoader, select_autoescape
 
 from .schema import (
     ScanResult, Issue, POURPrinciple, DisabilityType, Severity,
@@ -16,6 +15,8 @@ from .schema import (
 from .transformers.mapping import WCAGMapper
 from .validators import ComplianceValidator, NoDateValidator, MethodologyValidator
 from .ai_content_generator import generate_ai_content
+# Dopo ai_content_generator, che rende importabile il pacchetto eaa_scanner
+from eaa_scanner.templating import get_environment
 
 
 class EnhancedReportGenerator:
@@ -32,10 +33,7 @@ class EnhancedReportGenerator:
             template_dir = Path(__file__).parent / 'templates'
         
         self.template_dir = template_dir
-        self.env = Environment(
-            loader=FileSystemLoader(str(template_dir)),
-            autoescape=select_autoescape(['html', 'xml'])
-        )
+        self.env = get_environment(template_dir)
     
     def transform_scanner_results(self, scanner_data: Dict[str, Any]) -> List[Issue]:
         """
@@ -0,0 +1,156 @@
+"""
+Test per la cache LRU/TTL condivisa
+"""
+import asyncio
+import threading
+import time
+import unittest
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from eaa_scanner.cache import LRUCache, RedisCacheTier, cache_stats, get_cache
+
+
+class FakeRedisClient:
+    """Client Redis sincrono minimale (get/set/delete)"""
+
+    def __init__(self):
+        self.data = {}
+        self.fail = False
+
+    def get(self, key):
+        if self.fail:
+            raise ConnectionError("redis down")
+        return self.data.get(key)
+
+    def set(self, key, value, px=None):
+        self.data[key] = value
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+
+class TestLRUCache(unittest.TestCase):
+    """Test suite per limiti, scadenze e contatori"""
+
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache("t", max_entries=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        self.assertEqual(cache.get("a"), 1)
+        cache.set("c", 3)
+
+        self.assertNotIn("b", cache)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.stats.evictions, 1)
+
+    def test_memory_bound(self):
+        cache = LRUCache("t", max_entries=100, max_bytes=3000)
+        for n in range(5):
+            cache.set(str(n), "x" * 1000)
+        self.assertLessEqual(cache.total_bytes, 3000)
+        self.assertLess(len(cache), 5)
+        self.assertIn("4", cache)
+
+        cache.set("huge", "x" * 10000)
+        self.assertNotIn("huge", cache)
+
+    def test_ttl_and_counters(self):
+        cache = LRUCache("t", default_ttl=0.05)
+        cache.set("a", 1)
+        cache.set("b", 2, ttl=10)
+        self.assertEqual(cache.get("a"), 1)
+        time.sleep(0.08)
+
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.get("b"), 2)
+        self.assertEqual(cache.cleanup(), 0)
+        snapshot = cache.snapshot()
+        self.assertEqual((snapshot["hits"], snapshot["misses"], snapshot["expirations"]), (2, 1, 1))
+
+    def test_single_flight_threads(self):
+        cache = LRUCache("t")
+        calls = []
+        release = threading.Event()
+
+        def loader():
+            calls.append(1)
+            release.wait(1.0)
+            return "value"
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.get_or_load("k", loader))) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.05)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(calls, [1])
+        self.assertEqual(results, ["value"] * 4)
+
+    def test_single_flight_async_and_should_cache(self):
+        cache = LRUCache("t")
+        calls = []
+
+        async def loader():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return {"status": "fallback"}
+
+        async def scenario():
+            return await asyncio.gather(*[
+                cache.aget_or_load("k", loader, should_cache=lambda r: r["status"] == "success")
+                for _ in range(3)
+            ])
+
+        self.assertEqual(len(asyncio.run(scenario())), 3)
+        self.assertEqual(len(calls), 1)
+        self.assertNotIn("k", cache)
+
+    def test_loader_errors_are_not_cached(self):
+        cache = LRUCache("t")
+
+        def failing():
+            raise RuntimeError("boom")
+
+        with self.assertRaises(RuntimeError):
+            cache.get_or_load("k", failing)
+        self.assertEqual(cache.get_or_load("k", lambda: 1), 1)
+
+
+class TestRedisTier(unittest.TestCase):
+    """Test suite per il livello condiviso"""
+
+    def test_values_shared_between_processes(self):
+        client = FakeRedisClient()
+        first = LRUCache("t", remote=RedisCacheTier(client))
+        second = LRUCache("t", remote=RedisCacheTier(client))
+
+        first.set("k", {"valid": True})
+        self.assertEqual(second.get("k"), {"valid": True})
+        self.assertEqual(second.stats.remote_hits, 1)
+
+    def test_redis_errors_degrade_to_local(self):
+        client = FakeRedisClient()
+        client.fail = True
+        cache = LRUCache("t", remote=RedisCacheTier(client))
+        self.assertIsNone(cache.get("k"))
+        cache.set("k", 1)
+        self.assertEqual(cache.get("k"), 1)
+
+
+class TestRegistry(unittest.TestCase):
+    """Test suite per i namespace registrati"""
+
+    def test_namespace_reused_and_reported(self):
+        cache = get_cache("test_registry", max_entries=3)
+        self.assertIs(get_cache("test_registry"), cache)
+        self.assertEqual(cache_stats()["test_registry"]["max_entries"], 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,137 @@
+"""
+Test per la cancellazione cooperativa delle scansioni
+"""
+import threading
+import time
+import unittest
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from eaa_scanner.cancellation import (
+    CancellationRegistry, CancellationToken, ScanCancelled,
+    cancellation_scope, get_current_token, raise_if_cancelled
+)
+from eaa_scanner.scan_events import MonitoredScanner
+from eaa_scanner.utils import run_command
+
+
+class TestCancellationToken(unittest.TestCase):
+    """Test suite per token, callback e registro"""
+
+    def test_callbacks_run_once(self):
+        token = CancellationToken()
+        calls = []
+        token.add_callback(lambda: calls.append("a"))
+        remove = token.add_callback(lambda: calls.append("b"))
+        remove()
+
+        self.assertTrue(token.cancel("stop"))
+        self.assertFalse(token.cancel("again"))
+        self.assertEqual(calls, ["a"])
+        self.assertEqual(token.reason, "stop")
+
+        # Registrata dopo l'annullamento: eseguita subito
+        token.add_callback(lambda: calls.append("late"))
+        self.assertEqual(calls, ["a", "late"])
+
+    def test_checkpoints_and_sleep(self):
+        token = CancellationToken()
+        token.raise_if_cancelled()
+        threading.Timer(0.05, token.cancel).start()
+
+        started = time.monotonic()
+        with self.assertRaises(ScanCancelled):
+            token.sleep(5)
+        self.assertLess(time.monotonic() - started, 1)
+        with self.assertRaises(ScanCancelled):
+            token.raise_if_cancelled()
+
+    def test_scope_sets_current_token(self):
+        token = CancellationToken()
+        with cancellation_scope(token):
+            self.assertIs(get_current_token(), token)
+            with cancellation_scope(None):
+                self.assertIs(get_current_token(), token)
+            token.cancel()
+            with self.assertRaises(ScanCancelled):
+                raise_if_cancelled()
+        self.assertIsNone(get_current_token())
+        raise_if_cancelled()
+
+    def test_registry(self):
+        registry = CancellationRegistry()
+        self.assertFalse(registry.cancel("missing"))
+
+        with registry.scope("scan-1") as token:
+            self.assertIs(registry.open("scan-1"), token)
+            self.assertTrue(registry.cancel("scan-1"))
+            self.assertTrue(token.cancelled)
+        self.assertFalse(registry.cancel("scan-1"))
+        # Una nuova scansione con lo stesso ID riceve un token nuovo
+        self.assertIsNot(registry.open("scan-1"), token)
+
+
+class TestRunCommand(unittest.TestCase):
+    """Test suite per la terminazione dei sottoprocessi"""
+
+    def test_cancel_kills_process_group(self):
+        token = CancellationToken()
+        threading.Timer(0.2, token.cancel).start()
+
+        started = time.monotonic()
+        with self.assertRaises(ScanCancelled):
+            # Il processo figlio in background condivide stdout: senza il
+            # kill del gruppo la lettura attenderebbe la fine di entrambi
+            run_command(["sh", "-c", "sleep 30 & sleep 30"], timeout_sec=60, cancel_token=token)
+        self.assertLess(time.monotonic() - started, 5)
+
+    def test_current_token_is_used(self):
+        token = CancellationToken()
+        token.cancel()
+        with cancellation_scope(token), self.assertRaises(ScanCancelled):
+            run_command(["sh", "-c", "echo never"])
+
+    def test_timeout_returns_124(self):
+        started = time.monotonic()
+        result = run_command(["sh", "-c", "sleep 30 & sleep 30"], timeout_sec=0.2)
+        self.assertEqual(result.returncode, 124)
+        self.assertLess(time.monotonic() - started, 5)
+
+    def test_completed_command(self):
+        result = run_command(["sh", "-c", "echo ok"], cancel_token=CancellationToken())
+        self.assertEqual(result.returncode, 0)
+        self.assertEqual(result.stdout.strip(), "ok")
+
+
+class TestScannerPropagation(unittest.TestCase):
+    """Test suite per l'attraversamento dei fallback degli scanner"""
+
+    def test_scan_cancelled_is_not_swallowed(self):
+        class Scanner:
+            def scan(self, url):
+                try:
+                    raise ScanCancelled("stop")
+                except Exception:
+                    return "fallback"
+
+        with self.assertRaises(ScanCancelled):
+            MonitoredScanner(Scanner(), "Fake").scan("https://example.com")
+
+    def test_cancelled_scope_stops_before_scanning(self):
+        calls = []
+
+        class Scanner:
+            def scan(self, url):
+                calls.append(url)
+
+        token = CancellationToken()
+        token.cancel()
+        with cancellation_scope(token), self.assertRaises(ScanCancelled):
+            MonitoredScanner(Scanner(), "Fake").scan("https://example.com")
+        self.assertEqual(calls, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+"""
+Test per la generazione dei grafici
+"""
+import base64
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import sys
+sys.path.append(str(Path(__file__).parent.parent))
+
+from eaa_scanner import charts
+from eaa_scanner.cache import LRUCache
+from eaa_scanner.charts import CHART_SPECS, ChartGenerator, chart_cache_key
+
+ANALYTICS = {
+    "executive_summary": {"compliance_score": 72, "compliance_level": "parzialmente_conforme"},
+    "quantitative_analysis": {"by_severity": {"critical": 2, "high": 3, "medium": 1}},
+}
+
+
+class TestChartGeneration(unittest.TestCase):
+    """Test suite per rendering singolo, cache e pool di processi"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        cache_patch = mock.patch.object(charts, "_chart_cache", LRUCache("charts_test"))
+        self.cache = cache_patch.start()
+        self.addCleanup(cache_patch.stop)
+
+    def output_dir(self, name):
+        return Path(self.tmp.name) / name
+
+    def generate(self, workers, output, data=ANALYTICS):
+        with mock.patch.dict(os.environ, {"EAA_CHART_WORKERS": str(workers)}):
+            return ChartGenerator(output).generate_all_charts(data)
+
+    def test_figure_rendered_once(self):
+        generator = ChartGenerator(self.output_dir("single"))
+        with mock.patch("matplotlib.figure.Figure.savefig", autospec=True,
+                        side_effect=lambda fig, buffer, **kw: buffer.write(b"png")) as savefig:
+            uri = generator.create_compliance_gauge(ANALYTICS["executive_summary"])
+
+        self.assertEqual(savefig.call_count, 1)
+        self.assertEqual(uri, "data:image/png;base64," + base64.b64encode(b"png").decode())
+        self.assertEqual((self.output_dir("single") / "compliance_gauge.png").read_bytes(), b"png")
+
+    def test_serial_generation_writes_files_from_same_bytes(self):
+        output = self.output_dir("serial")
+        result = self.generate(0, output)
+
+        self.assertEqual(set(result), {key for key, _, _, _ in CHART_SPECS})
+        png = (output / "dashboard.png").read_bytes()
+        self.assertTrue(png.startswith(b"\x89PNG"))
+        self.assertEqual(result["dashboard"], "data:image/png;base64," + base64.b64encode(png).decode())
+
+    def test_identical_analytics_reuse_cached_charts(self):
+        self.generate(0, self.output_dir("first"))
+        with mock.patch.object(ChartGenerator, "_render_all") as render:
+            result = self.generate(0, self.output_dir("second"))
+
+        render.assert_not_called()
+        self.assertEqual(len(result), len(CHART_SPECS))
+        # I file vengono scritti anche nella nuova directory
+        self.assertTrue((self.output_dir("second") / "benchmark.png").exists())
+
+    def test_incomplete_results_are_not_cached(self):
+        with mock.patch.object(ChartGenerator, "create_risk_matrix", side_effect=RuntimeError("boom")):
+            result = self.generate(0, self.output_dir("partial"))
+
+        self.assertNotIn("risk_matrix", result)
+        self.assertEqual(len(result), len(CHART_SPECS) - 1)
+        self.assertNotIn(chart_cache_key(ANALYTICS), self.cache)
+
+    def test_cache_key_is_order_independent(self):
+        reordered = dict(reversed(list(ANALYTICS.items())))
+        self.assertEqual(chart_cache_key(reordered), chart_cache_key(ANALYTICS))
+        self.assertNotEqual(chart_cache_key({**ANALYTICS, "benchmarks": {"x": 1}}), chart_cache_key(ANALYTICS))
+
+    def test_process_pool(self):
+        self.addCleanup(lambda: charts._pool and charts._discard_pool(charts._pool))
+        result = self.generate(2, self.output_dir("pool"))
+
+        self.assertEqual(len(result), len(CHART_SPECS))
+        self.assertTrue((self.output_dir("pool") / "wcag_radar.png").exists())
+
+
+if __name__ == '__main__':
+    unittest.main()
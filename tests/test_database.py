@@ -0,0 +1,146 @@
+"""
+Test per il data-access layer SQLite dell'app FastAPI
+"""
+import asyncio
+import tempfile
+import threading
+import unittest
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from webapp.database import Database, ProgressWriter, migrate_scan_history, read_scan_stats
+
+
+class TestDatabase(unittest.TestCase):
+    """Test suite per pool di connessioni, WAL e scritture batch del progresso"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.database = Database(str(Path(self.tmp.name) / "test.db"), pool_size=2)
+        with self.database.transaction() as conn:
+            conn.execute("CREATE TABLE scans (id TEXT PRIMARY KEY, progress INTEGER, updated_at TEXT)")
+            conn.executemany("INSERT INTO scans VALUES (?, 0, '')", [("a",), ("b",)])
+
+    def tearDown(self):
+        self.database.close()
+        self.tmp.cleanup()
+
+    def test_wal_and_row_access(self):
+        """Test modalità WAL e righe accessibili per indice e per nome"""
+        async def scenario():
+            mode = await self.database.fetchone("PRAGMA journal_mode")
+            row = await self.database.fetchone("SELECT id, progress FROM scans WHERE id = ?", ("a",))
+            return mode[0], row
+
+        mode, row = asyncio.run(scenario())
+        self.assertEqual(mode, "wal")
+        self.assertEqual(row[0], "a")
+        self.assertEqual(row["progress"], 0)
+
+    def test_pool_is_bounded_and_reused(self):
+        """Test che le connessioni vengano riusate senza superare il pool"""
+        async def scenario():
+            await asyncio.gather(*[
+                self.database.fetchall("SELECT * FROM scans") for _ in range(20)
+            ])
+
+        asyncio.run(scenario())
+        stats = self.database.get_stats()
+        self.assertLessEqual(stats["connections_open"], 2)
+        self.assertEqual(stats["connections_idle"], stats["connections_open"])
+
+    def test_failed_transaction_rolls_back(self):
+        """Test rollback e restituzione della connessione dopo un errore"""
+        def failing(conn):
+            conn.execute("UPDATE scans SET progress = 50 WHERE id = 'a'")
+            raise RuntimeError("errore")
+
+        async def scenario():
+            with self.assertRaises(RuntimeError):
+                await self.database.run(failing)
+            return await self.database.fetchone("SELECT progress FROM scans WHERE id = 'a'")
+
+        self.assertEqual(asyncio.run(scenario())[0], 0)
+
+    def test_event_loop_not_blocked(self):
+        """Test che una query lenta non blocchi l'event loop"""
+        release = threading.Event()
+
+        def slow(conn):
+            release.wait(5)
+            return conn.execute("SELECT COUNT(*) FROM scans").fetchone()[0]
+
+        async def scenario():
+            query = asyncio.ensure_future(self.database.run(slow))
+            await asyncio.sleep(0.05)
+            # L'event loop risponde mentre la query è in corso
+            ticked = not query.done()
+            release.set()
+            return ticked, await query
+
+        ticked, count = asyncio.run(scenario())
+        self.assertTrue(ticked)
+        self.assertEqual(count, 2)
+
+    def test_progress_updates_are_coalesced(self):
+        """Test che solo l'ultimo progresso per scansione venga scritto, in un batch"""
+        writer = ProgressWriter(self.database, interval=60)
+
+        async def scenario():
+            for progress in range(1, 11):
+                writer.queue("a", progress * 10, f"t{progress}")
+            writer.queue("b", 5, "t1")
+            written = await writer.flush()
+            rows = await self.database.fetchall("SELECT id, progress FROM scans ORDER BY id")
+            return written, [tuple(row) for row in rows]
+
+        written, rows = asyncio.run(scenario())
+        self.assertEqual(written, 2)
+        self.assertEqual(writer.batches, 1)
+        self.assertEqual(rows, [("a", 100), ("b", 5)])
+
+
+
+class TestScanStats(unittest.TestCase):
+    """Test suite per gli aggregati scan_stats mantenuti dai trigger"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.database = Database(str(Path(self.tmp.name) / "stats.db"), pool_size=1)
+        self.addCleanup(self.database.close)
+        with self.database.transaction() as conn:
+            conn.execute("CREATE TABLE scans (id TEXT PRIMARY KEY, status TEXT, created_at TEXT, results TEXT)")
+            migrate_scan_history(conn)
+            conn.executemany(
+                "INSERT INTO scans (id, status, created_at, compliance_score, eaa_compliant) VALUES (?, ?, ?, ?, ?)",
+                [("a", "completed", "2026-01-01", 80, 1), ("b", "completed", "2026-02-01", 60, 0),
+                 ("c", "running", "2026-02-02", None, None)]
+            )
+
+    def stats(self, **kwargs):
+        with self.database.connection() as conn:
+            return read_scan_stats(conn, **kwargs)
+
+    def test_triggers_follow_status_changes(self):
+        with self.database.transaction() as conn:
+            conn.execute("UPDATE scans SET status = 'completed', compliance_score = 100, eaa_compliant = 1 "
+                         "WHERE id = 'c'")
+            conn.execute("DELETE FROM scans WHERE id = 'b'")
+
+        stats = self.stats()
+        self.assertEqual(stats["completed"], {"scan_count": 2, "compliant_count": 2,
+                                              "scored_count": 2, "score_sum": 180})
+        self.assertEqual(stats["running"]["scan_count"], 0)
+
+    def test_date_range_aggregated_from_scans(self):
+        stats = self.stats(date_from="2026-01-15")
+        self.assertEqual(stats["completed"], {"scan_count": 1, "compliant_count": 0,
+                                              "scored_count": 1, "score_sum": 60})
+        self.assertEqual(stats["running"]["scan_count"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
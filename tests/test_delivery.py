@@ -0,0 +1,181 @@
+"""
+Test per la consegna di risultati e report: streaming JSON, precompressione e Range
+"""
+import gzip
+import json
+import os
+import tempfile
+import time
+import unittest
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from eaa_scanner.delivery import (
+    RangeNotSatisfiable, iter_file, iter_json, parse_accept_encoding, parse_range,
+    precompress_artifact, select_precompressed
+)
+
+
+class TestDelivery(unittest.TestCase):
+    """Test suite per gli helper di consegna"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_iter_json_chunks_roundtrip(self):
+        """Test che i blocchi ricompongano lo stesso documento"""
+        data = {"issues": [{"code": f"rule-{n}", "testo": "è"} for n in range(2000)]}
+        chunks = list(iter_json(data, chunk_size=4096))
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(json.loads(b"".join(chunks)), data)
+
+    def test_precompress_and_select(self):
+        """Test varianti scritte alla generazione e scelta per Accept-Encoding"""
+        report = self.dir / "report.html"
+        report.write_text("<html>" + "contenuto " * 5000 + "</html>", encoding="utf-8")
+        written = precompress_artifact(report)
+
+        gz_path = self.dir / "report.html.gz"
+        self.assertIn(gz_path, written)
+        self.assertEqual(gzip.decompress(gz_path.read_bytes()), report.read_bytes())
+
+        self.assertEqual(select_precompressed(report, "gzip, deflate"), (gz_path, "gzip"))
+        self.assertEqual(select_precompressed(report, "gzip;q=0"), (report, None))
+        self.assertEqual(select_precompressed(report, None), (report, None))
+
+    def test_stale_variant_ignored(self):
+        """Test che una variante più vecchia del report rigenerato non venga servita"""
+        report = self.dir / "report.html"
+        report.write_text("vecchio", encoding="utf-8")
+        precompress_artifact(report)
+        past = time.time() - 60
+        os.utime(self.dir / "report.html.gz", (past, past))
+        for variant in self.dir.glob("report.html.br"):
+            os.utime(variant, (past, past))
+
+        self.assertEqual(select_precompressed(report, "gzip, br"), (report, None))
+
+    def test_non_compressible_skipped(self):
+        """Test che i PDF non vengano precompressi"""
+        pdf = self.dir / "report.pdf"
+        pdf.write_bytes(b"%PDF-1.4")
+        self.assertEqual(precompress_artifact(pdf), [])
+
+    def test_parse_range(self):
+        """Test intervalli espliciti, aperti, suffisso e non soddisfacibili"""
+        self.assertEqual(parse_range("bytes=0-99", 1000), (0, 99))
+        self.assertEqual(parse_range("bytes=900-", 1000), (900, 999))
+        self.assertEqual(parse_range("bytes=-100", 1000), (900, 999))
+        self.assertEqual(parse_range("bytes=0-5000", 1000), (0, 999))
+        self.assertIsNone(parse_range("bytes=0-1,5-6", 1000))
+        self.assertIsNone(parse_range("items=0-1", 1000))
+        with self.assertRaises(RangeNotSatisfiable):
+            parse_range("bytes=1000-", 1000)
+
+    def test_accept_encoding_quality(self):
+        """Test parsing dei q-value di Accept-Encoding"""
+        self.assertEqual(parse_accept_encoding("br;q=0.5, gzip"), {"br": 0.5, "gzip": 1.0})
+
+    def test_iter_file_range(self):
+        """Test lettura a blocchi di un intervallo"""
+        path = self.dir / "data.bin"
+        path.write_bytes(bytes(range(256)) * 10)
+        self.assertEqual(b"".join(iter_file(path, 10, 19, chunk_size=3)), path.read_bytes()[10:20])
+
+
+class TestScanArtifacts(unittest.TestCase):
+    """Test suite per le varianti precompresse scritte dalla scansione"""
+
+    def test_results_and_charts_precompressed(self):
+        """Test che summary.json e charts.json abbiano la variante .gz"""
+        from eaa_scanner.config import Config
+        from eaa_scanner.core import run_scan
+
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as tmp:
+            # L'export Jira della remediation viene scritto nella directory corrente
+            os.chdir(tmp)
+            try:
+                result = run_scan(Config(url="https://example.com", company_name="Acme", simulate=True),
+                                  output_root=Path(tmp))
+            finally:
+                os.chdir(cwd)
+
+            for key in ("summary_path", "charts_path"):
+                source = Path(result[key])
+                variant = source.with_name(source.name + ".gz")
+                self.assertEqual(gzip.decompress(variant.read_bytes()), source.read_bytes())
+
+
+class TestWSGIFileResponse(unittest.TestCase):
+    """Test suite per _file_response dell'API WSGI"""
+
+    def setUp(self):
+        from eaa_scanner.api.endpoints import APIEndpoints
+
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+        # Solo gli helper di risposta: i servizi non servono
+        self.endpoints = APIEndpoints.__new__(APIEndpoints)
+        self.pdf = self.dir / "report.pdf"
+        self.pdf.write_bytes(b"0123456789" * 100)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def call(self, path, content_type, environ):
+        captured = {}
+
+        def start_response(status, headers):
+            captured["status"] = status
+            captured["headers"] = dict(headers)
+
+        body = b"".join(self.endpoints._file_response(start_response, path, content_type, environ))
+        return captured["status"], captured["headers"], body
+
+    def test_range_request(self):
+        """Test risposta 206 con Content-Range"""
+        status, headers, body = self.call(self.pdf, "application/pdf", {"HTTP_RANGE": "bytes=10-29"})
+        self.assertEqual(status, "206 Partial Content")
+        self.assertEqual(headers["Content-Range"], "bytes 10-29/1000")
+        self.assertEqual(body, self.pdf.read_bytes()[10:30])
+
+    def test_unsatisfiable_range(self):
+        """Test risposta 416"""
+        status, headers, _ = self.call(self.pdf, "application/pdf", {"HTTP_RANGE": "bytes=5000-"})
+        self.assertEqual(status, "416 Range Not Satisfiable")
+        self.assertEqual(headers["Content-Range"], "bytes */1000")
+
+    def test_file_wrapper_used(self):
+        """Test invio tramite wsgi.file_wrapper quando disponibile"""
+        wrapped = []
+
+        def file_wrapper(f, block_size):
+            wrapped.append(block_size)
+            return iter(lambda: f.read(block_size), b"")
+
+        status, headers, body = self.call(self.pdf, "application/pdf", {"wsgi.file_wrapper": file_wrapper})
+        self.assertEqual(status, "200 OK")
+        self.assertEqual(headers["Content-Length"], "1000")
+        self.assertEqual(body, self.pdf.read_bytes())
+        self.assertEqual(len(wrapped), 1)
+
+    def test_precompressed_html(self):
+        """Test variante gzip servita con Content-Encoding"""
+        html = self.dir / "report.html"
+        html.write_text("<p>report</p>" * 500, encoding="utf-8")
+        precompress_artifact(html)
+
+        status, headers, body = self.call(html, "text/html", {"HTTP_ACCEPT_ENCODING": "gzip"})
+        self.assertEqual(headers["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(body), html.read_bytes())
+
+
+if __name__ == '__main__':
+    unittest.main()
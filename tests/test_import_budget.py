@@ -0,0 +1,39 @@
+"""
+Test di regressione sugli import pesanti all'avvio di API e CLI
+"""
+import importlib.util
+import unittest
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+spec = importlib.util.spec_from_file_location(
+    "import_budget", Path(__file__).parent.parent / "tools" / "import_budget.py"
+)
+import_budget = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(import_budget)
+
+
+class TestImportBudget(unittest.TestCase):
+    """Test suite per i sottosistemi caricati al primo uso"""
+
+    def test_entry_points_do_not_load_heavy_subsystems(self):
+        for module in import_budget.BUDGETS_MS:
+            with self.subTest(module=module):
+                total, modules = import_budget.measure(module)
+                self.assertIn(module, modules)
+                self.assertEqual(import_budget.loaded_heavy(module, modules), [])
+
+    def test_scan_pipeline_still_loads_on_demand(self):
+        _, modules = import_budget.measure("eaa_scanner.core")
+        self.assertNotIn("matplotlib", modules)
+        # Il primo uso importa normalmente il sottosistema
+        from eaa_scanner import core
+        from eaa_scanner.page_sampler import SamplerConfig
+        self.assertTrue(callable(core.run_smart_scan))
+        self.assertIsNotNone(SamplerConfig())
+
+
+if __name__ == '__main__':
+    unittest.main()
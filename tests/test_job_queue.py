@@ -0,0 +1,194 @@
+"""
+Test per la coda persistente dei job e per il worker
+"""
+import tempfile
+import time
+import unittest
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from eaa_scanner.jobs import (
+    JobCancelled, JobContext, JobQueue, JobStatus, JobWorker, SQLiteJobQueue, create_job_queue
+)
+
+
+class TestSQLiteJobQueue(unittest.TestCase):
+    """Test suite per lease, heartbeat, retry e priorità"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.queue = SQLiteJobQueue(str(Path(self.tmp.name) / "jobs.db"))
+
+    def tearDown(self):
+        self.queue.close()
+        self.tmp.cleanup()
+
+    def test_claim_orders_by_priority_then_enqueue_order(self):
+        first = self.queue.enqueue("scan", {"n": 1})
+        urgent = self.queue.enqueue("scan", {"n": 2}, priority=10)
+        second = self.queue.enqueue("scan", {"n": 3})
+
+        claimed = [self.queue.claim("w1").id for _ in range(3)]
+        self.assertEqual(claimed, [urgent.id, first.id, second.id])
+        self.assertIsNone(self.queue.claim("w1"))
+
+    def test_claim_is_exclusive_and_filters_kinds(self):
+        job = self.queue.enqueue("scan", {})
+        self.assertIsNone(self.queue.claim("w1", kinds=["report"]))
+
+        claimed = self.queue.claim("w1", kinds=["scan"])
+        self.assertEqual(claimed.id, job.id)
+        self.assertEqual(claimed.status, JobStatus.RUNNING)
+        self.assertEqual(claimed.attempts, 1)
+        self.assertIsNone(self.queue.claim("w2"))
+
+    def test_expired_lease_is_reclaimed_then_failed(self):
+        job = self.queue.enqueue("scan", {}, max_attempts=2)
+        self.queue.claim("w1", lease_seconds=0.01)
+        time.sleep(0.05)
+
+        reclaimed = self.queue.claim("w2", lease_seconds=0.01)
+        self.assertEqual(reclaimed.id, job.id)
+        self.assertEqual(reclaimed.lease_owner, "w2")
+        self.assertEqual(reclaimed.attempts, 2)
+        # Il vecchio proprietario non può più aggiornare il job
+        self.assertFalse(self.queue.heartbeat(job.id, "w1"))
+        self.assertFalse(self.queue.complete(job.id, "w1", {}))
+
+        time.sleep(0.05)
+        self.assertIsNone(self.queue.claim("w3"))
+        self.assertEqual(self.queue.get(job.id).status, JobStatus.FAILED)
+
+    def test_heartbeat_saves_progress_and_stops_after_cancel(self):
+        job = self.queue.enqueue("scan", {})
+        self.queue.claim("w1")
+
+        self.assertTrue(self.queue.heartbeat(job.id, "w1", progress={"progress": 40}))
+        self.assertEqual(self.queue.get(job.id).progress, {"progress": 40})
+
+        self.assertTrue(self.queue.cancel(job.id))
+        self.assertFalse(self.queue.heartbeat(job.id, "w1"))
+        failed = self.queue.fail(job.id, "w1", "interrotto")
+        self.assertEqual(failed.status, JobStatus.CANCELLED)
+
+    def test_cancel_queued_job(self):
+        job = self.queue.enqueue("scan", {})
+        self.assertTrue(self.queue.cancel(job.id))
+        self.assertEqual(self.queue.get(job.id).status, JobStatus.CANCELLED)
+        self.assertIsNone(self.queue.claim("w1"))
+        self.assertFalse(self.queue.cancel(job.id))
+
+    def test_fail_retries_with_delay_until_attempts_exhausted(self):
+        job = self.queue.enqueue("scan", {}, max_attempts=2)
+        self.queue.claim("w1")
+
+        retried = self.queue.fail(job.id, "w1", "boom", retry_delay=60)
+        self.assertEqual(retried.status, JobStatus.QUEUED)
+        self.assertEqual(retried.error, "boom")
+        self.assertIsNone(self.queue.claim("w1"))
+
+        job = self.queue.enqueue("scan", {}, max_attempts=1)
+        self.queue.claim("w1")
+        self.assertEqual(self.queue.fail(job.id, "w1", "boom").status, JobStatus.FAILED)
+
+    def test_complete_stores_result_and_stats(self):
+        job = self.queue.enqueue("scan", {}, job_id="scan_1")
+        self.queue.enqueue("scan", {})
+        self.queue.claim("w1")
+
+        self.assertTrue(self.queue.complete(job.id, "w1", {"score": 90}))
+        stored = self.queue.get("scan_1")
+        self.assertEqual(stored.status, JobStatus.SUCCEEDED)
+        self.assertEqual(stored.result, {"score": 90})
+        self.assertEqual(self.queue.stats().get("succeeded"), 1)
+        self.assertEqual(self.queue.stats().get("queued"), 1)
+
+    def test_create_job_queue_from_url(self):
+        path = Path(self.tmp.name) / "other.db"
+        queue = create_job_queue(f"sqlite:///{path}")
+        try:
+            self.assertIsInstance(queue, SQLiteJobQueue)
+            self.assertTrue(path.exists())
+        finally:
+            queue.close()
+
+    def test_incomplete_backend_fails_at_instantiation(self):
+        class PartialQueue(JobQueue):
+            def enqueue(self, kind, payload, **kwargs):
+                pass
+
+        with self.assertRaises(TypeError):
+            PartialQueue()
+
+
+class TestJobWorker(unittest.TestCase):
+    """Test suite per l'esecuzione dei job nel worker"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.queue = SQLiteJobQueue(str(Path(self.tmp.name) / "jobs.db"))
+
+    def tearDown(self):
+        self.queue.close()
+        self.tmp.cleanup()
+
+    def test_run_once_completes_job_with_progress(self):
+        def handler(job, context):
+            context.report_progress(progress=100)
+            return {"doubled": job.payload["value"] * 2}
+
+        job = self.queue.enqueue("double", {"value": 21})
+        worker = JobWorker(self.queue, {"double": handler}, worker_id="w1")
+
+        self.assertTrue(worker.run_once())
+        stored = self.queue.get(job.id)
+        self.assertEqual(stored.status, JobStatus.SUCCEEDED)
+        self.assertEqual(stored.result, {"doubled": 42})
+        self.assertEqual(stored.progress, {"progress": 100})
+        self.assertFalse(worker.run_once())
+
+    def test_failing_handler_is_retried_then_failed(self):
+        def handler(job, context):
+            raise RuntimeError("scanner non disponibile")
+
+        job = self.queue.enqueue("scan", {}, max_attempts=1)
+        worker = JobWorker(self.queue, {"scan": handler}, worker_id="w1")
+
+        self.assertTrue(worker.run_once())
+        stored = self.queue.get(job.id)
+        self.assertEqual(stored.status, JobStatus.FAILED)
+        self.assertIn("scanner non disponibile", stored.error)
+        self.assertEqual(worker.failed, 1)
+
+    def test_cancel_during_execution_stops_handler(self):
+        def handler(job, context):
+            self.queue.cancel(job.id)
+            deadline = time.time() + 5
+            while time.time() < deadline:
+                context.raise_if_cancelled()
+                time.sleep(0.01)
+            return {}
+
+        job = self.queue.enqueue("scan", {})
+        worker = JobWorker(self.queue, {"scan": handler}, worker_id="w1", lease_seconds=0.3)
+
+        self.assertTrue(worker.run_once())
+        self.assertEqual(self.queue.get(job.id).status, JobStatus.CANCELLED)
+
+    def test_job_context(self):
+        job = self.queue.enqueue("scan", {})
+        context = JobContext(job)
+        context.report_progress(progress=10)
+        context.report_progress(message="pagina 2")
+        self.assertEqual(context.take_progress(), {"progress": 10, "message": "pagina 2"})
+        self.assertIsNone(context.take_progress())
+
+        context.cancelled.set()
+        with self.assertRaises(JobCancelled):
+            context.raise_if_cancelled()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+"""
+Test per le metriche in formato Prometheus
+"""
+import asyncio
+import unittest
+import urllib.request
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from eaa_scanner import metrics
+from eaa_scanner.metrics import Registry, start_metrics_server
+from eaa_scanner.multi_page import get_browser_slots
+from eaa_scanner.scan_events import MonitoredScanner
+
+
+class TestRegistry(unittest.TestCase):
+    """Test suite per tipi di metriche e formato di esposizione"""
+
+    def setUp(self):
+        self.registry = Registry()
+
+    def test_counter_and_gauge(self):
+        counter = self.registry.counter("jobs_total", "Job", ("kind",))
+        counter.labels(kind="scan").inc()
+        counter.labels(kind="scan").inc(2)
+        gauge = self.registry.gauge("active", "Attivi")
+        with gauge.track_inprogress():
+            self.assertIn("active 1", self.registry.render())
+
+        text = self.registry.render()
+        self.assertIn("# TYPE jobs_total counter", text)
+        self.assertIn('jobs_total{kind="scan"} 3', text)
+        self.assertIn("active 0", text)
+        with self.assertRaises(ValueError):
+            counter.labels(kind="scan").inc(-1)
+        with self.assertRaises(ValueError):
+            counter.inc()  # etichette mancanti
+
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = self.registry.histogram("stage_seconds", "Fasi", ("stage",), buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 5.0):
+            histogram.labels(stage="pdf").observe(value)
+
+        text = self.registry.render()
+        self.assertIn('stage_seconds_bucket{stage="pdf",le="0.1"} 1', text)
+        self.assertIn('stage_seconds_bucket{stage="pdf",le="1"} 2', text)
+        self.assertIn('stage_seconds_bucket{stage="pdf",le="+Inf"} 3', text)
+        self.assertIn('stage_seconds_sum{stage="pdf"} 5.55', text)
+        self.assertIn('stage_seconds_count{stage="pdf"} 3', text)
+
+    def test_label_values_are_escaped(self):
+        gauge = self.registry.gauge("g", "G", ("name",))
+        gauge.labels(name='a"b\\c').set(1)
+        self.assertIn('g{name="a\\"b\\\\c"} 1', self.registry.render())
+
+    def test_registration_is_idempotent(self):
+        first = self.registry.counter("c_total", "C")
+        self.assertIs(self.registry.counter("c_total", "C"), first)
+        with self.assertRaises(ValueError):
+            self.registry.gauge("c_total", "C")
+
+    def test_collectors_run_before_render(self):
+        gauge = self.registry.gauge("derived", "Derivato")
+        self.registry.on_collect(lambda: gauge.set(42))
+        self.assertIn("derived 42", self.registry.render())
+
+    def test_metrics_server(self):
+        self.registry.counter("served_total", "Servite").inc()
+        server = start_metrics_server(0, host="127.0.0.1", registry=self.registry)
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        with urllib.request.urlopen(f"http://127.0.0.1:{server.server_port}/metrics") as response:
+            self.assertIn("served_total 1", response.read().decode())
+            self.assertTrue(response.headers["Content-Type"].startswith("text/plain"))
+
+
+class TestInstrumentation(unittest.TestCase):
+    """Test suite per i punti di misura della pipeline"""
+
+    def sample(self, metric, suffix="", **labels):
+        name = metric.name + suffix
+        for sample_name, sample_labels, value in metric._samples():
+            if sample_name == name and dict(sample_labels) == labels:
+                return value
+        return 0
+
+    def test_scanner_duration_by_outcome(self):
+        class Result:
+            json = {"issues": []}
+
+        class Scanner:
+            def scan(self, url):
+                return Result()
+
+        class Broken:
+            def scan(self, url):
+                raise RuntimeError("boom")
+
+        before = self.sample(metrics.SCANNER_SECONDS, "_count", scanner="fake", outcome="success")
+        MonitoredScanner(Scanner(), "Fake").scan("https://example.com")
+        with self.assertRaises(RuntimeError):
+            MonitoredScanner(Broken(), "Fake").scan("https://example.com")
+
+        self.assertEqual(self.sample(metrics.SCANNER_SECONDS, "_count", scanner="fake", outcome="success"), before + 1)
+        self.assertGreaterEqual(self.sample(metrics.SCANNER_SECONDS, "_count", scanner="fake", outcome="error"), 1)
+
+    def test_browser_slots_gauge(self):
+        async def scenario():
+            slots = get_browser_slots()
+            async with slots:
+                return self.sample(metrics.ACTIVE_BROWSERS, source="scan_slot")
+
+        before = self.sample(metrics.ACTIVE_BROWSERS, source="scan_slot")
+        self.assertEqual(asyncio.run(scenario()), before + 1)
+        self.assertEqual(self.sample(metrics.ACTIVE_BROWSERS, source="scan_slot"), before)
+
+
+if __name__ == '__main__':
+    unittest.main()
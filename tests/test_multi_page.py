@@ -0,0 +1,146 @@
+"""
+Test per l'esecuzione concorrente delle pagine e il progresso per unità
+"""
+import asyncio
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from webapp import database as db_module
+from webapp.database import Database
+from eaa_scanner.multi_page import ScanUnitProgress, get_browser_slots
+
+
+class TestScanUnitProgress(unittest.TestCase):
+    """Test suite per il conteggio delle unità pagina x scanner"""
+
+    def test_progress_from_scanner_events(self):
+        changes = []
+        progress = ScanUnitProgress(["a", "b"], units_per_page=2, on_change=lambda: changes.append(1))
+        monitor = progress.monitor_for(0)
+
+        monitor.emit_scanner_operation("s", "Pa11y", "Inizializzazione", 0)
+        monitor.emit_scanner_operation("s", "Pa11y", "Completato", 100)
+        monitor.emit_scanner_operation("s", "Pa11y", "Completato", 100)
+        self.assertEqual(progress.snapshot()["completed_units"], 1)
+        self.assertEqual(progress.percent, 25)
+
+        monitor.emit_scanner_operation("s", "Axe-core", "Fallito", 100)
+        self.assertEqual(progress.percent, 50)
+        self.assertEqual(len(changes), 2)
+
+    def test_more_scanners_than_estimated_extend_total(self):
+        progress = ScanUnitProgress(["a"], units_per_page=1)
+        monitor = progress.monitor_for(0)
+        for name in ("Pa11y", "Axe-core", "Lighthouse"):
+            monitor.emit_scanner_operation("s", name, "Inizializzazione", 0)
+        monitor.emit_scanner_operation("s", "Pa11y", "Completato", 100)
+        self.assertEqual(progress.total_units, 3)
+        self.assertEqual(progress.completed_units, 1)
+
+    def test_page_finished_closes_missing_units(self):
+        progress = ScanUnitProgress(["a", "b"], units_per_page=3)
+        progress.page_finished(1)
+        progress.monitor_for(1).emit_scanner_operation("s", "Pa11y", "Completato", 100)
+        snapshot = progress.snapshot()
+        self.assertEqual(snapshot["completed_units"], 3)
+        self.assertEqual(snapshot["pages_scanned"], 1)
+        self.assertEqual(snapshot["progress"], 50)
+
+        progress.page_finished(0)
+        self.assertEqual(progress.percent, 99)
+
+    def test_browser_slots_are_per_loop(self):
+        async def slots():
+            return get_browser_slots(), get_browser_slots()
+
+        with patch.dict(os.environ, {"SCAN_BROWSER_SLOTS": "3"}):
+            first, same = asyncio.run(slots())
+            other, _ = asyncio.run(slots())
+        self.assertIs(first, same)
+        self.assertIsNot(first, other)
+        self.assertEqual(first._value, 3)
+
+
+class FakeAdapter:
+    """Adapter enterprise che simula una pagina e misura la concorrenza"""
+
+    lock = threading.Lock()
+    running = 0
+    peak = 0
+
+    def run_enterprise_scan_for_api(self, url, event_monitor=None, scan_id=None, output_root=None, **kwargs):
+        cls = FakeAdapter
+        with cls.lock:
+            cls.running += 1
+            cls.peak = max(cls.peak, cls.running)
+        try:
+            for name in ("Pa11y", "Axe-core"):
+                event_monitor.emit_scanner_operation(scan_id, name, "Inizializzazione", 0)
+            # Le ultime pagine terminano per prime
+            time.sleep(0.02 * (10 - int(url.rsplit("/", 1)[1])))
+            for name in ("Pa11y", "Axe-core"):
+                event_monitor.emit_scanner_operation(scan_id, name, "Completato", 100)
+            if url.endswith("/3"):
+                raise RuntimeError("pagina non raggiungibile")
+            return {"issues_total": 2, "issues_by_severity": {"critical": 1, "low": 1}, "compliance_score": 80}
+        finally:
+            with cls.lock:
+                cls.running -= 1
+
+
+class TestMultiPageScanTask(unittest.TestCase):
+    """Test suite per run_multi_page_scan_task con pagine concorrenti"""
+
+    @classmethod
+    def setUpClass(cls):
+        from webapp import app_fastapi
+        cls.app = app_fastapi
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cwd = os.getcwd()
+        os.chdir(self.tmp.name)
+        self.previous = db_module._database
+        db_module._database = Database(str(Path(self.tmp.name) / "scans.db"))
+        self.app.init_database()
+        FakeAdapter.peak = 0
+
+    def tearDown(self):
+        db_module._database.close()
+        db_module._database = self.previous
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def test_pages_run_concurrently_within_browser_slots(self):
+        pages = [f"https://example.com/{n}" for n in range(6)]
+        request = self.app.MultiPageScanRequest(
+            pages=pages, company_name="Acme", email="a@example.com",
+            scanners={"pa11y": True, "axe": True, "lighthouse": False}
+        )
+        session = self.app.register_multi_page_session("mp-test", request)
+        try:
+            with patch("eaa_scanner.enterprise_integration.FastAPIEnterpriseAdapter", FakeAdapter), \
+                    patch.dict(os.environ, {"SCAN_BROWSER_SLOTS": "2"}):
+                asyncio.run(self.app.run_multi_page_scan_task("mp-test", session))
+
+            self.assertEqual(session["status"], "completed")
+            self.assertEqual(FakeAdapter.peak, 2)
+            expected = [url for url in pages if not url.endswith("/3")]
+            self.assertEqual(list(session["scan_results"]), expected)
+            self.assertEqual(session["pages_scanned"], 5)
+            self.assertEqual(session["results_summary"]["pages_analyzed"], 5)
+        finally:
+            self.app.scan_sessions.pop("mp-test", None)
+            self.app.scan_manager.scans.pop("mp-test", None)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,169 @@
+"""
+Test per la coda di uscita WebSocket con backpressure
+"""
+import asyncio
+import tempfile
+import unittest
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from eaa_scanner.api.outbox import ClientOutbox, coalesce_key_for
+from eaa_scanner.api.session_manager import SessionManager
+from eaa_scanner.api.websocket_manager import WebSocketManager
+
+
+class RecordingSocket:
+    """WebSocket fittizio: registra i messaggi, opzionalmente si blocca o fallisce"""
+
+    def __init__(self, fail=False, hang=False):
+        self.sent = []
+        self.fail = fail
+        self.hang = hang
+        self.closed = False
+
+    async def send(self, message):
+        if self.fail:
+            raise ConnectionError("socket chiuso")
+        if self.hang:
+            await asyncio.sleep(3600)
+        self.sent.append(message)
+
+
+async def drain(outbox):
+    """Attende che il writer abbia svuotato la coda"""
+    for _ in range(100):
+        if not outbox.depth:
+            break
+        await asyncio.sleep(0.01)
+    await asyncio.sleep(0)
+
+
+class TestClientOutbox(unittest.TestCase):
+    """Test suite per coalescing, scarto e writer della outbox"""
+
+    def test_coalesced_message_keeps_order(self):
+        """Test che il progresso sostituito non superi gli eventi accodati dopo"""
+        socket = RecordingSocket()
+        outbox = ClientOutbox(socket.send, "c1")
+        key = coalesce_key_for("progress", {"scanner": "wave"})
+
+        outbox.enqueue("progress-1", key)
+        outbox.enqueue("page_done")
+        outbox.enqueue("progress-2", key)
+
+        self.assertEqual(outbox.depth, 2)
+        self.assertEqual(outbox.coalesced, 1)
+
+        async def scenario():
+            outbox.start()
+            await drain(outbox)
+            outbox.close()
+
+        asyncio.run(scenario())
+        self.assertEqual(socket.sent, ["page_done", "progress-2"])
+
+    def test_drops_oldest_when_full(self):
+        """Test scarto del messaggio più vecchio a coda piena"""
+        socket = RecordingSocket()
+        outbox = ClientOutbox(socket.send, "c1", max_queue=3)
+        key = coalesce_key_for("progress")
+        outbox.enqueue("p1", key)
+        for n in range(3):
+            outbox.enqueue(f"m{n}")
+
+        # Il progresso scartato non è più coalescibile: ne viene accodato uno nuovo
+        outbox.enqueue("p2", key)
+
+        async def scenario():
+            outbox.start()
+            await drain(outbox)
+            outbox.close()
+
+        asyncio.run(scenario())
+        self.assertEqual(outbox.dropped, 2)
+        self.assertEqual(socket.sent, ["m1", "m2", "p2"])
+
+    def test_send_timeout_closes_outbox(self):
+        """Test che un invio bloccato chiuda la outbox e invochi on_close"""
+        closed = []
+        socket = RecordingSocket(hang=True)
+        outbox = ClientOutbox(socket.send, "c1", send_timeout=0.05, on_close=closed.append)
+
+        async def scenario():
+            outbox.start()
+            outbox.enqueue("m1")
+            outbox.enqueue("m2")
+            await asyncio.wait_for(outbox._task, timeout=2)
+
+        asyncio.run(scenario())
+        self.assertTrue(outbox.closed)
+        self.assertEqual(closed, [outbox])
+        self.assertFalse(outbox.enqueue("m3"))
+
+    def test_send_failure_closes_outbox(self):
+        """Test che un errore di invio chiuda la outbox e invochi on_close"""
+        closed = []
+        socket = RecordingSocket(fail=True)
+        outbox = ClientOutbox(socket.send, "c1", on_close=closed.append)
+
+        async def scenario():
+            outbox.start()
+            outbox.enqueue("m1")
+            await asyncio.wait_for(outbox._task, timeout=2)
+
+        asyncio.run(scenario())
+        self.assertEqual(closed, [outbox])
+        self.assertEqual(outbox.sent, 0)
+
+
+class TestWebSocketManagerOutbox(unittest.TestCase):
+    """Test suite per outbox e statistiche del WebSocketManager"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.manager = WebSocketManager(SessionManager(Path(self.tmp.name)), send_timeout=0.05)
+
+    def tearDown(self):
+        self.manager.session_manager.close()
+        self.tmp.cleanup()
+
+    def connect(self, client_id, socket):
+        from eaa_scanner.api.websocket_manager import WebSocketConnection
+
+        connection = WebSocketConnection(socket, client_id)
+        connection.start_outbox(self.manager.max_queue_per_client, self.manager.send_timeout,
+                                on_close=lambda _conn: self.manager._remove_connection(client_id))
+        self.manager._connections[client_id] = connection
+        self.manager._subscribe(connection, "session-1")
+        return connection
+
+    def test_failed_writer_removes_connection(self):
+        """Test che on_close rimuova la connessione da registro e indice"""
+        async def scenario():
+            connection = self.connect("slow", RecordingSocket(fail=True))
+            connection.enqueue("m1")
+            await asyncio.wait_for(connection.outbox._task, timeout=2)
+
+        asyncio.run(scenario())
+        self.assertNotIn("slow", self.manager._connections)
+        self.assertNotIn("session-1", self.manager._subscribers)
+
+    def test_stats_include_closed_connections(self):
+        """Test che i totali restino cumulativi dopo la disconnessione"""
+        async def scenario():
+            connection = self.connect("c1", RecordingSocket())
+            connection.enqueue("m1")
+            connection.enqueue("m2")
+            await drain(connection.outbox)
+            self.manager._remove_connection("c1")
+
+        asyncio.run(scenario())
+        queues = self.manager.get_stats()["queues"]
+        self.assertEqual(queues["sent"], 2)
+        self.assertEqual(queues["total_depth"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,177 @@
+"""
+Test per la pipeline discovery -> scansioni anticipate dello Smart Page Sampler
+"""
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from eaa_scanner.cancellation import ScanCancelled, get_current_token
+from eaa_scanner.page_sampler.coordinator import SamplerConfig, SmartPageSamplerCoordinator
+from eaa_scanner.page_sampler.smart_crawler import PageInfo
+
+
+BASE = "https://example.com"
+
+
+def make_pages():
+    pages = [PageInfo(url=f"{BASE}/", page_type="homepage", template_hash="home", priority=100)]
+    # Varianti di login con lo stesso template
+    for path in ("/login", "/login?next=/a", "/login?next=/b", "/account/login"):
+        pages.append(PageInfo(url=f"{BASE}{path}", page_type="authentication",
+                              template_hash="login", priority=90, forms_count=1))
+    for n in range(6):
+        pages.append(PageInfo(url=f"{BASE}/articolo-{n}", template_hash="article", priority=40))
+    return pages
+
+
+class FakeCrawler:
+    """Crawler fittizio: consegna le pagine via page_callback una alla volta"""
+
+    first_scan_started = None
+    finished = None
+
+    def __init__(self, base_url, page_callback=None, **kwargs):
+        self.base_url = base_url
+        self.page_callback = page_callback
+        self.visited_urls = set()
+
+    def crawl(self):
+        pages = make_pages()
+        for index, page in enumerate(pages):
+            self.visited_urls.add(page.url)
+            if self.page_callback:
+                self.page_callback(page)
+            if index == 0:
+                # La discovery prosegue solo dopo l'avvio della prima scansione
+                FakeCrawler.first_scan_started.wait(5)
+        FakeCrawler.finished.set()
+        return pages
+
+
+class TestSamplerPipeline(unittest.TestCase):
+    """Test suite per scansioni anticipate durante la discovery"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        FakeCrawler.first_scan_started = threading.Event()
+        FakeCrawler.finished = threading.Event()
+        self.scanned = []
+        self.scanned_during_discovery = []
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def page_scanner(self, page, depth_config):
+        self.scanned_during_discovery.append(not FakeCrawler.finished.is_set())
+        self.scanned.append(page['url'])
+        FakeCrawler.first_scan_started.set()
+        return {"url": page['url']}, {}, depth_config
+
+    def run_sampler(self):
+        config = SamplerConfig(enable_websocket=False, save_screenshots=False,
+                               output_dir=self.tmp.name, max_selected_pages=5, min_selected_pages=1)
+        coordinator = SmartPageSamplerCoordinator(config, page_scanner=self.page_scanner)
+        with mock.patch("eaa_scanner.page_sampler.coordinator.SmartCrawler", FakeCrawler):
+            return coordinator.execute(BASE)
+
+    def test_early_scans_start_before_discovery_ends(self):
+        """Test che la homepage venga scansionata prima della fine del crawling"""
+        result = self.run_sampler()
+
+        self.assertTrue(FakeCrawler.first_scan_started.is_set())
+        self.assertEqual(self.scanned[0], f"{BASE}/")
+        self.assertTrue(self.scanned_during_discovery[0])
+        self.assertIsNotNone(result.time_to_first_page_seconds)
+
+    def test_one_early_scan_per_template(self):
+        """Test che le varianti di login producano una sola scansione anticipata"""
+        result = self.run_sampler()
+
+        login_scans = [url for url in self.scanned if "login" in url]
+        self.assertEqual(len(login_scans), 1)
+        selected = {page['url'] for page in result.selected_pages}
+        self.assertIn(f"{BASE}/", result.early_scans)
+        self.assertTrue(set(result.early_scans) <= selected)
+
+    def test_running_unselected_scan_cancelled_before_return(self):
+        """Test che le scansioni anticipate scartate non sopravvivano a execute()"""
+        login_started = threading.Event()
+        login_cancelled = threading.Event()
+
+        def page_scanner(page, depth_config):
+            FakeCrawler.first_scan_started.set()
+            if "login" in page['url']:
+                login_started.set()
+                try:
+                    get_current_token().sleep(5)
+                except ScanCancelled:
+                    login_cancelled.set()
+                    raise
+            return {"url": page['url']}, {}, depth_config
+
+        def select_homepage(coordinator, pages, templates, result):
+            login_started.wait(5)
+            return [page for page in pages if page['url'] == f"{BASE}/"]
+
+        config = SamplerConfig(enable_websocket=False, save_screenshots=False,
+                               output_dir=self.tmp.name, max_selected_pages=5, min_selected_pages=1)
+        coordinator = SmartPageSamplerCoordinator(config, page_scanner=page_scanner)
+        started = time.monotonic()
+        with mock.patch("eaa_scanner.page_sampler.coordinator.SmartCrawler", FakeCrawler), \
+                mock.patch.object(SmartPageSamplerCoordinator, "_execute_selection", select_homepage):
+            result = coordinator.execute(BASE)
+
+        self.assertLess(time.monotonic() - started, 4)
+        self.assertTrue(login_cancelled.is_set())
+        self.assertEqual(list(result.early_scans), [f"{BASE}/"])
+
+
+class TestSmartScanReuse(unittest.TestCase):
+    """Test che run_smart_scan riusi i risultati delle scansioni anticipate"""
+
+    def test_early_results_not_rescanned(self):
+        from eaa_scanner import core
+        from eaa_scanner.config import Config
+
+        FakeCrawler.first_scan_started = threading.Event()
+        FakeCrawler.finished = threading.Event()
+        scanned = []
+        real_scan = core._scan_sampled_page
+
+        def counting_scan(cfg, url, page_depth, depth_manager):
+            FakeCrawler.first_scan_started.set()
+            scanned.append(url)
+            return real_scan(cfg, url, page_depth, depth_manager)
+
+        cfg = Config(url=BASE, company_name="Acme", email="a@example.com", simulate=True)
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as tmp, \
+                mock.patch("eaa_scanner.page_sampler.coordinator.SmartCrawler", FakeCrawler), \
+                mock.patch.object(core, "_scan_sampled_page", side_effect=counting_scan):
+            # L'export Jira della remediation viene scritto nella directory corrente
+            os.chdir(tmp)
+            try:
+                result = core.run_smart_scan(cfg, output_root=Path(tmp),
+                                             sampler_config={"enable_websocket": False,
+                                                             "save_screenshots": False,
+                                                             "max_selected_pages": 4,
+                                                             "min_selected_pages": 1})
+            finally:
+                os.chdir(cwd)
+
+        early = result["aggregated"]["smart_sampling"]["pipeline"]["early_scanned_pages"]
+        self.assertIn(f"{BASE}/", early)
+        self.assertEqual(result["pages_scanned"], 4)
+        self.assertEqual(len(scanned), len(set(scanned)), scanned)
+        self.assertIn(f"{BASE}/", scanned)
+
+
+if __name__ == '__main__':
+    unittest.main()
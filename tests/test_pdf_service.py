@@ -0,0 +1,250 @@
+"""
+Test per il pool Chrome del servizio PDF
+"""
+import base64
+import json
+import tempfile
+import threading
+import os
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import sys
+sys.path.append(str(Path(__file__).parent.parent))
+
+from eaa_scanner import pdf, pdf_service
+from eaa_scanner.cancellation import CancellationToken, ScanCancelled, cancellation_scope
+from eaa_scanner.pdf_service import (
+    ChromeInstance, ChromePDFPool, PDFJobTimeout, PDFQueueFull, PDFServiceError, print_options
+)
+
+
+class FakeInstance:
+    """Istanza Chrome simulata: scrive il PDF dopo `delay` secondi"""
+
+    def __init__(self, delay=0.0, fail=False):
+        self.delay = delay
+        self.fail = fail
+        self.jobs = 0
+        self.closed = False
+
+    @property
+    def alive(self):
+        return not self.closed
+
+    def print_to_pdf(self, html_path, pdf_path, options, deadline):
+        if self.fail:
+            raise RuntimeError("crash")
+        started = time.monotonic()
+        while time.monotonic() - started < self.delay:
+            if self.closed:
+                raise ConnectionError("closed")
+            time.sleep(0.01)
+        Path(pdf_path).write_bytes(b"%PDF")
+        self.jobs += 1
+
+    def close(self):
+        self.closed = True
+
+
+class FakeWebSocket:
+    """Risponde ai comandi DevTools come una scheda di Chrome"""
+
+    def __init__(self):
+        self.sent = []
+        self.pending = []
+
+    def send(self, raw):
+        message = json.loads(raw)
+        self.sent.append(message)
+        method, session = message["method"], message.get("sessionId")
+        if method == "Page.navigate":
+            self.pending.append({"method": "Page.frameStartedLoading", "sessionId": session, "params": {}})
+            self.pending.append({"id": message["id"], "result": {"frameId": "F"}})
+            self.pending.append({"method": "Page.loadEventFired", "sessionId": session, "params": {}})
+        elif method == "Page.printToPDF":
+            self.pending.append({"id": message["id"], "result": {"data": base64.b64encode(b"%PDF-1.4").decode()}})
+
+    def recv(self, timeout=None):
+        if not self.pending:
+            raise TimeoutError()
+        return json.dumps(self.pending.pop(0))
+
+
+class TestChromePDFPool(unittest.TestCase):
+    """Test suite per riuso delle istanze, coda limitata e timeout"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.html = Path(self.tmp.name) / "report.html"
+        self.html.write_text("<p>report</p>")
+        self.created = []
+
+    def pool(self, size=1, max_queue=0, max_jobs=100, **instance):
+        def factory(path):
+            self.created.append(FakeInstance(**instance))
+            return self.created[-1]
+        pool = ChromePDFPool("chrome", size=size, max_queue=max_queue, max_jobs=max_jobs,
+                             instance_factory=factory)
+        self.addCleanup(pool.close)
+        return pool
+
+    def pdf_path(self, n=0):
+        return Path(self.tmp.name) / f"report_{n}.pdf"
+
+    def test_instance_reused(self):
+        pool = self.pool()
+        for n in range(3):
+            pool.render(self.html, self.pdf_path(n))
+            self.assertEqual(self.pdf_path(n).read_bytes(), b"%PDF")
+        self.assertEqual(len(self.created), 1)
+        self.assertEqual(self.created[0].jobs, 3)
+
+    def test_instance_recycled_after_max_jobs(self):
+        pool = self.pool(max_jobs=2)
+        for n in range(3):
+            pool.render(self.html, self.pdf_path(n))
+        self.assertEqual(len(self.created), 2)
+        self.assertTrue(self.created[0].closed)
+
+    def test_failed_instance_replaced(self):
+        pool = self.pool(fail=True)
+        with self.assertRaises(PDFServiceError):
+            pool.render(self.html, self.pdf_path())
+        self.assertTrue(self.created[0].closed)
+        with self.assertRaises(PDFServiceError):
+            pool.render(self.html, self.pdf_path())
+        self.assertEqual(len(self.created), 2)
+
+    def test_bounded_queue(self):
+        pool = self.pool(size=1, max_queue=1, delay=0.3)
+        errors = []
+
+        def render(n):
+            try:
+                pool.render(self.html, self.pdf_path(n))
+            except PDFServiceError as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=render, args=(n,)) for n in range(2)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.1)
+        with self.assertRaises(PDFQueueFull):
+            pool.render(self.html, self.pdf_path(9))
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(len(self.created), 1)
+
+    def test_timeout_waiting_for_instance(self):
+        pool = self.pool(size=1, max_queue=4, delay=0.5)
+        thread = threading.Thread(target=pool.render, args=(self.html, self.pdf_path()))
+        thread.start()
+        time.sleep(0.05)
+        with self.assertRaises(PDFJobTimeout):
+            pool.render(self.html, self.pdf_path(1), timeout=0.1)
+        thread.join()
+
+    def test_cancel_closes_instance(self):
+        pool = self.pool(delay=5)
+        token = CancellationToken()
+        threading.Timer(0.1, token.cancel).start()
+        started = time.monotonic()
+        with cancellation_scope(token), self.assertRaises(ScanCancelled):
+            pool.render(self.html, self.pdf_path())
+        self.assertLess(time.monotonic() - started, 2)
+        self.assertTrue(self.created[0].closed)
+
+    def test_warm(self):
+        pool = self.pool(size=2)
+        self.assertEqual(pool.warm(), 1)
+        pool.render(self.html, self.pdf_path())
+        self.assertEqual(len(self.created), 1)
+
+
+class TestWarmPolicy(unittest.TestCase):
+    """Test suite per l'avvio anticipato di Chrome solo quando verrà usato"""
+
+    def setUp(self):
+        env_patch = mock.patch.dict(os.environ)
+        env_patch.start()
+        self.addCleanup(env_patch.stop)
+        os.environ.pop("EAA_PDF_WARM", None)
+
+    def test_auto_prefers_weasyprint(self):
+        with mock.patch.object(pdf_service, "_weasyprint_available", return_value=True):
+            self.assertFalse(pdf_service.warm_enabled("auto"))
+            self.assertTrue(pdf_service.warm_enabled("chrome"))
+        with mock.patch.object(pdf_service, "_weasyprint_available", return_value=False):
+            self.assertTrue(pdf_service.warm_enabled("auto"))
+            self.assertFalse(pdf_service.warm_enabled("wkhtmltopdf"))
+
+    def test_env_overrides(self):
+        os.environ["EAA_PDF_WARM"] = "0"
+        self.assertFalse(pdf_service.warm_enabled("chrome"))
+        os.environ["EAA_PDF_WARM"] = "1"
+        self.assertTrue(pdf_service.warm_enabled("weasyprint"))
+
+    def test_disabled_warm_does_not_create_pool(self):
+        with mock.patch.object(pdf_service, "warm_enabled", return_value=False), \
+                mock.patch.object(pdf_service, "get_chrome_pool") as get_pool:
+            self.assertEqual(pdf_service.warm_pdf_service(), 0)
+        get_pool.assert_not_called()
+
+
+class TestDevToolsProtocol(unittest.TestCase):
+    """Test suite per i comandi DevTools di ChromeInstance"""
+
+    def test_print_to_pdf(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            instance = ChromeInstance("chrome")
+            instance._ws = FakeWebSocket()
+            instance._session_id = "S"
+            html, target = Path(tmp) / "report.html", Path(tmp) / "report.pdf"
+            options = print_options("Letter", {"top": 0.5})
+
+            instance.print_to_pdf(html, target, options, time.monotonic() + 5)
+
+            self.assertEqual(target.read_bytes(), b"%PDF-1.4")
+            navigate, printing = instance._ws.sent
+            self.assertEqual(navigate["params"]["url"], html.resolve().as_uri())
+            self.assertEqual(printing["sessionId"], "S")
+            self.assertEqual(printing["params"]["paperWidth"], 8.5)
+            self.assertEqual(printing["params"]["marginTop"], 0.5)
+            self.assertEqual(instance.jobs, 1)
+
+    def test_missing_response_times_out(self):
+        instance = ChromeInstance("chrome")
+        instance._ws = mock.Mock(recv=mock.Mock(side_effect=TimeoutError))
+        with self.assertRaises(PDFJobTimeout):
+            instance._call("Page.enable", deadline=time.monotonic() + 1)
+
+
+class TestChromeEngine(unittest.TestCase):
+    """Test suite per l'uso del pool nella conversione HTML -> PDF"""
+
+    def test_pool_used_before_command_line(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            html, target = Path(tmp) / "report.html", Path(tmp) / "report.pdf"
+            pool = mock.Mock(render=mock.Mock(side_effect=lambda h, p, o, timeout: p.write_bytes(b"%PDF")))
+            with mock.patch.object(pdf, "get_chrome_pool", return_value=pool), \
+                    mock.patch.object(pdf, "run_command") as run_command:
+                self.assertTrue(pdf.html_to_pdf(html, target, engine="chrome",
+                                                chrome_options={"page_format": "A4"}, timeout=30))
+            run_command.assert_not_called()
+            self.assertEqual(pool.render.call_args.kwargs["timeout"], 30)
+
+    def test_queue_full_does_not_spawn_browser(self):
+        pool = mock.Mock(render=mock.Mock(side_effect=PDFQueueFull("full")))
+        with mock.patch.object(pdf, "get_chrome_pool", return_value=pool), \
+                mock.patch.object(pdf, "run_command") as run_command:
+            self.assertFalse(pdf._try_chrome(Path("report.html"), Path("report.pdf")))
+        run_command.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+"""
+Test per il rate limiting GCRA e gli header RateLimit-*
+"""
+import asyncio
+import unittest
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from eaa_scanner.state import MemoryStateBackend
+from eaa_scanner.state.rate_limit import gcra
+
+
+class TestGCRA(unittest.TestCase):
+    """Test suite per l'algoritmo su TAT"""
+
+    def test_burst_then_steady_rate(self):
+        tat, allowed = None, []
+        for now in (0.0, 0.0, 0.0, 0.0, 10.0, 20.0, 20.0):
+            result, new_tat = gcra(tat, now, limit=3, period=60)
+            allowed.append(result.allowed)
+            tat = new_tat if new_tat is not None else tat
+        # Raffica di 3, poi una richiesta ogni 20 secondi
+        self.assertEqual(allowed, [True, True, True, False, False, True, False])
+
+    def test_rejection_reports_retry_and_keeps_state(self):
+        _, tat = gcra(None, 100.0, limit=1, period=10)
+        result, new_tat = gcra(tat, 104.0, limit=1, period=10)
+        self.assertFalse(result.allowed)
+        self.assertIsNone(new_tat)
+        self.assertAlmostEqual(result.retry_after, 6.0)
+        self.assertEqual(result.headers()["Retry-After"], "6")
+
+    def test_headers(self):
+        result, tat = gcra(None, 0.0, limit=4, period=60)
+        self.assertEqual(tat, 15.0)
+        self.assertEqual(result.headers(), {
+            "RateLimit-Limit": "4", "RateLimit-Remaining": "3", "RateLimit-Reset": "15"
+        })
+
+
+class BrokenBackend(MemoryStateBackend):
+    """Backend Redis non raggiungibile"""
+
+    calls = 0
+
+    def throttle(self, key, limit, period, cost=1):
+        BrokenBackend.calls += 1
+        raise ConnectionError("redis down")
+
+
+class TestAPIRateLimiter(unittest.TestCase):
+    """Test suite per il limiter dell'API e il fallback da Redis"""
+
+    @classmethod
+    def setUpClass(cls):
+        from webapp import app_fastapi
+        cls.app = app_fastapi
+
+    def test_redis_failure_falls_back_and_backs_off(self):
+        BrokenBackend.calls = 0
+        limiter = self.app.RateLimiter(MemoryStateBackend(), BrokenBackend())
+        results = [asyncio.run(limiter.check("k", limit=2, window=60)) for _ in range(3)]
+        self.assertEqual([r.allowed for r in results], [True, True, False])
+        self.assertEqual(BrokenBackend.calls, 1)
+
+
+class TestDependencyRateLimiter(unittest.TestCase):
+    """Test suite per il limiter in memoria delle dipendenze condivise"""
+
+    def test_limit_per_client(self):
+        from webapp.dependencies import RateLimiter
+        limiter = RateLimiter(requests=2, window=60)
+        self.assertEqual([limiter.is_allowed("a") for _ in range(3)], [True, True, False])
+        self.assertTrue(limiter.is_allowed("b"))
+        self.assertEqual(limiter.check("a").headers()["RateLimit-Remaining"], "0")
+
+
+if __name__ == '__main__':
+    unittest.main()
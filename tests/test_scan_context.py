@@ -0,0 +1,132 @@
+"""
+Test per la propagazione degli hook di scansione tramite contextvars
+"""
+import asyncio
+import os
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import tempfile
+from unittest import mock
+
+import sys
+sys.path.append(str(Path(__file__).parent.parent))
+
+from eaa_scanner.config import Config
+from eaa_scanner.enterprise_core import EnterpriseScanOrchestrator
+from eaa_scanner.scan_events import (
+    ScanEventHooks, create_task_with_hooks, get_current_hooks, hooks_context,
+    run_in_executor_with_context, submit_with_context
+)
+
+
+class RecordingMonitor:
+    """Monitor fittizio che registra gli eventi ricevuti"""
+
+    def __init__(self):
+        self.events = []
+
+    def __getattr__(self, name):
+        if name.startswith("emit_"):
+            return lambda *args: self.events.append((name[5:], args[1:]))
+        raise AttributeError(name)
+
+
+class TestHooksPropagation(unittest.TestCase):
+    """Test suite per hook visibili in thread executor e task asyncio"""
+
+    def test_hooks_context_restores_previous(self):
+        """Test che hooks_context ripristini il contesto all'uscita"""
+        hooks = ScanEventHooks("scan-1")
+        with hooks_context(hooks):
+            self.assertIs(get_current_hooks(), hooks)
+        self.assertIsNone(get_current_hooks())
+
+    def test_submit_with_context_reaches_worker(self):
+        """Test che gli hook arrivino al thread dell'executor"""
+        hooks = ScanEventHooks("scan-1")
+        with ThreadPoolExecutor(max_workers=1) as executor, hooks_context(hooks):
+            plain = executor.submit(get_current_hooks).result()
+            propagated = submit_with_context(executor, get_current_hooks).result()
+
+        self.assertIsNone(plain)
+        self.assertIs(propagated, hooks)
+
+    def test_asyncio_helpers(self):
+        """Test run_in_executor e task con hook dedicati"""
+        hooks = ScanEventHooks("scan-1")
+        task_hooks = ScanEventHooks("scan-2")
+
+        async def scenario():
+            with hooks_context(hooks):
+                in_executor = await run_in_executor_with_context(None, get_current_hooks)
+
+            async def read_hooks():
+                return get_current_hooks()
+
+            in_task = await create_task_with_hooks(read_hooks(), task_hooks)
+            return in_executor, in_task, get_current_hooks()
+
+        in_executor, in_task, after = asyncio.run(scenario())
+
+        self.assertIs(in_executor, hooks)
+        self.assertIs(in_task, task_hooks)
+        self.assertIsNone(after)
+
+    def test_run_scan_does_not_leak_hooks(self):
+        """Test che run_scan non lasci i propri hook nel contesto del chiamante"""
+        from eaa_scanner.core import run_scan
+
+        monitor = RecordingMonitor()
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as tmp:
+            # L'export Jira della remediation viene scritto nella directory corrente
+            os.chdir(tmp)
+            try:
+                result = run_scan(Config(url="https://example.com", company_name="Acme", simulate=True),
+                                  output_root=Path(tmp), event_monitor=monitor)
+            finally:
+                os.chdir(cwd)
+
+        self.assertIsNone(get_current_hooks())
+        self.assertTrue(monitor.events)
+        self.assertGreater(result["event_stats"]["delivered"], 0)
+
+
+class TestParallelScanners(unittest.TestCase):
+    """Test suite per l'esecuzione parallela degli scanner enterprise"""
+
+    def test_parallel_keeps_order_and_counts(self):
+        """Test ordine risultati, contatori e hook nei thread worker"""
+        orchestrator = EnterpriseScanOrchestrator(enable_parallel=True)
+        monitor = RecordingMonitor()
+        hooks = ScanEventHooks("scan-1")
+        hooks.set_monitor(monitor)
+
+        class FailingAxe:
+            def __init__(self, **kwargs):
+                pass
+
+            def scan(self, url):
+                raise RuntimeError("axe non disponibile")
+
+        cfg = Config(url="https://example.com", simulate=True)
+        cfg.scanners_enabled.wave = True
+        cfg.scanners_enabled.pa11y = True
+        cfg.scanners_enabled.axe_core = True
+        cfg.scanners_enabled.lighthouse = True
+
+        with tempfile.TemporaryDirectory() as tmp, hooks_context(hooks), \
+                mock.patch("eaa_scanner.enterprise_core.AxeScanner", FailingAxe):
+            results = orchestrator._execute_scanners_robust(cfg, Path(tmp), hooks, 0)
+
+        self.assertEqual([key for key, _ in results], ["wave", "pa11y", "axe", "lighthouse"])
+        self.assertIsNone(dict(results)["axe"])
+        self.assertEqual(orchestrator.execution_stats,
+                         {"started": 4, "completed": 3, "failed": 1, "timeouts": 0})
+        # scanner_start viene emesso da MonitoredScanner nei thread worker
+        started = {args[0] for kind, args in monitor.events if kind == "scanner_start"}
+        self.assertEqual(started, {"WAVE", "Pa11y", "Axe-core", "Lighthouse"})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+"""
+Test per gli hook eventi di scansione
+"""
+import threading
+import time
+import unittest
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from eaa_scanner.scan_events import ScanEventHooks
+
+
+class RecordingMonitor:
+    """Monitor fittizio che registra gli eventi ricevuti"""
+
+    def __init__(self):
+        self.events = []
+
+    def __getattr__(self, name):
+        if name.startswith("emit_"):
+            return lambda *args: self.events.append((name[5:], args[1:]))
+        raise AttributeError(name)
+
+
+class TestScanEventCoalescing(unittest.TestCase):
+    """Test suite per il coalescing degli aggiornamenti scanner"""
+
+    def setUp(self):
+        self.monitor = RecordingMonitor()
+        self.hooks = ScanEventHooks("scan-1", coalesce_window=60)
+        self.hooks.set_monitor(self.monitor)
+
+    def test_operations_merged_within_window(self):
+        """Test che gli aggiornamenti ravvicinati vengano fusi"""
+        self.hooks.emit_scanner_start("Pa11y", "https://example.com")
+        for progress in (25, 50, 75, 90):
+            self.hooks.emit_scanner_operation("Pa11y", "op", progress=progress)
+        self.hooks.emit_scanner_complete("Pa11y", {"errors": 0})
+
+        kinds = [kind for kind, _ in self.monitor.events]
+        self.assertEqual(kinds, ["scanner_start", "scanner_operation", "scanner_complete"])
+        self.assertEqual(self.hooks.get_stats(), {"delivered": 1, "merged": 2, "dropped": 1})
+
+    def test_scanners_coalesced_independently(self):
+        """Test che il coalescing sia per scanner"""
+        self.hooks.emit_scanner_operation("WAVE", "op", progress=10)
+        self.hooks.emit_scanner_operation("Axe-core", "op", progress=10)
+
+        self.assertEqual(len(self.monitor.events), 2)
+
+    def test_phase_change_flushes_pending(self):
+        """Test che un cambio fase consegni l'ultimo aggiornamento in attesa"""
+        self.hooks.emit_scanner_operation("WAVE", "op", progress=10)
+        self.hooks.emit_scanner_operation("WAVE", "op", progress=80)
+        self.hooks.emit_processing_step("Generazione analytics", 70)
+
+        self.assertEqual(self.monitor.events[1], ("scanner_operation", ("WAVE", "op", 80, None)))
+        self.assertEqual(self.monitor.events[2][0], "processing_step")
+
+    def test_pending_delivered_when_window_closes(self):
+        """Test che l'aggiornamento trattenuto arrivi senza altri eventi"""
+        hooks = ScanEventHooks("scan-2", coalesce_window=0.05)
+        hooks.set_monitor(self.monitor)
+        hooks.emit_scanner_operation("Pa11y", "Inizializzazione", progress=25)
+        hooks.emit_scanner_operation("Pa11y", "Scansione in corso", progress=50)
+
+        deadline = time.time() + 2
+        while len(self.monitor.events) < 2 and time.time() < deadline:
+            time.sleep(0.01)
+
+        self.assertEqual(self.monitor.events[-1], ("scanner_operation", ("Pa11y", "Scansione in corso", 50, None)))
+        self.assertEqual(hooks.get_stats()["delivered"], 2)
+
+    def test_timer_delivery_never_follows_complete(self):
+        """Test che il complete attenda la consegna del timer già avviata"""
+        delivering = threading.Event()
+
+        class SlowMonitor(RecordingMonitor):
+            def emit_scanner_operation(self, *args):
+                if threading.current_thread() is not threading.main_thread():
+                    delivering.set()
+                    time.sleep(0.2)
+                self.events.append(("scanner_operation", args[1:]))
+
+        monitor = SlowMonitor()
+        hooks = ScanEventHooks("scan-3", coalesce_window=0.05)
+        hooks.set_monitor(monitor)
+        hooks.emit_scanner_operation("Pa11y", "op", progress=25)
+        hooks.emit_scanner_operation("Pa11y", "op", progress=50)
+        self.assertTrue(delivering.wait(2))
+        hooks.emit_scanner_complete("Pa11y", {"errors": 0})
+
+        kinds = [kind for kind, _ in monitor.events]
+        self.assertEqual(kinds, ["scanner_operation", "scanner_operation", "scanner_complete"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,133 @@
+"""
+Test per lo storico scansioni: migrazione, paginazione keyset e statistiche aggregate
+"""
+import asyncio
+import json
+import sqlite3
+import tempfile
+import unittest
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from webapp import database as db_module
+from webapp.database import Database
+
+
+class TestScanHistory(unittest.TestCase):
+    """Test suite per /api/history con indici e colonne di riepilogo"""
+
+    @classmethod
+    def setUpClass(cls):
+        from webapp import app_fastapi
+        cls.app = app_fastapi
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        db_path = str(Path(self.tmp.name) / "history.db")
+
+        # Database con schema precedente e una scansione già salvata
+        conn = sqlite3.connect(db_path)
+        conn.execute("""
+            CREATE TABLE scans (
+                id TEXT PRIMARY KEY, url TEXT NOT NULL, company_name TEXT NOT NULL,
+                email TEXT NOT NULL, status TEXT NOT NULL, progress INTEGER DEFAULT 0,
+                results TEXT, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, output_path TEXT,
+                html_report_path TEXT, pdf_report_path TEXT
+            )
+        """)
+        conn.execute(
+            "INSERT INTO scans (id, url, company_name, email, status, results, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            ("legacy", "https://example.com", "Acme", "a@example.com", "completed",
+             json.dumps({"compliance_score": 72.5, "eaa_compliant": True, "total_issues": 9}),
+             "2024-01-01T00:00:00")
+        )
+        conn.commit()
+        conn.close()
+
+        self.previous = db_module._database
+        db_module._database = Database(db_path)
+        self.app.init_database()
+
+        rows = [
+            (f"scan-{n:02d}", "https://example.com", "Acme", "a@example.com",
+             "completed" if n % 3 else "failed", f"2024-02-{n + 1:02d}T00:00:00", 50 + n, n % 2)
+            for n in range(25)
+        ]
+        with db_module._database.transaction() as conn:
+            conn.executemany("""
+                INSERT INTO scans (id, url, company_name, email, status, created_at,
+                                   compliance_score, eaa_compliant)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, rows)
+
+    def tearDown(self):
+        db_module._database.close()
+        db_module._database = self.previous
+        self.tmp.cleanup()
+
+    def history(self, **kwargs):
+        kwargs.setdefault("current_user", None)
+        for name in ("status_filter", "date_from", "date_to", "cursor"):
+            kwargs.setdefault(name, None)
+        return asyncio.run(self.app.get_scan_history(**kwargs))["data"]
+
+    def test_legacy_rows_backfilled(self):
+        """Test che la migrazione copi i campi di riepilogo dal JSON"""
+        data = self.history(limit=100)
+        legacy = next(h for h in data["history"] if h["id"] == "legacy")
+        self.assertEqual(legacy["compliance_score"], 72.5)
+        self.assertTrue(legacy["eaa_compliant"])
+        self.assertEqual(legacy["total_issues"], 9)
+
+    def test_cursor_pagination_walks_all_rows(self):
+        """Test paginazione keyset: ordine, nessun duplicato, nessuna riga persa"""
+        seen, cursor = [], None
+        while True:
+            data = self.history(limit=10, cursor=cursor)
+            seen.extend(h["id"] for h in data["history"])
+            cursor = data["pagination"]["next_cursor"]
+            if not cursor:
+                break
+
+        self.assertEqual(len(seen), 26)
+        self.assertEqual(len(set(seen)), 26)
+        self.assertEqual(seen[0], "scan-24")
+        self.assertEqual(seen[-1], "legacy")
+
+    def test_totals_from_stats_table(self):
+        """Test totali mantenuti dai trigger, anche dopo un aggiornamento di stato"""
+        self.assertEqual(self.history(limit=5)["pagination"]["total"], 26)
+        self.assertEqual(self.history(limit=5, status_filter="failed")["pagination"]["total"], 9)
+
+        with db_module._database.transaction() as conn:
+            conn.execute("UPDATE scans SET status = 'completed' WHERE id = 'scan-00'")
+        self.assertEqual(self.history(limit=5, status_filter="failed")["pagination"]["total"], 8)
+
+    def test_history_query_uses_index(self):
+        """Test che la pagina filtrata per stato usi l'indice composto"""
+        with db_module._database.connection() as conn:
+            plan = " ".join(row[-1] for row in conn.execute("""
+                EXPLAIN QUERY PLAN SELECT id FROM scans WHERE status = ?
+                ORDER BY created_at DESC, id DESC LIMIT 10
+            """, ("completed",)))
+        self.assertIn("idx_scans_status_created", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+
+    def test_save_scan_fills_summary_columns(self):
+        """Test che save_scan_to_database scriva le colonne di riepilogo"""
+        request = self.app.ScanRequest(url="https://example.com", company_name="Acme", email="a@example.com")
+        results = {"compliance_score": 88, "eaa_compliant": True, "critical_issues": 2}
+        asyncio.run(self.app.save_scan_to_database("scan-00", request, results, {}))
+
+        entry = next(h for h in self.history(limit=100)["history"] if h["id"] == "scan-00")
+        self.assertEqual(entry["compliance_score"], 88)
+        self.assertEqual(entry["critical_issues"], 2)
+        self.assertEqual(entry["date"], "2024-02-01T00:00:00")
+        self.assertEqual(self.history(limit=5, status_filter="failed")["pagination"]["total"], 8)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+"""
+Test per lo store eventi a ring buffer del monitor di scansione
+"""
+import unittest
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from webapp.scan_monitor import EventRingBuffer, ScanEventStore, ScanMonitor
+
+
+class TestEventRingBuffer(unittest.TestCase):
+    """Test suite per il buffer circolare con sequence ID"""
+
+    def test_since_returns_only_new_events(self):
+        """Test eventi successivi all'ultimo ID ricevuto"""
+        buffer = EventRingBuffer(10)
+        for i in range(5):
+            buffer.append({"n": i})
+
+        events, truncated = buffer.since(3)
+
+        self.assertFalse(truncated)
+        self.assertEqual([e["id"] for e in events], [4, 5])
+        self.assertEqual([e["n"] for e in events], [3, 4])
+
+    def test_overwrite_reports_truncation(self):
+        """Test che un client rimasto indietro venga segnalato"""
+        buffer = EventRingBuffer(3)
+        for i in range(10):
+            buffer.append({"n": i})
+
+        events, truncated = buffer.since(2)
+
+        self.assertTrue(truncated)
+        self.assertEqual([e["id"] for e in events], [8, 9, 10])
+        self.assertEqual(len(buffer), 3)
+
+    def test_recent_and_limit(self):
+        """Test ultimi N eventi e limite sulla risposta"""
+        buffer = EventRingBuffer(50)
+        for i in range(20):
+            buffer.append({"n": i})
+
+        self.assertEqual([e["id"] for e in buffer.recent(3)], [18, 19, 20])
+        events, _ = buffer.since(0, limit=4)
+        self.assertEqual([e["id"] for e in events], [1, 2, 3, 4])
+
+
+class TestScanEventStore(unittest.TestCase):
+    """Test suite per eviction e limiti di memoria"""
+
+    def test_completed_scans_expire(self):
+        """Test rimozione scansioni terminate dopo il TTL"""
+        store = ScanEventStore(completed_ttl_seconds=10)
+        store.append("a", {"event_type": "scan_start"})
+        store.append("a", {"event_type": "scan_complete"})
+        store.append("b", {"event_type": "scan_start"})
+
+        completed_at = store._buffers["a"].completed_at
+        self.assertEqual(store.evict_expired(now=completed_at + 5), 0)
+        self.assertEqual(store.evict_expired(now=completed_at + 11), 1)
+        self.assertFalse(store.has_scan("a"))
+        self.assertTrue(store.has_scan("b"))
+
+    def test_memory_cap_prefers_completed_scans(self):
+        """Test tetto globale: prima si rimuovono le scansioni terminate"""
+        store = ScanEventStore(per_scan_capacity=10, max_total_events=6)
+        store.append("done", {"event_type": "scan_complete"})
+        for _ in range(3):
+            store.append("active", {"event_type": "scanner_operation"})
+        for _ in range(3):
+            store.append("new", {"event_type": "scanner_operation"})
+
+        self.assertFalse(store.has_scan("done"))
+        self.assertTrue(store.has_scan("active"))
+        self.assertEqual(store.get_stats()["total_events"], 6)
+
+    def test_evicted_scan_keeps_sequence(self):
+        """Test che un buffer ricreato dopo eviction prosegua la numerazione"""
+        store = ScanEventStore(per_scan_capacity=20, max_total_events=12)
+        for _ in range(10):
+            store.append("slow", {"event_type": "scanner_operation"})
+        for _ in range(12):
+            store.append("busy", {"event_type": "scanner_operation"})
+        self.assertFalse(store.has_scan("slow"))
+        self.assertEqual(store.get_events_since("slow", 8), ([], True))
+
+        seq = store.append("slow", {"event_type": "scanner_operation"})
+        events, truncated = store.get_events_since("slow", 10)
+
+        self.assertEqual(seq, 11)
+        self.assertFalse(truncated)
+        self.assertEqual([e["id"] for e in events], [11])
+
+    def test_client_ahead_of_buffer_restarts(self):
+        """Test che un last_id oltre l'ultimo evento segnali truncated"""
+        buffer = EventRingBuffer(10)
+        for i in range(3):
+            buffer.append({"n": i})
+
+        events, truncated = buffer.since(10)
+
+        self.assertTrue(truncated)
+        self.assertEqual([e["id"] for e in events], [1, 2, 3])
+
+
+class TestScanMonitor(unittest.TestCase):
+    """Test suite per il contratto eventi del monitor"""
+
+    def test_event_shape(self):
+        """Test forma eventi e polling incrementale"""
+        monitor = ScanMonitor(ScanEventStore())
+        monitor.emit_scan_start("s1", url="https://example.com", company_name="Acme",
+                                scanners_enabled={"wave": True, "pa11y": False})
+        monitor.emit_scan_failed("s1", "Network error", error_code="NETWORK_ERROR")
+
+        events, _ = monitor.get_events_since("s1", 1)
+
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0]["event_type"], "scan_failed")
+        self.assertEqual(events[0]["data"]["error_code"], "NETWORK_ERROR")
+        first = monitor.get_recent_events("s1", 2)[0]
+        self.assertEqual(first["data"]["scanners"], ["wave"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+"""
+Test per riepilogo precalcolato, ETag e risultati paginati delle scansioni
+"""
+import asyncio
+import json
+import unittest
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from starlette.requests import Request
+
+from webapp.scan_payloads import aggregate_scan_results, etag_matches, paginate_scan_results
+
+
+def make_request(if_none_match=None):
+    """Richiesta ASGI minimale con header If-None-Match opzionale"""
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    return Request({"type": "http", "method": "GET", "path": "/", "query_string": b"", "headers": headers})
+
+
+def page_result(score, critical, wcag, issues):
+    return {
+        "compliance_score": score,
+        "issues_total": issues,
+        "issues_by_severity": {"critical": critical, "low": issues - critical},
+        "issues_by_wcag": {wcag: issues},
+        "normalized_issues": [{"code": f"i{n}"} for n in range(issues)],
+        "raw_data": {"html": "x" * 1000},
+        "scan_date": "2024-01-01",
+        "scanners_used": ["axe"]
+    }
+
+
+class TestScanPayloads(unittest.TestCase):
+    """Test suite per i payload di stato e risultati"""
+
+    def setUp(self):
+        self.results = {
+            f"https://example.com/{n}": page_result(60 + n * 10, n, f"1.{n}.1", n + 1)
+            for n in range(3)
+        }
+
+    def test_aggregate_summary(self):
+        """Test aggregazione di punteggio, severità e WCAG"""
+        summary = aggregate_scan_results(self.results)
+        self.assertEqual(summary["compliance_score"], 70.0)
+        self.assertEqual(summary["total_issues"], 6)
+        self.assertEqual(summary["issues_by_severity"]["critical"], 3)
+        self.assertEqual(summary["issues_by_wcag"], {"1.0.1": 1, "1.1.1": 2, "1.2.1": 3})
+        self.assertEqual(summary["pages_analyzed"], 3)
+        self.assertNotIn("scan_data", summary)
+
+    def test_pagination_and_raw_data(self):
+        """Test paginazione in ordine di scansione, raw_data solo su richiesta"""
+        first = paginate_scan_results(self.results, page=1, page_size=2)
+        self.assertEqual([item["url"] for item in first["items"]],
+                         ["https://example.com/0", "https://example.com/1"])
+        self.assertNotIn("raw_data", first["items"][0])
+        self.assertTrue(first["pagination"]["has_next"])
+
+        last = paginate_scan_results(self.results, page=2, page_size=2, include_raw=True)
+        self.assertEqual(len(last["items"]), 1)
+        self.assertIn("raw_data", last["items"][0])
+        self.assertFalse(last["pagination"]["has_next"])
+
+    def test_etag_matching(self):
+        """Test confronto If-None-Match con liste, prefisso debole e wildcard"""
+        self.assertTrue(etag_matches('"a", W/"b"', '"b"'))
+        self.assertTrue(etag_matches("*", '"b"'))
+        self.assertFalse(etag_matches('"a"', '"b"'))
+        self.assertFalse(etag_matches(None, '"b"'))
+
+
+class TestScanStatusEndpoint(unittest.TestCase):
+    """Test suite per /api/scan/status con riepilogo compatto e 304"""
+
+    @classmethod
+    def setUpClass(cls):
+        from webapp import app_fastapi
+        cls.app = app_fastapi
+
+    def setUp(self):
+        self.session_id = "payload-test"
+        self.app.scan_sessions[self.session_id] = {
+            "status": "completed",
+            "progress": 100,
+            "scan_results": {
+                f"https://example.com/{n}": page_result(80, 1, "1.1.1", 2) for n in range(4)
+            }
+        }
+
+    def tearDown(self):
+        self.app.scan_sessions.pop(self.session_id, None)
+
+    def status(self, if_none_match=None):
+        return asyncio.run(self.app._get_scan_status_internal(self.session_id, make_request(if_none_match)))
+
+    def test_completed_status_is_compact_and_cached(self):
+        """Test stato compatto, riepilogo conservato e 304 con ETag corrispondente"""
+        response = self.status()
+        payload = json.loads(response.body)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(payload["results"]["total_issues"], 8)
+        self.assertNotIn("scan_data", payload["results"])
+        self.assertNotIn("normalized_issues", payload["results"])
+        self.assertIn("results_summary", self.app.scan_sessions[self.session_id])
+
+        etag = response.headers["etag"]
+        cached = self.status(if_none_match=etag)
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(cached.body, b"")
+
+        # Un cambiamento di stato produce un nuovo ETag
+        self.app.scan_sessions[self.session_id]["message"] = "aggiornato"
+        self.assertEqual(self.status(if_none_match=etag).status_code, 200)
+
+    def test_page_results_endpoint(self):
+        """Test endpoint paginato dei risultati completi"""
+        response = asyncio.run(self.app.get_scan_page_results(
+            self.session_id, make_request(), page=2, page_size=3, include_raw=False
+        ))
+        payload = json.loads(response.body)
+        self.assertEqual(len(payload["items"]), 1)
+        self.assertEqual(payload["pagination"]["total"], 4)
+        self.assertEqual(len(payload["items"][0]["normalized_issues"]), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,186 @@
+"""
+Test per gli indici Redis dell'elenco scansioni di ScanService
+"""
+import asyncio
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from webapp.models.scan import ScanRequest
+from webapp.services.scan_service import (
+    INDEX_ALL, INDEX_EXPIRY, INDEX_EXPIRY_BACKFILLED, INDEX_MEMBERSHIP, ScanService
+)
+
+
+class FakeRedis:
+    """Sottoinsieme asincrono dei comandi Redis usati da ScanService"""
+
+    def __init__(self):
+        self.strings = {}
+        self.zsets = {}
+        self.hashes = {}
+        self.calls = []
+
+    async def get(self, key):
+        self.calls.append("get")
+        return self.strings.get(key)
+
+    async def setex(self, key, ttl, value):
+        self.strings[key] = value
+
+    async def set(self, key, value):
+        self.strings[key] = value
+
+    async def exists(self, key):
+        return int(key in self.strings)
+
+    async def ttl(self, key):
+        return 3000 if key in self.strings else -2
+
+    async def mget(self, keys):
+        self.calls.append("mget")
+        return [self.strings.get(key) for key in keys]
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.strings.pop(key, None)
+
+    async def zadd(self, key, mapping):
+        self.zsets.setdefault(key, {}).update(mapping)
+
+    async def zrem(self, key, *members):
+        for member in members:
+            self.zsets.get(key, {}).pop(member, None)
+
+    async def zrevrange(self, key, start, end):
+        self.calls.append("zrevrange")
+        ordered = sorted(self.zsets.get(key, {}).items(), key=lambda item: (item[1], item[0]), reverse=True)
+        return [member for member, _ in ordered[start:end + 1]]
+
+    async def zrangebyscore(self, key, low, high, start=0, num=None):
+        ordered = sorted(self.zsets.get(key, {}).items(), key=lambda item: item[1])
+        members = [member for member, score in ordered if score <= high]
+        return members[start:start + num if num else None]
+
+    async def zscan_iter(self, key):
+        for item in list(self.zsets.get(key, {}).items()):
+            yield item
+
+    async def hset(self, key, field, value):
+        self.hashes.setdefault(key, {})[field] = value
+
+    async def hmget(self, key, fields):
+        return [self.hashes.get(key, {}).get(field) for field in fields]
+
+    async def hdel(self, key, *fields):
+        for field in fields:
+            self.hashes.get(key, {}).pop(field, None)
+
+    async def keys(self, pattern):
+        raise AssertionError("KEYS non deve essere usato")
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.commands.append((name, args, kwargs))
+
+    async def execute(self):
+        return [await getattr(self.redis, name)(*args, **kwargs) for name, args, kwargs in self.commands]
+
+
+class TestScanServiceListing(unittest.TestCase):
+    """Test suite per list_scans su indici sorted set"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        with patch.dict("os.environ", {"SCAN_STORAGE_PATH": self.tmp.name}):
+            self.service = ScanService()
+        self.redis = FakeRedis()
+
+        async def get_redis():
+            return self.redis
+        self.service.get_redis = get_redis
+
+    def create(self, n, user=None):
+        request = ScanRequest(url=f"https://example.com/{n}", company_name="Acme", email="a@example.com")
+        scan_id = asyncio.run(self.service.create_scan(request, user))
+        # created_at ha la risoluzione dei microsecondi
+        time.sleep(0.001)
+        return scan_id
+
+    def list(self, **kwargs):
+        return [scan["id"] for scan in asyncio.run(self.service.list_scans(**kwargs))]
+
+    def test_pages_newest_first_with_one_mget(self):
+        ids = [self.create(n) for n in range(5)]
+        self.redis.calls.clear()
+
+        self.assertEqual(self.list(limit=2), [ids[4], ids[3]])
+        self.assertEqual(self.redis.calls, ["zrevrange", "mget"])
+        self.assertEqual(self.list(limit=2, offset=4), [ids[0]])
+        self.assertEqual(self.list(limit=2, offset=5), [])
+
+    def test_status_and_user_indexes_follow_updates(self):
+        mine = [self.create(n, {"id": "u1"}) for n in range(3)]
+        other = self.create(9, {"id": "u2"})
+        asyncio.run(self.service.complete_scan(mine[0], {"score": 90}))
+        asyncio.run(self.service.fail_scan(other, "timeout"))
+
+        self.assertEqual(self.list(status="pending"), [mine[2], mine[1]])
+        self.assertEqual(self.list(status="completed"), [mine[0]])
+        self.assertEqual(self.list(user_id="u1"), [mine[2], mine[1], mine[0]])
+        self.assertEqual(self.list(user_id="u2", status="pending"), [])
+        self.assertEqual(self.list(user_id="u2", status="failed"), [other])
+
+    def test_expired_records_are_unindexed(self):
+        ids = [self.create(n, {"id": "u1"}) for n in range(4)]
+        # Scadenza TTL dei due record più recenti
+        del self.redis.strings[f"scan:{ids[3]}"]
+        del self.redis.strings[f"scan:{ids[2]}"]
+
+        self.assertEqual(self.list(limit=2), [ids[1], ids[0]])
+        self.assertNotIn(ids[3], self.redis.zsets[INDEX_ALL])
+        self.assertEqual(self.list(user_id="u1", status="pending"), [ids[1], ids[0]])
+        self.assertNotIn(ids[3], self.redis.hashes["scans:index:membership"])
+
+    def test_expired_tail_is_unindexed_on_write(self):
+        ids = [self.create(n, {"id": "u1"}) for n in range(3)]
+        # Il record più vecchio scade: nessuna pagina elencata lo raggiunge
+        del self.redis.strings[f"scan:{ids[0]}"]
+        self.redis.zsets[INDEX_EXPIRY][ids[0]] = time.time() - 1
+
+        self.create(3)
+        for key, members in self.redis.zsets.items():
+            self.assertNotIn(ids[0], members, key)
+        self.assertNotIn(ids[0], self.redis.hashes[INDEX_MEMBERSHIP])
+        self.assertIn(ids[1], self.redis.zsets[INDEX_EXPIRY])
+
+    def test_backfill_for_scans_indexed_before_expiry(self):
+        ids = [self.create(n) for n in range(3)]
+        # Indici scritti prima dell'indice di scadenza
+        del self.redis.zsets[INDEX_EXPIRY]
+        del self.redis.strings[INDEX_EXPIRY_BACKFILLED]
+        del self.redis.strings[f"scan:{ids[0]}"]
+
+        self.service._expiry_backfilled = False
+        self.assertEqual(self.list(), [ids[2], ids[1]])
+        self.assertNotIn(ids[0], self.redis.zsets[INDEX_ALL])
+        self.assertEqual(set(self.redis.zsets[INDEX_EXPIRY]), {ids[1], ids[2]})
+        self.assertIn(INDEX_EXPIRY_BACKFILLED, self.redis.strings)
+
+
+if __name__ == '__main__':
+    unittest.main()
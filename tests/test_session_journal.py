@@ -0,0 +1,223 @@
+"""
+Test per la persistenza a journal del SessionManager
+"""
+import tempfile
+import unittest
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from eaa_scanner.api.discovery_service import DiscoveryService
+from eaa_scanner.api.models import (
+    AccessibilityIssue, DiscoveredPage, SessionStatus, SeverityLevel, ScanSession
+)
+from eaa_scanner.api.session_journal import SessionJournal
+from eaa_scanner.api.session_manager import SessionManager
+
+
+def make_issue(n):
+    return AccessibilityIssue(
+        code=f"rule-{n}", description="Immagine senza alt", severity=SeverityLevel.HIGH,
+        wcag_criteria="1.1.1", wcag_level="A", page_url="https://example.com"
+    )
+
+
+class TestSessionJournal(unittest.TestCase):
+    """Test suite per journal append-only, compattazione e replay"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.storage = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_appends_only_new_items(self):
+        """Test che ogni salvataggio scriva solo le modifiche"""
+        journal = SessionJournal(self.storage)
+        session = ScanSession(company_name="Acme", total_pages=3)
+        journal.record("scan", session)
+
+        for n in range(5):
+            session.add_issue(make_issue(n))
+            journal.record("scan", session)
+        journal.close()
+
+        lines = journal.journal_path("scan", session.session_id).read_text().splitlines()
+        self.assertEqual(len(lines), 5)
+        self.assertNotIn("company_name", lines[-1])
+        self.assertIn("rule-4", lines[-1])
+        self.assertNotIn("rule-3", lines[-1])
+
+    def test_replay_restores_session(self):
+        """Test ricostruzione da snapshot più journal"""
+        journal = SessionJournal(self.storage)
+        session = ScanSession(total_pages=2)
+        journal.record("scan", session)
+        session.add_issue(make_issue(1))
+        session.status = SessionStatus.RUNNING
+        journal.record("scan", session)
+        session.pages_scanned = 2
+        journal.record("scan", session)
+        journal.close()
+
+        restored = SessionJournal(self.storage).load(
+            "scan", ScanSession, journal.snapshot_path("scan", session.session_id))
+
+        self.assertEqual(restored.status, SessionStatus.RUNNING)
+        self.assertEqual(restored.pages_scanned, 2)
+        self.assertEqual(restored.total_issues, 1)
+        self.assertEqual(restored.issues[0].severity, SeverityLevel.HIGH)
+
+    def test_compaction_and_stale_journal(self):
+        """Test compattazione: un journal già incluso nello snapshot viene ignorato"""
+        journal = SessionJournal(self.storage, compact_every=3)
+        session = ScanSession()
+        journal.record("scan", session)
+        journal_path = journal.journal_path("scan", session.session_id)
+
+        for n in range(3):
+            session.add_issue(make_issue(n))
+            journal.record("scan", session)
+        self.assertEqual(journal_path.read_text(), "")
+
+        # Simula crash tra scrittura snapshot e azzeramento journal
+        journal_path.write_text('{"seq":2,"append":{"issues":[{"code":"dup"}]}}\n')
+        restored = SessionJournal(self.storage).load(
+            "scan", ScanSession, journal.snapshot_path("scan", session.session_id))
+        self.assertEqual(len(restored.issues), 3)
+
+    def test_truncated_tail_is_ignored(self):
+        """Test che una riga troncata da un crash non impedisca il recovery"""
+        journal = SessionJournal(self.storage)
+        session = ScanSession()
+        journal.record("scan", session)
+        session.pages_scanned = 1
+        journal.record("scan", session)
+        journal.close()
+
+        journal_path = journal.journal_path("scan", session.session_id)
+        with open(journal_path, "a") as f:
+            f.write('{"seq":2,"set":{"pages_sc')
+
+        restored = SessionJournal(self.storage).load(
+            "scan", ScanSession, journal.snapshot_path("scan", session.session_id))
+        self.assertEqual(restored.pages_scanned, 1)
+
+
+class TestSessionManagerPersistence(unittest.TestCase):
+    """Test suite per modifiche in-place persistite dal SessionManager"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.storage = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_page_selection_survives_reload(self):
+        """Test che la selezione pagine dell'utente sopravviva al riavvio"""
+        manager = SessionManager(self.storage)
+        session = manager.create_discovery_session("https://example.com")
+        for path in ("/", "/login"):
+            manager.add_discovered_page(session.session_id, DiscoveredPage(url=f"https://example.com{path}"))
+        manager.set_discovery_status(session.session_id, SessionStatus.COMPLETED)
+
+        service = DiscoveryService(manager, output_dir=self.storage / "out")
+        service.update_page_selection(session.session_id, ["https://example.com/login"])
+        manager.close()
+
+        restored = SessionManager(self.storage).get_discovery_session(session.session_id)
+        selected = [p.url for p in restored.discovered_pages if p.selected_for_scan]
+        self.assertEqual(selected, ["https://example.com/login"])
+
+    def test_progress_updates_append_to_journal(self):
+        """Test che gli aggiornamenti di progresso non riscrivano lo snapshot"""
+        manager = SessionManager(self.storage)
+        session = manager.create_discovery_session("https://example.com")
+        manager.update_discovery_session(session.session_id, pages_discovered=0)
+        snapshot = manager._journal.snapshot_path("discovery", session.session_id)
+        written = snapshot.read_bytes()
+
+        for n in range(1, 20):
+            manager.update_discovery_session(session.session_id, pages_discovered=n, current_page=f"/p{n}")
+        self.assertEqual(snapshot.read_bytes(), written)
+
+        manager.update_discovery_session(session.session_id, status=SessionStatus.RUNNING)
+        self.assertNotEqual(snapshot.read_bytes(), written)
+        manager.close()
+
+        restored = SessionManager(self.storage).get_discovery_session(session.session_id)
+        self.assertEqual(restored.pages_discovered, 19)
+        self.assertEqual(restored.current_page, "/p19")
+
+
+class TestLazySessionLoading(unittest.TestCase):
+    """Test suite per indice su disco e caricamento lazy delle sessioni"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.storage = Path(self.tmp.name)
+        manager = SessionManager(self.storage)
+        self.ids = []
+        for n in range(4):
+            session = manager.create_discovery_session(f"https://example.com/{n}")
+            manager.add_discovered_page(session.session_id, DiscoveredPage(url=f"https://example.com/{n}/a"))
+            manager.set_discovery_status(session.session_id, SessionStatus.COMPLETED)
+            self.ids.append(session.session_id)
+        self.running = manager.create_discovery_session("https://example.com/running")
+        manager.set_discovery_status(self.running.session_id, SessionStatus.RUNNING)
+        manager.close()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_startup_loads_only_active_sessions(self):
+        """Test che all'avvio si carichino solo le sessioni non concluse"""
+        manager = SessionManager(self.storage)
+        store = manager._discovery_sessions
+
+        self.assertEqual(store.loaded_count, 1)
+        listed = manager.get_discovery_sessions_list(SessionStatus.COMPLETED)
+        self.assertEqual(len(listed), 4)
+        self.assertEqual(store.loaded_count, 1)
+        self.assertGreater(listed[0]["size_bytes"], 0)
+
+        restored = manager.get_discovery_session(self.ids[0])
+        self.assertEqual(restored.discovered_pages[0].url, "https://example.com/0/a")
+        self.assertEqual(store.loads, 1)
+
+    def test_lru_evicts_only_completed_sessions(self):
+        """Test limite di sessioni caricate e ricaricamento dopo lo scarto"""
+        manager = SessionManager(self.storage, max_loaded_sessions=2)
+        for session_id in self.ids:
+            self.assertIsNotNone(manager.get_discovery_session(session_id))
+
+        store = manager._discovery_sessions
+        self.assertEqual(store.loaded_count, 2)
+        self.assertIn(self.running.session_id, store.loaded_ids())
+        self.assertEqual(manager.get_discovery_session(self.ids[0]).base_url, "https://example.com/0")
+        self.assertEqual(store.loads, 5)
+
+    def test_missing_index_is_rebuilt(self):
+        """Test ricostruzione dell'indice dagli snapshot"""
+        (self.storage / "sessions_index.json").unlink()
+        manager = SessionManager(self.storage)
+
+        self.assertEqual(len(manager.get_discovery_sessions_list()), 5)
+        self.assertTrue((self.storage / "sessions_index.json").exists())
+
+    def test_cleanup_does_not_load_sessions(self):
+        """Test che il cleanup usi l'indice e rimuova i file"""
+        manager = SessionManager(self.storage)
+        removed = manager.cleanup_old_sessions(max_age_hours=-1)
+
+        self.assertEqual(removed, 4)
+        self.assertEqual(manager._discovery_sessions.loads, 0)
+        self.assertFalse(list(self.storage.glob(f"discovery_{self.ids[0]}.*")))
+        self.assertEqual(len(SessionManager(self.storage).get_discovery_sessions_list()), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
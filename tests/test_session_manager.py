@@ -0,0 +1,133 @@
+"""
+Test per locking per sessione e letture copy-on-write del SessionManager
+"""
+import tempfile
+import threading
+import unittest
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from eaa_scanner.api.discovery_service import DiscoveryService
+from eaa_scanner.api.models import DiscoveredPage, SessionStatus
+from eaa_scanner.api.scan_service import ScanService
+from eaa_scanner.api.session_manager import SessionManager
+
+
+class TestSessionManagerLocking(unittest.TestCase):
+    """Test suite per concorrenza tra sessioni"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.manager = SessionManager(Path(self.tmp.name))
+        discovery = self.manager.create_discovery_session("https://example.com")
+        self.manager.add_discovered_page(discovery.session_id, DiscoveredPage(url="https://example.com/"))
+        self.scan = self.manager.create_scan_session(
+            discovery.session_id, ["https://example.com/"], "Acme", "a@example.com")
+
+    def tearDown(self):
+        self.manager.close()
+        self.tmp.cleanup()
+
+    def test_reader_does_not_wait_for_writer(self):
+        """Test che un lettore riceva l'ultima copia mentre un writer tiene il lock"""
+        session_id = self.scan.session_id
+        lock = self.manager._session_lock(session_id)
+        acquired, release = threading.Event(), threading.Event()
+
+        def writer():
+            with lock:
+                session = self.manager._scan_sessions.get(session_id)
+                session.pages_scanned = 1
+                self.manager._touch(session)
+                acquired.set()
+                release.wait(5)
+
+        thread = threading.Thread(target=writer)
+        thread.start()
+        acquired.wait(5)
+        try:
+            self.assertEqual(self.manager.get_scan_session(session_id).pages_scanned, 0)
+        finally:
+            release.set()
+            thread.join()
+        self.assertEqual(self.manager.get_scan_session(session_id).pages_scanned, 1)
+
+    def test_snapshot_is_isolated_from_writes(self):
+        """Test che la copia letta non cambi con le scritture successive"""
+        before = self.manager.get_scan_session(self.scan.session_id)
+        self.manager.update_scan_progress(self.scan.session_id, 1, message="pagina 1")
+
+        self.assertEqual(before.pages_scanned, 0)
+        self.assertEqual(len(before.log_messages), 0)
+        self.assertEqual(self.manager.get_scan_session(self.scan.session_id).pages_scanned, 1)
+
+    def test_websocket_emitted_outside_lock(self):
+        """Test che i callback WebSocket non vengano eseguiti col lock di sessione"""
+        observed = []
+
+        def callback(event):
+            lock = self.manager._session_lock(event.session_id)
+            result = []
+
+            def probe():
+                # RLock: va rilasciato dallo stesso thread che lo acquisisce
+                acquired = lock.acquire(blocking=False)
+                if acquired:
+                    lock.release()
+                result.append(acquired)
+
+            thread = threading.Thread(target=probe)
+            thread.start()
+            thread.join(5)
+            observed.append(result[0])
+
+        self.manager.register_websocket_callback(callback)
+        self.manager.set_scan_status(self.scan.session_id, SessionStatus.RUNNING)
+        self.manager.update_scan_progress(self.scan.session_id, 1)
+
+        self.assertEqual(observed, [True, True])
+
+
+class TestServiceLayerWrites(unittest.TestCase):
+    """Test suite: le scritture dei servizi passano dal manager"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.manager = SessionManager(Path(self.tmp.name))
+        self.discovery = self.manager.create_discovery_session("https://example.com")
+        for path in ("/", "/contatti"):
+            self.manager.add_discovered_page(
+                self.discovery.session_id, DiscoveredPage(url=f"https://example.com{path}"))
+
+    def tearDown(self):
+        self.manager.close()
+        self.tmp.cleanup()
+
+    def test_update_page_selection_through_service(self):
+        """Test selezione pagine dal servizio: stato live aggiornato, copie già lette invariate"""
+        service = DiscoveryService(self.manager, output_dir=Path(self.tmp.name) / "out")
+        before = self.manager.get_discovery_session(self.discovery.session_id)
+
+        self.assertTrue(service.update_page_selection(self.discovery.session_id, ["https://example.com/contatti"]))
+
+        after = self.manager.get_discovery_session(self.discovery.session_id)
+        self.assertEqual([p.selected_for_scan for p in after.discovered_pages], [False, True])
+        self.assertEqual([p.selected_for_scan for p in before.discovered_pages], [False, False])
+        self.assertFalse(service.update_page_selection("missing", []))
+
+    def test_report_logs_reach_live_session(self):
+        """Test che i log scritti dal servizio scan non vadano persi sulle copie"""
+        scan = self.manager.create_scan_session(
+            self.discovery.session_id, ["https://example.com/"], "Acme", "a@example.com")
+        service = ScanService(self.manager, output_dir=Path(self.tmp.name) / "out")
+
+        service._process_scan_results(scan.session_id, [])
+
+        logs = self.manager.get_scan_session(scan.session_id).log_messages
+        self.assertTrue(any("Generazione report finale" in line for line in logs))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,270 @@
+"""
+Test per lo stato condiviso tra processi (backend, store, limiti)
+"""
+import asyncio
+import tempfile
+import threading
+import time
+import unittest
+from datetime import datetime
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from webapp import database as db_module
+from webapp.database import Database
+from eaa_scanner.state import (
+    MemoryStateBackend, SQLiteStateBackend, SharedStore, StateBackend, create_state_backend
+)
+
+
+class BackendContract:
+    """Comportamento comune a tutti i backend"""
+
+    def make_backend(self):
+        raise NotImplementedError
+
+    def setUp(self):
+        self.backend = self.make_backend()
+
+    def tearDown(self):
+        self.backend.close()
+
+    def test_fields_roundtrip_and_partial_reads(self):
+        created = datetime(2024, 5, 1, 12, 30)
+        self.backend.set_fields("scans", "a", {"status": "running", "created_at": created, "results": {"x": [1, 2]}})
+
+        self.assertEqual(self.backend.get_fields("scans", "a", ["status", "missing"]), {"status": "running"})
+        record = self.backend.get_fields("scans", "a")
+        self.assertEqual(record["created_at"], created)
+        self.assertEqual(record["results"], {"x": [1, 2]})
+        self.assertIsNone(self.backend.get_fields("scans", "b"))
+
+    def test_nested_edits_need_explicit_write(self):
+        self.backend.set_fields("scans", "a", {"results": {"pages": ["/"]}})
+        store = SharedStore(self.backend, "scans")
+        record = store["a"]
+        record["results"]["pages"].append("/login")
+        self.assertEqual(self.backend.get_fields("scans", "a")["results"], {"pages": ["/"]})
+
+        record.save("results")
+        self.assertEqual(self.backend.get_fields("scans", "a")["results"], {"pages": ["/", "/login"]})
+
+    def test_replace_delete_and_listing(self):
+        self.backend.set_fields("scans", "a", {"status": "running", "progress": 10})
+        self.backend.set_fields("scans", "a", {"status": "done"}, replace=True)
+        self.assertEqual(self.backend.get_fields("scans", "a"), {"status": "done"})
+
+        self.backend.set_fields("scans", "b", {})
+        self.assertTrue(self.backend.exists("scans", "b"))
+        self.assertEqual(self.backend.keys("scans"), ["a", "b"])
+        self.assertEqual(self.backend.count("other"), 0)
+
+        self.backend.delete_fields("scans", "a", ["status"])
+        self.assertEqual(self.backend.get_fields("scans", "a"), {})
+        self.assertTrue(self.backend.delete("scans", "a"))
+        self.assertFalse(self.backend.delete("scans", "a"))
+        self.assertEqual(self.backend.count("scans"), 1)
+
+    def test_ttl_expires_records_and_counters(self):
+        self.backend.set_fields("scans", "a", {"status": "running"}, ttl=0.05)
+        self.assertEqual(self.backend.incr("hits", ttl=0.05), 1)
+        self.assertEqual(self.backend.incr("hits", 2, ttl=0.05), 3)
+        time.sleep(0.1)
+
+        self.assertFalse(self.backend.exists("scans", "a"))
+        self.assertEqual(self.backend.keys("scans"), [])
+        self.assertEqual(self.backend.get_counter("hits"), 0)
+        self.assertEqual(self.backend.incr("hits"), 1)
+
+    def test_throttle_keeps_one_expiring_key(self):
+        results = [self.backend.throttle("ip", limit=2, period=0.1) for _ in range(3)]
+        self.assertEqual([r.allowed for r in results], [True, True, False])
+        self.assertEqual([r.remaining for r in results], [1, 0, 0])
+        self.assertGreater(results[2].retry_after, 0)
+
+        time.sleep(0.12)
+        self.backend.purge_expired()
+        self.assertTrue(self.backend.throttle("ip", limit=2, period=0.1).allowed)
+        self.assertEqual(self.backend.throttle("other", limit=2, period=0.1).remaining, 1)
+
+    def test_publish_reaches_subscribers(self):
+        received = []
+        done = threading.Event()
+
+        def callback(channel, message):
+            received.append((channel, message))
+            done.set()
+
+        subscription = self.backend.subscribe(callback)
+        try:
+            self.backend.publish("ws", {"scan_id": "a", "progress": 50})
+            self.assertTrue(done.wait(2.0))
+        finally:
+            subscription.close()
+        self.assertEqual(received, [("ws", {"scan_id": "a", "progress": 50})])
+
+
+class TestMemoryStateBackend(BackendContract, unittest.TestCase):
+    """Test suite per il backend in memoria"""
+
+    def make_backend(self):
+        return MemoryStateBackend()
+
+    def test_incomplete_backend_not_instantiable(self):
+        class PartialBackend(StateBackend):
+            def get_fields(self, namespace, key, fields=None):
+                return None
+
+        with self.assertRaises(TypeError):
+            PartialBackend()
+
+
+class TestSQLiteStateBackend(BackendContract, unittest.TestCase):
+    """Test suite per il backend SQLite condiviso tra processi"""
+
+    def make_backend(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        return SQLiteStateBackend(str(Path(self.tmp.name) / "state.db"), poll_interval=0.01)
+
+    def test_second_connection_sees_writes(self):
+        other = SQLiteStateBackend(str(Path(self.tmp.name) / "state.db"))
+        try:
+            self.backend.set_fields("sessions", "s1", {"status": "running"})
+            other.set_fields("sessions", "s1", {"progress": 40})
+            self.assertEqual(self.backend.get_fields("sessions", "s1"), {"status": "running", "progress": 40})
+            self.assertEqual(other.incr("active"), 1)
+            self.assertEqual(self.backend.incr("active"), 2)
+        finally:
+            other.close()
+
+    def test_purge_expired(self):
+        self.backend.set_fields("scans", "old", {"a": 1}, ttl=0.01)
+        self.backend.set_fields("scans", "new", {"a": 1})
+        time.sleep(0.05)
+        self.assertEqual(self.backend.purge_expired(), 1)
+        self.assertEqual(self.backend.keys("scans"), ["new"])
+
+
+class TestCreateStateBackend(unittest.TestCase):
+    """Test suite per la selezione del backend da URL"""
+
+    def test_urls(self):
+        self.assertIsInstance(create_state_backend(None), MemoryStateBackend)
+        self.assertIsInstance(create_state_backend("memory://"), MemoryStateBackend)
+        with tempfile.TemporaryDirectory() as tmp:
+            backend = create_state_backend(f"sqlite:///{tmp}/state.db")
+            self.assertIsInstance(backend, SQLiteStateBackend)
+            backend.close()
+
+
+class TestSharedStore(unittest.TestCase):
+    """Test suite per i record condivisi con scrittura immediata"""
+
+    def setUp(self):
+        self.backend = MemoryStateBackend()
+        self.store = SharedStore(self.backend, "sessions")
+
+    def test_record_writes_through(self):
+        session = self.store.create("s1", {"status": "running", "scan_results": {}})
+        session["progress"] = 30
+        session.update(status="completed", message="ok")
+        session.setdefault("issues_found", 0)
+        session.pop("message")
+
+        self.assertEqual(self.store["s1"], {"status": "completed", "scan_results": {}, "progress": 30, "issues_found": 0})
+
+    def test_nested_changes_need_save(self):
+        # Con un backend serializzato le modifiche annidate restano locali
+        with tempfile.TemporaryDirectory() as tmp:
+            backend = SQLiteStateBackend(str(Path(tmp) / "state.db"))
+            self.store = SharedStore(backend, "sessions")
+            try:
+                self._check_nested_save()
+            finally:
+                backend.close()
+
+    def _check_nested_save(self):
+        session = self.store.create("s1", {"scan_results": {}})
+        session["scan_results"]["https://a"] = {"issues": 1}
+        self.assertEqual(self.store["s1"]["scan_results"], {})
+
+        session.save("scan_results")
+        self.assertEqual(self.store["s1"]["scan_results"], {"https://a": {"issues": 1}})
+
+    def test_mapping_interface(self):
+        self.store["a"] = {"n": 1}
+        self.store.write("b", {"n": 2})
+        self.assertIn("a", self.store)
+        self.assertNotIn("c", self.store)
+        self.assertEqual(len(self.store), 2)
+        self.assertEqual(dict((key, dict(value)) for key, value in self.store.items()), {"a": {"n": 1}, "b": {"n": 2}})
+        self.assertEqual(self.store.fields("b", ["n"]), {"n": 2})
+        self.assertIsNone(self.store.get("c"))
+        self.assertEqual(self.store.pop("a"), {"n": 1})
+        self.assertNotIn("a", self.store)
+
+    def test_refresh_sees_other_writers(self):
+        mine = self.store.create("s1", {"status": "running"})
+        self.store.write("s1", {"status": "cancelled"})
+        self.assertEqual(mine["status"], "running")
+        self.assertEqual(mine.refresh()["status"], "cancelled")
+
+
+class TestSharedLimits(unittest.TestCase):
+    """Test suite per limite scansioni e rate limiter sullo stato condiviso"""
+
+    @classmethod
+    def setUpClass(cls):
+        from webapp import app_fastapi
+        cls.app = app_fastapi
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = str(Path(self.tmp.name) / "state.db")
+        self.backend = SQLiteStateBackend(self.path)
+        self.addCleanup(self.backend.close)
+        previous = db_module._database
+        db_module._database = Database(str(Path(self.tmp.name) / "scans.db"))
+        self.app.init_database()
+        self.addCleanup(setattr, db_module, "_database", previous)
+        self.addCleanup(db_module._database.close)
+
+    def test_rate_limiter_window_is_shared(self):
+        other = SQLiteStateBackend(self.path)
+        self.addCleanup(other.close)
+        first = self.app.RateLimiter(self.backend)
+        second = self.app.RateLimiter(other)
+        results = [asyncio.run(limiter.is_allowed("rate_limit:1.2.3.4", limit=3, window=60))
+                   for limiter in (first, second, first, second)]
+        self.assertEqual(results, [True, True, True, False])
+
+    def test_scan_limit_counts_scans_of_all_workers(self):
+        managers = [self.app.ScanManager(self.backend), self.app.ScanManager(SQLiteStateBackend(self.path))]
+        self.addCleanup(managers[1].backend.close)
+        request = self.app.ScanRequest(url="https://example.com", company_name="Acme", email="a@example.com")
+
+        async def scenario():
+            for manager in managers:
+                manager.max_concurrent = 2
+            first = await managers[0].create_scan(request)
+            await managers[1].create_scan(request)
+            with self.assertRaises(self.app.HTTPException) as raised:
+                await managers[0].create_scan(request)
+            self.assertEqual(raised.exception.status_code, 429)
+
+            await managers[1].update_scan(first, status="completed")
+            await managers[1].update_scan(first, status="completed")
+            self.assertEqual(managers[0].active_count, 1)
+            await managers[0].create_scan(request)
+            # Lascia completare le sincronizzazioni col database
+            await asyncio.sleep(0)
+
+        asyncio.run(scenario())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+"""
+Test per il backend SVG dei grafici
+"""
+import subprocess
+import tempfile
+import unittest
+from pathlib import Path
+from urllib.parse import unquote
+from xml.dom import minidom
+
+import sys
+sys.path.append(str(Path(__file__).parent.parent))
+
+from eaa_scanner import svg_charts
+from eaa_scanner.enterprise_charts import EnterpriseChartGenerator
+from eaa_scanner.svg_charts import (
+    CHART_SPECS, SVG_DATA_URI_PREFIX, SVGChartGenerator, create_chart_generator, resolve_chart_format
+)
+
+ROOT = Path(__file__).parent.parent
+
+ANALYTICS = {
+    "executive_summary": {"compliance_score": 72, "compliance_level": "parzialmente_conforme"},
+    "quantitative_analysis": {"by_severity": {"critical": 2, "high": 3, "medium": 1}},
+    "wcag_analysis": {"principle_distribution": {"perceivable": {"errors": 3, "warnings": 1}}},
+}
+
+
+def parse_svg(svg):
+    return minidom.parseString(svg).documentElement
+
+
+class TestChartFormat(unittest.TestCase):
+    """Test suite per la scelta del formato"""
+
+    def test_resolve_chart_format(self):
+        self.assertEqual(resolve_chart_format(), "svg")
+        self.assertEqual(resolve_chart_format("auto", "wkhtmltopdf"), "png")
+        self.assertEqual(resolve_chart_format("auto", "weasyprint", "enterprise"), "svg")
+        self.assertEqual(resolve_chart_format("PNG", "chrome"), "png")
+        self.assertEqual(resolve_chart_format("svg", "wkhtmltopdf"), "svg")
+        self.assertEqual(resolve_chart_format("unknown", "chrome"), "svg")
+
+    def test_svg_generator_does_not_import_matplotlib(self):
+        code = (
+            "import sys\n"
+            "from eaa_scanner.svg_charts import create_chart_generator\n"
+            "create_chart_generator(None, 'svg')\n"
+            "print('matplotlib' in sys.modules)\n"
+        )
+        result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True,
+                                text=True, timeout=60)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(result.stdout.strip(), "False")
+
+
+class TestSVGCharts(unittest.TestCase):
+    """Test suite per primitive e generatore SVG"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.output = Path(self.tmp.name)
+
+    def assert_accessible(self, svg):
+        root = parse_svg(svg)
+        self.assertEqual(root.tagName, "svg")
+        self.assertEqual(root.getAttribute("role"), "img")
+        self.assertTrue(root.getElementsByTagName("title")[0].firstChild.data)
+        self.assertTrue(root.getElementsByTagName("desc")[0].firstChild.data)
+
+    def test_primitives_are_valid_and_accessible(self):
+        color = svg_charts.COLORS["primary"]
+        charts = [
+            svg_charts.gauge(72, "Gauge", "Parziale", color),
+            svg_charts.gauge(45, "Gauge", "Basso", color, zones=[(60, "#f00"), (100, "#0f0")]),
+            svg_charts.donut([("A & B", 3, color), ("C", 1, "#000")], "Donut <principi>"),
+            svg_charts.donut([], "Vuoto"),
+            svg_charts.radar([("Uno", 80), ("Due", 40), ("Tre", 60)], "Radar", color),
+            svg_charts.bar_chart([("Riga", [(2, color), (1, "#000")])], "Barre", reference=(1, "Rif")),
+            svg_charts.bar_chart([], "Barre vuote"),
+        ]
+        for svg in charts:
+            self.assert_accessible(svg)
+
+    def test_text_is_escaped(self):
+        svg = svg_charts.donut([("<script>", 1, "#000")], "Titolo & co")
+        self.assertNotIn("<script>", svg)
+        self.assertEqual(parse_svg(svg).getElementsByTagName("title")[0].firstChild.data, "Titolo & co")
+
+    def test_generator_matches_chart_specs(self):
+        result = SVGChartGenerator(self.output).generate_all_charts(ANALYTICS)
+
+        self.assertEqual(set(result), {key for key, _, _, _ in CHART_SPECS})
+        for key, _, _, file_name in CHART_SPECS:
+            self.assertTrue(result[key].startswith(SVG_DATA_URI_PREFIX))
+            svg = (self.output / f"{file_name}.svg").read_text(encoding="utf-8")
+            self.assertEqual(unquote(result[key][len(SVG_DATA_URI_PREFIX):]), svg)
+            self.assert_accessible(svg)
+
+    def test_generator_without_files(self):
+        self.assertIsInstance(create_chart_generator(self.output, "svg"), SVGChartGenerator)
+        generator = SVGChartGenerator(self.output / "none", write_files=False)
+        self.assertEqual(len(generator.generate_all_charts({})), len(CHART_SPECS))
+        self.assertFalse((self.output / "none").exists())
+
+    def test_enterprise_svg_charts(self):
+        generator = EnterpriseChartGenerator(str(self.output), chart_format="svg")
+        data = {
+            "compliance": {"overall_score": 64, "compliance_level": "parzialmente_conforme"},
+            "detailed_results": {"errors": [{"severity": "high", "wcag_criteria": "1.1.1"}],
+                                 "warnings": [], "scanner_scores": {"axe": 70, "pa11y": 55}},
+        }
+        result = generator.generate_all_charts_safe(data)
+
+        self.assertEqual(result["chart_format"], "svg")
+        self.assertTrue(result["charts"])
+        for name, chart in result["charts"].items():
+            self.assertEqual(chart["format"], "svg")
+            self.assert_accessible(chart["svg"])
+            self.assertTrue((self.output / f"{name}.svg").exists())
+
+
+if __name__ == '__main__':
+    unittest.main()
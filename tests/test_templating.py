@@ -0,0 +1,112 @@
+"""
+Test per gli ambienti Jinja2 condivisi
+"""
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import sys
+sys.path.append(str(Path(__file__).parent.parent))
+
+from jinja2 import TemplateNotFound
+
+from eaa_scanner import templating
+from eaa_scanner.report import generate_html_report
+
+
+class TestTemplateRegistry(unittest.TestCase):
+    """Test suite per registro, bytecode cache e precompilazione"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.template_dir = Path(self.tmp.name) / "templates"
+        self.template_dir.mkdir()
+        self.cache_dir = Path(self.tmp.name) / "bytecode"
+
+        # Registro e cache del bytecode isolati per ogni test
+        env_patch = mock.patch.dict(os.environ, {"EAA_TEMPLATE_CACHE_DIR": str(self.cache_dir)})
+        env_patch.start()
+        self.addCleanup(env_patch.stop)
+        for name in ("_environments", "_bytecode_caches", "_string_templates"):
+            patch = mock.patch.object(templating, name, {})
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def write(self, name, source):
+        (self.template_dir / name).write_text(source, encoding="utf-8")
+
+    def test_environment_shared_per_directory(self):
+        env = templating.get_environment(self.template_dir)
+        self.assertIs(templating.get_environment(str(self.template_dir)), env)
+        self.assertIsNot(templating.get_environment(self.template_dir, autoescape=False), env)
+
+    def test_template_compiled_once(self):
+        self.write("page.html", "<p>{{ value }}</p>")
+        first = templating.get_template(self.template_dir, "page.html")
+        self.assertIs(templating.get_template(self.template_dir, "page.html"), first)
+        self.assertEqual(first.render(value="<b>"), "<p>&lt;b&gt;</p>")
+
+        raw = templating.get_template(self.template_dir, "page.html", autoescape=False)
+        self.assertEqual(raw.render(value="<b>"), "<p><b></p>")
+
+    def test_select_in_order_of_preference(self):
+        self.write("second.html", "second")
+        template = templating.get_template(self.template_dir, ["first.html", "second.html"])
+        self.assertEqual(template.render(), "second")
+        with self.assertRaises(TemplateNotFound):
+            templating.get_template(self.template_dir, ["missing.html"])
+
+    def test_fallback_source_compiled_once(self):
+        first = templating.get_template(self.template_dir, "missing.html", fallback_source="{{ 1 + 1 }}")
+        second = templating.get_template(self.template_dir, "missing.html", fallback_source="{{ 1 + 1 }}")
+        self.assertIs(first, second)
+        self.assertEqual(first.render(), "2")
+
+    def test_precompile_writes_bytecode(self):
+        self.write("a.html", "{{ a }}")
+        self.write("b.html", "{% if %}")  # errore di sintassi: registrato, non sollevato
+
+        compiled = templating.precompile_templates([(self.template_dir, True)])
+        self.assertEqual(compiled[str(self.template_dir.resolve())], ["a.html"])
+        self.assertEqual(len(list(self.cache_dir.glob("*_escaped.cache"))), 1)
+
+    def test_default_bytecode_dir_is_private(self):
+        with mock.patch.dict(os.environ):
+            os.environ.pop("EAA_TEMPLATE_CACHE_DIR")
+            cache = templating._bytecode_cache(True)
+        directory = Path(cache.directory)
+        self.assertEqual(directory.stat().st_uid, os.getuid())
+        self.assertEqual(directory.stat().st_mode & 0o777, 0o700)
+        self.assertIn("escaped", cache.pattern)
+
+    def test_auto_reload_only_in_development(self):
+        with mock.patch.dict(os.environ, {"DEBUG_MODE": "false"}):
+            os.environ.pop("EAA_TEMPLATE_AUTO_RELOAD", None)
+            self.assertFalse(templating.auto_reload_enabled())
+        with mock.patch.dict(os.environ, {"DEBUG_MODE": "true"}):
+            self.assertTrue(templating.auto_reload_enabled())
+        with mock.patch.dict(os.environ, {"DEBUG_MODE": "true", "EAA_TEMPLATE_AUTO_RELOAD": "0"}):
+            self.assertFalse(templating.auto_reload_enabled())
+
+
+class TestReportTemplates(unittest.TestCase):
+    """Test suite per i template dei report del pacchetto"""
+
+    def test_package_templates_compile(self):
+        compiled = templating.precompile_templates()
+        names = compiled[str(templating.REPORT_TEMPLATE_DIRS[0][0].resolve())]
+        self.assertIn("report_enterprise_professional.html", names)
+
+    def test_generate_html_report_uses_shared_environment(self):
+        data = {"company_name": "ACME", "url": "https://example.com", "compliance": {}}
+        html = generate_html_report(data)
+        self.assertIn("ACME", html)
+        env = templating.get_environment(templating.REPORT_TEMPLATE_DIRS[0][0])
+        self.assertIn("report_enterprise_professional.html", [t.name for t in env.cache.values()])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Budget dei tempi di import (cold start di API e CLI)
+
+Importa ogni modulo in un processo nuovo con `python -X importtime`,
+verifica che i sottosistemi pesanti restino caricati al primo uso e che il
+tempo cumulativo resti entro il budget.
+
+    python tools/import_budget.py            # tutti i moduli
+    python tools/import_budget.py --top 15   # mostra anche gli import più lenti
+"""
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Tempo cumulativo massimo (ms) dell'import di ciascun entry point
+BUDGETS_MS = {
+    "webapp.app_fastapi": 2000,
+    "eaa_scanner.cli": 800,
+}
+
+# Sottosistemi che si caricano solo quando vengono usati
+HEAVY_MODULES = [
+    "matplotlib", "sklearn", "scipy", "openai", "playwright", "weasyprint",
+    "eaa_scanner.charts", "eaa_scanner.pdf", "eaa_scanner.pdf_service", "eaa_scanner.page_sampler",
+    "eaa_scanner.report", "eaa_scanner.llm_integration",
+]
+
+FORBIDDEN = {
+    "webapp.app_fastapi": HEAVY_MODULES + ["eaa_scanner.core", "bs4"],
+    "eaa_scanner.cli": HEAVY_MODULES,
+}
+
+
+def measure(module: str) -> Tuple[float, Dict[str, float]]:
+    """
+    Importa un modulo in un interprete nuovo
+
+    Returns:
+        (tempo cumulativo in ms, tempo cumulativo in ms per ogni modulo importato)
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    modules: Dict[str, float] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not cumulative.strip().isdigit():
+            continue  # intestazione
+        modules[name.strip()] = int(cumulative) / 1000
+    return modules.get(module, 0.0), modules
+
+
+def loaded_heavy(module: str, modules: Dict[str, float]) -> List[str]:
+    return sorted(
+        name for name in modules
+        if any(name == heavy or name.startswith(heavy + ".") for heavy in FORBIDDEN.get(module, []))
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Verifica i tempi di import di API e CLI")
+    parser.add_argument("modules", nargs="*", default=list(BUDGETS_MS), help="Moduli da misurare")
+    parser.add_argument("--top", type=int, default=0, help="Mostra gli N import più lenti")
+    args = parser.parse_args()
+
+    failures = 0
+    for module in args.modules:
+        total, modules = measure(module)
+        budget = BUDGETS_MS.get(module)
+        heavy = loaded_heavy(module, modules)
+        over = budget is not None and total > budget
+        status = "OK" if not (over or heavy) else "FALLITO"
+        print(f"{status:8} {module}: {total:.0f} ms" + (f" (budget {budget} ms)" if budget else ""))
+        if heavy:
+            print(f"         importati all'avvio: {', '.join(heavy)}")
+        for name, ms in sorted(modules.items(), key=lambda item: -item[1])[1:args.top + 1]:
+            print(f"         {ms:8.1f} ms  {name}")
+        failures += int(over or bool(heavy))
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -256,21 +256,24 @@ def handle_llm_usage_stats(environ, start_response):
     """Statistiche di utilizzo LLM"""
     try:
         from webapp.llm_utils import get_web_llm_manager
+        from eaa_scanner.cache import cache_stats as cache_stats_by_namespace
         
         web_manager = get_web_llm_manager()
         
         # Calcola statistiche dalla cache
+        validation_stats = web_manager.session_cache.stats
         cache_stats = {
-            "total_validations": len([k for k in web_manager.session_cache.keys() if k.startswith('validation_')]),
+            "total_validations": validation_stats.loads,
             "cache_size": len(web_manager.session_cache),
-            "cache_hit_rate": 0.85  # Mock - in implementazione reale trackare hits/misses
+            "cache_hit_rate": round(validation_stats.hit_rate, 2),
+            "namespaces": cache_stats_by_namespace()
         }
         
         stats = {
             "period": "session",
             "cache": cache_stats,
             "estimates": {
-                "total_requests": len(web_manager.cost_cache),
+                "total_requests": web_manager.cost_cache.stats.hits + web_manager.cost_cache.stats.misses,
                 "avg_cost_usd": 0.12,  # Mock
                 "popular_models": ["gpt-4o", "gpt-4o-mini"],
                 "popular_sections": ["executive_summary", "recommendations"]
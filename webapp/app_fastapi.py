@@ -7,25 +7,41 @@ import os
 import json
 import time
 import asyncio
+import importlib.util
 import logging
 import redis
 from pathlib import Path
 from typing import Optional, List, Dict, Any
 from datetime import datetime, timedelta
 from contextlib import asynccontextmanager
+from functools import partial
 
 # FastAPI core imports
 from fastapi import FastAPI, HTTPException, Depends, Request, Response, status, BackgroundTasks, Query
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from fastapi.middleware.gzip import GZipMiddleware
-from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse, FileResponse
+from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse, StreamingResponse, FileResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from fastapi import WebSocket, WebSocketDisconnect
 
 # Import routers
 from webapp.routers import report_generator
+from eaa_scanner.api.outbox import ClientOutbox, coalesce_key_for
+from webapp.database import (
+    SCAN_SUMMARY_COLUMNS, decode_history_cursor, encode_history_cursor, get_database,
+    get_database_path, get_progress_writer, migrate_scan_history, read_scan_stats, scan_summary_values
+)
+from webapp.scan_payloads import aggregate_scan_results, etag_json_response, paginate_scan_results
+from webapp.responses import RangeAwareGZipMiddleware, artifact_response, json_stream_response
+from eaa_scanner.delivery import precompress_artifact
+from eaa_scanner import metrics
+from eaa_scanner.cancellation import CancellationRegistry, ScanCancelled
+from eaa_scanner.multi_page import ScanUnitProgress, get_browser_slots
+from eaa_scanner.state import MemoryStateBackend, RateLimitResult, SharedStore, StateBackend, create_state_backend
+from eaa_scanner.state.redis_backend import RedisStateBackend
+from eaa_scanner.jobs import Job, JobQueue, JobStatus, create_job_queue
+from webapp.scan_jobs import MULTI_PAGE_SCAN_JOB, SCAN_JOB, SESSION_PROGRESS_FIELDS
 
 # Pydantic models for validation
 from pydantic import BaseModel, Field, HttpUrl, EmailStr, validator, ConfigDict, field_validator
@@ -77,12 +93,15 @@ else:
 
 # ==================== SCAN STATUS TRACKING ====================
 
-# In-memory scan status storage
-scan_status_store = {}
+# Scan status records live in the shared state store (scan_status_store,
+# created after the settings below) so every API worker sees them
 
 class ScanStatus:
-    """Status tracker for scan operations"""
-    def __init__(self, scan_id: str):
+    """Status tracker for scan operations
+    
+    Each update is written through to the shared scan_status_store.
+    """
+    def __init__(self, scan_id: str, record: Optional[Dict[str, Any]] = None):
         self.scan_id = scan_id
         self.status = "starting"
         self.progress = 0
@@ -91,6 +110,10 @@ class ScanStatus:
         self.error = None
         self.created_at = datetime.now()
         self.updated_at = datetime.now()
+        if record:
+            for name in ("status", "progress", "message", "result", "error", "created_at", "updated_at"):
+                if name in record:
+                    setattr(self, name, record[name])
         
     def update(self, status: str = None, progress: int = None, message: str = None, result: Any = None, error: str = None):
         """Update scan status"""
@@ -105,6 +128,19 @@ class ScanStatus:
         if error is not None:
             self.error = error
         self.updated_at = datetime.now()
+        self.save()
+    
+    def save(self):
+        """Write the status to the shared store"""
+        scan_status_store[self.scan_id] = {
+            "status": self.status,
+            "progress": self.progress,
+            "message": self.message,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at
+        }
         
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for JSON response"""
@@ -120,27 +156,30 @@ class ScanStatus:
             "polling_interval": 2  # Suggested polling interval in seconds
         }
 
-def get_scan_status(scan_id: str) -> Optional[ScanStatus]:
-    """Get scan status by ID"""
-    return scan_status_store.get(scan_id)
+def load_scan_status(scan_id: str) -> Optional[ScanStatus]:
+    """Get scan status by ID (get_scan_status is taken by the endpoints below)"""
+    record = scan_status_store.get(scan_id)
+    return ScanStatus(scan_id, record) if record is not None else None
 
 def create_scan_status(scan_id: str) -> ScanStatus:
     """Create new scan status"""
     status = ScanStatus(scan_id)
-    scan_status_store[scan_id] = status
+    status.save()
     return status
 
 def cleanup_old_scans():
     """Clean up scans older than 30 minutes"""
     cutoff = datetime.now() - timedelta(minutes=30)
     to_remove = []
-    for scan_id, status in scan_status_store.items():
-        if status.created_at < cutoff:
+    for scan_id in list(scan_status_store):
+        record = scan_status_store.fields(scan_id, ("created_at",))
+        if record and record.get("created_at") and record["created_at"] < cutoff:
             to_remove.append(scan_id)
     for scan_id in to_remove:
-        del scan_status_store[scan_id]
+        scan_status_store.pop(scan_id, None)
     if to_remove:
         logger.info(f"Cleaned up {len(to_remove)} old scans")
+    state_backend.purge_expired()
 
 # ==================== CONFIGURATION ====================
 
@@ -211,6 +250,16 @@ class Settings(BaseSettings):
     max_concurrent_scans: int = 10
     scan_timeout: int = 300  # 5 minutes
     
+    # Job queue: when set, scans are executed by worker processes
+    # (python -m eaa_scanner.jobs) instead of in-process background tasks
+    scan_queue_url: Optional[str] = Field(default=None, env="SCAN_QUEUE_URL")
+    scan_job_max_attempts: int = Field(default=2, env="SCAN_JOB_MAX_ATTEMPTS")
+    
+    # Shared state for sessions, scan status and rate limits: required when
+    # running more than one API worker (sqlite:///data/state.db on one host,
+    # redis://... across hosts); in-process memory when unset
+    state_backend_url: Optional[str] = Field(default=None, env="STATE_BACKEND_URL")
+    
     model_config = ConfigDict(env_file=".env", case_sensitive=False, extra="allow")
 
 settings = Settings()
@@ -222,6 +271,16 @@ try:
 except Exception:
     pass
 
+# ==================== SHARED STATE ====================
+
+# Records expire a day after their last write; cleanup tasks prune earlier
+SHARED_STATE_TTL = 24 * 3600
+
+state_backend = create_state_backend(settings.state_backend_url)
+scan_status_store = SharedStore(state_backend, "scan_status", ttl=SHARED_STATE_TTL)
+scan_sessions = SharedStore(state_backend, "scan_sessions", ttl=SHARED_STATE_TTL)
+discovery_sessions = SharedStore(state_backend, "discovery_sessions", ttl=SHARED_STATE_TTL)
+
 # ==================== SECURITY SETUP ====================
 
 # Password hashing
@@ -465,11 +524,10 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> Optional[User
     
     # Fetch user from database
     try:
-        conn = sqlite3.connect(get_database_path())
-        cursor = conn.cursor()
-        cursor.execute('SELECT username, email, full_name, disabled FROM users WHERE username = ?', (token_data.username,))
-        user_row = cursor.fetchone()
-        conn.close()
+        user_row = await get_database().fetchone(
+            'SELECT username, email, full_name, disabled FROM users WHERE username = ?',
+            (token_data.username,)
+        )
         
         if user_row:
             username, email, full_name, disabled = user_row
@@ -506,145 +564,141 @@ def require_auth(user: User = Depends(get_current_user)):
 # ==================== RATE LIMITING ====================
 
 class RateLimiter:
-    """Distributed rate limiter using Redis or fallback to memory"""
+    """GCRA rate limiter on Redis, falling back to the shared state backend
     
-    def __init__(self):
-        self.memory_store = {}  # Fallback for when Redis is unavailable
+    Each key holds a single timestamp that expires once its limit is full
+    again, so state stays constant per client and idle clients are evicted.
+    """
     
-    async def is_allowed(self, key: str, limit: int = 100, window: int = 60) -> bool:
-        """Check if request is allowed under rate limit"""
-        
-        if redis_available and redis_client:
+    # Pause before trying Redis again after a failure
+    REDIS_RETRY_SECONDS = 30.0
+    
+    def __init__(self, backend: StateBackend, redis_backend: Optional[StateBackend] = None):
+        self.backend = backend
+        self.redis_backend = redis_backend
+        self._redis_retry_at = 0.0
+    
+    async def check(self, key: str, limit: int = 100, window: int = 60) -> RateLimitResult:
+        """Consume one request for key and return the limiter state"""
+        if self.redis_backend is not None and time.monotonic() >= self._redis_retry_at:
             try:
-                # Use Redis for distributed rate limiting
-                pipe = redis_client.pipeline()
-                now = time.time()
-                window_start = now - window
-                
-                # Remove old entries
-                pipe.zremrangebyscore(key, 0, window_start)
-                # Count current entries
-                pipe.zcard(key)
-                # Add current request
-                pipe.zadd(key, {str(now): now})
-                # Set expiry
-                pipe.expire(key, window)
-                
-                results = pipe.execute()
-                current_count = results[1]
-                
-                return current_count < limit
+                return self.redis_backend.throttle(key, limit, window)
             except Exception as e:
                 logger.error(f"Redis error: {e}")
-                # Fall back to memory
-        
-        # In-memory fallback
-        now = time.time()
-        if key not in self.memory_store:
-            self.memory_store[key] = []
-        
-        # Remove old entries
-        self.memory_store[key] = [
-            timestamp for timestamp in self.memory_store[key]
-            if timestamp > now - window
-        ]
-        
-        # Check limit
-        if len(self.memory_store[key]) >= limit:
-            return False
+                # Don't pay a failed connection on every request
+                self._redis_retry_at = time.monotonic() + self.REDIS_RETRY_SECONDS
         
-        # Add current request
-        self.memory_store[key].append(now)
-        return True
+        return self.backend.throttle(key, limit, window)
+    
+    async def is_allowed(self, key: str, limit: int = 100, window: int = 60) -> bool:
+        """Check if request is allowed under rate limit"""
+        return (await self.check(key, limit, window)).allowed
 
-rate_limiter = RateLimiter()
+rate_limiter = RateLimiter(state_backend, RedisStateBackend(redis_client) if redis_available else None)
 
-async def check_rate_limit(request: Request):
-    """Rate limit dependency"""
+async def check_rate_limit(request: Request, response: Response):
+    """Rate limit dependency, reporting the limit in RateLimit-* headers"""
     # Use IP address as key
     client_ip = request.client.host
     key = f"rate_limit:{client_ip}"
     
-    allowed = await rate_limiter.is_allowed(
+    result = await rate_limiter.check(
         key,
         settings.rate_limit_requests,
         settings.rate_limit_period
     )
     
-    if not allowed:
+    if not result.allowed:
         raise HTTPException(
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-            detail="Too many requests. Please try again later."
+            detail="Too many requests. Please try again later.",
+            headers=result.headers()
         )
+    response.headers.update(result.headers())
 
 # ==================== SCAN MANAGER ====================
 
 class ScanManager:
-    """Manages active scans with concurrency limits"""
+    """Manages active scans with concurrency limits
     
-    def __init__(self):
-        self.scans: Dict[str, Dict[str, Any]] = {}
-        self.active_count = 0
+    Scan records and the active-scan counter live in the shared state
+    backend, so the limit applies across all API workers.
+    """
+    
+    ACTIVE_COUNTER = "active_scans"
+    
+    def __init__(self, backend: StateBackend):
+        self.backend = backend
+        self.scans = SharedStore(backend, "scans", ttl=SHARED_STATE_TTL)
         self.max_concurrent = settings.max_concurrent_scans
-        self._lock = asyncio.Lock()
     
-    async def create_scan(self, request: ScanRequest) -> str:
-        """Create a new scan with concurrency check and database insertion"""
-        async with self._lock:
-            if self.active_count >= self.max_concurrent:
-                raise HTTPException(
-                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                    detail=f"Too many active scans. Maximum: {self.max_concurrent}"
-                )
-            
-            scan_id = f"v2scan_{secrets.token_urlsafe(8)}"
-            self.scans[scan_id] = {
-                "id": scan_id,
-                "status": "pending",
-                "progress": 0,
-                "request": request.dict(),
-                "created_at": datetime.utcnow(),
-                "updated_at": datetime.utcnow(),
-                "results": None
-            }
-            self.active_count += 1
-            
-            # Insert into database immediately
-            try:
-                conn = sqlite3.connect(get_database_path())
-                cursor = conn.cursor()
-                cursor.execute('''
-                    INSERT INTO scans 
-                    (id, url, company_name, email, status, progress, created_at, updated_at)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    scan_id,
-                    str(request.url),
-                    request.company_name,
-                    request.email,
-                    "pending",
-                    0,
-                    datetime.utcnow().isoformat(),
-                    datetime.utcnow().isoformat()
-                ))
-                conn.commit()
-                conn.close()
-                logger.info(f"Created scan {scan_id} in database")
-            except Exception as e:
-                logger.error(f"Failed to create scan in database: {e}")
-            
-            return scan_id
+    @property
+    def active_count(self) -> int:
+        return max(0, self.backend.get_counter(self.ACTIVE_COUNTER))
+    
+    def _release_slot(self, scan: Dict[str, Any]):
+        """Give back the concurrency slot of a tracked scan (once)"""
+        if scan.get("tracked"):
+            scan["tracked"] = False
+            if self.backend.incr(self.ACTIVE_COUNTER, -1) < 0:
+                self.backend.incr(self.ACTIVE_COUNTER, 1)
+    
+    async def create_scan(self, request: ScanRequest, track_active: bool = True) -> str:
+        """Create a new scan with concurrency check and database insertion
+        
+        With ``track_active=False`` (scans run by queue workers) the
+        concurrency limit does not apply: capacity is the worker pool.
+        """
+        if track_active and self.backend.incr(self.ACTIVE_COUNTER) > self.max_concurrent:
+            self.backend.incr(self.ACTIVE_COUNTER, -1)
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail=f"Too many active scans. Maximum: {self.max_concurrent}"
+            )
+        
+        scan_id = f"v2scan_{secrets.token_urlsafe(8)}"
+        self.scans[scan_id] = {
+            "id": scan_id,
+            "status": "pending",
+            "progress": 0,
+            "request": request.dict(),
+            "created_at": datetime.utcnow(),
+            "updated_at": datetime.utcnow(),
+            "results": None,
+            "tracked": track_active
+        }
+        
+        # Insert into database immediately
+        try:
+            await get_database().execute('''
+                INSERT INTO scans 
+                (id, url, company_name, email, status, progress, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                scan_id,
+                str(request.url),
+                request.company_name,
+                request.email,
+                "pending",
+                0,
+                datetime.utcnow().isoformat(),
+                datetime.utcnow().isoformat()
+            ))
+            logger.info(f"Created scan {scan_id} in database")
+        except Exception as e:
+            logger.error(f"Failed to create scan in database: {e}")
+        
+        return scan_id
     
     async def update_scan(self, scan_id: str, **kwargs):
         """Update scan status and sync to database"""
-        if scan_id in self.scans:
-            self.scans[scan_id].update(kwargs)
-            self.scans[scan_id]["updated_at"] = datetime.utcnow()
+        scan = self.scans.get(scan_id)
+        if scan is not None:
+            scan.update(kwargs, updated_at=datetime.utcnow())
             
             # Update active count if completed
-            if kwargs.get("status") in ["completed", "failed"]:
-                async with self._lock:
-                    self.active_count = max(0, self.active_count - 1)
+            if kwargs.get("status") in ["completed", "failed", "cancelled"]:
+                self._release_slot(scan)
             
             # Sync important updates to database
             if any(key in kwargs for key in ["status", "progress", "results"]):
@@ -668,34 +722,84 @@ class ScanManager:
             try:
                 await asyncio.sleep(3600)  # Run every hour
                 cutoff = datetime.utcnow() - timedelta(hours=1)
+                removed = 0
                 
-                async with self._lock:
-                    to_remove = [
-                        scan_id for scan_id, scan in self.scans.items()
-                        if scan["created_at"] < cutoff
-                    ]
-                    
-                    for scan_id in to_remove:
-                        if self.scans[scan_id]["status"] in ["pending", "running"]:
-                            self.active_count = max(0, self.active_count - 1)
-                        del self.scans[scan_id]
-                    
-                    if to_remove:
-                        logger.info(f"Cleaned up {len(to_remove)} old scans")
+                for scan_id in list(self.scans):
+                    scan = self.scans.fields(scan_id, ("created_at", "status", "tracked"))
+                    created_at = (scan or {}).get("created_at", cutoff)
+                    if isinstance(created_at, str):
+                        created_at = datetime.fromisoformat(created_at)
+                    if created_at >= cutoff:
+                        continue
+                    if scan.get("tracked") and scan.get("status") in ["pending", "running"]:
+                        self._release_slot(self.scans.get(scan_id) or {})
+                    self.scans.pop(scan_id, None)
+                    removed += 1
+                
+                if removed:
+                    logger.info(f"Cleaned up {removed} old scans")
+            except asyncio.CancelledError:
+                break
             except Exception as e:
                 logger.error(f"Error in cleanup task: {e}")
 
-scan_manager = ScanManager()
+scan_manager = ScanManager(state_backend)
+
+# Cancellation tokens of the scans running in this process: cancelling one
+# terminates the scanner subprocesses (and their browsers) immediately
+scan_cancellations = CancellationRegistry()
+
+# ==================== SCAN JOB QUEUE ====================
+
+_scan_queue: Optional[JobQueue] = None
+
+def get_scan_queue() -> Optional[JobQueue]:
+    """Durable scan queue, or None when scans run in-process"""
+    global _scan_queue
+    if _scan_queue is None and settings.scan_queue_url:
+        _scan_queue = create_job_queue(settings.scan_queue_url)
+    return _scan_queue
+
+async def load_scan_job(job_id: str) -> Optional[Job]:
+    """Read a scan job without blocking the event loop (None without a queue)"""
+    queue = get_scan_queue()
+    if queue is None:
+        return None
+    return await asyncio.to_thread(queue.get, job_id)
+
+# Job state -> scan status exposed by the status endpoints
+JOB_SCAN_STATUS = {
+    JobStatus.QUEUED: "queued",
+    JobStatus.RUNNING: "running",
+    JobStatus.SUCCEEDED: "completed",
+    JobStatus.FAILED: "failed",
+    JobStatus.CANCELLED: "cancelled"
+}
+
+def job_scan_state(job: Job) -> Dict[str, Any]:
+    """Status fields of a queued scan from the job's last reported progress"""
+    state = dict(job.progress)
+    if job.status != JobStatus.RUNNING or state.get("status") in (None, "pending", "completed", "failed"):
+        # Terminal states come from the job only: a running job may still be
+        # storing its result, or retrying after a failed attempt
+        state["status"] = JOB_SCAN_STATUS[job.status]
+    if job.status == JobStatus.FAILED:
+        state["message"] = job.error or state.get("message")
+    return state
 
 # ==================== DATABASE SYNC HELPER ====================
 
+# "col = ?" list for the denormalized summary columns (see webapp.database)
+SCAN_SUMMARY_ASSIGNMENTS = ", ".join(f"{name} = ?" for name in SCAN_SUMMARY_COLUMNS)
+
 async def sync_scan_to_database(scan_id: str, status: str = None, progress: int = None, 
                                 results: Dict[str, Any] = None, message: str = None):
-    """Helper function to keep database synchronized with scan_manager"""
+    """Helper function to keep database synchronized with scan_manager
+    
+    Progress-only updates are batched by the ProgressWriter; status and
+    results changes are written immediately.
+    """
     try:
-        conn = sqlite3.connect(get_database_path())
-        cursor = conn.cursor()
-        
         # Get current scan from manager
         scan = scan_manager.get_scan(scan_id)
         if not scan:
@@ -706,34 +810,40 @@ async def sync_scan_to_database(scan_id: str, status: str = None, progress: int
         final_status = status or scan.get("status", "unknown")
         final_progress = progress if progress is not None else scan.get("progress", 0)
         final_results = results or scan.get("results")
+        updated_at = datetime.utcnow().isoformat()
+        
+        progress_writer = get_progress_writer()
+        if status is None and results is None and message is None:
+            progress_writer.queue(scan_id, final_progress, updated_at)
+            return
+        progress_writer.discard(scan_id)
         
         # Update database
         if final_results:
-            cursor.execute('''
+            await get_database().execute(f'''
                 UPDATE scans 
-                SET status = ?, progress = ?, results = ?, updated_at = ?
+                SET status = ?, progress = ?, results = ?, updated_at = ?, {SCAN_SUMMARY_ASSIGNMENTS}
                 WHERE id = ?
             ''', (
                 final_status,
                 final_progress, 
                 json.dumps(final_results, ensure_ascii=False) if final_results else None,
-                datetime.utcnow().isoformat(),
+                updated_at,
+                *scan_summary_values(final_results),
                 scan_id
             ))
         else:
-            cursor.execute('''
+            await get_database().execute('''
                 UPDATE scans 
                 SET status = ?, progress = ?, updated_at = ?
                 WHERE id = ?
             ''', (
                 final_status,
                 final_progress,
-                datetime.utcnow().isoformat(),
+                updated_at,
                 scan_id
             ))
         
-        conn.commit()
-        conn.close()
         logger.info(f"Database synced for scan {scan_id}: status={final_status}, progress={final_progress}")
         
     except Exception as e:
@@ -742,10 +852,29 @@ async def sync_scan_to_database(scan_id: str, status: str = None, progress: int
 # ==================== WEBSOCKET MANAGER ====================
 
 class WebSocketManager:
-    """Manages WebSocket connections with authentication"""
+    """Manages WebSocket connections with authentication
+    
+    Each connection gets a bounded outbound queue drained by its own writer
+    task, so a broadcast never waits on a slow client: progress messages are
+    coalesced in the queue and the oldest message is dropped when it is full.
+    """
     
-    def __init__(self):
+    # Pub/sub channel carrying broadcasts between API workers
+    EVENTS_CHANNEL = "ws_broadcast"
+    
+    def __init__(self, backend: Optional[StateBackend] = None, max_queue_per_client: int = 100,
+                 send_timeout: float = 10.0):
+        # Without a shared backend (or with the in-process one) broadcasts
+        # are delivered locally; otherwise they go through pub/sub so clients
+        # connected to any worker receive them
+        self.backend = None if isinstance(backend, MemoryStateBackend) else backend
+        self._subscription = None
         self.active_connections: Dict[str, List[WebSocket]] = {}
+        self.outboxes: Dict[int, ClientOutbox] = {}
+        self.max_queue_per_client = max_queue_per_client
+        self.send_timeout = send_timeout
+        # Totals of closed outboxes, so get_stats() stays cumulative
+        self._closed_totals = {"sent": 0, "dropped": 0, "coalesced": 0}
     
     async def connect(self, websocket: WebSocket, scan_id: str, token: Optional[str] = None):
         """Accept WebSocket connection with optional authentication"""
@@ -755,34 +884,127 @@ class WebSocketManager:
         if scan_id not in self.active_connections:
             self.active_connections[scan_id] = []
         self.active_connections[scan_id].append(websocket)
+        
+        outbox = ClientOutbox(
+            websocket.send_text,
+            client_id=f"{scan_id}:{id(websocket)}",
+            max_queue=self.max_queue_per_client,
+            send_timeout=self.send_timeout,
+            on_close=lambda _outbox: self.disconnect(websocket, scan_id)
+        )
+        self.outboxes[id(websocket)] = outbox
+        outbox.start()
     
     def disconnect(self, websocket: WebSocket, scan_id: str):
         """Remove WebSocket connection"""
+        outbox = self.outboxes.pop(id(websocket), None)
+        if outbox:
+            outbox.close()
+            self._closed_totals["sent"] += outbox.sent
+            self._closed_totals["dropped"] += outbox.dropped
+            self._closed_totals["coalesced"] += outbox.coalesced
         if scan_id in self.active_connections:
-            self.active_connections[scan_id].remove(websocket)
+            if websocket in self.active_connections[scan_id]:
+                self.active_connections[scan_id].remove(websocket)
             if not self.active_connections[scan_id]:
                 del self.active_connections[scan_id]
     
+    def start_fanout(self, loop: asyncio.AbstractEventLoop):
+        """Receive broadcasts published by other workers (API processes only)"""
+        if self.backend is None or self._subscription is not None:
+            return
+        
+        def on_event(channel: str, event: Dict[str, Any]):
+            if channel == self.EVENTS_CHANNEL:
+                loop.call_soon_threadsafe(self.deliver, event["scan_id"], event["message"],
+                                          event.get("published_at"))
+        
+        self._subscription = self.backend.subscribe(on_event)
+    
+    def stop_fanout(self):
+        if self._subscription is not None:
+            self._subscription.close()
+            self._subscription = None
+    
     async def broadcast(self, scan_id: str, message: dict):
-        """Broadcast message to all connections for a scan"""
-        if scan_id in self.active_connections:
-            disconnected = []
-            for websocket in self.active_connections[scan_id]:
-                try:
-                    await websocket.send_json(message)
-                except Exception:
-                    disconnected.append(websocket)
-            
-            # Clean up disconnected clients
-            for ws in disconnected:
-                self.disconnect(ws, scan_id)
+        """Send message to all connections of a scan, on every worker"""
+        if self.backend is None:
+            self.deliver(scan_id, message)
+            return
+        try:
+            await asyncio.to_thread(self.backend.publish, self.EVENTS_CHANNEL,
+                                    {"scan_id": scan_id, "message": message, "published_at": time.time()})
+        except Exception as e:
+            logger.error(f"Failed to publish broadcast for {scan_id}: {e}")
+            self.deliver(scan_id, message)
+    
+    def deliver(self, scan_id: str, message: dict, published_at: Optional[float] = None):
+        """Queue message for local connections of a scan (non-blocking per client)
+        
+        ``published_at`` (wall clock of the publishing worker) is set for
+        broadcasts received through pub/sub and feeds the fan-out lag histogram.
+        """
+        if published_at is not None:
+            metrics.FANOUT_LAG_SECONDS.observe(max(0.0, time.time() - published_at))
+        connections = self.active_connections.get(scan_id)
+        if not connections:
+            return
+        
+        # Serialize once for all subscribers (same encoding as send_json)
+        text = json.dumps(message, separators=(",", ":"), ensure_ascii=False, default=str)
+        coalesce_key = coalesce_key_for(message.get("type"), message)
+        
+        for websocket in list(connections):
+            outbox = self.outboxes.get(id(websocket))
+            if outbox is None or not outbox.enqueue(text, coalesce_key):
+                self.disconnect(websocket, scan_id)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue-depth metrics for the outbound WebSocket queues
+        
+        Message counters are cumulative: they include connections already closed.
+        """
+        outboxes = list(self.outboxes.values())
+        totals = self._closed_totals
+        return {
+            "scans_with_clients": len(self.active_connections),
+            "connections": len(outboxes),
+            "total_queue_depth": sum(o.depth for o in outboxes),
+            "max_queue_depth": max((o.depth for o in outboxes), default=0),
+            "messages_sent": totals["sent"] + sum(o.sent for o in outboxes),
+            "messages_dropped": totals["dropped"] + sum(o.dropped for o in outboxes),
+            "messages_coalesced": totals["coalesced"] + sum(o.coalesced for o in outboxes)
+        }
 
-ws_manager = WebSocketManager()
+ws_manager = WebSocketManager(state_backend)
 
-# ==================== APPLICATION SETUP ====================
+# ==================== METRICS ====================
 
-# Store for discovery sessions (temporary, not persisted)
-discovery_sessions: Dict[str, Any] = {}
+ACTIVE_SCANS_GAUGE = metrics.REGISTRY.gauge("eaa_active_scans", "Scans holding a concurrency slot (all workers)")
+WEBSOCKET_CONNECTIONS_GAUGE = metrics.REGISTRY.gauge(
+    "eaa_websocket_connections", "WebSocket clients connected to this process"
+)
+WEBSOCKET_QUEUE_GAUGE = metrics.REGISTRY.gauge(
+    "eaa_websocket_queue_depth", "Outbound WebSocket queue depth", ("aggregate",)
+)
+WEBSOCKET_MESSAGES_GAUGE = metrics.REGISTRY.gauge(
+    "eaa_websocket_messages", "Cumulative outbound WebSocket messages by result", ("result",)
+)
+
+
+def collect_api_metrics():
+    """Refresh the gauges derived from scan manager and WebSocket state"""
+    ACTIVE_SCANS_GAUGE.set(scan_manager.active_count)
+    ws_stats = ws_manager.get_stats()
+    WEBSOCKET_CONNECTIONS_GAUGE.set(ws_stats["connections"])
+    WEBSOCKET_QUEUE_GAUGE.labels(aggregate="total").set(ws_stats["total_queue_depth"])
+    WEBSOCKET_QUEUE_GAUGE.labels(aggregate="max").set(ws_stats["max_queue_depth"])
+    for result in ("sent", "dropped", "coalesced"):
+        WEBSOCKET_MESSAGES_GAUGE.labels(result=result).set(ws_stats[f"messages_{result}"])
+
+metrics.REGISTRY.on_collect(collect_api_metrics)
+
+# ==================== APPLICATION SETUP ====================
 
 # Store for user-configured API keys (override defaults)
 # Priority: 1. User-configured (from panel), 2. Environment variable, 3. Default
@@ -842,15 +1064,13 @@ class UserCreate(BaseModel):
 async def create_user(user_data: UserCreate):
     """Create new user account"""
     try:
-        conn = sqlite3.connect(get_database_path())
-        cursor = conn.cursor()
-        
         # Check if user already exists
-        cursor.execute('SELECT username FROM users WHERE username = ? OR email = ?', (user_data.username, user_data.email))
-        existing_user = cursor.fetchone()
+        existing_user = await get_database().fetchone(
+            'SELECT username FROM users WHERE username = ? OR email = ?',
+            (user_data.username, user_data.email)
+        )
         
         if existing_user:
-            conn.close()
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Username or email already exists"
@@ -859,7 +1079,7 @@ async def create_user(user_data: UserCreate):
         # Hash password and create user
         hashed_password = get_password_hash(user_data.password)
         
-        cursor.execute('''
+        await get_database().execute('''
             INSERT INTO users (username, email, hashed_password, full_name, disabled)
             VALUES (?, ?, ?, ?, ?)
         ''', (
@@ -870,9 +1090,6 @@ async def create_user(user_data: UserCreate):
             False
         ))
         
-        conn.commit()
-        conn.close()
-        
         return User(
             username=user_data.username,
             email=user_data.email,
@@ -901,6 +1118,24 @@ async def cleanup_task_runner():
         except Exception as e:
             logger.error(f"Error in cleanup task: {e}")
 
+def precompile_report_templates() -> None:
+    """Compile report templates ahead of the first report (runs in a worker thread)"""
+    try:
+        from eaa_scanner.templating import precompile_templates
+        compiled = precompile_templates()
+        logger.info(f"Precompiled {sum(len(names) for names in compiled.values())} report templates")
+    except Exception as e:
+        logger.warning(f"Report template precompilation failed: {e}")
+
+def warm_pdf_engines() -> None:
+    """Start a persistent Chrome ahead of the first report when reports will use it (runs in a worker thread)"""
+    try:
+        from eaa_scanner.pdf_service import warm_pdf_service
+        if warm_pdf_service():
+            logger.info("PDF Chrome pool ready")
+    except Exception as e:
+        logger.warning(f"PDF Chrome pool warm-up failed: {e}")
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan manager"""
@@ -909,8 +1144,16 @@ async def lifespan(app: FastAPI):
     
     # Initialize database first
     init_database()
+    get_progress_writer().start()
+    
+    # Deliver WebSocket broadcasts published by other workers
+    ws_manager.start_fanout(asyncio.get_running_loop())
     
-    # Start periodic cleanup task for in-memory scan status
+    # Compile report templates off the event loop; startup does not wait for it
+    asyncio.get_running_loop().run_in_executor(None, precompile_report_templates)
+    asyncio.get_running_loop().run_in_executor(None, warm_pdf_engines)
+    
+    # Start periodic cleanup task for scan status records
     cleanup_task = asyncio.create_task(cleanup_task_runner())
     
     # Start original scan manager cleanup (if it exists)
@@ -932,6 +1175,11 @@ async def lifespan(app: FastAPI):
     cleanup_task.cancel()
     if scan_cleanup_task:
         scan_cleanup_task.cancel()
+    ws_manager.stop_fanout()
+    await get_progress_writer().stop()
+    from eaa_scanner.pdf_service import shutdown_pdf_service
+    shutdown_pdf_service()
+    get_database().close()
     logger.info("Application shutdown complete")
 
 # Create FastAPI app with proper configuration
@@ -946,9 +1194,7 @@ app = FastAPI(
 
 # ==================== GLOBAL STATE ====================
 
-# In-memory storage for active sessions
-discovery_sessions = {}
-scan_sessions = {}
+# Discovery and multi-page scan sessions: see SHARED STATE above
 
 # ==================== MIDDLEWARE CONFIGURATION ====================
 
@@ -968,9 +1214,9 @@ app.add_middleware(
     max_age=600
 )
 
-# GZip compression for responses
+# GZip compression for responses (Range requests are passed through untouched)
 app.add_middleware(
-    GZipMiddleware,
+    RangeAwareGZipMiddleware,
     minimum_size=1000
 )
 
@@ -1040,25 +1286,21 @@ app.include_router(report_generator.router, prefix="/api/report", tags=["report"
 async def test_database():
     """Test endpoint per verificare stato database"""
     try:
-        db_path = get_database_path()
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
+        database = get_database()
+        db_path = database.path
         
         # Check if tables exist
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
-        tables = cursor.fetchall()
+        tables = await database.fetchall("SELECT name FROM sqlite_master WHERE type='table';")
         
         # Try to count scans
         try:
-            cursor.execute("SELECT COUNT(*) FROM scans")
-            scan_count = cursor.fetchone()[0]
+            scan_count = (await database.fetchone("SELECT COUNT(*) FROM scans"))[0]
         except sqlite3.OperationalError as e:
             scan_count = f"Error: {e}"
         
-        conn.close()
-        
         return {
             "database_path": db_path,
+            "pool": database.get_stats(),
             "path_exists": os.path.exists(db_path),
             "tables": [table[0] for table in tables],
             "scan_count": scan_count
@@ -1098,28 +1340,31 @@ async def health_check():
         system_info=system_info
     )
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics_endpoint():
+    """Prometheus metrics of this process (each API worker exposes its own)"""
+    return PlainTextResponse(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
 @app.post("/api/v2/auth/token", response_model=Token)
 async def login(form_data: OAuth2PasswordRequestForm = Depends()):
     """Real authentication endpoint with database verification"""
     try:
         # Check database for user
-        conn = sqlite3.connect(get_database_path())
-        cursor = conn.cursor()
-        cursor.execute('SELECT username, hashed_password, disabled FROM users WHERE username = ?', (form_data.username,))
-        user_row = cursor.fetchone()
+        database = get_database()
+        user_row = await database.fetchone(
+            'SELECT username, hashed_password, disabled FROM users WHERE username = ?',
+            (form_data.username,)
+        )
         
         # Create default test user if not exists
         if not user_row and form_data.username == "test":
             test_password_hash = get_password_hash("test")
-            cursor.execute('''
+            await database.execute('''
                 INSERT INTO users (username, email, hashed_password, full_name, disabled)
                 VALUES (?, ?, ?, ?, ?)
             ''', ("test", "test@example.com", test_password_hash, "Test User", False))
-            conn.commit()
             user_row = ("test", test_password_hash, False)
         
-        conn.close()
-        
         if not user_row:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -1179,14 +1424,21 @@ async def start_scan(
 ):
     """Start a new accessibility scan (authentication optional for now)"""
     try:
-        scan_id = await scan_manager.create_scan(request)
+        queue = get_scan_queue()
+        scan_id = await scan_manager.create_scan(request, track_active=queue is None)
         
         # Create status tracking for polling
         scan_status = create_scan_status(scan_id)
         scan_status.update(status="starting", progress=0, message="Avvio scansione...")
         
-        # Add background task
-        background_tasks.add_task(run_scan_task, scan_id, request)
+        if queue is not None:
+            # Executed by a worker process; status is read back from the job
+            await asyncio.to_thread(
+                queue.enqueue, SCAN_JOB, {"scan_id": scan_id, "request": request.dict()},
+                job_id=scan_id, max_attempts=settings.scan_job_max_attempts
+            )
+        else:
+            background_tasks.add_task(run_scan_task, scan_id, request)
         
         scan = scan_manager.get_scan(scan_id)
         
@@ -1214,6 +1466,14 @@ async def get_scan_status(
     """Get scan status (authentication optional for now)"""
     scan = scan_manager.get_scan(scan_id)
     
+    job = await load_scan_job(scan_id)
+    if job is not None:
+        created_at = datetime.utcfromtimestamp(job.created_at)
+        scan = dict(scan or {"created_at": created_at, "progress": 0}, **job_scan_state(job))
+        scan["updated_at"] = datetime.utcfromtimestamp(job.updated_at)
+        if job.status == JobStatus.SUCCEEDED and isinstance(job.result, dict):
+            scan["results"] = job.result.get("results")
+    
     if not scan:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -1288,8 +1548,9 @@ async def get_active_scans(
     except Exception as e:
         logger.error(f"Error getting active scans from scan_manager: {e}")
     
-    # From in-memory status store
-    for scan_id, status in scan_status_store.items():
+    # From the shared status store
+    for scan_id, record in scan_status_store.items():
+        status = ScanStatus(scan_id, record)
         if status.status not in ["completed", "failed"]:
             # Check if already added from scan_manager
             if not any(s["scan_id"] == scan_id for s in active_scans):
@@ -1339,17 +1600,24 @@ async def manual_cleanup(
 
 # ==================== REAL SCANNER INTEGRATION ====================
 
+# The scan pipeline (eaa_scanner.core: charts, PDF engines, page sampler,
+# LLM client) is imported on first use, keeping API cold start fast
 try:
-    from eaa_scanner.core import run_scan as eaa_run_scan
     from eaa_scanner.config import Config as EAAConfig
-    from eaa_scanner.crawler import WebCrawler
-    from eaa_scanner.pdf import html_to_pdf
-    from eaa_scanner.llm_integration import LLMIntegration
-    from eaa_scanner.report import generate_html_report as eaa_generate_html
-    EAA_SCANNER_AVAILABLE = True
+    EAA_SCANNER_AVAILABLE = importlib.util.find_spec("eaa_scanner.core") is not None
 except ImportError as e:
     logger.warning(f"EAA Scanner modules not available: {e}")
     EAA_SCANNER_AVAILABLE = False
+
+def eaa_run_scan(**kwargs) -> Dict[str, Any]:
+    """Run the EAA scan pipeline (imported on first call)"""
+    from eaa_scanner.core import run_scan
+    return run_scan(**kwargs)
+
+def html_to_pdf(**kwargs) -> bool:
+    """Convert an HTML report with the EAA PDF engines (imported on first call)"""
+    from eaa_scanner.pdf import html_to_pdf as convert
+    return convert(**kwargs)
     
 import sqlite3
 from datetime import datetime, timedelta
@@ -1357,25 +1625,18 @@ import aiofiles
 import tempfile
 import shutil
 from urllib.parse import urlparse
-from bs4 import BeautifulSoup
-import requests
 
 # Database initialization
-def get_database_path():
-    """Get the correct database path for the environment"""
-    import os
-    db_dir = '/app/data' if os.path.exists('/app/data') else '.'
-    return os.path.join(db_dir, 'eaa_scanner.db')
-
 def init_database():
-    """Initialize SQLite database for storing scan results"""
-    import os
-    
-    db_path = get_database_path()
-    print(f"Initializing database at: {db_path}")
+    """Initialize SQLite database for storing scan results (WAL mode, see webapp.database)"""
+    database = get_database()
+    print(f"Initializing database at: {database.path}")
     
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
+    with database.transaction() as conn:
+        _create_schema(conn.cursor())
+
+def _create_schema(cursor: sqlite3.Cursor):
+    """Create tables and apply column migrations"""
     
     # Create scans table
     cursor.execute('''
@@ -1430,8 +1691,8 @@ def init_database():
         )
     ''')
     
-    conn.commit()
-    conn.close()
+    # Summary columns, history indexes and aggregate stats table
+    migrate_scan_history(cursor.connection)
 
 # Initialize database on startup
 # init_database()  # Moved to lifespan manager
@@ -1456,6 +1717,7 @@ class RealWebCrawler:
         except ImportError:
             self.use_optimized = False
             logger.info("ℹ️ Using standard crawler (install aiohttp for better performance)")
+            from eaa_scanner.crawler import WebCrawler
             self.crawler = WebCrawler(
                 base_url=base_url,
                 max_pages=max_pages,
@@ -2391,18 +2653,16 @@ async def generate_html_fallback(eaa_config, results: Dict[str, Any]) -> str:
 async def run_scan_task(scan_id: str, request: ScanRequest):
     """Background task to run real accessibility scan"""
     scan_status = None
+    cancel_token = scan_cancellations.open(scan_id)
     try:
         logger.info(f"========== STARTING REAL SCAN {scan_id} for {request.url} ==========")
         logger.info(f"Request data: company={request.company_name}, email={request.email}")
         logger.info(f"Scanner config: {request.scannerConfig}")
         logger.info(f"Simulate value: {getattr(request, 'simulate', 'NOT_SET')}")
         
-        # Get scan status from store directly (NOT the async function)
-        scan_status = scan_status_store.get(scan_id)
-        
         # Update status in both systems
         await scan_manager.update_scan(scan_id, status="running", progress=5)
-        scan_status = scan_status_store.get(scan_id)
+        scan_status = load_scan_status(scan_id)
         if scan_status:
             scan_status.update(status="running", progress=5, message="Scansione in corso...")
         
@@ -2718,7 +2978,8 @@ async def run_scan_task(scan_id: str, request: ScanRequest):
                         cfg=eaa_config,
                         output_root=output_root,
                         enable_crawling=False,
-                        event_monitor=monitor
+                        event_monitor=monitor,
+                        cancel_token=cancel_token
                     )
                 )
             logger.info(f"========== EAA_RUN_SCAN COMPLETED for {scan_id} ==========")
@@ -2791,15 +3052,11 @@ async def run_scan_task(scan_id: str, request: ScanRequest):
         
         # Aggiorna anche il database per timeout
         try:
-            conn = sqlite3.connect(get_database_path())
-            cursor = conn.cursor()
-            cursor.execute('''
+            await get_database().execute('''
                 UPDATE scans 
                 SET status = ?, updated_at = ?
                 WHERE id = ?
             ''', ("failed", datetime.utcnow().isoformat(), scan_id))
-            conn.commit()
-            conn.close()
         except Exception as db_error:
             logger.error(f"Failed to update timeout status in database: {db_error}")
             
@@ -2808,6 +3065,11 @@ async def run_scan_task(scan_id: str, request: ScanRequest):
             "status": "failed",
             "message": "Timeout della scansione"
         })
+    except ScanCancelled:
+        logger.info(f"Scan {scan_id} cancelled: scanner processes terminated")
+        await scan_manager.update_scan(scan_id, status="cancelled", message="Scansione annullata dall'utente")
+        if scan_status:
+            scan_status.update(status="cancelled", message="Scansione annullata dall'utente")
     except Exception as e:
         logger.error(f"========== BACKGROUND TASK EXCEPTION for {scan_id} ==========")
         logger.error(f"Exception type: {type(e)}")
@@ -2829,6 +3091,8 @@ async def run_scan_task(scan_id: str, request: ScanRequest):
             "status": "failed",
             "message": "Errore durante la scansione"
         })
+    finally:
+        scan_cancellations.release(scan_id, cancel_token)
 
 async def process_eaa_results(eaa_result: Dict[str, Any], scan_id: str) -> Dict[str, Any]:
     """Process EAA scanner results into API format"""
@@ -2940,13 +3204,21 @@ async def process_eaa_results(eaa_result: Dict[str, Any], scan_id: str) -> Dict[
 async def save_scan_to_database(scan_id: str, request: ScanRequest, results: Dict[str, Any], eaa_result: Dict[str, Any]):
     """Save scan results to SQLite database"""
     try:
-        conn = sqlite3.connect(get_database_path())
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT OR REPLACE INTO scans 
-            (id, url, company_name, email, status, progress, results, output_path, html_report_path, updated_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        # Upsert (not INSERT OR REPLACE): keeps created_at and fires the
+        # update trigger that maintains scan_stats
+        summary_columns = ", ".join(SCAN_SUMMARY_COLUMNS)
+        summary_placeholders = ", ".join("?" for _ in SCAN_SUMMARY_COLUMNS)
+        summary_updates = ", ".join(f"{name} = excluded.{name}" for name in SCAN_SUMMARY_COLUMNS)
+        await get_database().execute(f'''
+            INSERT INTO scans 
+            (id, url, company_name, email, status, progress, results, output_path, html_report_path, updated_at,
+             {summary_columns})
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, {summary_placeholders})
+            ON CONFLICT(id) DO UPDATE SET
+                url = excluded.url, company_name = excluded.company_name, email = excluded.email,
+                status = excluded.status, progress = excluded.progress, results = excluded.results,
+                output_path = excluded.output_path, html_report_path = excluded.html_report_path,
+                updated_at = excluded.updated_at, {summary_updates}
         ''', (
             scan_id,
             str(request.url),
@@ -2957,27 +3229,21 @@ async def save_scan_to_database(scan_id: str, request: ScanRequest, results: Dic
             json.dumps(results, ensure_ascii=False),
             results.get("output_path", ""),
             results.get("html_report_path", ""),
-            datetime.utcnow().isoformat()
+            datetime.utcnow().isoformat(),
+            *scan_summary_values(results)
         ))
         
-        conn.commit()
-        conn.close()
-        
         logger.info(f"Saved scan {scan_id} to database")
         
     except Exception as e:
         logger.error(f"Error saving scan to database: {e}")
         # Aggiorna anche il database in caso di errore
         try:
-            conn = sqlite3.connect(get_database_path())
-            cursor = conn.cursor()
-            cursor.execute('''
+            await get_database().execute('''
                 UPDATE scans 
                 SET status = ?, updated_at = ?
                 WHERE id = ?
             ''', ("failed", datetime.utcnow().isoformat(), scan_id))
-            conn.commit()
-            conn.close()
         except Exception as db_error:
             logger.error(f"Failed to update scan status in database: {db_error}")
         
@@ -2992,15 +3258,11 @@ async def save_scan_to_database(scan_id: str, request: ScanRequest, results: Dic
         
         # Aggiorna anche il database per timeout
         try:
-            conn = sqlite3.connect(get_database_path())
-            cursor = conn.cursor()
-            cursor.execute('''
+            await get_database().execute('''
                 UPDATE scans 
                 SET status = ?, updated_at = ?
                 WHERE id = ?
             ''', ("failed", datetime.utcnow().isoformat(), scan_id))
-            conn.commit()
-            conn.close()
         except Exception as db_error:
             logger.error(f"Failed to update timeout status in database: {db_error}")
             
@@ -3019,15 +3281,11 @@ async def save_scan_to_database(scan_id: str, request: ScanRequest, results: Dic
         
         # Aggiorna anche il database per errori generali
         try:
-            conn = sqlite3.connect(get_database_path())
-            cursor = conn.cursor()
-            cursor.execute('''
+            await get_database().execute('''
                 UPDATE scans 
                 SET status = ?, updated_at = ?
                 WHERE id = ?
             ''', ("failed", datetime.utcnow().isoformat(), scan_id))
-            conn.commit()
-            conn.close()
         except Exception as db_error:
             logger.error(f"Failed to update failed status in database: {db_error}")
             
@@ -3043,11 +3301,7 @@ async def generate_pdf_background(scan_id: str, pdf_id: str):
         logger.info(f"Starting real PDF generation for scan {scan_id}")
         
         # Get scan from database
-        conn = sqlite3.connect(get_database_path())
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM scans WHERE id = ?', (scan_id,))
-        scan_row = cursor.fetchone()
-        conn.close()
+        scan_row = await get_database().fetchone('SELECT * FROM scans WHERE id = ?', (scan_id,))
         
         if not scan_row:
             raise Exception(f"Scan {scan_id} not found in database")
@@ -3070,12 +3324,10 @@ async def generate_pdf_background(scan_id: str, pdf_id: str):
         pdf_path = Path("output") / scan_id / pdf_filename
         pdf_path.parent.mkdir(parents=True, exist_ok=True)
         
-        # Use the real PDF generation from eaa_scanner
+        # Use the real PDF generation from eaa_scanner (blocking: Chrome pool / WeasyPrint)
         if EAA_SCANNER_AVAILABLE:
-            success = html_to_pdf(
-                html_path=Path(html_report_path),
-                pdf_path=pdf_path,
-                engine="auto"
+            success = await asyncio.get_running_loop().run_in_executor(
+                None, partial(html_to_pdf, html_path=Path(html_report_path), pdf_path=pdf_path, engine="auto")
             )
         else:
             # Fallback PDF generation using weasyprint or wkhtmltopdf
@@ -3083,11 +3335,7 @@ async def generate_pdf_background(scan_id: str, pdf_id: str):
         
         if success and pdf_path.exists():
             # Update database with PDF path
-            conn = sqlite3.connect(get_database_path())
-            cursor = conn.cursor()
-            cursor.execute('UPDATE scans SET pdf_report_path = ? WHERE id = ?', (str(pdf_path), scan_id))
-            conn.commit()
-            conn.close()
+            await get_database().execute('UPDATE scans SET pdf_report_path = ? WHERE id = ?', (str(pdf_path), scan_id))
             
             logger.info(f"PDF generation completed for scan {scan_id}: {pdf_path}")
         else:
@@ -3137,13 +3385,11 @@ async def generate_html_report(scan_id: str, scan_data: Dict[str, Any]) -> Optio
         
         async with aiofiles.open(html_path, 'w', encoding='utf-8') as f:
             await f.write(html_content)
+        # Varianti .gz/.br scritte una volta, servite da artifact_response
+        await asyncio.to_thread(precompress_artifact, html_path)
         
         # Update database
-        conn = sqlite3.connect(get_database_path())
-        cursor = conn.cursor()
-        cursor.execute('UPDATE scans SET html_report_path = ? WHERE id = ?', (str(html_path), scan_id))
-        conn.commit()
-        conn.close()
+        await get_database().execute('UPDATE scans SET html_report_path = ? WHERE id = ?', (str(html_path), scan_id))
         
         return str(html_path)
         
@@ -3157,20 +3403,17 @@ async def run_llm_regeneration(regeneration_id: str, request: RegenerationReques
         logger.info(f"Starting real LLM regeneration {regeneration_id}")
         
         # Get regeneration session from database
-        conn = sqlite3.connect(get_database_path())
-        cursor = conn.cursor()
+        database = get_database()
         
         # Update initial status
-        cursor.execute('''
+        await database.execute('''
             UPDATE regeneration_sessions 
             SET status = ?, progress = ?, updated_at = ?
             WHERE id = ?
         ''', ("analyzing", 10, datetime.utcnow().isoformat(), regeneration_id))
-        conn.commit()
         
         # Get original scan data
-        cursor.execute('SELECT * FROM scans WHERE id = ?', (request.scan_id,))
-        scan_row = cursor.fetchone()
+        scan_row = await database.fetchone('SELECT * FROM scans WHERE id = ?', (request.scan_id,))
         
         if not scan_row:
             raise Exception(f"Scan {request.scan_id} not found")
@@ -3191,12 +3434,11 @@ async def run_llm_regeneration(regeneration_id: str, request: RegenerationReques
             scan_results = {}
         
         # Update progress
-        cursor.execute('''
+        await database.execute('''
             UPDATE regeneration_sessions 
             SET status = ?, progress = ?, updated_at = ?
             WHERE id = ?
         ''', ("processing", 25, datetime.utcnow().isoformat(), regeneration_id))
-        conn.commit()
         
         # Use real LLM integration
         effective_key = get_effective_openai_key()
@@ -3231,12 +3473,11 @@ async def run_llm_regeneration(regeneration_id: str, request: RegenerationReques
             raise Exception("LLM integration not available")
         
         # Update progress
-        cursor.execute('''
+        await database.execute('''
             UPDATE regeneration_sessions 
             SET status = ?, progress = ?, updated_at = ?
             WHERE id = ?
         ''', ("generating", 50, datetime.utcnow().isoformat(), regeneration_id))
-        conn.commit()
         
         # Generate enhanced content based on request type
         enhanced_results = {}
@@ -3291,7 +3532,7 @@ async def run_llm_regeneration(regeneration_id: str, request: RegenerationReques
             }
         
         # Update completion status
-        cursor.execute('''
+        await database.execute('''
             UPDATE regeneration_sessions 
             SET status = ?, progress = ?, results = ?, tokens_used = ?, cost_estimate = ?, updated_at = ?
             WHERE id = ?
@@ -3302,24 +3543,17 @@ async def run_llm_regeneration(regeneration_id: str, request: RegenerationReques
             datetime.utcnow().isoformat(), regeneration_id
         ))
         
-        conn.commit()
-        conn.close()
-        
         logger.info(f"Real LLM regeneration completed: {regeneration_id}")
         
     except Exception as e:
         logger.error(f"Real LLM regeneration failed: {e}", exc_info=True)
         
         # Update failure status
-        conn = sqlite3.connect(get_database_path())
-        cursor = conn.cursor()
-        cursor.execute('''
+        await get_database().execute('''
             UPDATE regeneration_sessions 
             SET status = ?, updated_at = ?
             WHERE id = ?
         ''', ("failed", datetime.utcnow().isoformat(), regeneration_id))
-        conn.commit()
-        conn.close()
 
 # ==================== DISCOVERY ENDPOINTS ====================
 
@@ -3541,8 +3775,7 @@ async def run_discovery(session_id: str, request: DiscoveryRequest):
         # Update progress callback
         async def progress_callback(progress: int, message: str):
             if session_id in discovery_sessions:
-                discovery_sessions[session_id]["progress"] = progress
-                discovery_sessions[session_id]["message"] = message
+                discovery_sessions.write(session_id, {"progress": progress, "message": message})
         
         # Validate URL before creating crawler
         discovery_url = request.url or request.base_url
@@ -3574,19 +3807,23 @@ async def run_discovery(session_id: str, request: DiscoveryRequest):
         
         # Update session with real results
         if session_id in discovery_sessions:
-            discovery_sessions[session_id]["pages_found"] = discovered_pages
-            discovery_sessions[session_id]["status"] = "completed"
-            discovery_sessions[session_id]["progress"] = 100
-            discovery_sessions[session_id]["message"] = f"Discovery completata: {len(discovered_pages)} pagine trovate"
+            discovery_sessions.write(session_id, {
+                "pages_found": discovered_pages,
+                "status": "completed",
+                "progress": 100,
+                "message": f"Discovery completata: {len(discovered_pages)} pagine trovate"
+            })
             
             logger.info(f"Discovery completed for session {session_id}: {len(discovered_pages)} pages found")
             
     except Exception as e:
         logger.error(f"Real discovery failed: {e}", exc_info=True)
         if session_id in discovery_sessions:
-            discovery_sessions[session_id]["status"] = "failed"
-            discovery_sessions[session_id]["message"] = "Errore durante il discovery"
-            discovery_sessions[session_id]["progress"] = 100
+            discovery_sessions.write(session_id, {
+                "status": "failed",
+                "message": "Errore durante il discovery",
+                "progress": 100
+            })
 
 # ==================== MISSING API ENDPOINTS ====================
 
@@ -3594,14 +3831,19 @@ async def run_discovery(session_id: str, request: DiscoveryRequest):
 async def get_scan_results(
     scan_id: str
 ):
-    """Get detailed scan results from database with fallback to scan_manager"""
+    """Get detailed scan results, streamed as chunked JSON
+    
+    ``detailed_results`` can hold every scanner's raw output; serializing it
+    incrementally avoids building the whole JSON string per request.
+    """
+    return json_stream_response(await build_scan_results(scan_id))
+
+
+async def build_scan_results(scan_id: str) -> Dict[str, Any]:
+    """Build detailed scan results from database with fallback to scan_manager"""
     try:
         # Prima prova dal database
-        conn = sqlite3.connect(get_database_path())
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM scans WHERE id = ?', (scan_id,))
-        scan_row = cursor.fetchone()
-        conn.close()
+        scan_row = await get_database().fetchone('SELECT * FROM scans WHERE id = ?', (scan_id,))
         
         if not scan_row:
             # Fallback: cerca in scan_manager (in memoria)
@@ -3612,11 +3854,7 @@ async def get_scan_results(
                 await sync_scan_to_database(scan_id)
                 
                 # Riprova dal database
-                conn = sqlite3.connect(get_database_path())
-                cursor = conn.cursor()
-                cursor.execute('SELECT * FROM scans WHERE id = ?', (scan_id,))
-                scan_row = cursor.fetchone()
-                conn.close()
+                scan_row = await get_database().fetchone('SELECT * FROM scans WHERE id = ?', (scan_id,))
                 
                 if not scan_row:
                     # Se ancora non c'è, restituisci dai dati in memoria
@@ -3773,6 +4011,8 @@ async def get_scan_results(
         
         return response
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting scan results: {e}")
         raise HTTPException(
@@ -3817,6 +4057,7 @@ async def generate_pdf_report(
 @app.get("/api/download_report/{scan_id}")
 async def download_report(
     scan_id: str,
+    request: Request,
     format: str = "html",
     version: str = "original",
     pdf_id: Optional[str] = None,
@@ -3825,11 +4066,7 @@ async def download_report(
     """Download real report files in various formats"""
     try:
         # Get scan from database
-        conn = sqlite3.connect(get_database_path())
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM scans WHERE id = ?', (scan_id,))
-        scan_row = cursor.fetchone()
-        conn.close()
+        scan_row = await get_database().fetchone('SELECT * FROM scans WHERE id = ?', (scan_id,))
         
         if not scan_row:
             raise HTTPException(
@@ -3855,11 +4092,9 @@ async def download_report(
                 try:
                     await generate_pdf_background(scan_id, pdf_id)
                     # Refresh scan data
-                    conn = sqlite3.connect(get_database_path())
-                    cursor = conn.cursor()
-                    cursor.execute('SELECT pdf_report_path FROM scans WHERE id = ?', (scan_id,))
-                    pdf_path = cursor.fetchone()[0]
-                    conn.close()
+                    pdf_path = (await get_database().fetchone(
+                        'SELECT pdf_report_path FROM scans WHERE id = ?', (scan_id,)
+                    ))[0]
                 except Exception as e:
                     logger.error(f"PDF generation failed: {e}")
                     raise HTTPException(
@@ -3869,11 +4104,7 @@ async def download_report(
             
             if pdf_path and Path(pdf_path).exists():
                 filename = f"report_eaa_{company_name}_{timestamp}.pdf"
-                return FileResponse(
-                    path=pdf_path,
-                    media_type="application/pdf",
-                    filename=filename
-                )
+                return artifact_response(request, pdf_path, "application/pdf", filename)
             else:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -3882,16 +4113,12 @@ async def download_report(
         
         elif format.lower() == "json":
             # Return JSON results
-            results = await get_scan_results(scan_id, current_user)
+            results = await build_scan_results(scan_id)
             filename = f"report_eaa_{company_name}_{timestamp}.json"
             
-            return Response(
-                content=json.dumps(results, indent=2, default=str, ensure_ascii=False),
-                media_type="application/json",
-                headers={
-                    "Content-Disposition": f"attachment; filename={filename}"
-                }
-            )
+            return json_stream_response(results, headers={
+                "Content-Disposition": f"attachment; filename={filename}"
+            })
         
         else:  # HTML format (default)
             # Serve real HTML file
@@ -3903,11 +4130,7 @@ async def download_report(
             
             if html_path and Path(html_path).exists():
                 filename = f"report_eaa_{company_name}_{timestamp}.html"
-                return FileResponse(
-                    path=html_path,
-                    media_type="text/html",
-                    filename=filename
-                )
+                return artifact_response(request, html_path, "text/html", filename)
             else:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -3926,14 +4149,14 @@ async def download_report(
 # ==================== BACKWARD COMPATIBLE ALIASES ====================
 
 @app.get("/download/html")
-async def download_html_legacy(scan_id: str):
+async def download_html_legacy(scan_id: str, request: Request):
     """Legacy endpoint for HTML download - backward compatibility"""
-    return await download_report(scan_id, format="html")
+    return await download_report(scan_id, request, format="html")
 
 @app.get("/download/pdf") 
-async def download_pdf_legacy(scan_id: str):
+async def download_pdf_legacy(scan_id: str, request: Request):
     """Legacy endpoint for PDF download - backward compatibility"""
-    return await download_report(scan_id, format="pdf")
+    return await download_report(scan_id, request, format="pdf")
 
 # ==================== LLM & REGENERATION ENDPOINTS ====================
 
@@ -3941,11 +4164,7 @@ async def download_pdf_legacy(scan_id: str):
 async def get_regeneration_status(regeneration_id: str):
     """Get LLM regeneration status from database"""
     try:
-        conn = sqlite3.connect(get_database_path())
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM regeneration_sessions WHERE id = ?', (regeneration_id,))
-        session_row = cursor.fetchone()
-        conn.close()
+        session_row = await get_database().fetchone('SELECT * FROM regeneration_sessions WHERE id = ?', (regeneration_id,))
         
         if not session_row:
             raise HTTPException(
@@ -4004,8 +4223,7 @@ async def scan_stream_polling(
             from webapp.scan_monitor import get_scan_monitor
             monitor = get_scan_monitor()
             
-            if scan_id in monitor.event_history:
-                historical_events = monitor.event_history[scan_id][-5:]  # Last 5 events
+            historical_events = monitor.get_recent_events(scan_id, 5)  # Last 5 events
         except Exception as e:
             logger.warning(f"Could not get historical events: {e}")
         
@@ -4050,79 +4268,48 @@ async def get_system_stats(
 ):
     """Get real system statistics from database"""
     try:
-        conn = sqlite3.connect(get_database_path())
-        cursor = conn.cursor()
+        database = get_database()
         
-        # Get scan statistics
-        cursor.execute('SELECT COUNT(*) FROM scans')
-        total_scans = cursor.fetchone()[0]
+        async def scalar(sql: str):
+            return (await database.fetchone(sql))[0]
         
-        cursor.execute('SELECT COUNT(*) FROM scans WHERE status = "completed"')
-        completed_scans = cursor.fetchone()[0]
+        # Scan counts and score aggregates maintained by triggers in scan_stats
+        scan_stats = await database.run(read_scan_stats)
         
-        cursor.execute('SELECT COUNT(*) FROM scans WHERE status = "failed"')
-        failed_scans = cursor.fetchone()[0]
+        def stat(status_name: str, field: str = "scan_count"):
+            return scan_stats.get(status_name, {}).get(field, 0)
         
-        cursor.execute('SELECT COUNT(*) FROM scans WHERE status IN ("running", "pending")')
-        active_scans = cursor.fetchone()[0]
+        total_scans = int(sum(entry["scan_count"] for entry in scan_stats.values()))
+        completed_scans = int(stat("completed"))
+        failed_scans = int(stat("failed"))
+        active_scans = int(stat("running") + stat("pending"))
         
-        # Get average compliance score
-        cursor.execute('''
-            SELECT AVG(CAST(JSON_EXTRACT(results, '$.compliance_score') AS REAL))
-            FROM scans 
-            WHERE status = "completed" AND results IS NOT NULL
-        ''')
-        avg_compliance_result = cursor.fetchone()[0]
-        avg_compliance = round(avg_compliance_result or 0, 1)
-        
-        # Get average scan duration
-        cursor.execute('''
-            SELECT AVG(CAST(JSON_EXTRACT(results, '$.scan_duration') AS REAL))
-            FROM scans 
-            WHERE status = "completed" AND results IS NOT NULL
-        ''')
-        avg_duration_result = cursor.fetchone()[0]
-        avg_duration = round(avg_duration_result or 0, 1)
-        
-        # Get average issues per scan
-        cursor.execute('''
-            SELECT AVG(CAST(JSON_EXTRACT(results, '$.total_issues') AS INTEGER))
-            FROM scans 
-            WHERE status = "completed" AND results IS NOT NULL
+        avg_compliance = round(stat("completed", "score_sum") / max(1, stat("completed", "scored_count")), 1)
+        
+        # Average duration and issues from the denormalized summary columns
+        averages = await database.fetchone('''
+            SELECT AVG(scan_duration), AVG(total_issues)
+            FROM scans WHERE status = 'completed'
         ''')
-        avg_issues_result = cursor.fetchone()[0]
-        avg_issues = round(avg_issues_result or 0, 1)
+        avg_duration = round(averages[0] or 0, 1)
+        avg_issues = round(averages[1] or 0, 1)
         
         # Get LLM usage statistics
-        cursor.execute('SELECT COUNT(*) FROM regeneration_sessions')
-        total_regenerations = cursor.fetchone()[0]
+        total_regenerations = await scalar('SELECT COUNT(*) FROM regeneration_sessions')
         
-        cursor.execute('SELECT SUM(cost_estimate) FROM regeneration_sessions WHERE status = "completed"')
-        total_cost_result = cursor.fetchone()[0]
+        total_cost_result = await scalar('SELECT SUM(cost_estimate) FROM regeneration_sessions WHERE status = "completed"')
         total_cost = round(total_cost_result or 0, 2)
         
-        cursor.execute('SELECT AVG(tokens_used) FROM regeneration_sessions WHERE status = "completed"')
-        avg_tokens_result = cursor.fetchone()[0]
+        avg_tokens_result = await scalar('SELECT AVG(tokens_used) FROM regeneration_sessions WHERE status = "completed"')
         avg_tokens = round(avg_tokens_result or 0, 0)
         
-        conn.close()
-        
         # Calculate success rate
         success_rate = round((completed_scans / max(1, total_scans)) * 100, 1)
         
         # Calculate compliance rate
         compliance_rate = 0
         if completed_scans > 0:
-            conn = sqlite3.connect(get_database_path())
-            cursor = conn.cursor()
-            cursor.execute('''
-                SELECT COUNT(*) FROM scans 
-                WHERE status = "completed" 
-                AND JSON_EXTRACT(results, '$.eaa_compliant') = 1
-            ''')
-            compliant_scans = cursor.fetchone()[0]
-            conn.close()
-            compliance_rate = round((compliant_scans / completed_scans) * 100, 1)
+            compliance_rate = round((stat("completed", "compliant_count") / completed_scans) * 100, 1)
         
         stats = {
             "scans": {
@@ -4153,7 +4340,8 @@ async def get_system_stats(
                 "total_cost": f"${total_cost}",
                 "avg_tokens_per_request": int(avg_tokens),
                 "available_models": ["gpt-4o", "gpt-4-turbo", "gpt-3.5-turbo"]
-            }
+            },
+            "websocket": ws_manager.get_stats()
         }
         
         return {
@@ -4341,13 +4529,17 @@ async def get_scan_history(
     status_filter: Optional[str] = None,
     date_from: Optional[str] = None,
     date_to: Optional[str] = None,
+    cursor: Optional[str] = None,
     current_user: Optional[User] = Depends(get_current_user)
 ):
-    """Get real paginated scan history from database with filtering"""
+    """Get real paginated scan history from database with filtering
+    
+    Rows come from the (status, created_at, id) indexes and the denormalized
+    summary columns; the results JSON is never parsed. Pass the returned
+    ``next_cursor`` as ``cursor`` for keyset pagination (constant cost per
+    page); ``page`` keeps working with OFFSET for existing clients.
+    """
     try:
-        conn = sqlite3.connect(get_database_path())
-        cursor = conn.cursor()
-        
         # Build query with filters
         where_conditions = []
         params = []
@@ -4364,69 +4556,78 @@ async def get_scan_history(
             where_conditions.append("created_at <= ?")
             params.append(date_to)
         
-        where_clause = ""
-        if where_conditions:
-            where_clause = "WHERE " + " AND ".join(where_conditions)
+        page_conditions = list(where_conditions)
+        page_params = list(params)
+        offset = 0
+        if cursor:
+            try:
+                cursor_created_at, cursor_id = decode_history_cursor(cursor)
+            except ValueError:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cursore non valido")
+            page_conditions.append("(created_at, id) < (?, ?)")
+            page_params.extend([cursor_created_at, cursor_id])
+        else:
+            offset = (max(1, page) - 1) * limit
         
-        # Get total count
-        count_query = f"SELECT COUNT(*) FROM scans {where_clause}"
-        cursor.execute(count_query, params)
-        total_scans = cursor.fetchone()[0]
+        page_clause = ""
+        if page_conditions:
+            page_clause = "WHERE " + " AND ".join(page_conditions)
         
-        # Get paginated results
-        offset = (page - 1) * limit
+        # Fetch one extra row to know whether another page exists
         data_query = f"""
-            SELECT id, url, company_name, email, status, progress, results, created_at, updated_at 
-            FROM scans {where_clause}
-            ORDER BY created_at DESC
+            SELECT id, url, company_name, email, status, created_at, {", ".join(SCAN_SUMMARY_COLUMNS)}
+            FROM scans {page_clause}
+            ORDER BY created_at DESC, id DESC
             LIMIT ? OFFSET ?
         """
-        cursor.execute(data_query, params + [limit, offset])
-        scan_rows = cursor.fetchall()
+        
+        def read_page(conn: sqlite3.Connection):
+            # Aggregates for the whole filtered history, not just this page:
+            # trigger-maintained scan_stats, or the created_at index for a date range
+            stats = read_scan_stats(conn, date_from, date_to)
+            if status_filter:
+                stats = {key: value for key, value in stats.items() if key == status_filter}
+            rows = conn.execute(data_query, page_params + [limit + 1, offset]).fetchall()
+            return stats, rows
+        
+        scan_stats, scan_rows = await get_database().run(read_page)
+        total_scans = sum(int(entry["scan_count"]) for entry in scan_stats.values())
+        has_next = len(scan_rows) > limit
+        scan_rows = scan_rows[:limit]
         
         # Process scan data
         history = []
         for row in scan_rows:
-            scan_id, url, company_name, email, status, progress, results_json, created_at, updated_at = row
-            
-            # Parse results
-            try:
-                if results_json:
-                    results = json.loads(results_json) if isinstance(results_json, str) else results_json
-                else:
-                    results = {}
-            except:
-                results = {}
-            
             history.append({
-                "id": scan_id,
-                "url": url,
-                "company": company_name,
-                "email": email,
-                "date": created_at,
-                "status": status,
-                "compliance_score": results.get("compliance_score", 0),
-                "total_issues": results.get("total_issues", 0),
-                "critical_issues": results.get("critical_issues", 0),
-                "high_issues": results.get("high_issues", 0),
-                "wcag_level": results.get("wcag_level", "AA"),
-                "eaa_compliant": results.get("eaa_compliant", False),
-                "scanners_completed": results.get("scanners_completed", 0),
-                "scan_duration": results.get("scan_duration", 0),
-                "report_available": status == "completed",
+                "id": row["id"],
+                "url": row["url"],
+                "company": row["company_name"],
+                "email": row["email"],
+                "date": row["created_at"],
+                "status": row["status"],
+                "compliance_score": row["compliance_score"] or 0,
+                "total_issues": row["total_issues"] or 0,
+                "critical_issues": row["critical_issues"] or 0,
+                "high_issues": row["high_issues"] or 0,
+                "wcag_level": row["wcag_level"] or "AA",
+                "eaa_compliant": bool(row["eaa_compliant"]),
+                "scanners_completed": row["scanners_completed"] or 0,
+                "scan_duration": row["scan_duration"] or 0,
+                "report_available": row["status"] == "completed",
                 "created_by": current_user.username if current_user else "anonymous"
             })
         
-        # Calculate summary statistics
-        completed_scans = len([h for h in history if h["status"] == "completed"])
-        failed_scans = len([h for h in history if h["status"] == "failed"])
+        next_cursor = None
+        if has_next and scan_rows:
+            next_cursor = encode_history_cursor(scan_rows[-1]["created_at"], scan_rows[-1]["id"])
         
-        # Calculate averages for completed scans only
-        completed_history = [h for h in history if h["status"] == "completed" and h["compliance_score"] > 0]
-        avg_score = sum([h["compliance_score"] for h in completed_history]) / max(1, len(completed_history))
-        compliance_rate = len([h for h in completed_history if h["eaa_compliant"]]) / max(1, len(completed_history)) * 100
-        
-        conn.close()
+        # Summary statistics over the filtered history; averages for scored completed scans
+        completed = scan_stats.get("completed", {})
+        completed_scans = int(completed.get("scan_count", 0))
+        failed_scans = int(scan_stats.get("failed", {}).get("scan_count", 0))
+        scored_scans = max(1, completed.get("scored_count", 0))
+        avg_score = completed.get("score_sum", 0) / scored_scans
+        compliance_rate = completed.get("compliant_count", 0) / scored_scans * 100
         
         return {
             "success": True,
@@ -4437,8 +4638,9 @@ async def get_scan_history(
                     "limit": limit,
                     "total": total_scans,
                     "pages": (total_scans + limit - 1) // limit,
-                    "has_next": offset + limit < total_scans,
-                    "has_prev": page > 1
+                    "has_next": has_next,
+                    "has_prev": bool(cursor) or page > 1,
+                    "next_cursor": next_cursor
                 },
                 "summary": {
                     "total_scans": total_scans,
@@ -4451,6 +4653,8 @@ async def get_scan_history(
             "message": f"Recuperate {len(history)} scansioni di {total_scans} totali"
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting scan history: {e}")
         raise HTTPException(
@@ -4725,6 +4929,7 @@ async def save_api_keys(request: dict):
 
 async def run_multi_page_scan_task(session_id: str, scan_data: dict):
     """Background task to run multi-page scan"""
+    cancel_token = scan_cancellations.open(session_id)
     try:
         logger.info(f"========== MULTI-PAGE SCAN TASK STARTED for {session_id} ==========")
         logger.info(f"Session data: {scan_data}")
@@ -4739,14 +4944,15 @@ async def run_multi_page_scan_task(session_id: str, scan_data: dict):
         logger.info(f"scanners type: {type(scan_data.get('scanners', None))}")
         logger.info(f"========== END SCAN_DATA DEBUG ==========")
         
+        pages = list(scan_data['pages'])
+        total_pages = len(pages)
         all_issues = []
         pages_scanned = 0
         
         # Use EAA Scanner for accessibility scanning
         logger.info(f"========== USING EAA SCANNER DIRECTLY ==========")
         try:
-            from eaa_scanner.core import run_scan as eaa_run_scan
-            from eaa_scanner.config import Config as EAAConfig
+            from eaa_scanner.enterprise_integration import FastAPIEnterpriseAdapter
             from pathlib import Path
             logger.info(f"EAA Scanner imported successfully")
         except Exception as import_error:
@@ -4754,246 +4960,172 @@ async def run_multi_page_scan_task(session_id: str, scan_data: dict):
             logger.error(f"Import error: {import_error}", exc_info=True)
             raise import_error
         
-        # Process each page using EAA Scanner directly
-        logger.info(f"========== PROCESSING {len(scan_data['pages'])} PAGES WITH EAA SCANNER ==========")
+        # Pages run concurrently, each holding one of the process-wide browser slots
+        logger.info(f"========== PROCESSING {total_pages} PAGES WITH EAA SCANNER ==========")
+        
+        # Each page gets its own output directory under the session one
+        session_root = Path("output") / session_id
+        session_root.mkdir(parents=True, exist_ok=True)
+        
+        # Determina modalità simulazione per batch: usa env come fallback (default false)
+        simulate_env = os.getenv("SIMULATE_MODE", "false").lower()
+        simulate_flag = simulate_env in ("1", "true", "yes", "on")
+        company_name = scan_data.get('company_name', 'Multi-page Scan')
+        email = scan_data.get('email', 'scan@example.com')
+        wave_api_key = get_effective_wave_key() or ""
+        
+        scanners = scan_data.get('scanners') or {}
+        units_per_page = sum([
+            bool(scanners.get('pa11y', True)),
+            bool(scanners.get('axe', True)),
+            bool(scanners.get('lighthouse', True)),
+            bool(scanners.get('wave', False) and wave_api_key)
+        ])
         
-        # Create temporary output directory
-        output_root = Path("output")
-        output_root.mkdir(exist_ok=True)
+        loop = asyncio.get_running_loop()
         
-        for idx, page_url in enumerate(scan_data['pages']):
+        def publish_progress():
+            """Publish real progress (completed page x scanner units) to the session"""
+            snapshot = progress_tracker.snapshot()
+            message = (f"Scansione: {snapshot['pages_scanned']}/{total_pages} pagine, "
+                       f"{snapshot['completed_units']}/{snapshot['total_units']} scanner completati")
+            scan_data.update(progress=max(1, snapshot['progress']), message=message)
+            if session_id in scan_manager.scans:
+                scan_manager.scans.write(session_id, {'progress': scan_data['progress'], 'message': message})
+        
+        def on_progress_change():
+            # Scanner events arrive on worker threads: hop onto the event loop
             try:
-                logger.info(f"========== PROCESSING PAGE {idx + 1}/{len(scan_data['pages'])}: {page_url} ==========")
-                
-                # Update current page
-                scan_data['current_page'] = page_url
-                scan_data['progress'] = max(1, int((idx / max(1, len(scan_data['pages']))) * 100))
-                # Sync in-memory session for status endpoint
-                if session_id in scan_sessions:
-                    scan_sessions[session_id]['status'] = 'running'
-                    scan_sessions[session_id]['current_page'] = page_url
-                    scan_sessions[session_id]['progress'] = scan_data['progress']
-                
-                # Update scan_manager for SSE endpoint
-                if session_id in scan_manager.scans:
-                    scan_manager.scans[session_id]['progress'] = scan_data['progress']
-                    scan_manager.scans[session_id]['message'] = f"Scansione pagina {idx + 1} di {scan_data['total_pages']}: {page_url}"
-                
-                # Send SSE update
-                await ws_manager.broadcast(
-                    session_id,
-                    {
-                        "type": "page_scan_start",
-                        "page": page_url,
-                        "page_number": idx + 1,
-                        "total_pages": scan_data['total_pages'],
-                        "progress": scan_data['progress']
-                    }
-                )
-                
-                # Create EAA Scanner configuration for this page
-                logger.info(f"========== CREATING EAA CONFIG for {page_url} ==========")
-                # Determina modalità simulazione per batch: usa env come fallback (default false)
-                simulate_env = os.getenv("SIMULATE_MODE", "false").lower()
-                simulate_flag = simulate_env in ("1", "true", "yes", "on")
-
-                eaa_config = EAAConfig(
-                    url=page_url,
-                    company_name=scan_data.get('company_name', 'Multi-page Scan'),
-                    email=scan_data.get('email', 'scan@example.com'),
-                    wave_api_key=get_effective_wave_key() or "",
-                    openai_api_key=get_effective_openai_key() or "",
-                    simulate=bool(simulate_flag),
-                    llm_enabled=False  # Disabilitato durante la scansione, verrà eseguito dopo
-                )
-                # Applica toggles scanner corretti
-                try:
-                    from eaa_scanner.config import ScannerToggles
-                    toggles = ScannerToggles(
-                        pa11y=scan_data.get('scanners', {}).get('pa11y', True),
-                        axe_core=scan_data.get('scanners', {}).get('axe', True),
-                        lighthouse=scan_data.get('scanners', {}).get('lighthouse', True),
-                        wave=scan_data.get('scanners', {}).get('wave', False)
+                loop.call_soon_threadsafe(publish_progress)
+            except RuntimeError:
+                pass  # loop already closed, late event after the scan ended
+        
+        progress_tracker = ScanUnitProgress(pages, units_per_page, on_change=on_progress_change)
+        browser_slots = get_browser_slots()
+        scan_data['status'] = 'running'
+        scan_data.setdefault('scan_results', {})
+        publish_progress()
+        
+        def merge_page_result(page_url: str, eaa_result: Optional[Dict[str, Any]]) -> int:
+            """Merge one page result into the session as soon as it arrives"""
+            nonlocal pages_scanned
+            if not eaa_result:
+                logger.warning(f"⚠️ EAA Scanner returned empty result for {page_url}")
+                return 0
+            
+            page_issues_count = eaa_result.get('issues_total', 0)
+            severity_counts = eaa_result.get('issues_by_severity', {})
+            
+            # Salva i risultati completi per questa pagina (riassegnando il
+            # campo, così la sessione condivisa vede la pagina subito)
+            page_results = scan_data.get('scan_results')
+            page_results = dict(page_results) if isinstance(page_results, dict) else {}
+            page_results[page_url] = {
+                'compliance_score': eaa_result.get('compliance_score', 0),
+                'issues_total': page_issues_count,
+                'issues_by_severity': severity_counts,
+                'issues_by_wcag': eaa_result.get('issues_by_wcag', {}),
+                'normalized_issues': eaa_result.get('normalized_issues', []),
+                'raw_data': eaa_result.get('raw_data', {}),
+                'scan_date': eaa_result.get('scan_date'),
+                'scanners_used': eaa_result.get('scanners_used', [])
+            }
+            scan_data['scan_results'] = page_results
+            
+            all_issues.append({
+                'page': page_url,
+                'critical': severity_counts.get('critical', 0),
+                'high': severity_counts.get('high', 0),
+                'medium': severity_counts.get('medium', 0),
+                'low': severity_counts.get('low', 0),
+                'total': page_issues_count
+            })
+            pages_scanned += 1
+            scan_data.update(pages_scanned=pages_scanned, issues_found=len(all_issues))
+            logger.info(f"✅ Page {page_url} scanned successfully: {page_issues_count} issues found")
+            return page_issues_count
+        
+        async def scan_page(idx: int, page_url: str):
+            page_issues_count = 0
+            try:
+                async with browser_slots:
+                    # Pages still waiting for a slot stop here once the session is cancelled
+                    cancel_token.raise_if_cancelled()
+                    logger.info(f"========== PROCESSING PAGE {idx + 1}/{total_pages}: {page_url} ==========")
+                    scan_data['current_page'] = page_url
+                    await ws_manager.broadcast(
+                        session_id,
+                        {
+                            "type": "page_scan_start",
+                            "page": page_url,
+                            "page_number": idx + 1,
+                            "total_pages": total_pages,
+                            "progress": scan_data.get('progress', 0)
+                        }
                     )
-                    # Disabilita wave se manca API key
-                    if not eaa_config.wave_api_key:
-                        toggles.wave = False
-                    eaa_config.scanners_enabled = toggles
-                except Exception:
-                    pass
-                
-                logger.info(f"EAA Config: pa11y={eaa_config.scanners_enabled.pa11y}, axe={eaa_config.scanners_enabled.axe_core}, lighthouse={eaa_config.scanners_enabled.lighthouse}")
-                
-                # Run EAA Scanner for this page - ENTERPRISE MODE
-                logger.info(f"========== RUNNING ENTERPRISE MODE for {page_url} ==========")
-                
-                # Import enterprise system
-                from eaa_scanner.enterprise_integration import FastAPIEnterpriseAdapter
-                
-                # Usa scan_only per evitare generazione charts/PDF/report
-                # AGGIORNAMENTO PROGRESSO DURANTE SCANSIONE
-                
-                # Callback per aggiornare progresso durante scansione
-                def progress_callback(scanner_name: str, progress_pct: int):
-                    """Callback chiamato durante la scansione per aggiornare il progresso"""
-                    try:
-                        # Calcola progresso globale: progresso pagina + progresso scanner corrente
-                        page_progress = int((idx / max(1, len(scan_data['pages']))) * 100)
-                        scanner_progress = int(progress_pct * 0.8)  # 80% del tempo è scansione
-                        total_progress = min(99, page_progress + int(scanner_progress / len(scan_data['pages'])))
-                        
-                        # Aggiorna scan_sessions
-                        if session_id in scan_sessions:
-                            scan_sessions[session_id]['progress'] = total_progress
-                            scan_sessions[session_id]['message'] = f"Scansione pagina {idx + 1}/{len(scan_data['pages'])}: {scanner_name} ({progress_pct}%)"
-                        
-                        # Aggiorna scan_manager per SSE
-                        if session_id in scan_manager.scans:
-                            scan_manager.scans[session_id]['progress'] = total_progress
-                            scan_manager.scans[session_id]['message'] = f"Scanner {scanner_name}: {progress_pct}%"
-                        
-                        logger.info(f"📊 Progress Update: Page {idx+1}/{len(scan_data['pages'])}, Scanner {scanner_name}: {progress_pct}% -> Total: {total_progress}%")
-                    except Exception as e:
-                        logger.error(f"Errore callback progresso: {e}")
-                
-                # AGGIORNAMENTI DI PROGRESSO NON BLOCCANTI
-                import asyncio
-                
-                async def update_progress_periodically():
-                    """Aggiorna il progresso ogni 2 secondi senza bloccare"""
-                    progress_steps = [10, 25, 40, 60, 75, 90]
-                    for step in progress_steps:
-                        await asyncio.sleep(2)  # Non blocca l'event loop!
-                        
-                        # Calcola progresso totale
-                        page_base_progress = int((idx / max(1, len(scan_data['pages']))) * 100)
-                        simulated_progress = min(99, page_base_progress + int(step / len(scan_data['pages'])))
-                        
-                        # Aggiorna scan_sessions
-                        if session_id in scan_sessions:
-                            scan_sessions[session_id]['progress'] = simulated_progress
-                            scan_sessions[session_id]['message'] = f"Scansione pagina {idx + 1}/{len(scan_data['pages'])}: {step}%"
-                            scan_sessions[session_id]['current_page'] = page_url
-                            scan_sessions[session_id]['pages_scanned'] = idx
-                            scan_sessions[session_id]['total_pages'] = len(scan_data['pages'])
-                        
-                        # Aggiorna scan_manager
-                        if session_id in scan_manager.scans:
-                            scan_manager.scans[session_id]['progress'] = simulated_progress
-                            scan_manager.scans[session_id]['message'] = f"Scanner attivi: {step}%"
-                        
-                        logger.info(f"📊 Progress Update: Page {idx+1}/{len(scan_data['pages'])} -> {simulated_progress}%")
-                
-                # Crea task per aggiornamento progresso
-                progress_task = asyncio.create_task(update_progress_periodically())
-                
-                try:
-                    # Esegui scansione enterprise in thread separato per non bloccare l'event loop
+                    
+                    # Usa scan_only per evitare generazione charts/PDF/report; the
+                    # enterprise scan runs in a thread to keep the event loop free
                     adapter = FastAPIEnterpriseAdapter()
                     eaa_result = await asyncio.to_thread(
                         adapter.run_enterprise_scan_for_api,
                         url=page_url,
-                        company_name=eaa_config.company_name,
-                        email=eaa_config.email,
-                        wave_api_key=eaa_config.wave_api_key,
-                        simulate=eaa_config.simulate,
-                        scan_id=session_id
+                        company_name=company_name,
+                        email=email,
+                        wave_api_key=wave_api_key,
+                        simulate=simulate_flag,
+                        event_monitor=progress_tracker.monitor_for(idx),
+                        scan_id=f"{session_id}_p{idx + 1:03d}",
+                        output_root=session_root,
+                        cancel_token=cancel_token
                     )
-                finally:
-                    # Cancella task di progresso quando la scansione è completata
-                    progress_task.cancel()
-                    try:
-                        await progress_task
-                    except asyncio.CancelledError:
-                        pass  # Task cancellato correttamente
-                
-                if eaa_result:
-                    # Il nuovo formato da scan_only
-                    page_issues_count = eaa_result.get('issues_total', 0)
-                    severity_counts = eaa_result.get('issues_by_severity', {})
-                    
-                    crit = severity_counts.get('critical', 0)
-                    high = severity_counts.get('high', 0)
-                    med = severity_counts.get('medium', 0)
-                    low = severity_counts.get('low', 0)
-                    
-                    # Salva i risultati completi per questa pagina
-                    if 'scan_results' not in scan_sessions[session_id] or not isinstance(scan_sessions[session_id]['scan_results'], dict):
-                        scan_sessions[session_id]['scan_results'] = {}
-                    
-                    scan_sessions[session_id]['scan_results'][page_url] = {
-                        'compliance_score': eaa_result.get('compliance_score', 0),
-                        'issues_total': page_issues_count,
-                        'issues_by_severity': severity_counts,
-                        'issues_by_wcag': eaa_result.get('issues_by_wcag', {}),
-                        'normalized_issues': eaa_result.get('normalized_issues', []),
-                        'raw_data': eaa_result.get('raw_data', {}),
-                        'scan_date': eaa_result.get('scan_date'),
-                        'scanners_used': eaa_result.get('scanners_used', [])
-                    }
-                    
-                    all_issues.extend([{
-                        'page': page_url,
-                        'critical': crit,
-                        'high': high,
-                        'medium': med,
-                        'low': low,
-                        'total': page_issues_count
-                    }])
-                    pages_scanned += 1
-                    logger.info(f"✅ Page {page_url} scanned successfully: {page_issues_count} issues found")
-                else:
-                    logger.warning(f"⚠️ EAA Scanner returned empty result for {page_url}")
-                
-                scan_data['pages_scanned'] = pages_scanned
-                scan_data['issues_found'] = len(all_issues)
-                if session_id in scan_sessions:
-                    scan_sessions[session_id]['pages_scanned'] = pages_scanned
-                    scan_sessions[session_id]['issues_found'] = len(all_issues)
-                
-                # Send SSE update for page completion
-                await ws_manager.broadcast(
-                    session_id,
-                    {
-                        "type": "page_scan_complete",
-                        "page": page_url,
-                        "issues_found": page_issues_count if eaa_result and 'aggregated' in eaa_result else 0,
-                        "total_issues": len(all_issues)
-                    }
-                )
-                
+                page_issues_count = merge_page_result(page_url, eaa_result)
             except Exception as e:
                 logger.error(f"========== ERROR SCANNING PAGE {page_url} ==========")
                 logger.error(f"Exception: {str(e)}", exc_info=True)
-                continue
+            finally:
+                progress_tracker.page_finished(idx)
+            
+            # Send SSE update for page completion
+            await ws_manager.broadcast(
+                session_id,
+                {
+                    "type": "page_scan_complete",
+                    "page": page_url,
+                    "issues_found": page_issues_count,
+                    "total_issues": len(all_issues)
+                }
+            )
+        
+        await asyncio.gather(*(scan_page(idx, page_url) for idx, page_url in enumerate(pages)))
         
-        # Update final status
-        scan_data['status'] = 'completed'
-        scan_data['progress'] = 100
-        # Non sovrascrivere scan_results - mantiene il dizionario con i dati completi
+        # Results were merged in completion order: restore the page order
+        page_results = scan_data.get('scan_results') or {}
+        scan_data['scan_results'] = {url: page_results[url] for url in pages if url in page_results}
+        
+        # Update final status: riepilogo calcolato una sola volta e scritto
+        # insieme a 'completed', così il polling non lo vede mai mancante
+        scan_data.update(
+            results_summary=aggregate_scan_results(scan_data['scan_results']),
+            status='completed',
+            progress=100
+        )
         
         # Update scan_manager for SSE endpoint
         if session_id in scan_manager.scans:
-            scan_manager.scans[session_id]['status'] = 'completed'
-            scan_manager.scans[session_id]['progress'] = 100
-            scan_manager.scans[session_id]['results'] = all_issues
-            scan_manager.scans[session_id]['message'] = "Scansione completata con successo"
-        # Sync in-memory session
-        if session_id in scan_sessions:
-            scan_sessions[session_id]['status'] = 'completed'
-            scan_sessions[session_id]['progress'] = 100
-            # Non sovrascrivere scan_results qui - mantiene i dati completi salvati durante la scansione
+            scan_manager.scans.write(session_id, {
+                'status': 'completed',
+                'progress': 100,
+                'results': all_issues,
+                'message': "Scansione completata con successo"
+            })
         
         # Update database
-        conn = sqlite3.connect(get_database_path())
-        cursor = conn.cursor()
-        cursor.execute('''
+        await get_database().execute('''
             UPDATE scans 
             SET status = ?, completed_at = ?, output_path = ?
             WHERE id = ?
         ''', ('completed', datetime.utcnow().isoformat(), f'/app/output/{session_id}', session_id))
-        conn.commit()
-        conn.close()
         
         # Send final SSE update
         await ws_manager.broadcast(
@@ -5009,14 +5141,56 @@ async def run_multi_page_scan_task(session_id: str, scan_data: dict):
         
         logger.info(f"Multi-page scan {session_id} completed successfully")
         
+    except ScanCancelled:
+        logger.info(f"Multi-page scan {session_id} cancelled: scanner processes terminated")
+        scan_data.update(status='cancelled', message="Scansione annullata dall'utente")
     except Exception as e:
         logger.error(f"========== MULTI-PAGE SCAN TASK EXCEPTION for {session_id} ==========")
         logger.error(f"Exception type: {type(e)}")
         logger.error(f"Exception message: {str(e)}")
         logger.error(f"Multi-page scan task failed: {e}", exc_info=True)
         logger.error(f"========== END MULTI-PAGE SCAN TASK EXCEPTION ==========")
-        scan_data['status'] = 'failed'
-        scan_data['error'] = str(e)
+        scan_data.update(status='failed', error=str(e))
+    finally:
+        scan_cancellations.release(session_id, cancel_token)
+
+def register_multi_page_session(session_id: str, request: MultiPageScanRequest,
+                                initial_status: str = "running") -> Dict[str, Any]:
+    """Register a multi-page scan in memory (API process, or the worker running it)"""
+    main_url = str(request.pages[0]) if request.pages else ""
+    
+    # Store scan details in the shared session store for tracking
+    session = scan_sessions.create(session_id, {
+        "session_id": session_id,
+        "status": initial_status,
+        "pages": [str(url) for url in request.pages],
+        "company_name": request.company_name,
+        "email": request.email,
+        "mode": request.mode,
+        "scanners": request.scanners or {},
+        "discovery_session_id": request.discovery_session_id,
+        "created_at": datetime.utcnow().isoformat(),
+        "progress": 0,
+        "current_page": "",
+        "pages_scanned": 0,
+        "total_pages": len(request.pages),
+        "issues_found": 0,
+        "scan_results": {}
+    })
+    
+    # Also register in scan_manager for SSE endpoint compatibility
+    scan_manager.scans[session_id] = {
+        "id": session_id,
+        "url": main_url,
+        "company_name": request.company_name,
+        "email": request.email,
+        "status": initial_status,
+        "progress": 0,
+        "message": f"Scansione avviata per {len(request.pages)} pagine",
+        "created_at": datetime.now().isoformat(),
+        "results": None
+    }
+    return session
 
 async def start_multi_page_scan(
     request: MultiPageScanRequest,
@@ -5028,15 +5202,13 @@ async def start_multi_page_scan(
         # Create a unique session ID for this multi-page scan
         session_id = secrets.token_urlsafe(16)
         
-        # Store scan session in database
-        conn = sqlite3.connect(get_database_path())
-        cursor = conn.cursor()
-        
         # Convert the first page as the main URL for the scan
         main_url = str(request.pages[0]) if request.pages else ""
+        queue = get_scan_queue()
+        initial_status = "queued" if queue is not None else "running"
         
-        # Create scan record
-        cursor.execute('''
+        # Store scan session in database
+        await get_database().execute('''
             INSERT INTO scans (id, url, company_name, email, status, created_at)
             VALUES (?, ?, ?, ?, ?, ?)
         ''', (
@@ -5044,58 +5216,27 @@ async def start_multi_page_scan(
             main_url,
             request.company_name,
             request.email,
-            'running',
+            initial_status,
             datetime.utcnow().isoformat()
         ))
-        conn.commit()
-        conn.close()
         
-        # Store scan details in memory for tracking
-        scan_sessions[session_id] = {
-            "session_id": session_id,
-            "status": "running",
-            "pages": [str(url) for url in request.pages],
-            "company_name": request.company_name,
-            "email": request.email,
-            "mode": request.mode,
-            "scanners": request.scanners or {},
-            "discovery_session_id": request.discovery_session_id,
-            "created_at": datetime.utcnow().isoformat(),
-            "progress": 0,
-            "current_page": "",
-            "pages_scanned": 0,
-            "total_pages": len(request.pages),
-            "issues_found": 0,
-            "scan_results": {}
-        }
+        session = register_multi_page_session(session_id, request, initial_status)
         
-        # Also register in scan_manager for SSE endpoint compatibility
-        logger.info(f"========== REGISTERING SCAN MANAGER for {session_id} ==========")
-        scan_manager.scans[session_id] = {
-            "id": session_id,
-            "url": main_url,
-            "company_name": request.company_name,
-            "email": request.email,
-            "status": "running",
-            "progress": 0,
-            "message": f"Scansione avviata per {len(request.pages)} pagine",
-            "created_at": datetime.now().isoformat(),
-            "results": None
-        }
-        logger.info(f"========== SCAN MANAGER REGISTERED for {session_id} ==========")
-        
-        # Start background task to process all pages
-        logger.info(f"========== ADDING BACKGROUND TASK for {session_id} ==========")
-        background_tasks.add_task(
-            run_multi_page_scan_task, 
-            session_id, 
-            scan_sessions[session_id]
-        )
-        logger.info(f"========== BACKGROUND TASK ADDED for {session_id} ==========")
+        if queue is not None:
+            # Executed by a worker process; the status endpoint reads the job back
+            await asyncio.to_thread(
+                queue.enqueue, MULTI_PAGE_SCAN_JOB,
+                {"session_id": session_id, "request": request.dict()},
+                job_id=session_id, max_attempts=settings.scan_job_max_attempts
+            )
+        else:
+            # Start background task to process all pages
+            background_tasks.add_task(run_multi_page_scan_task, session_id, session)
+        logger.info(f"Multi-page scan {session_id} started ({initial_status})")
         
         return {
             "session_id": session_id,
-            "status": "running",
+            "status": initial_status,
             "message": f"Scansione avviata per {len(request.pages)} pagine",
             "total_pages": len(request.pages)
         }
@@ -5147,15 +5288,47 @@ async def get_scan_status(session_id: str, request: Request):
         else:
             raise HTTPException(status_code=404, detail="Session not found")
 
+# Session fields read by each status poll (everything but the per-page results)
+SESSION_STATUS_FIELDS = (
+    "status", "progress", "pages_scanned", "total_pages", "current_page", "issues_found", "message",
+    "results_summary"
+)
+
+async def sync_session_from_job(session_id: str) -> None:
+    """Refresh a multi-page session run by a queue worker from its job
+    
+    Only non-terminal sessions are refreshed, so the (possibly large)
+    result is read once, when the job has succeeded. Sessions missing from
+    memory, e.g. after an API restart, are rebuilt from the job.
+    """
+    session = scan_sessions.fields(session_id, ("status",))
+    if session is not None and session.get("status") in ("completed", "failed", "cancelled"):
+        return
+    job = await load_scan_job(session_id)
+    if job is None or job.kind != MULTI_PAGE_SCAN_JOB:
+        return
+    
+    if session is None:
+        scan_sessions[session_id] = {"session_id": session_id, "scan_results": {}}
+    state = job_scan_state(job)
+    values = {key: value for key, value in state.items() if key in SESSION_PROGRESS_FIELDS}
+    if job.status == JobStatus.SUCCEEDED and isinstance(job.result, dict):
+        values["scan_results"] = job.result.get("scan_results") or {}
+        values["results_summary"] = job.result.get("results_summary")
+        values["progress"] = 100
+    scan_sessions.write(session_id, values)
+
 async def _get_scan_status_internal(session_id: str, request: Request):
     """Get status of a scan session, includendo eventuali nuovi eventi per polling incrementale."""
+    await sync_session_from_job(session_id)
     # Supporta polling incrementale con last_event_id
     try:
         last_event_id = int(request.query_params.get("last_event_id", "0") or 0)
     except ValueError:
         last_event_id = 0
-    if session_id in scan_sessions:
-        session = scan_sessions[session_id]
+    # Status fields only: the per-page results are not read on each poll
+    session = scan_sessions.fields(session_id, SESSION_STATUS_FIELDS)
+    if session is not None:
         status_payload = {
             "session_id": session_id,
             "status": session.get("status", "unknown"),
@@ -5167,92 +5340,87 @@ async def _get_scan_status_internal(session_id: str, request: Request):
             "message": session.get("message", "")
         }
         
-        # Se la scansione è completata, aggiungi i risultati
-        if session.get("status") == "completed" and "scan_results" in session:
-            # Aggregazione dei risultati di tutte le pagine
-            all_results = session["scan_results"]
-            logger.info(f"DEBUG get_scan_status: scan_results type={type(all_results)}, keys={list(all_results.keys()) if isinstance(all_results, dict) else 'not dict'}")
-            # Verifica che sia un dizionario
-            if isinstance(all_results, dict) and len(all_results) > 0:
-                total_issues = 0
-                severity_totals = {"critical": 0, "high": 0, "medium": 0, "low": 0}
-                wcag_totals = {}
-                all_normalized_issues = []
-                
-                for page_url, page_data in all_results.items():
-                    total_issues += page_data.get("issues_total", 0)
-                    
-                    # Aggrega le severità
-                    for sev, count in page_data.get("issues_by_severity", {}).items():
-                        if sev in severity_totals:
-                            severity_totals[sev] += count
-                    
-                    # Aggrega WCAG
-                    for wcag, count in page_data.get("issues_by_wcag", {}).items():
-                        wcag_totals[wcag] = wcag_totals.get(wcag, 0) + count
-                    
-                    # Aggrega issues normalizzate
-                    all_normalized_issues.extend(page_data.get("normalized_issues", []))
-                
-                # Calcola score medio ponderato
-                total_compliance = sum(
-                    page_data.get("compliance_score", 0) 
-                    for page_data in all_results.values()
-                )
-                avg_compliance = total_compliance / max(1, len(all_results))
-                
-                status_payload["results"] = {
-                    "compliance_score": round(avg_compliance, 1),
-                    "total_issues": total_issues,
-                    "issues_by_severity": severity_totals,
-                    "issues_by_wcag": wcag_totals,
-                    "normalized_issues": all_normalized_issues[:200],  # Limita per performance
-                    "pages_analyzed": len(all_results),
-                    "scan_data": all_results  # Dati completi per ogni pagina
-                }
+        # Se la scansione è completata, aggiungi il riepilogo precalcolato
+        if session.get("status") == "completed":
+            summary = session.get("results_summary")
+            if summary is None:
+                # Sessioni completate prima del precalcolo: aggrega una volta e conserva
+                page_results = (scan_sessions.fields(session_id, ("scan_results",)) or {}).get("scan_results")
+                if page_results:
+                    summary = aggregate_scan_results(page_results)
+                    scan_sessions.write(session_id, {"results_summary": summary})
+            if summary and summary.get("pages_analyzed"):
+                status_payload["results"] = dict(summary, results_url=f"/api/scan/{session_id}/pages")
         # Allegare nuovi eventi dal monitor per supportare frontend in polling
         try:
             from webapp.scan_monitor import get_scan_monitor
             monitor = get_scan_monitor()
-            events = monitor.event_history.get(session_id, [])
-            # Genera ID 1-based compatibili con polling
-            enriched = []
-            for idx, evt in enumerate(events, start=1):
-                if idx > last_event_id:
-                    e = dict(evt)
-                    e["id"] = idx
-                    enriched.append(e)
-            if enriched:
-                status_payload["new_events"] = enriched
+            # Sequence ID monotoni: lookup O(1) del punto di ripresa nel ring buffer
+            events, truncated = monitor.get_events_since(session_id, last_event_id)
+            if events:
+                status_payload["new_events"] = events
+            if truncated:
+                # Il client è rimasto indietro oltre la capacità del buffer
+                status_payload["events_truncated"] = True
         except Exception:
             # Nessun evento disponibile o monitor non inizializzato
             pass
-        return status_payload
+        return etag_json_response(request, status_payload)
     
     # Check database for completed scans
-    conn = sqlite3.connect(get_database_path())
-    cursor = conn.cursor()
-    cursor.execute('SELECT * FROM scans WHERE id = ?', (session_id,))
-    scan = cursor.fetchone()
-    conn.close()
+    scan = await get_database().fetchone('SELECT status FROM scans WHERE id = ?', (session_id,))
     
     if scan:
-        return {
+        return etag_json_response(request, {
             "session_id": session_id,
-            "status": scan[4],  # status column
-            "progress": 100 if scan[4] == 'completed' else 0,
+            "status": scan["status"],
+            "progress": 100 if scan["status"] == 'completed' else 0,
             "message": "Scan found in database"
-        }
+        })
     
     raise HTTPException(status_code=404, detail="Scan session not found")
 
+@app.get("/api/scan/{session_id}/pages")
+async def get_scan_page_results(
+    session_id: str,
+    request: Request,
+    page: int = Query(1, ge=1),
+    page_size: int = Query(10, ge=1, le=50),
+    include_raw: bool = False
+):
+    """Paginated per-page results of a multi-page scan
+    
+    The status endpoint only carries the aggregated summary; the full
+    per-page data (normalized issues, optionally raw scanner output) is
+    served here. Completed results are immutable, so clients revalidate
+    with ``If-None-Match`` and get a 304 without a body.
+    """
+    await sync_session_from_job(session_id)
+    session = scan_sessions.fields(session_id, ("status", "scan_results"))
+    if session is None:
+        raise HTTPException(status_code=404, detail="Scan session not found")
+    
+    payload = paginate_scan_results(session.get("scan_results") or {}, page, page_size, include_raw)
+    payload["session_id"] = session_id
+    payload["status"] = session.get("status", "unknown")
+    return etag_json_response(request, payload)
+
 @app.post("/api/scan/{scan_id}/cancel")
 async def cancel_scan(scan_id: str):
-    """Cancel a running scan (best-effort) and notify listeners"""
+    """Cancel a scan and notify listeners
+    
+    A scan running in this process is stopped immediately: its scanner
+    subprocesses are terminated. On queue workers the job sees the request
+    at its next heartbeat.
+    """
+    scan_cancellations.cancel(scan_id, "Scansione annullata dall'utente")
+    queue = get_scan_queue()
+    if queue is not None:
+        # Queued jobs are dropped; a running worker stops at its next heartbeat
+        await asyncio.to_thread(queue.cancel, scan_id)
     # Update in-memory session if exists
     if scan_id in scan_sessions:
-        scan_sessions[scan_id]["status"] = "cancelled"
-        scan_sessions[scan_id]["message"] = "Scansione annullata dall'utente"
+        scan_sessions.write(scan_id, {"status": "cancelled", "message": "Scansione annullata dall'utente"})
     # Update scan_manager state
     scan = scan_manager.get_scan(scan_id)
     if scan:
@@ -5263,6 +5431,11 @@ async def cancel_scan(scan_id: str):
             "message": "Scansione annullata dall'utente",
             "data": { "error": "cancelled" }
         })
+    try:
+        from webapp.scan_monitor import get_scan_monitor
+        get_scan_monitor().emit_scan_cancelled(scan_id)
+    except Exception as e:
+        logger.debug(f"Monitor eventi non disponibile per cancellazione {scan_id}: {e}")
     return {"message": "Cancellation requested", "status": "cancelled", "scan_id": scan_id}
 
 @app.post("/api/llm/validate-key")
@@ -5348,16 +5521,12 @@ async def estimate_llm_costs(request: dict):
         }
 
 @app.get("/api/reports/{report_id}/download")
-async def download_report_direct(report_id: str, format: str = Query("pdf", regex="^(pdf|html|json)$")):
+async def download_report_direct(report_id: str, request: Request, format: str = Query("pdf", regex="^(pdf|html|json)$")):
     """
     Scarica il report nel formato richiesto.
     """
     try:
-        conn = sqlite3.connect(get_database_path())
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM scans WHERE id = ?', (report_id,))
-        scan_row = cursor.fetchone()
-        conn.close()
+        scan_row = await get_database().fetchone('SELECT * FROM scans WHERE id = ?', (report_id,))
         
         if not scan_row:
             raise HTTPException(
@@ -5375,11 +5544,7 @@ async def download_report_direct(report_id: str, format: str = Query("pdf", rege
         if format == "pdf":
             pdf_path = scan_data.get("pdf_report_path")
             if pdf_path and Path(pdf_path).exists():
-                return FileResponse(
-                    path=pdf_path,
-                    media_type="application/pdf",
-                    filename=f"report_{company_name}.pdf"
-                )
+                return artifact_response(request, pdf_path, "application/pdf", f"report_{company_name}.pdf")
             else:
                 # Genera PDF se non esiste
                 # TODO: implementare generazione PDF
@@ -5399,11 +5564,7 @@ async def download_report_direct(report_id: str, format: str = Query("pdf", rege
                         html_path = str(html_files[0])
             
             if html_path and Path(html_path).exists():
-                return FileResponse(
-                    path=html_path,
-                    media_type="text/html",
-                    filename=f"report_{company_name}.html"
-                )
+                return artifact_response(request, html_path, "text/html", f"report_{company_name}.html")
             else:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -5436,16 +5597,12 @@ async def download_report_direct(report_id: str, format: str = Query("pdf", rege
         )
 
 @app.get("/api/reports/{report_id}/view", response_class=HTMLResponse)
-async def view_report(report_id: str):
+async def view_report(report_id: str, request: Request):
     """
     Visualizza il report HTML direttamente nel browser.
     """
     try:
-        conn = sqlite3.connect(get_database_path())
-        cursor = conn.cursor()
-        cursor.execute('SELECT output_path, html_report_path FROM scans WHERE id = ?', (report_id,))
-        result = cursor.fetchone()
-        conn.close()
+        result = await get_database().fetchone('SELECT output_path, html_report_path FROM scans WHERE id = ?', (report_id,))
         
         if not result:
             raise HTTPException(
@@ -5457,8 +5614,7 @@ async def view_report(report_id: str):
         
         # Prova prima il percorso html_report_path
         if html_report_path and Path(html_report_path).exists():
-            with open(html_report_path, 'r', encoding='utf-8') as f:
-                return HTMLResponse(content=f.read())
+            return artifact_response(request, html_report_path, "text/html")
         
         # Altrimenti cerca nella cartella output
         if output_path:
@@ -5468,8 +5624,7 @@ async def view_report(report_id: str):
                 html_files = list(output_dir.glob("*.html"))
                 if html_files:
                     # Prendi il primo file HTML trovato
-                    with open(html_files[0], 'r', encoding='utf-8') as f:
-                        return HTMLResponse(content=f.read())
+                    return artifact_response(request, str(html_files[0]), "text/html")
         
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -5500,9 +5655,7 @@ async def get_reports(
         Lista paginata dei report con informazioni di paginazione
     """
     try:
-        conn = sqlite3.connect(get_database_path())
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
+        database = get_database()
         
         # Query base per recuperare i report
         query = """
@@ -5538,8 +5691,7 @@ async def get_reports(
         params.extend([limit, skip])
         
         # Esegui query principale
-        cursor.execute(query, params)
-        reports_raw = cursor.fetchall()
+        reports_raw = await database.fetchall(query, params)
         
         # Converti in dizionari e aggiungi campi calcolati
         reports = []
@@ -5605,15 +5757,12 @@ async def get_reports(
         
         # Conta totale record per paginazione
         count_query = "SELECT COUNT(*) as total FROM scans"
+        count_params = []
         if status:
             count_query += " WHERE status = ?"
-            cursor.execute(count_query, [status])
-        else:
-            cursor.execute(count_query)
+            count_params.append(status)
         
-        total = cursor.fetchone()['total']
-        
-        conn.close()
+        total = (await database.fetchone(count_query, count_params))['total']
         
         return {
             "reports": reports,
@@ -5654,13 +5803,10 @@ async def regenerate_with_llm(request: RegenerationRequest, background_tasks: Ba
         regeneration_id = secrets.token_urlsafe(16)
         
         # Validate that the scan exists in database
-        conn = sqlite3.connect(get_database_path())
-        cursor = conn.cursor()
-        cursor.execute('SELECT id FROM scans WHERE id = ?', (request.scan_id,))
-        scan_exists = cursor.fetchone()
+        database = get_database()
+        scan_exists = await database.fetchone('SELECT id FROM scans WHERE id = ?', (request.scan_id,))
         
         if not scan_exists:
-            conn.close()
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Scansione non trovata"
@@ -5675,7 +5821,7 @@ async def regenerate_with_llm(request: RegenerationRequest, background_tasks: Ba
         cost_estimate = cost_estimates.get(request.content_type, 0.50)
         
         # Store regeneration session in database
-        cursor.execute('''
+        await database.execute('''
             INSERT INTO regeneration_sessions 
             (id, scan_id, model, content_type, status, progress, created_at, updated_at, cost_estimate)
             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
@@ -5691,9 +5837,6 @@ async def regenerate_with_llm(request: RegenerationRequest, background_tasks: Ba
             cost_estimate
         ))
         
-        conn.commit()
-        conn.close()
-        
         # Start background regeneration
         background_tasks.add_task(run_llm_regeneration, regeneration_id, request)
         
@@ -5724,11 +5867,7 @@ async def preview_report(
     """Preview HTML report inline (not as download)"""
     try:
         # Get scan from database
-        conn = sqlite3.connect(get_database_path())
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM scans WHERE id = ?', (scan_id,))
-        scan_row = cursor.fetchone()
-        conn.close()
+        scan_row = await get_database().fetchone('SELECT * FROM scans WHERE id = ?', (scan_id,))
         
         if not scan_row:
             raise HTTPException(
@@ -0,0 +1,424 @@
+"""
+SQLite data-access layer for the FastAPI application
+Pooled connections in WAL mode, run on a dedicated executor so that
+database I/O never blocks the event loop
+"""
+
+import asyncio
+import base64
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# ==================== CONFIGURATION ====================
+
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "4"))
+DB_BUSY_TIMEOUT = float(os.getenv("DB_BUSY_TIMEOUT", "5"))
+# Prepared statements kept per connection (sqlite3 statement cache)
+DB_STATEMENT_CACHE = 256
+# Seconds between flushes of batched progress updates
+PROGRESS_FLUSH_INTERVAL = float(os.getenv("DB_PROGRESS_FLUSH_INTERVAL", "0.5"))
+
+
+def get_database_path() -> str:
+    """Get the correct database path for the environment"""
+    db_dir = '/app/data' if os.path.exists('/app/data') else '.'
+    return os.path.join(db_dir, 'eaa_scanner.db')
+
+
+# ==================== CONNECTION POOL ====================
+
+class Database:
+    """
+    Pooled SQLite access
+
+    Connections are opened once with WAL journaling (readers never wait for
+    the writer), ``synchronous=NORMAL`` and a busy timeout, and reuse their
+    cached prepared statements across requests. The async helpers run the
+    query on a dedicated thread pool sized like the connection pool.
+    """
+
+    def __init__(self, path: Optional[str] = None, pool_size: int = DB_POOL_SIZE,
+                 busy_timeout: float = DB_BUSY_TIMEOUT):
+        self.path = path or get_database_path()
+        self.pool_size = max(1, pool_size)
+        self.busy_timeout = busy_timeout
+        self._pool: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._created = 0
+        self._create_lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._closed = False
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a configured connection"""
+        conn = sqlite3.connect(
+            self.path,
+            timeout=self.busy_timeout,
+            check_same_thread=False,
+            cached_statements=DB_STATEMENT_CACHE,
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout * 1000)}")
+        conn.execute("PRAGMA foreign_keys=ON")
+        return conn
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """
+        Borrow a pooled connection (blocking; use from worker threads)
+
+        The pool grows lazily up to ``pool_size``; further callers wait for a
+        connection to be returned.
+        """
+        if self._closed:
+            raise RuntimeError("Database closed")
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            conn = None
+            with self._create_lock:
+                if self._created < self.pool_size:
+                    conn = self._connect()
+                    self._created += 1
+            if conn is None:
+                conn = self._pool.get()
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            self._pool.put(conn)
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a connection and commit on success (rollback on error)"""
+        with self.connection() as conn:
+            try:
+                yield conn
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+
+    # ==================== ASYNC API ====================
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._create_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.pool_size,
+                                                        thread_name_prefix="sqlite")
+        return self._executor
+
+    async def run(self, fn: Callable[[sqlite3.Connection], Any]) -> Any:
+        """
+        Run ``fn(conn)`` inside a transaction on the database executor
+
+        Args:
+            fn: Callable receiving a pooled connection
+
+        Returns:
+            Whatever ``fn`` returns
+        """
+        def work():
+            with self.transaction() as conn:
+                return fn(conn)
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_executor(), work)
+
+    async def fetchone(self, sql: str, params: Sequence[Any] = ()) -> Optional[sqlite3.Row]:
+        return await self.run(lambda conn: conn.execute(sql, params).fetchone())
+
+    async def fetchall(self, sql: str, params: Sequence[Any] = ()) -> List[sqlite3.Row]:
+        return await self.run(lambda conn: conn.execute(sql, params).fetchall())
+
+    async def execute(self, sql: str, params: Sequence[Any] = ()) -> int:
+        """Execute a write statement, returning the affected row count"""
+        return await self.run(lambda conn: conn.execute(sql, params).rowcount)
+
+    async def executemany(self, sql: str, seq_of_params: Iterable[Sequence[Any]]) -> int:
+        """Execute a write statement for many parameter sets in one transaction"""
+        rows = list(seq_of_params)
+        return await self.run(lambda conn: conn.executemany(sql, rows).rowcount)
+
+    def close(self) -> None:
+        """Close all pooled connections and stop the executor"""
+        self._closed = True
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
+        self._created = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "pool_size": self.pool_size,
+            "connections_open": self._created,
+            "connections_idle": self._pool.qsize(),
+        }
+
+
+# ==================== BATCHED PROGRESS WRITES ====================
+
+class ProgressWriter:
+    """
+    Coalesces frequent scan progress updates into periodic batched writes
+
+    Only the latest progress per scan is kept; every flush writes all pending
+    scans with a single ``executemany`` in one transaction.
+    """
+
+    UPDATE_SQL = 'UPDATE scans SET progress = ?, updated_at = ? WHERE id = ?'
+
+    def __init__(self, database: Database, interval: float = PROGRESS_FLUSH_INTERVAL):
+        self.database = database
+        self.interval = interval
+        self._pending: Dict[str, Tuple[int, str]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.batches = 0
+        self.rows_written = 0
+
+    def queue(self, scan_id: str, progress: int, updated_at: str) -> None:
+        """Record the latest progress for a scan (written on the next flush)"""
+        self._pending[scan_id] = (progress, updated_at)
+
+    def discard(self, scan_id: str) -> None:
+        """Drop a pending update superseded by a full write"""
+        self._pending.pop(scan_id, None)
+
+    async def flush(self) -> int:
+        """Write all pending progress updates in a single transaction"""
+        if not self._pending:
+            return 0
+        pending, self._pending = self._pending, {}
+        rows = [(progress, updated_at, scan_id) for scan_id, (progress, updated_at) in pending.items()]
+        try:
+            await self.database.executemany(self.UPDATE_SQL, rows)
+        except Exception as e:
+            logger.error(f"Failed to write batched progress updates: {e}")
+            # Keep the values for the next attempt unless newer ones arrived
+            for scan_id, value in pending.items():
+                self._pending.setdefault(scan_id, value)
+            return 0
+        self.batches += 1
+        self.rows_written += len(rows)
+        return len(rows)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.flush()
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the periodic task and write what is still pending"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+
+# ==================== SCAN HISTORY ====================
+
+# Denormalized copies of the summary fields stored in the ``results`` JSON,
+# so that listings never parse the results blob
+SCAN_SUMMARY_COLUMNS: Dict[str, str] = {
+    "compliance_score": "REAL",
+    "total_issues": "INTEGER",
+    "critical_issues": "INTEGER",
+    "high_issues": "INTEGER",
+    "wcag_level": "TEXT",
+    "eaa_compliant": "INTEGER",
+    "scanners_completed": "INTEGER",
+    "scan_duration": "REAL",
+}
+
+SCAN_HISTORY_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS idx_scans_created ON scans(created_at DESC, id DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_scans_status_created ON scans(status, created_at DESC, id DESC)",
+)
+
+# Per-status aggregates kept current by triggers on ``scans``
+SCAN_STATS_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS scan_stats (
+        status TEXT PRIMARY KEY,
+        scan_count INTEGER NOT NULL DEFAULT 0,
+        compliant_count INTEGER NOT NULL DEFAULT 0,
+        scored_count INTEGER NOT NULL DEFAULT 0,
+        score_sum REAL NOT NULL DEFAULT 0
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS scan_stats_insert AFTER INSERT ON scans BEGIN
+        INSERT INTO scan_stats (status) SELECT NEW.status
+        WHERE NOT EXISTS (SELECT 1 FROM scan_stats WHERE status = NEW.status);
+        UPDATE scan_stats SET
+            scan_count = scan_count + 1,
+            compliant_count = compliant_count + COALESCE(NEW.eaa_compliant, 0),
+            scored_count = scored_count + (NEW.compliance_score IS NOT NULL),
+            score_sum = score_sum + COALESCE(NEW.compliance_score, 0)
+        WHERE status = NEW.status;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS scan_stats_delete AFTER DELETE ON scans BEGIN
+        UPDATE scan_stats SET
+            scan_count = scan_count - 1,
+            compliant_count = compliant_count - COALESCE(OLD.eaa_compliant, 0),
+            scored_count = scored_count - (OLD.compliance_score IS NOT NULL),
+            score_sum = score_sum - COALESCE(OLD.compliance_score, 0)
+        WHERE status = OLD.status;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS scan_stats_update
+    AFTER UPDATE OF status, eaa_compliant, compliance_score ON scans BEGIN
+        UPDATE scan_stats SET
+            scan_count = scan_count - 1,
+            compliant_count = compliant_count - COALESCE(OLD.eaa_compliant, 0),
+            scored_count = scored_count - (OLD.compliance_score IS NOT NULL),
+            score_sum = score_sum - COALESCE(OLD.compliance_score, 0)
+        WHERE status = OLD.status;
+        INSERT INTO scan_stats (status) SELECT NEW.status
+        WHERE NOT EXISTS (SELECT 1 FROM scan_stats WHERE status = NEW.status);
+        UPDATE scan_stats SET
+            scan_count = scan_count + 1,
+            compliant_count = compliant_count + COALESCE(NEW.eaa_compliant, 0),
+            scored_count = scored_count + (NEW.compliance_score IS NOT NULL),
+            score_sum = score_sum + COALESCE(NEW.compliance_score, 0)
+        WHERE status = NEW.status;
+    END
+    """,
+)
+
+
+def migrate_scan_history(conn: sqlite3.Connection) -> None:
+    """
+    Add summary columns, history indexes and the aggregate stats table
+
+    Idempotent: new columns are backfilled once from the results JSON, and
+    the stats table is rebuilt from ``scans`` so it can never drift.
+    """
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(scans)")}
+    added = [name for name in SCAN_SUMMARY_COLUMNS if name not in columns]
+    for name in added:
+        conn.execute(f"ALTER TABLE scans ADD COLUMN {name} {SCAN_SUMMARY_COLUMNS[name]}")
+    if added:
+        assignments = ", ".join(f"{name} = json_extract(results, '$.{name}')" for name in added)
+        conn.execute(f"UPDATE scans SET {assignments} WHERE results IS NOT NULL AND json_valid(results)")
+        logger.info(f"Backfilled scan summary columns: {', '.join(added)}")
+
+    for statement in SCAN_HISTORY_INDEXES + SCAN_STATS_SCHEMA:
+        conn.execute(statement)
+
+    conn.execute("DELETE FROM scan_stats")
+    conn.execute("""
+        INSERT INTO scan_stats (status, scan_count, compliant_count, scored_count, score_sum)
+        SELECT status, COUNT(*), COALESCE(SUM(eaa_compliant), 0),
+               COUNT(compliance_score), COALESCE(SUM(compliance_score), 0)
+        FROM scans GROUP BY status
+    """)
+
+
+SCAN_STATS_FIELDS = ("scan_count", "compliant_count", "scored_count", "score_sum")
+
+
+def read_scan_stats(conn: sqlite3.Connection, date_from: Optional[str] = None,
+                    date_to: Optional[str] = None) -> Dict[str, Dict[str, float]]:
+    """
+    Per-status aggregates (SCAN_STATS_FIELDS) keyed by status
+
+    Without a date range they are read from the trigger-maintained
+    ``scan_stats`` table; a date range is aggregated from ``scans`` through
+    the created_at index.
+    """
+    if date_from or date_to:
+        conditions, params = [], []
+        if date_from:
+            conditions.append("created_at >= ?")
+            params.append(date_from)
+        if date_to:
+            conditions.append("created_at <= ?")
+            params.append(date_to)
+        rows = conn.execute(f"""
+            SELECT status, COUNT(*), COALESCE(SUM(eaa_compliant), 0),
+                   COUNT(compliance_score), COALESCE(SUM(compliance_score), 0)
+            FROM scans WHERE {" AND ".join(conditions)} GROUP BY status
+        """, params).fetchall()
+    else:
+        rows = conn.execute(f"SELECT status, {', '.join(SCAN_STATS_FIELDS)} FROM scan_stats").fetchall()
+    return {row[0]: dict(zip(SCAN_STATS_FIELDS, row[1:])) for row in rows}
+
+
+def scan_summary_values(results: Optional[Dict[str, Any]]) -> Tuple[Any, ...]:
+    """Values for SCAN_SUMMARY_COLUMNS (in order) extracted from scan results"""
+    results = results if isinstance(results, dict) else {}
+    values = []
+    for name in SCAN_SUMMARY_COLUMNS:
+        value = results.get(name)
+        if name == "eaa_compliant" and value is not None:
+            value = int(bool(value))
+        values.append(value)
+    return tuple(values)
+
+
+def encode_history_cursor(created_at: Any, scan_id: str) -> str:
+    """Opaque keyset cursor pointing after the given row"""
+    raw = json.dumps([created_at, scan_id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_history_cursor(cursor: str) -> Tuple[Any, str]:
+    """Inverse of encode_history_cursor (raises ValueError if malformed)"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, scan_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+    return created_at, str(scan_id)
+
+
+# ==================== SINGLETONS ====================
+
+_database: Optional[Database] = None
+_progress_writer: Optional[ProgressWriter] = None
+
+
+def get_database() -> Database:
+    """Shared Database instance for the application"""
+    global _database
+    if _database is None:
+        _database = Database()
+    return _database
+
+
+def get_progress_writer() -> ProgressWriter:
+    """Shared ProgressWriter bound to the application database"""
+    global _progress_writer
+    if _progress_writer is None:
+        _progress_writer = ProgressWriter(get_database())
+    return _progress_writer
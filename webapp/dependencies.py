@@ -4,15 +4,16 @@ Handles authentication, rate limiting, and common dependencies
 """
 
 import os
-import time
 import jwt
 from typing import Optional, Dict, Any
 from datetime import datetime, timedelta
-from fastapi import HTTPException, Request, Depends, status
+from fastapi import HTTPException, Request, Response, Depends, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from collections import defaultdict
 import hashlib
 
+from eaa_scanner.cache import LRUCache, get_cache as get_shared_cache
+from eaa_scanner.state import MemoryStateBackend, RateLimitResult
+
 # ==================== CONFIGURATION ====================
 
 JWT_SECRET = os.getenv("JWT_SECRET", "your-secret-key-change-in-production")
@@ -139,40 +140,20 @@ async def require_admin(
 # ==================== RATE LIMITING ====================
 
 class RateLimiter:
-    """Simple in-memory rate limiter"""
+    """In-memory GCRA rate limiter (one timestamp per client, evicted when idle)"""
     
     def __init__(self, requests: int = RATE_LIMIT_REQUESTS, window: int = RATE_LIMIT_WINDOW):
         self.requests = requests
         self.window = window
-        self.clients = defaultdict(list)
+        self.backend = MemoryStateBackend()
     
-    def _clean_old_requests(self, client_id: str, current_time: float):
-        """Remove requests outside the time window"""
-        cutoff = current_time - self.window
-        self.clients[client_id] = [
-            req_time for req_time in self.clients[client_id]
-            if req_time > cutoff
-        ]
+    def check(self, client_id: str) -> RateLimitResult:
+        """Consume one request for client and return the limiter state"""
+        return self.backend.throttle(client_id, self.requests, self.window)
     
     def is_allowed(self, client_id: str) -> bool:
         """Check if request is allowed for client"""
-        current_time = time.time()
-        self._clean_old_requests(client_id, current_time)
-        
-        if len(self.clients[client_id]) >= self.requests:
-            return False
-        
-        self.clients[client_id].append(current_time)
-        return True
-    
-    def get_reset_time(self, client_id: str) -> int:
-        """Get time until rate limit resets"""
-        if not self.clients[client_id]:
-            return 0
-        
-        oldest_request = min(self.clients[client_id])
-        reset_time = int(oldest_request + self.window - time.time())
-        return max(0, reset_time)
+        return self.check(client_id).allowed
 
 # Global rate limiter instance
 rate_limiter = RateLimiter()
@@ -201,29 +182,33 @@ def get_client_id(request: Request) -> str:
     identifier = f"{client_ip}:{user_agent}"
     return hashlib.sha256(identifier.encode()).hexdigest()[:16]
 
-async def get_rate_limit(request: Request) -> None:
+async def get_rate_limit(request: Request, response: Response) -> None:
     """
     Check rate limit for request
     
     Args:
         request: FastAPI request object
+        response: Response receiving the RateLimit-* headers
         
     Raises:
         HTTPException: If rate limit exceeded
     """
     client_id = get_client_id(request)
+    result = rate_limiter.check(client_id)
     
-    if not rate_limiter.is_allowed(client_id):
-        reset_time = rate_limiter.get_reset_time(client_id)
+    if not result.allowed:
+        retry_after = result.headers()["Retry-After"]
         raise HTTPException(
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-            detail=f"Rate limit exceeded. Try again in {reset_time} seconds",
+            detail=f"Rate limit exceeded. Try again in {retry_after} seconds",
             headers={
+                **result.headers(),
                 "X-RateLimit-Limit": str(RATE_LIMIT_REQUESTS),
                 "X-RateLimit-Window": str(RATE_LIMIT_WINDOW),
-                "X-RateLimit-Reset": str(reset_time)
+                "X-RateLimit-Reset": retry_after
             }
         )
+    response.headers.update(result.headers())
 
 # ==================== API KEY MANAGEMENT ====================
 
@@ -332,52 +317,10 @@ async def get_db_session():
 
 # ==================== CACHING ====================
 
-class SimpleCache:
-    """Simple in-memory cache with TTL"""
-    
-    def __init__(self, default_ttl: int = 300):
-        self.cache = {}
-        self.default_ttl = default_ttl
-    
-    def get(self, key: str) -> Optional[Any]:
-        """Get value from cache"""
-        if key in self.cache:
-            value, expiry = self.cache[key]
-            if time.time() < expiry:
-                return value
-            else:
-                del self.cache[key]
-        return None
-    
-    def set(self, key: str, value: Any, ttl: Optional[int] = None):
-        """Set value in cache with TTL"""
-        ttl = ttl or self.default_ttl
-        expiry = time.time() + ttl
-        self.cache[key] = (value, expiry)
-    
-    def delete(self, key: str):
-        """Delete value from cache"""
-        if key in self.cache:
-            del self.cache[key]
-    
-    def clear(self):
-        """Clear entire cache"""
-        self.cache.clear()
-    
-    def cleanup(self):
-        """Remove expired entries"""
-        current_time = time.time()
-        expired_keys = [
-            key for key, (_, expiry) in self.cache.items()
-            if expiry < current_time
-        ]
-        for key in expired_keys:
-            del self.cache[key]
-
-# Global cache instance
-cache = SimpleCache()
+# Global cache instance (bounded LRU with TTL, see eaa_scanner.cache)
+cache = get_shared_cache("api", max_entries=2048, default_ttl=300)
 
-async def get_cache() -> SimpleCache:
+async def get_cache() -> LRUCache:
     """Get cache instance"""
     return cache
 
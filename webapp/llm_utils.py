@@ -3,11 +3,15 @@ Utilità per operazioni LLM nell'interfaccia web.
 Estende il sistema LLM esistente con funzionalità specifiche per webapp.
 """
 
+import copy
+import hashlib
+import json
 import time
 import logging
 from typing import Dict, List, Optional, Any
 from pathlib import Path
 
+from eaa_scanner.cache import get_cache
 from eaa_scanner.llm_config import get_llm_manager, LLMManager
 
 # Configura logger specifico
@@ -24,39 +28,27 @@ class WebLLMManager:
     """Gestore LLM specializzato per webapp con cache e sessioni"""
     
     def __init__(self):
-        self.session_cache = {}
-        self.cost_cache = {}
+        # Esiti di validazione (10 minuti, condivisi tra processi se c'è Redis)
+        self.session_cache = get_cache("llm_validation", max_entries=1024, default_ttl=600, shared=True)
+        self.cost_cache = get_cache("llm_costs", max_entries=512, default_ttl=3600)
         
     def validate_api_key_cached(self, api_key: str) -> Dict[str, Any]:
         """Valida API key con cache risultati"""
-        cache_key = f"validation_{hash(api_key)}"
+        # Digest stabile tra processi (hash() cambia a ogni avvio)
+        cache_key = f"validation_{hashlib.sha256(api_key.encode()).hexdigest()}"
         
-        # Controlla cache (valida per 10 minuti)
-        if cache_key in self.session_cache:
-            cached = self.session_cache[cache_key]
-            if time.time() - cached['timestamp'] < 600:  # 10 min
-                logger.info("Validation da cache")
-                return cached['result']
-        
-        # Validazione reale
-        try:
+        def validate() -> Dict[str, Any]:
             manager = LLMManager(api_key=api_key)
             is_valid = manager.validate_api_key()
-            
-            result = {
+            return {
                 "valid": is_valid,
                 "message": "API key valida" if is_valid else "API key non valida o scaduta",
                 "timestamp": time.time()
             }
-            
-            # Cache risultato
-            self.session_cache[cache_key] = {
-                'result': result,
-                'timestamp': time.time()
-            }
-            
-            return result
-            
+        
+        # Validazione reale, una sola per chiave anche con richieste concorrenti
+        try:
+            return self.session_cache.get_or_load(cache_key, validate)
         except Exception as e:
             logger.error(f"Errore validazione API key: {e}")
             return {
@@ -66,7 +58,12 @@ class WebLLMManager:
             }
     
     def estimate_costs_advanced(self, config: Dict[str, Any]) -> Dict[str, Any]:
-        """Calcola stima costi con algoritmo migliorato"""
+        """Calcola stima costi con algoritmo migliorato (memorizzata per configurazione)"""
+        cache_key = json.dumps(config, sort_keys=True, default=str)
+        estimate = self.cost_cache.get_or_load(cache_key, lambda: self._estimate_costs(config))
+        return copy.deepcopy(estimate)
+    
+    def _estimate_costs(self, config: Dict[str, Any]) -> Dict[str, Any]:
         model = config.get('model', 'gpt-4o')
         num_pages = config.get('num_pages', 1)
         sections = config.get('sections', [])
@@ -365,19 +362,9 @@ Questa dichiarazione è stata preparata il {time.strftime('%d/%m/%Y')}.
         return fallbacks.get(section, f"Contenuto per sezione {section} non disponibile.")
     
     def cleanup_cache(self, max_age_hours: int = 24):
-        """Pulisce cache vecchie"""
-        cutoff = time.time() - (max_age_hours * 3600)
-        
-        # Pulisci validation cache
-        to_remove = []
-        for key, data in self.session_cache.items():
-            if data['timestamp'] < cutoff:
-                to_remove.append(key)
-        
-        for key in to_remove:
-            del self.session_cache[key]
-        
-        logger.info(f"Cache cleanup: rimossi {len(to_remove)} elementi")
+        """Pulisce cache scadute (le dimensioni sono già limitate dalla LRU)"""
+        removed = self.session_cache.cleanup() + self.cost_cache.cleanup()
+        logger.info(f"Cache cleanup: rimossi {removed} elementi")
 
 
 # Singleton globale per webapp
@@ -0,0 +1,71 @@
+"""
+Risposte FastAPI per risultati e report di grandi dimensioni
+
+JSON serializzato in streaming, report serviti dal disco con la variante
+precompressa accettata dal client e Range gestito da FileResponse (che usa
+anche l'estensione ASGI pathsend per l'invio zero-copy quando il server la offre).
+"""
+
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from fastapi.middleware.gzip import GZipMiddleware
+from starlette.requests import Request
+from starlette.responses import FileResponse, StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+from eaa_scanner.delivery import COMPRESSIBLE_SUFFIXES, iter_json, select_precompressed
+
+
+def json_stream_response(data: Any, headers: Optional[Dict[str, str]] = None) -> StreamingResponse:
+    """
+    Risposta JSON serializzata a blocchi (iterencode)
+
+    Args:
+        data: Documento JSON (datetime e altri tipi serializzati con str)
+        headers: Header aggiuntivi (es. Content-Disposition)
+    """
+    return StreamingResponse(iter_json(data, default=str), media_type="application/json", headers=headers)
+
+
+def artifact_response(request: Request, path: str, media_type: str,
+                      filename: Optional[str] = None) -> FileResponse:
+    """
+    Serve un report generato senza caricarlo in memoria
+
+    Per HTML/JSON sceglie la variante .br/.gz scritta alla generazione se il
+    client la accetta; le richieste Range ricevono sempre il file originale.
+
+    Args:
+        request: Richiesta (Accept-Encoding, Range)
+        path: File del report
+        media_type: Content type del file originale
+        filename: Nome per Content-Disposition attachment (None: inline)
+    """
+    source = Path(path)
+    serve_path, encoding = source, None
+    headers = {}
+    if source.suffix.lower() in COMPRESSIBLE_SUFFIXES:
+        headers["Vary"] = "Accept-Encoding"
+        if "range" not in request.headers:
+            serve_path, encoding = select_precompressed(source, request.headers.get("accept-encoding"))
+    if encoding:
+        # Con Content-Encoding impostato GZipMiddleware non ricomprime
+        headers["Content-Encoding"] = encoding
+
+    return FileResponse(path=serve_path, media_type=media_type, filename=filename, headers=headers)
+
+
+class RangeAwareGZipMiddleware(GZipMiddleware):
+    """
+    GZipMiddleware che lascia passare le richieste Range
+
+    Comprimere una risposta 206 ne invaliderebbe Content-Range e
+    Content-Length: le richieste con Range vengono servite così come sono.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and any(name == b"range" for name, _ in scope["headers"]):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
@@ -0,0 +1,141 @@
+"""
+Handler dei job di scansione eseguiti dai worker della coda
+
+Il processo API accoda i job (vedi SCAN_QUEUE_URL) e ne legge lo stato; questi
+handler girano nei processi worker avviati con:
+
+    python -m eaa_scanner.jobs --handlers webapp.scan_jobs
+
+e riusano i task di scansione dell'app FastAPI. Il progresso viene pubblicato
+sul job a ogni heartbeat, il risultato completo al termine.
+"""
+
+import asyncio
+import logging
+from contextlib import suppress
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict
+
+from eaa_scanner.cancellation import ScanCancelled
+from eaa_scanner.jobs import Job, JobContext
+
+logger = logging.getLogger(__name__)
+
+SCAN_JOB = "scan"
+MULTI_PAGE_SCAN_JOB = "multi_page_scan"
+
+# Campi di stato di una sessione multi-pagina pubblicati come progresso del job
+SESSION_PROGRESS_FIELDS = (
+    "status", "progress", "pages_scanned", "total_pages", "current_page", "issues_found", "message"
+)
+
+# Intervallo di campionamento del progresso (pubblicato al successivo heartbeat)
+PROGRESS_INTERVAL = 2.0
+
+# Attesa della chiusura del task dopo l'annullamento dei suoi scanner
+CANCEL_GRACE_SECONDS = 10.0
+
+
+async def _run_with_progress(task: Awaitable[Any], context: JobContext,
+                             snapshot: Callable[[], Dict[str, Any]],
+                             cancel: Callable[[], Any]) -> None:
+    """
+    Esegue il task di scansione campionandone lo stato e gestendo la cancellazione
+
+    Alla cancellazione `cancel` annulla il token della scansione, che termina
+    subito i sottoprocessi degli scanner; il task ha poi CANCEL_GRACE_SECONDS
+    per chiudersi da solo prima di essere cancellato.
+
+    Raises:
+        JobCancelled: Se il job è stato cancellato o il lease è andato perso
+    """
+    from webapp.database import get_progress_writer
+
+    writer = get_progress_writer()
+    writer.start()
+    scan = asyncio.ensure_future(task)
+    try:
+        while not scan.done():
+            await asyncio.wait({scan}, timeout=PROGRESS_INTERVAL)
+            context.report_progress(**snapshot())
+            if context.cancelled.is_set():
+                cancel()
+                await asyncio.wait({scan}, timeout=CANCEL_GRACE_SECONDS)
+                scan.cancel()
+                with suppress(asyncio.CancelledError, ScanCancelled):
+                    await scan
+                context.raise_if_cancelled()
+        scan.result()
+    finally:
+        await writer.stop()
+
+
+async def _run_scan(job: Job, context: JobContext) -> Dict[str, Any]:
+    from webapp import app_fastapi as api
+
+    scan_id = job.payload["scan_id"]
+    request = api.ScanRequest(**job.payload["request"])
+
+    # Stato locale al worker usato dal task; la riga nel database esiste già
+    api.scan_manager.scans[scan_id] = {
+        "id": scan_id,
+        "status": "pending",
+        "progress": 0,
+        "request": job.payload["request"],
+        "created_at": datetime.utcnow(),
+        "updated_at": datetime.utcnow(),
+        "results": None
+    }
+    api.create_scan_status(scan_id)
+
+    def snapshot() -> Dict[str, Any]:
+        scan = api.scan_manager.scans[scan_id]
+        return {"status": scan["status"], "progress": scan["progress"], "message": scan.get("message")}
+
+    await _run_with_progress(api.run_scan_task(scan_id, request), context, snapshot,
+                             lambda: api.scan_cancellations.cancel(scan_id))
+
+    scan = api.scan_manager.scans[scan_id]
+    if scan["status"] != "completed":
+        # Il task registra l'errore senza sollevarlo: qui diventa un tentativo fallito
+        raise RuntimeError(scan.get("message") or "Scansione fallita")
+    return {"status": "completed", "results": scan.get("results")}
+
+
+async def _run_multi_page_scan(job: Job, context: JobContext) -> Dict[str, Any]:
+    from webapp import app_fastapi as api
+
+    session_id = job.payload["session_id"]
+    request = api.MultiPageScanRequest(**job.payload["request"])
+    session = api.register_multi_page_session(session_id, request)
+
+    def snapshot() -> Dict[str, Any]:
+        return {field: session.get(field) for field in SESSION_PROGRESS_FIELDS if field in session}
+
+    await _run_with_progress(api.run_multi_page_scan_task(session_id, session), context, snapshot,
+                             lambda: api.scan_cancellations.cancel(session_id))
+
+    if session.get("status") != "completed":
+        raise RuntimeError(session.get("error") or "Scansione multi-pagina fallita")
+    result = snapshot()
+    result.update({
+        "scan_results": session.get("scan_results") or {},
+        "results_summary": session.get("results_summary")
+    })
+    return result
+
+
+def run_scan_job(job: Job, context: JobContext) -> Dict[str, Any]:
+    """Scansione singola (POST /api/v2/scan)"""
+    return asyncio.run(_run_scan(job, context))
+
+
+def run_multi_page_scan_job(job: Job, context: JobContext) -> Dict[str, Any]:
+    """Scansione multi-pagina (POST /api/scan/start)"""
+    return asyncio.run(_run_multi_page_scan(job, context))
+
+
+JOB_HANDLERS = {
+    SCAN_JOB: run_scan_job,
+    MULTI_PAGE_SCAN_JOB: run_multi_page_scan_job,
+}
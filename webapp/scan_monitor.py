@@ -0,0 +1,390 @@
+"""
+Monitor eventi di scansione per SSE e polling incrementale
+
+Gli eventi di ogni scansione sono conservati in un ring buffer limitato con
+sequence ID monotoni: "eventi dopo N" costa O(1) per trovare il punto di
+partenza più O(k) sugli eventi restituiti, indipendentemente dalla lunghezza
+della scansione. Le scansioni completate vengono rimosse dopo un TTL e un
+tetto globale sul numero di eventi limita la memoria complessiva.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Eventi che chiudono una scansione e ne avviano il TTL di ritenzione
+TERMINAL_EVENTS = {"scan_complete", "scan_failed", "scan_cancelled"}
+
+
+class EventRingBuffer:
+    """
+    Buffer circolare di dimensione fissa indicizzato per sequence ID
+
+    L'evento con sequence ``seq`` vive nello slot ``(seq - 1) % capacity``,
+    quindi la posizione di partenza per "eventi dopo N" si calcola in O(1).
+    ``start_seq`` permette di proseguire la numerazione di un buffer rimosso.
+    """
+
+    __slots__ = ("capacity", "_slots", "_start_seq", "_next_seq", "created_at", "updated_at", "completed_at")
+
+    def __init__(self, capacity: int, start_seq: int = 1):
+        self.capacity = max(1, capacity)
+        self._slots: List[Optional[Dict[str, Any]]] = [None] * self.capacity
+        self._start_seq = max(1, start_seq)
+        self._next_seq = self._start_seq
+        self.created_at = time.time()
+        self.updated_at = self.created_at
+        self.completed_at: Optional[float] = None
+
+    def __len__(self) -> int:
+        return min(self._next_seq - self._start_seq, self.capacity)
+
+    @property
+    def last_seq(self) -> int:
+        """Sequence dell'ultimo evento inserito (0 se vuoto)"""
+        return self._next_seq - 1
+
+    @property
+    def first_seq(self) -> int:
+        """Sequence del più vecchio evento ancora conservato"""
+        return max(self._start_seq, self._next_seq - self.capacity)
+
+    def append(self, event: Dict[str, Any]) -> int:
+        """
+        Inserisce un evento assegnandogli il prossimo sequence ID
+
+        Returns:
+            Sequence ID assegnato
+        """
+        seq = self._next_seq
+        event["id"] = seq
+        self._slots[(seq - 1) % self.capacity] = event
+        self._next_seq += 1
+        self.updated_at = time.time()
+        return seq
+
+    def since(self, last_seq: int, limit: Optional[int] = None) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        Restituisce gli eventi con sequence > last_seq
+
+        Args:
+            last_seq: Ultimo sequence ID già ricevuto dal client
+            limit: Numero massimo di eventi da restituire
+
+        Returns:
+            Tupla (eventi, truncated); truncated è True se alcuni eventi
+            successivi a last_seq sono già stati sovrascritti, o se last_seq
+            è oltre l'ultimo evento (numerazione ripartita: si riparte da capo)
+        """
+        if last_seq > self.last_seq:
+            last_seq = 0
+            truncated = True
+        else:
+            truncated = last_seq + 1 < self.first_seq
+        start = max(last_seq + 1, self.first_seq)
+        end = self._next_seq
+        if limit is not None:
+            end = min(end, start + max(0, limit))
+        return [self._slots[(seq - 1) % self.capacity] for seq in range(start, end)], truncated
+
+    def recent(self, count: int) -> List[Dict[str, Any]]:
+        """Restituisce gli ultimi ``count`` eventi"""
+        events, _ = self.since(max(0, self.last_seq - count))
+        return events
+
+
+class ScanEventStore:
+    """
+    Store thread-safe degli eventi di tutte le scansioni
+
+    Politica di eviction:
+    - le scansioni terminate vengono rimosse ``completed_ttl_seconds`` dopo
+      l'evento terminale;
+    - se il totale eventi supera ``max_total_events`` (o le scansioni
+      superano ``max_scans``) vengono rimosse prima le scansioni terminate più
+      vecchie, poi quelle attive aggiornate meno di recente.
+    """
+
+    def __init__(self,
+                 per_scan_capacity: int = 500,
+                 max_total_events: int = 50000,
+                 max_scans: int = 1000,
+                 completed_ttl_seconds: float = 600):
+        self.per_scan_capacity = per_scan_capacity
+        self.max_total_events = max_total_events
+        self.max_scans = max_scans
+        self.completed_ttl_seconds = completed_ttl_seconds
+        self._buffers: Dict[str, EventRingBuffer] = {}
+        # Ultimo sequence delle scansioni rimosse: un buffer ricreato prosegue
+        # la numerazione e i client in polling ricevono truncated=True
+        self._seq_floors: "OrderedDict[str, int]" = OrderedDict()
+        self._total_events = 0
+        self._evicted_scans = 0
+        self._lock = threading.Lock()
+        self._last_sweep = time.time()
+
+    def append(self, scan_id: str, event: Dict[str, Any]) -> int:
+        """
+        Aggiunge un evento alla scansione
+
+        Returns:
+            Sequence ID assegnato all'evento
+        """
+        with self._lock:
+            buffer = self._buffers.get(scan_id)
+            if buffer is None:
+                floor = self._seq_floors.pop(scan_id, 0)
+                buffer = EventRingBuffer(self.per_scan_capacity, start_seq=floor + 1)
+                self._buffers[scan_id] = buffer
+
+            before = len(buffer)
+            seq = buffer.append(event)
+            self._total_events += len(buffer) - before
+
+            if event.get("event_type") in TERMINAL_EVENTS:
+                buffer.completed_at = buffer.updated_at
+
+            self._enforce_limits(protect=scan_id)
+            return seq
+
+    def get_events_since(self, scan_id: str, last_id: int = 0,
+                         limit: Optional[int] = None) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        Eventi successivi a ``last_id`` per una scansione
+
+        Returns:
+            Tupla (eventi, truncated)
+        """
+        with self._lock:
+            buffer = self._buffers.get(scan_id)
+            if buffer is None:
+                return [], last_id < self._seq_floors.get(scan_id, 0)
+            return buffer.since(last_id, limit)
+
+    def get_recent_events(self, scan_id: str, count: int) -> List[Dict[str, Any]]:
+        """Ultimi ``count`` eventi di una scansione"""
+        with self._lock:
+            buffer = self._buffers.get(scan_id)
+            return buffer.recent(count) if buffer else []
+
+    def last_event_id(self, scan_id: str) -> int:
+        """Sequence ID dell'ultimo evento (0 se la scansione non ha eventi)"""
+        with self._lock:
+            buffer = self._buffers.get(scan_id)
+            return buffer.last_seq if buffer else self._seq_floors.get(scan_id, 0)
+
+    def has_scan(self, scan_id: str) -> bool:
+        with self._lock:
+            return scan_id in self._buffers
+
+    def remove_scan(self, scan_id: str) -> None:
+        with self._lock:
+            self._drop(scan_id)
+
+    def evict_expired(self, now: Optional[float] = None) -> int:
+        """
+        Rimuove le scansioni terminate da più di ``completed_ttl_seconds``
+
+        Returns:
+            Numero di scansioni rimosse
+        """
+        with self._lock:
+            return self._evict_expired(now or time.time())
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "scans": len(self._buffers),
+                "completed_scans": sum(1 for b in self._buffers.values() if b.completed_at),
+                "total_events": self._total_events,
+                "max_total_events": self.max_total_events,
+                "per_scan_capacity": self.per_scan_capacity,
+                "evicted_scans": self._evicted_scans,
+            }
+
+    # Metodi interni (da chiamare con il lock acquisito)
+
+    def _drop(self, scan_id: str) -> None:
+        buffer = self._buffers.pop(scan_id, None)
+        if buffer is not None:
+            self._total_events -= len(buffer)
+            self._evicted_scans += 1
+            self._seq_floors[scan_id] = buffer.last_seq
+            # Solo interi: tetto generoso ma limitato
+            while len(self._seq_floors) > self.max_scans * 10:
+                self._seq_floors.popitem(last=False)
+
+    def _evict_expired(self, now: float) -> int:
+        expired = [
+            scan_id for scan_id, buffer in self._buffers.items()
+            if buffer.completed_at and now - buffer.completed_at >= self.completed_ttl_seconds
+        ]
+        for scan_id in expired:
+            self._drop(scan_id)
+        self._last_sweep = now
+        return len(expired)
+
+    def _enforce_limits(self, protect: str) -> None:
+        now = time.time()
+        # Sweep TTL al massimo una volta al secondo per non pesare su ogni append
+        if now - self._last_sweep >= 1.0:
+            self._evict_expired(now)
+
+        if self._total_events <= self.max_total_events and len(self._buffers) <= self.max_scans:
+            return
+
+        # Prima le scansioni terminate (più vecchie prima), poi le attive meno recenti
+        candidates = sorted(
+            (scan_id for scan_id in self._buffers if scan_id != protect),
+            key=lambda sid: (
+                self._buffers[sid].completed_at is None,
+                self._buffers[sid].completed_at or self._buffers[sid].updated_at,
+            )
+        )
+        for scan_id in candidates:
+            if self._total_events <= self.max_total_events and len(self._buffers) <= self.max_scans:
+                break
+            logger.debug(f"Eviction eventi scansione {scan_id} per limite memoria")
+            self._drop(scan_id)
+
+
+class ScanMonitor:
+    """
+    Emettitore di eventi di scansione (contratto SSE/polling)
+
+    Ogni evento ha la forma ``{id, event_type, scan_id, timestamp, message, data}``.
+    """
+
+    def __init__(self, store: Optional[ScanEventStore] = None):
+        self.store = store or ScanEventStore(
+            per_scan_capacity=int(os.getenv("EAA_EVENT_BUFFER_SIZE", "500")),
+            max_total_events=int(os.getenv("EAA_EVENT_MAX_TOTAL", "50000")),
+            completed_ttl_seconds=float(os.getenv("EAA_EVENT_RETENTION_SECONDS", "600")),
+        )
+        self.started_at = time.time()
+
+    def _emit(self, scan_id: str, event_type: str, message: str,
+              data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        event = {
+            "event_type": event_type,
+            "scan_id": scan_id,
+            "timestamp": time.time(),
+            "message": message,
+            "data": data or {},
+        }
+        self.store.append(scan_id, event)
+        return event
+
+    # Lettura
+
+    def get_events_since(self, scan_id: str, last_id: int = 0,
+                         limit: Optional[int] = None) -> Tuple[List[Dict[str, Any]], bool]:
+        return self.store.get_events_since(scan_id, last_id, limit)
+
+    def get_recent_events(self, scan_id: str, count: int = 5) -> List[Dict[str, Any]]:
+        return self.store.get_recent_events(scan_id, count)
+
+    def heartbeat(self, scan_id: str) -> Dict[str, Any]:
+        """Evento heartbeat non persistito, per mantenere vive le connessioni SSE"""
+        return {
+            "event_type": "heartbeat",
+            "scan_id": scan_id,
+            "timestamp": time.time(),
+            "message": "",
+            "data": {"uptime_ms": int((time.time() - self.started_at) * 1000)},
+        }
+
+    # Emissione
+
+    def emit_scan_start(self, scan_id: str, url: str, company_name: str,
+                        scanners_enabled: Optional[Dict[str, bool]] = None):
+        scanners = [name for name, enabled in (scanners_enabled or {}).items() if enabled]
+        return self._emit(scan_id, "scan_start", f"Avvio scansione di {url}", {
+            "url": url,
+            "company_name": company_name,
+            "scanners": scanners,
+        })
+
+    def emit_page_progress(self, scan_id: str, current_page: int, total_pages: int, current_url: str):
+        return self._emit(scan_id, "page_progress", f"Pagina {current_page}/{total_pages}: {current_url}", {
+            "current_page": current_page,
+            "total_pages": total_pages,
+            "current_url": current_url,
+            "progress_percent": int(current_page / max(1, total_pages) * 100),
+        })
+
+    def emit_scanner_start(self, scan_id: str, scanner_name: str, url: str,
+                           estimated_duration: Optional[int] = None):
+        return self._emit(scan_id, "scanner_start", f"Avvio {scanner_name}", {
+            "scanner": scanner_name,
+            "url": url,
+            "estimated_duration": estimated_duration,
+        })
+
+    def emit_scanner_operation(self, scan_id: str, scanner_name: str, operation: str,
+                               progress: Optional[int] = None, details: Optional[Dict] = None):
+        return self._emit(scan_id, "scanner_operation", f"{scanner_name}: {operation}", {
+            "scanner": scanner_name,
+            "operation": operation,
+            "progress": progress,
+            "details": details or {},
+        })
+
+    def emit_scanner_complete(self, scan_id: str, scanner_name: str, results_summary: Dict[str, Any]):
+        return self._emit(scan_id, "scanner_complete", f"{scanner_name} completato", {
+            "scanner": scanner_name,
+            "results_summary": results_summary,
+        })
+
+    def emit_scanner_error(self, scan_id: str, scanner_name: str, error_message: str,
+                           is_critical: bool = False):
+        return self._emit(scan_id, "scanner_error", f"Errore {scanner_name}: {error_message}", {
+            "scanner": scanner_name,
+            "error": error_message,
+            "is_critical": is_critical,
+        })
+
+    def emit_processing_step(self, scan_id: str, step_name: str, progress: Optional[int] = None):
+        return self._emit(scan_id, "processing_step", step_name, {
+            "step": step_name,
+            "progress": progress,
+        })
+
+    def emit_report_generation(self, scan_id: str, stage: str, progress: Optional[int] = None):
+        return self._emit(scan_id, "report_generation", f"Generazione report: {stage}", {
+            "stage": stage,
+            "progress": progress,
+        })
+
+    def emit_scan_complete(self, scan_id: str, scan_results: Dict[str, Any]):
+        return self._emit(scan_id, "scan_complete", "Scansione completata", dict(scan_results or {}))
+
+    def emit_scan_failed(self, scan_id: str, error_message: str, error_code: Optional[str] = None,
+                         pages_completed: int = 0):
+        return self._emit(scan_id, "scan_failed", f"Scansione fallita: {error_message}", {
+            "error": error_message,
+            "error_code": error_code or "SCAN_ERROR",
+            "pages_completed": pages_completed,
+        })
+
+    def emit_scan_cancelled(self, scan_id: str, reason: str = "Scansione annullata dall'utente"):
+        return self._emit(scan_id, "scan_cancelled", reason, {"reason": reason})
+
+
+_monitor: Optional[ScanMonitor] = None
+_monitor_lock = threading.Lock()
+
+
+def get_scan_monitor() -> ScanMonitor:
+    """Restituisce il monitor eventi condiviso del processo"""
+    global _monitor
+    if _monitor is None:
+        with _monitor_lock:
+            if _monitor is None:
+                _monitor = ScanMonitor()
+    return _monitor
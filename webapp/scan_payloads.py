@@ -0,0 +1,140 @@
+"""
+Payload precalcolati per lo stato e i risultati delle scansioni multi-pagina
+
+Il riepilogo aggregato (severità, WCAG, punteggio) viene calcolato una volta
+al completamento e conservato nella sessione: il polling dello stato restituisce
+solo un documento compatto con ETag, mentre i dati completi per pagina sono
+serviti da un endpoint paginato separato.
+"""
+
+import hashlib
+import json
+from typing import Any, Dict, List, Optional
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+# Campi per pagina restituiti di default dall'endpoint paginato (raw_data solo su richiesta)
+PAGE_RESULT_FIELDS = (
+    "compliance_score", "issues_total", "issues_by_severity", "issues_by_wcag",
+    "normalized_issues", "scan_date", "scanners_used"
+)
+
+MAX_PAGE_SIZE = 50
+
+
+def aggregate_scan_results(page_results: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Aggrega i risultati per pagina in un riepilogo compatto
+
+    Args:
+        page_results: Risultati indicizzati per URL della pagina
+
+    Returns:
+        Riepilogo con punteggio medio, totali per severità e per criterio WCAG
+    """
+    total_issues = 0
+    issues_available = 0
+    severity_totals = {"critical": 0, "high": 0, "medium": 0, "low": 0}
+    wcag_totals: Dict[str, int] = {}
+    total_compliance = 0.0
+
+    for page_data in page_results.values():
+        total_issues += page_data.get("issues_total", 0)
+        issues_available += len(page_data.get("normalized_issues", []))
+        total_compliance += page_data.get("compliance_score", 0) or 0
+
+        for sev, count in page_data.get("issues_by_severity", {}).items():
+            if sev in severity_totals:
+                severity_totals[sev] += count
+
+        for wcag, count in page_data.get("issues_by_wcag", {}).items():
+            wcag_totals[wcag] = wcag_totals.get(wcag, 0) + count
+
+    return {
+        "compliance_score": round(total_compliance / max(1, len(page_results)), 1),
+        "total_issues": total_issues,
+        "issues_by_severity": severity_totals,
+        "issues_by_wcag": wcag_totals,
+        "issues_available": issues_available,
+        "pages_analyzed": len(page_results)
+    }
+
+
+def paginate_scan_results(page_results: Dict[str, Dict[str, Any]], page: int = 1,
+                          page_size: int = 10, include_raw: bool = False) -> Dict[str, Any]:
+    """
+    Pagina i risultati completi per pagina scansionata (in ordine di scansione)
+
+    Args:
+        page_results: Risultati indicizzati per URL della pagina
+        page: Numero di pagina (da 1)
+        page_size: Elementi per pagina (massimo MAX_PAGE_SIZE)
+        include_raw: Include i dati grezzi degli scanner
+
+    Returns:
+        Elementi della pagina richiesta e metadati di paginazione
+    """
+    page = max(1, page)
+    page_size = max(1, min(page_size, MAX_PAGE_SIZE))
+    urls = list(page_results)
+    start = (page - 1) * page_size
+
+    items: List[Dict[str, Any]] = []
+    for url in urls[start:start + page_size]:
+        page_data = page_results[url]
+        item = {"url": url}
+        item.update({field: page_data.get(field) for field in PAGE_RESULT_FIELDS})
+        if include_raw:
+            item["raw_data"] = page_data.get("raw_data", {})
+        items.append(item)
+
+    total_pages = (len(urls) + page_size - 1) // page_size
+    return {
+        "items": items,
+        "pagination": {
+            "page": page,
+            "page_size": page_size,
+            "total": len(urls),
+            "total_pages": total_pages,
+            "has_next": page < total_pages
+        }
+    }
+
+
+def compute_etag(body: bytes) -> str:
+    """ETag forte derivato dal contenuto serializzato"""
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Confronto debole di If-None-Match (RFC 9110): ignora il prefisso W/"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def etag_json_response(request: Request, payload: Any, max_age: int = 0) -> Response:
+    """
+    Serializza il payload e risponde 304 se il client ha già questa versione
+
+    Args:
+        request: Richiesta (per If-None-Match)
+        payload: Documento JSON
+        max_age: Secondi di cache consentiti al client (0: rivalida sempre)
+
+    Returns:
+        Risposta JSON con ETag o 304 Not Modified senza corpo
+    """
+    body = json.dumps(payload, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+    etag = compute_etag(body)
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"private, max-age={max_age}" if max_age else "no-cache"
+    }
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
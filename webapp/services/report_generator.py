@@ -11,10 +11,11 @@ import aiohttp
 from typing import Dict, Any, List, Optional
 from datetime import datetime
 from pathlib import Path
-from jinja2 import Environment, FileSystemLoader, select_autoescape
 import markdown
 import pdfkit
 
+from eaa_scanner.templating import get_environment
+
 from ..models.scan import ReportGenerationRequest
 
 class ReportGenerator:
@@ -24,12 +25,9 @@ class ReportGenerator:
         self.output_path = Path(os.getenv("REPORT_OUTPUT_PATH", "./output/reports"))
         self.output_path.mkdir(exist_ok=True, parents=True)
         
-        # Setup Jinja2 template environment
+        # Shared Jinja2 environment: templates are compiled once per process
         template_path = Path(__file__).parent.parent / "templates"
-        self.jinja_env = Environment(
-            loader=FileSystemLoader(str(template_path)),
-            autoescape=select_autoescape(['html', 'xml'])
-        )
+        self.jinja_env = get_environment(template_path)
         
         self.reports_in_progress = {}
         
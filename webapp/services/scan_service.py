@@ -6,6 +6,7 @@ Handles persistence, state management, and coordination
 import os
 import json
 import asyncio
+import time
 import aiofiles
 from typing import Optional, Dict, Any, List
 from datetime import datetime
@@ -14,6 +15,42 @@ import uuid
 import redis.asyncio as aioredis
 from ..models.scan import ScanRequest, ScanResult
 
+# Scan records expire from Redis one hour after their last write
+SCAN_TTL_SECONDS = 3600
+
+# Sorted sets of scan ids scored by created_at, one per listing filter
+INDEX_ALL = "scans:index:all"
+INDEX_STATUS = "scans:index:status:{status}"
+INDEX_USER = "scans:index:user:{user_id}"
+INDEX_USER_STATUS = "scans:index:user:{user_id}:status:{status}"
+# Hash scan id -> index keys, outliving the record so expired ids can be unindexed
+INDEX_MEMBERSHIP = "scans:index:membership"
+# Sorted set scan id -> expiry time of its record, so expired scans leave the
+# indexes even when no listing page ever reaches them
+INDEX_EXPIRY = "scans:index:expires"
+# Set once scans indexed before INDEX_EXPIRY existed have an expiry entry
+INDEX_EXPIRY_BACKFILLED = "scans:index:expires:backfilled"
+# Expired scans unindexed per write or listing, and ids per backfill round trip
+EXPIRY_SWEEP_BATCH = 200
+
+
+def _index_keys(scan: Dict) -> List[str]:
+    """Sorted sets a scan belongs to, given its status and owner"""
+    status, user_id = scan.get("status"), scan.get("user_id")
+    keys = [INDEX_ALL, INDEX_STATUS.format(status=status)]
+    if user_id:
+        keys.append(INDEX_USER.format(user_id=user_id))
+        keys.append(INDEX_USER_STATUS.format(user_id=user_id, status=status))
+    return keys
+
+
+def _index_score(scan: Dict) -> float:
+    try:
+        return datetime.fromisoformat(scan["created_at"]).timestamp()
+    except (KeyError, TypeError, ValueError):
+        return 0.0
+
+
 class ScanService:
     """Service for managing scans with async operations"""
     
@@ -22,6 +59,7 @@ class ScanService:
         self.storage_path = Path(os.getenv("SCAN_STORAGE_PATH", "./output"))
         self.storage_path.mkdir(exist_ok=True, parents=True)
         self._redis_client = None
+        self._expiry_backfilled = False
         
     async def get_redis(self) -> aioredis.Redis:
         """Get or create Redis connection"""
@@ -70,11 +108,7 @@ class ScanService:
         # Store in Redis for fast access
         try:
             redis = await self.get_redis()
-            await redis.setex(
-                f"scan:{scan_id}",
-                3600,  # 1 hour expiry
-                json.dumps(scan_data)
-            )
+            await self._store_in_redis(redis, scan_data)
         except Exception as e:
             print(f"Redis storage failed, using filesystem: {e}")
             # Fallback to filesystem
@@ -123,17 +157,14 @@ class ScanService:
         if not scan:
             return False
         
+        previous_indexes = _index_keys(scan)
         scan.update(updates)
         scan["updated_at"] = datetime.now().isoformat()
         
         # Update in Redis
         try:
             redis = await self.get_redis()
-            await redis.setex(
-                f"scan:{scan_id}",
-                3600,
-                json.dumps(scan)
-            )
+            await self._store_in_redis(redis, scan, previous_indexes)
         except Exception as e:
             print(f"Redis update failed: {e}")
             
@@ -239,7 +270,11 @@ class ScanService:
         user_id: Optional[str] = None
     ) -> List[Dict]:
         """
-        List scans with optional filtering
+        List scans with optional filtering, newest first
+        
+        Reads one page of ids from the sorted-set index matching the
+        filters and fetches those scans with a single MGET, so the cost
+        depends on the page size, not on the number of stored scans.
         
         Args:
             status: Filter by status
@@ -250,36 +285,101 @@ class ScanService:
         Returns:
             List of scan data dictionaries
         """
-        scans = []
+        if limit <= 0:
+            return []
+        if user_id and status:
+            index = INDEX_USER_STATUS.format(user_id=user_id, status=status)
+        elif user_id:
+            index = INDEX_USER.format(user_id=user_id)
+        elif status:
+            index = INDEX_STATUS.format(status=status)
+        else:
+            index = INDEX_ALL
         
-        # Get from Redis if available
         try:
             redis = await self.get_redis()
-            keys = await redis.keys("scan:*")
-            
-            for key in keys:
-                if ":updates" in key or ":control" in key:
-                    continue
-                    
-                data = await redis.get(key)
-                if data:
-                    scan = json.loads(data)
-                    
-                    # Apply filters
-                    if status and scan.get("status") != status:
-                        continue
-                    if user_id and scan.get("user_id") != user_id:
-                        continue
-                        
-                    scans.append(scan)
+            await self._prune_expired(redis)
+            while True:
+                scan_ids = await redis.zrevrange(index, offset, offset + limit - 1)
+                if not scan_ids:
+                    return []
+                values = await redis.mget([f"scan:{scan_id}" for scan_id in scan_ids])
+                
+                expired = [scan_id for scan_id, data in zip(scan_ids, values) if data is None]
+                if not expired:
+                    return [json.loads(data) for data in values]
+                # Records expired by TTL: drop them from every index and
+                # read the page again, so offsets stay consistent
+                await self._unindex(redis, expired)
         except Exception as e:
             print(f"Redis list failed: {e}")
-            
-        # Sort by created_at descending
-        scans.sort(key=lambda x: x.get("created_at", ""), reverse=True)
-        
-        # Apply pagination
-        return scans[offset:offset + limit]
+            return []
+    
+    async def _store_in_redis(self, redis, scan: Dict, previous_indexes: Optional[List[str]] = None):
+        """Write a scan and keep its index entries in step with status and owner"""
+        indexes = _index_keys(scan)
+        score = _index_score(scan)
+        pipe = redis.pipeline(transaction=True)
+        pipe.setex(f"scan:{scan['id']}", SCAN_TTL_SECONDS, json.dumps(scan))
+        for key in set(previous_indexes or ()) - set(indexes):
+            pipe.zrem(key, scan["id"])
+        for key in indexes:
+            pipe.zadd(key, {scan["id"]: score})
+        pipe.hset(INDEX_MEMBERSHIP, scan["id"], json.dumps(indexes))
+        pipe.zadd(INDEX_EXPIRY, {scan["id"]: time.time() + SCAN_TTL_SECONDS})
+        await pipe.execute()
+        await self._prune_expired(redis)
+    
+    async def _prune_expired(self, redis):
+        """Unindex a bounded batch of scans whose record TTL has passed"""
+        if not self._expiry_backfilled:
+            await self._backfill_index_expiry(redis)
+        scan_ids = await redis.zrangebyscore(INDEX_EXPIRY, "-inf", time.time(), start=0, num=EXPIRY_SWEEP_BATCH)
+        if not scan_ids:
+            return
+        # A scan rewritten since the read has a fresh record: keep it
+        values = await redis.mget([f"scan:{scan_id}" for scan_id in scan_ids])
+        expired = [scan_id for scan_id, data in zip(scan_ids, values) if data is None]
+        if expired:
+            await self._unindex(redis, expired)
+    
+    async def _backfill_index_expiry(self, redis):
+        """Add expiry entries, from the record TTL, for scans indexed before INDEX_EXPIRY"""
+        if not await redis.exists(INDEX_EXPIRY_BACKFILLED):
+            batch = []
+            async for scan_id, _ in redis.zscan_iter(INDEX_ALL):
+                batch.append(scan_id)
+                if len(batch) >= EXPIRY_SWEEP_BATCH:
+                    await self._backfill_batch(redis, batch)
+                    batch = []
+            if batch:
+                await self._backfill_batch(redis, batch)
+            await redis.set(INDEX_EXPIRY_BACKFILLED, "1")
+        self._expiry_backfilled = True
+    
+    async def _backfill_batch(self, redis, scan_ids: List[str]):
+        pipe = redis.pipeline(transaction=False)
+        for scan_id in scan_ids:
+            pipe.ttl(f"scan:{scan_id}")
+        ttls = await pipe.execute()
+        now = time.time()
+        # -2: record gone (expire now), -1: no TTL (treat as just written)
+        expiry = {
+            scan_id: now + (SCAN_TTL_SECONDS if ttl == -1 else max(ttl, 0))
+            for scan_id, ttl in zip(scan_ids, ttls)
+        }
+        await redis.zadd(INDEX_EXPIRY, expiry)
+    
+    async def _unindex(self, redis, scan_ids: List[str]):
+        """Remove scans whose record has expired from all their indexes"""
+        memberships = await redis.hmget(INDEX_MEMBERSHIP, scan_ids)
+        pipe = redis.pipeline(transaction=True)
+        for scan_id, indexes in zip(scan_ids, memberships):
+            for key in json.loads(indexes) if indexes else [INDEX_ALL]:
+                pipe.zrem(key, scan_id)
+        pipe.hdel(INDEX_MEMBERSHIP, *scan_ids)
+        pipe.zrem(INDEX_EXPIRY, *scan_ids)
+        await pipe.execute()
     
     async def _save_to_filesystem(self, scan_id: str, data: Dict):
         """Save scan data to filesystem"""
@@ -315,6 +415,7 @@ class ScanService:
                 try:
                     redis = await self.get_redis()
                     await redis.delete(f"scan:{scan_id}")
+                    await self._unindex(redis, [scan_id])
                 except Exception:
                     pass
     